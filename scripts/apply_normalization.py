@@ -19,6 +19,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from arnold.graph import ArnoldGraph
 from arnold.normalizer import (
+    AliasIndex,
+    COMMON_EXERCISE_MAPPINGS,
     is_non_exercise,
     normalize_exercise_name_for_matching,
     find_canonical_exercise_id
@@ -93,6 +95,11 @@ def normalize_exercise_instances(graph: ArnoldGraph, dry_run: bool = False) -> d
 
     print(f"  Found {len(results)} unmapped exercise instances")
 
+    # Static mappings first, then every Exercise name/alias in the graph
+    index = AliasIndex({alias: f"EXERCISE:{suffix}" for alias, suffix in COMMON_EXERCISE_MAPPINGS.items()})
+    learned = index.add_graph_aliases(graph)
+    print(f"  Alias index: {len(index)} aliases ({learned} from graph)")
+
     stats = {
         'total_unmapped': len(results),
         'matched': 0,
@@ -104,7 +111,7 @@ def normalize_exercise_instances(graph: ArnoldGraph, dry_run: bool = False) -> d
     for r in results:
         raw_name = r['raw_name']
         normalized = normalize_exercise_name_for_matching(raw_name)
-        exercise_id = find_canonical_exercise_id(normalized)
+        exercise_id = find_canonical_exercise_id(normalized, index)
 
         if exercise_id:
             matched_pairs.append({
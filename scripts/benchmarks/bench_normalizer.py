@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark arnold.normalizer over the raw tag dump.
+
+Replays every exercise name in data/normalization/raw_tags.json, weighted
+by its frequency (the way importers and apply_normalization.py see them),
+through is_non_exercise -> normalize -> canonical lookup, and compares:
+
+- legacy: per-call re.sub passes and the linear first-match substring scan
+  (reference copy of the previous implementation, below)
+- compiled, cold: combined patterns + alias automaton, empty memo
+- compiled, warm: same, memo already populated
+
+Also reports how many lookups the longest-match index resolves differently
+from the legacy first-match scan.
+
+Usage:
+    python scripts/benchmarks/bench_normalizer.py
+    python scripts/benchmarks/bench_normalizer.py --repeat 50 --synthetic-aliases 5000
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from arnold.normalizer import (  # noqa: E402
+    COMMON_EXERCISE_MAPPINGS,
+    NON_EXERCISE_PATTERNS,
+    AliasIndex,
+    find_canonical_exercise_id,
+    is_non_exercise,
+    normalize_exercise_name_for_matching,
+)
+
+RAW_TAGS = Path(__file__).parent.parent.parent / "data" / "normalization" / "raw_tags.json"
+
+
+# --- Legacy reference (previous arnold.normalizer implementation) ---
+
+def legacy_is_non_exercise(name: str) -> bool:
+    name = name.strip()
+    for pattern in NON_EXERCISE_PATTERNS:
+        if re.match(pattern, name, re.IGNORECASE):
+            return True
+    return len(name) < 3 or bool(re.match(r'^[\W_]+$', name)) or bool(re.match(r'^\d+\s*$', name))
+
+
+def legacy_normalize(name: str) -> str:
+    name = re.sub(r'\([^)]*\)', '', name)
+    name = re.sub(r'\d+\s*(lb|kg|lbs|kgs)', '', name, flags=re.IGNORECASE)
+    name = re.sub(r'^\s*weighted\s+', '', name, flags=re.IGNORECASE)
+    name = re.sub(r'\s+with\s+.*', '', name, flags=re.IGNORECASE)
+    name = re.sub(r'\s+(static|dynamic|isometric)', '', name, flags=re.IGNORECASE)
+    name = name.lower()
+    name = re.sub(r'^[\W_]+|[\W_]+$', '', name)
+    name = re.sub(r'[\s\-_]+', ' ', name)
+    name = name.strip()
+    if name.endswith('s') and not name.endswith('ss'):
+        if not any(x in name for x in ['press', 'swiss', 'cross']):
+            name = name[:-1]
+    return name
+
+
+def legacy_find(normalized_name: str, mappings: dict):
+    if normalized_name in mappings:
+        return f"EXERCISE:{mappings[normalized_name]}"
+    for key, value in mappings.items():
+        if key in normalized_name or normalized_name in key:
+            return f"EXERCISE:{value}"
+    return None
+
+
+# --- Benchmark ---
+
+def load_names(path: Path):
+    """(name, freq) for every raw exercise name in the dump."""
+    with open(path) as f:
+        dump = json.load(f)
+    seen = {}
+    for section in ("exercise_names", "unmapped_exercises"):
+        for item in dump.get(section, {}).get("items", []):
+            seen[item["name"]] = max(seen.get(item["name"], 0), item.get("freq", 1))
+    return list(seen.items())
+
+
+def synthetic_aliases(count: int) -> dict:
+    """Stand-in for graph-learned aliases (multi-word, non-matching)."""
+    return {f"synthetic move {i} variant {i % 97}": f"Synthetic_{i}" for i in range(count)}
+
+
+def run_legacy(stream, mappings):
+    start = time.perf_counter()
+    resolved = [
+        None if legacy_is_non_exercise(name) else legacy_find(legacy_normalize(name), mappings)
+        for name in stream
+    ]
+    return time.perf_counter() - start, resolved
+
+
+def run_compiled(stream, index):
+    start = time.perf_counter()
+    resolved = [
+        None if is_non_exercise(name) else find_canonical_exercise_id(normalize_exercise_name_for_matching(name), index)
+        for name in stream
+    ]
+    return time.perf_counter() - start, resolved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalization pipeline benchmark")
+    parser.add_argument("--input", type=Path, default=RAW_TAGS)
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the frequency-weighted stream")
+    parser.add_argument("--synthetic-aliases", type=int, default=2000,
+                        help="Extra aliases standing in for graph-learned ones (0 = static only)")
+    args = parser.parse_args()
+
+    names = load_names(args.input)
+    one_pass = [name for name, freq in names for _ in range(freq)]
+    stream = one_pass * args.repeat
+
+    mappings = dict(COMMON_EXERCISE_MAPPINGS)
+    mappings.update(synthetic_aliases(args.synthetic_aliases))
+    build_start = time.perf_counter()
+    index = AliasIndex({alias: f"EXERCISE:{suffix}" for alias, suffix in mappings.items()})
+    index.lookup("warm up")  # Builds the automaton
+    build_s = time.perf_counter() - build_start
+
+    print(f"{len(names)} unique names, {len(stream)} lookups, {len(index)} aliases "
+          f"(index built in {build_s * 1000:.0f} ms)\n")
+
+    legacy_s, legacy = run_legacy(stream, mappings)
+    normalize_exercise_name_for_matching.cache_clear()
+    cold_s, _ = run_compiled(one_pass, index)
+    warm_s, compiled = run_compiled(stream, index)
+
+    print(f"{'pipeline':<18} {'time s':>8} {'µs/name':>9}")
+    print(f"{'legacy':<18} {legacy_s:>8.3f} {legacy_s / len(stream) * 1e6:>9.1f}")
+    print(f"{'compiled (cold)':<18} {cold_s:>8.3f} {cold_s / len(one_pass) * 1e6:>9.1f}   (one pass, empty memo)")
+    print(f"{'compiled (warm)':<18} {warm_s:>8.3f} {warm_s / len(stream) * 1e6:>9.1f}   "
+          f"({legacy_s / warm_s:.0f}x legacy)")
+    print(f"\n  {normalize_exercise_name_for_matching.cache_info()}")
+
+    unique = {name: (old, new) for name, old, new in zip(stream, legacy, compiled)}
+    changed = {name: pair for name, pair in unique.items() if pair[0] != pair[1]}
+    mapped_old = sum(1 for old, _ in unique.values() if old)
+    mapped_new = sum(1 for _, new in unique.values() if new)
+    print(f"\n  Mapped names: legacy {mapped_old}, compiled {mapped_new}; "
+          f"{len(changed)} of {len(unique)} resolve differently (longest match vs first match)")
+    for name, (old, new) in sorted(changed.items())[:10]:
+        print(f"    {name[:60]!r}: {old} -> {new}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark PeriodizationEngine decisions over the in-memory TrainingTimeline.
+
+Generates years of synthetic workouts (4/week, RPE, deviations, a phase
+every week), serves them through a stub graph that counts queries, then
+times timeline load, incremental appends and repeated phase / deload /
+adherence decisions. Each decision is checked against a plain Python
+scan of the same records.
+
+No database needed.
+
+Usage:
+    python scripts/benchmarks/bench_periodization_timeline.py
+    python scripts/benchmarks/bench_periodization_timeline.py --years 10 --decisions 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from arnold.judgment_day.periodization import PeriodizationEngine, PeriodizationPhase  # noqa: E402
+from arnold.judgment_day.timeline import TrainingTimeline  # noqa: E402
+
+PHASES = ["Accumulation", "Accumulation", "Intensification", "Realization"]
+
+
+class StubGraph:
+    """Answers the timeline query from a list of records; counts queries."""
+
+    def __init__(self, records):
+        self.records = records
+        self.queries = 0
+
+    def execute_query(self, query, params=None):
+        self.queries += 1
+        since = (params or {}).get('since')
+        return [r for r in self.records if since is None or r['date'] >= since]
+
+    def execute_write(self, query, params=None):
+        self.queries += 1
+
+
+def synthetic_workouts(years: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=365 * years)
+    records = []
+    day = start
+    n = 0
+    while day <= date.today():
+        if day.weekday() in (0, 1, 3, 5):
+            week = (day - start).days // 7
+            records.append({
+                'id': f"WORKOUT:{n}",
+                'date': day.isoformat(),
+                'tonnage': rng.uniform(4000, 20000),
+                'intensity': rng.choice([None, rng.uniform(5, 9)]),
+                'deviations': rng.choice([0, 0, 0, 1]),
+                'phase': PHASES[week % 4] if day.weekday() == 0 else None,
+            })
+            n += 1
+        day += timedelta(days=1)
+    return records
+
+
+def reference(records, weeks: int = 4) -> dict:
+    """Same decisions computed by scanning the records."""
+    start = (date.today() - timedelta(weeks=weeks)).isoformat()
+    window = [r for r in records if r['date'] >= start]
+    rated = [r['intensity'] for r in window if r['intensity'] is not None]
+    phased = [r for r in records if r['phase'] is not None]
+    return {
+        'last_phase': (phased[-1]['phase'], date.fromisoformat(phased[-1]['date'])) if phased else None,
+        'completed': len(window),
+        'avg_intensity': sum(rated) / len(rated) if rated else None,
+        'deviations': sum(1 for r in window if r['deviations']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TrainingTimeline periodization decisions")
+    parser.add_argument("--years", type=int, default=5, help="Years of synthetic history")
+    parser.add_argument("--decisions", type=int, default=2000, help="Decision rounds to time")
+    parser.add_argument("--appends", type=int, default=1000, help="Incremental appends to time")
+    args = parser.parse_args()
+
+    records = synthetic_workouts(args.years)
+    graph = StubGraph(records)
+    print(f"History: {len(records):,} workouts over {args.years} years")
+
+    t0 = time.perf_counter()
+    timeline = TrainingTimeline(graph).load()
+    load_ms = (time.perf_counter() - t0) * 1000
+    print(f"  Load:      {load_ms:8.2f} ms ({graph.queries} query)")
+
+    # Correctness against a plain scan
+    expected = reference(records)
+    engine = PeriodizationEngine(graph, timeline=timeline)
+    fatigue = timeline.fatigue_since(date.today() - timedelta(weeks=4))
+    assert timeline.last_phase() == expected['last_phase']
+    assert timeline.count_since(date.today() - timedelta(weeks=4)) == expected['completed']
+    assert fatigue['deviations'] == expected['deviations']
+    if expected['avg_intensity'] is not None:
+        assert abs(fatigue['avg_intensity'] - expected['avg_intensity']) < 1e-3
+    print("  ✓ Decisions match reference scan")
+
+    queries_before = graph.queries
+    t0 = time.perf_counter()
+    for _ in range(args.decisions):
+        phase, week, _ = engine.get_current_phase()
+        engine.should_deload()
+        engine.get_adherence_rate(weeks=4)
+        engine.get_phase_targets(phase)
+    decide_s = time.perf_counter() - t0
+    per_round_us = decide_s / args.decisions * 1e6
+    print(f"  Decisions: {per_round_us:8.1f} µs per round "
+          f"(phase + deload + adherence + targets), {graph.queries - queries_before} queries")
+
+    last = date.fromordinal(int(timeline.dates[-1]))
+    t0 = time.perf_counter()
+    for i in range(args.appends):
+        timeline.append(
+            last + timedelta(days=i + 1),
+            tonnage=10000.0,
+            intensity=7.0,
+            phase=PeriodizationPhase.ACCUMULATION.value if i % 4 == 0 else None,
+        )
+    append_us = (time.perf_counter() - t0) / args.appends * 1e6
+    print(f"  Append:    {append_us:8.1f} µs per workout ({len(timeline):,} rows)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
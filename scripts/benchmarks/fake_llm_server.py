@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Fake OpenAI-compatible chat endpoint for offline pipeline runs.
+
+Answers POST /v1/chat/completions after a simulated latency. Above
+--capacity concurrent requests it returns HTTP 429 with Retry-After,
+and latency grows with load, so adaptive concurrency (arnold.batch_runner)
+can be exercised without a real API.
+
+The response content is --content (a JSON string), or the contents of
+--content-file. With neither, a minimal movement classification is
+returned.
+
+Usage:
+    python scripts/benchmarks/fake_llm_server.py --port 8766 --latency 0.2 --capacity 4
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=test python scripts/...
+
+In-process (benchmarks):
+    server = start_server(port=0, latency=0.05, capacity=4)
+    url = f"http://127.0.0.1:{server.server_port}/v1"
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_CONTENT = json.dumps({
+    "movements": ["HINGE"],
+    "reasoning": "Stub classification",
+    "primary_muscles": [],
+    "joint_actions": [],
+    "confidence": 0.8,
+})
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    server: 'FakeLLMServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: Optional[dict] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            if server.active >= server.capacity:
+                server.rejected += 1
+                over = True
+            else:
+                server.active += 1
+                load = server.active
+                over = False
+
+        if over:
+            self._send(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                       {"Retry-After": str(server.retry_after)})
+            return
+
+        try:
+            # Latency grows with concurrent load, like a shared backend
+            base = server.latency_fn(request) if server.latency_fn else server.latency
+            time.sleep(base * (1 + server.load_factor * (load - 1)))
+            content = server.content_fn(request) if server.content_fn else server.content
+            self._send(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float, capacity: int, content: str,
+                 load_factor: float = 0.1, retry_after: float = 0.5, content_fn=None, latency_fn=None):
+        super().__init__(address, FakeLLMHandler)
+        self.latency = latency
+        self.capacity = capacity
+        self.content = content
+        self.content_fn = content_fn
+        self.latency_fn = latency_fn  # request -> seconds (e.g. grows with prompt/output size)
+        self.load_factor = load_factor
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.active = 0
+        self.requests = 0
+        self.rejected = 0
+
+
+def start_server(port: int = 0, latency: float = 0.05, capacity: int = 4,
+                 content: str = DEFAULT_CONTENT, **kwargs) -> FakeLLMServer:
+    """Start a fake endpoint on a background thread (port 0 = any free port)."""
+    server = FakeLLMServer(("127.0.0.1", port), latency, capacity, content, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat endpoint")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.2, help="Base seconds per request")
+    parser.add_argument("--capacity", type=int, default=4, help="Concurrent requests before 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After seconds on 429")
+    parser.add_argument("--content", type=str, help="Response content (JSON string)")
+    parser.add_argument("--content-file", type=str, help="File with response content")
+    args = parser.parse_args()
+
+    content = args.content or DEFAULT_CONTENT
+    if args.content_file:
+        with open(args.content_file) as f:
+            content = f.read()
+
+    server = FakeLLMServer(("127.0.0.1", args.port), args.latency, args.capacity, content,
+                           retry_after=args.retry_after)
+    print(f"Fake LLM endpoint on http://127.0.0.1:{args.port}/v1 "
+          f"(latency {args.latency}s, capacity {args.capacity})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{server.requests} requests, {server.rejected} rate-limited")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,21 +3,27 @@
 Parallel LLM-Powered Movement Pattern Classification
 
 Classifies all unclassified exercises in Neo4j using OpenAI gpt-5-mini
-with 6 parallel workers (ThreadPoolExecutor pattern).
+through arnold.batch_runner: --pack exercises per request (taxonomy and
+instructions sent once per pack, JSON-array response), up to 6 concurrent
+calls adjusted to observed latency and rate limits. Exercises a packed
+response misses are retried one per request. Every result is appended to a
+JSONL checkpoint (data/cache/checkpoints/), so re-running the same command
+after a crash resumes from the checkpoint.
 
 Usage:
     python scripts/classify_all_exercises_parallel.py --test    # 20 exercises
     python scripts/classify_all_exercises_parallel.py --full    # All unclassified
     python scripts/classify_all_exercises_parallel.py --batch 100  # First 100
+    python scripts/classify_all_exercises_parallel.py --full --restart  # Ignore checkpoint
+    python scripts/classify_all_exercises_parallel.py --full --pack 1   # One exercise per request
 """
 
 import sys
 import json
 import argparse
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from dotenv import load_dotenv
 import os
@@ -26,14 +32,17 @@ import os
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from arnold.graph import ArnoldGraph
-from arnold.classify_movements import MovementClassifier
+from arnold.batch_runner import Checkpoint, is_rate_limit, run_packed
+from arnold.classify_movements import DEFAULT_PACK_SIZE, MovementClassifier
+from arnold.llm_cache import shared_cache
 
 # Load environment
 load_dotenv(Path(__file__).parent.parent / ".env")
 
-MAX_WORKERS = 6  # Parallel LLM calls
+MAX_WORKERS = 6  # Upper bound on concurrent LLM calls
 OUTPUT_DIR = Path(__file__).parent.parent / "data"
 OUTPUT_DIR.mkdir(exist_ok=True)
+CHECKPOINT_DIR = OUTPUT_DIR / "cache" / "checkpoints"
 
 
 class ParallelExerciseClassifier:
@@ -44,6 +53,8 @@ class ParallelExerciseClassifier:
     def __init__(self, graph: ArnoldGraph):
         self.graph = graph
         self.movement_taxonomy = self._load_taxonomy()
+        self.classifier = MovementClassifier(api_key=os.getenv('OPENAI_API_KEY'))
+        self._sunk = set()
         self.stats = {
             'total': 0,
             'classified': 0,
@@ -107,12 +118,11 @@ class ParallelExerciseClassifier:
         """
         Classify a single exercise (thread-safe).
 
-        Each thread gets its own MovementClassifier instance.
+        Rate limits propagate so the batch runner can back off; other
+        failures come back as a result with an 'error' key.
         """
-        classifier = MovementClassifier(api_key=os.getenv('OPENAI_API_KEY'))
-
         try:
-            result = classifier.classify_exercise(
+            result = self.classifier.classify_exercise(
                 exercise['name'],
                 exercise['category'],
                 exercise['equipment'],
@@ -125,6 +135,8 @@ class ParallelExerciseClassifier:
             return result
 
         except Exception as e:
+            if is_rate_limit(e):
+                raise
             return {
                 'exercise': exercise['name'],
                 'exercise_id': exercise['id'],
@@ -134,50 +146,95 @@ class ParallelExerciseClassifier:
                 'error': str(e)
             }
 
-    def parallel_classify(self, exercises: List[Dict]) -> List[Dict[str, Any]]:
+    def _classify_pack(self, pack: List[Dict]) -> List[Optional[Dict[str, Any]]]:
+        """Classify a pack in one request; None marks exercises to retry singly."""
+        results = self.classifier.classify_exercises(pack, self.movement_taxonomy)
+        for exercise, result in zip(pack, results):
+            if result is not None:
+                result['exercise_id'] = exercise['id']
+        return results
+
+    def _classify_or_raise(self, exercise: Dict) -> Dict[str, Any]:
+        """Failed classifications raise, so the checkpoint records them for retry."""
+        result = self.classify_single_exercise(exercise)
+        if result.get('error'):
+            raise RuntimeError(result['error'])
+        return result
+
+    def _record(self, exercise: Dict, result: Dict[str, Any]):
+        """Sink: update stats as each classification lands."""
+        self._sunk.add(exercise['id'])
+        self.stats['classified'] += 1
+
+        if result['confidence'] >= 0.8:
+            self.stats['high_confidence'] += 1
+        elif result['confidence'] >= 0.5:
+            self.stats['medium_confidence'] += 1
+        else:
+            self.stats['low_confidence'] += 1
+
+    def parallel_classify(
+        self,
+        exercises: List[Dict],
+        checkpoint: Path = None,
+        pack_size: int = DEFAULT_PACK_SIZE
+    ) -> List[Dict[str, Any]]:
         """
-        Classify exercises in parallel using ThreadPoolExecutor.
+        Classify exercises concurrently, checkpointing each result.
+
+        Args:
+            exercises: Exercises to classify
+            checkpoint: JSONL checkpoint; exercises already in it are skipped
+            pack_size: Exercises per request (1 = one request per exercise)
+
+        Returns:
+            Classifications for every exercise that succeeded (this run or earlier)
         """
         print(f"\n{'='*70}")
         print(f"PARALLEL CLASSIFICATION: {len(exercises)} exercises")
-        print(f"Workers: {MAX_WORKERS}")
+        print(f"Workers: up to {MAX_WORKERS} (adaptive), {pack_size} exercises per request")
+        if checkpoint:
+            print(f"Checkpoint: {checkpoint}")
         print('='*70)
 
-        results = []
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            # Submit all classification tasks
-            future_to_exercise = {
-                executor.submit(self.classify_single_exercise, exercise): exercise
-                for exercise in exercises
-            }
-
-            # Process results as they complete
-            with tqdm(total=len(exercises), desc="Classifying") as pbar:
-                for future in as_completed(future_to_exercise):
-                    exercise = future_to_exercise[future]
-
-                    try:
-                        result = future.result()
-                        results.append(result)
-
-                        # Update stats
-                        self.stats['classified'] += 1
-
-                        if result['confidence'] >= 0.8:
-                            self.stats['high_confidence'] += 1
-                        elif result['confidence'] >= 0.5:
-                            self.stats['medium_confidence'] += 1
-                        else:
-                            self.stats['low_confidence'] += 1
-
-                    except Exception as e:
-                        self.stats['errors'].append({
-                            'exercise': exercise['name'],
-                            'error': str(e)
-                        })
+        with tqdm(total=len(exercises), desc="Classifying") as pbar:
+            run_stats = run_packed(
+                self._classify_pack,
+                self._classify_or_raise,
+                exercises,
+                pack_size,
+                checkpoint=checkpoint,
+                key=lambda exercise: exercise['id'],
+                sink=self._record,
+                max_workers=MAX_WORKERS,
+                progress=lambda done, total: pbar.update(done - pbar.n)
+            )
 
-                    pbar.update(1)
+        if run_stats['skipped']:
+            print(f"  ✓ Resumed: {run_stats['skipped']} exercises already in checkpoint")
+        if run_stats['packed_calls']:
+            print(f"  ✓ {run_stats['packed_items']} exercises in {run_stats['packed_calls']} packed requests, "
+                  f"{run_stats['requeued']} retried individually")
+        if run_stats['rate_limited']:
+            print(f"  ⚠ Rate limited {run_stats['rate_limited']} times "
+                  f"(concurrency {run_stats['concurrency'][0]} → {run_stats['concurrency'][-1]})")
+
+        wanted = {exercise['id']: exercise for exercise in exercises}
+        records = Checkpoint(checkpoint).load() if checkpoint else {}
+        for key, record in records.items():
+            if key in wanted and not record['ok']:
+                self.stats['errors'].append({
+                    'exercise': wanted[key]['name'],
+                    'error': record['error']
+                })
+
+        results = [record['result'] for key, record in records.items() if key in wanted and record['ok']]
+
+        # Count classifications finished by an earlier (interrupted) run
+        if run_stats['skipped']:
+            for result in results:
+                if result['exercise_id'] not in self._sunk:
+                    self._record(wanted[result['exercise_id']], result)
 
         return results
 
@@ -203,6 +260,7 @@ class ParallelExerciseClassifier:
         print(f"  ✓ High confidence (≥0.8): {self.stats['high_confidence']} ({100*self.stats['high_confidence']/total:.1f}%)")
         print(f"  ⚠ Medium confidence (0.5-0.8): {self.stats['medium_confidence']} ({100*self.stats['medium_confidence']/total:.1f}%)")
         print(f"  ⚠ Low confidence (<0.5): {self.stats['low_confidence']} ({100*self.stats['low_confidence']/total:.1f}%)")
+        print(f"\n{shared_cache().summary()}")
 
         if self.stats['errors']:
             print(f"\n✗ Errors: {len(self.stats['errors'])}")
@@ -260,6 +318,9 @@ def main():
     parser.add_argument('--full', action='store_true', help='Classify all unclassified exercises')
     parser.add_argument('--batch', type=int, help='Classify first N exercises')
     parser.add_argument('--save-progress', action='store_true', help='Save progress every 100 exercises')
+    parser.add_argument('--restart', action='store_true', help='Discard the checkpoint and start over')
+    parser.add_argument('--pack', type=int, default=DEFAULT_PACK_SIZE,
+                        help=f'Exercises per request (default {DEFAULT_PACK_SIZE}; 1 = one per request)')
 
     args = parser.parse_args()
 
@@ -313,7 +374,10 @@ def main():
 
     # Run parallel classification
     start_time = time.time()
-    results = classifier.parallel_classify(exercises)
+    checkpoint = CHECKPOINT_DIR / filename.replace('.json', '.jsonl')
+    if args.restart and checkpoint.exists():
+        checkpoint.unlink()
+    results = classifier.parallel_classify(exercises, checkpoint=checkpoint, pack_size=args.pack)
     elapsed_time = time.time() - start_time
 
     # Save results
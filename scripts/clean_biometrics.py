@@ -9,11 +9,15 @@ Run: python scripts/clean_biometrics.py
 """
 
 import os
-import psycopg2
+import sys
+from pathlib import Path
 from psycopg2.extras import RealDictCursor
 import numpy as np
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).parent / "sync"))
+from step_runtime import StepResult, connect, run_main  # noqa: E402
+
 PG_URI = os.environ.get(
     "DATABASE_URI",
     "postgresql://brock@localhost:5432/arnold_analytics"
@@ -61,7 +65,7 @@ def get_replacement_value(readings, idx, metric_type):
 
 def detect_sensor_errors():
     """Detect sensor errors using physiological bounds."""
-    conn = psycopg2.connect(PG_URI, cursor_factory=RealDictCursor)
+    conn = connect(PG_URI, cursor_factory=RealDictCursor)
     cur = conn.cursor()
     
     # Get all biometric readings
@@ -162,7 +166,7 @@ def detect_sensor_errors():
 
 def show_current_errors():
     """Show currently flagged sensor errors."""
-    conn = psycopg2.connect(PG_URI, cursor_factory=RealDictCursor)
+    conn = connect(PG_URI, cursor_factory=RealDictCursor)
     cur = conn.cursor()
     
     cur.execute("""
@@ -185,7 +189,7 @@ def show_current_errors():
         print("\nNo sensor errors flagged.")
 
 
-def main():
+def main(argv: list = None):
     print("Biometric Sensor Error Detection")
     print("=" * 50)
     print("Physiological bounds (values outside = sensor error):")
@@ -197,5 +201,10 @@ def main():
     show_current_errors()
 
 
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     main()
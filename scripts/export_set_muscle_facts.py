@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Export set_muscle_facts (migration 027) to staging Parquet.
+
+Postgres keeps the table current via triggers on `sets`; this mirrors it to
+data/staging/set_muscle_facts/month=YYYY-MM/part-0.parquet for DuckDB
+readers (src/muscle_heatmap.py).
+
+Incremental: one summary query compares each month's row count and latest
+updated_at with the last export (data/sync_state/set_muscle_facts.json).
+Only months that changed are rewritten; months that disappeared are removed.
+
+Usage:
+    python scripts/export_set_muscle_facts.py           # Changed months only
+    python scripts/export_set_muscle_facts.py --full    # Rewrite every month
+    python scripts/export_set_muscle_facts.py --dry-run # Show what would change
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, str(Path(__file__).parent / "sync"))
+from step_runtime import StepResult, connect, run_main  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).parent.parent
+FACTS_DIR = PROJECT_ROOT / "data" / "staging" / "set_muscle_facts"
+STATE_FILE = PROJECT_ROOT / "data" / "sync_state" / "set_muscle_facts.json"
+
+PG_URI = os.getenv("DATABASE_URI", "postgresql://brock@localhost:5432/arnold_analytics")
+
+# Parquet schema (month is the hive partition key, not stored in the files)
+SCHEMA = pa.schema([
+    ("set_id", pa.string()),
+    ("muscle_name", pa.string()),
+    ("role", pa.string()),
+    ("workout_id", pa.string()),
+    ("session_date", pa.date32()),
+    ("exercise_id", pa.string()),
+    ("exercise_name", pa.string()),
+    ("muscle_type", pa.string()),
+    ("role_weight", pa.float64()),
+    ("reps", pa.int32()),
+    ("load_lbs", pa.float64()),
+    ("volume_lbs", pa.float64()),
+    ("rpe", pa.float64()),
+    ("is_warmup", pa.bool_()),
+])
+
+
+def load_state() -> dict:
+    """Last exported {month: [row_count, max_updated_at]}."""
+    if STATE_FILE.exists():
+        with open(STATE_FILE) as f:
+            return json.load(f).get("months", {})
+    return {}
+
+
+def save_state(months: dict):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, "w") as f:
+        json.dump({"months": months}, f, indent=2, sort_keys=True)
+
+
+def month_summary(cur) -> dict:
+    """Current {month: [row_count, max_updated_at]} from Postgres."""
+    cur.execute("""
+        SELECT
+            to_char(session_date, 'YYYY-MM') as month,
+            COUNT(*) as row_count,
+            MAX(updated_at)::text as max_updated_at
+        FROM set_muscle_facts
+        GROUP BY 1
+        ORDER BY 1
+    """)
+    return {r["month"]: [r["row_count"], r["max_updated_at"]] for r in cur.fetchall()}
+
+
+def export_month(cur, month: str) -> int:
+    """Rewrite one month partition; returns row count."""
+    cur.execute("""
+        SELECT
+            set_id::text, muscle_name, role, workout_id::text, session_date,
+            exercise_id, exercise_name, muscle_type,
+            role_weight::float8, reps, load_lbs::float8, volume_lbs::float8,
+            rpe::float8, is_warmup
+        FROM set_muscle_facts
+        WHERE session_date >= to_date(%s, 'YYYY-MM')
+          AND session_date < to_date(%s, 'YYYY-MM') + interval '1 month'
+        ORDER BY session_date, set_id
+    """, (month, month))
+    rows = cur.fetchall()
+
+    partition = FACTS_DIR / f"month={month}"
+    partition.mkdir(parents=True, exist_ok=True)
+    tmp = partition / "part-0.parquet.tmp"
+    pq.write_table(pa.Table.from_pylist(rows, schema=SCHEMA), tmp)
+    tmp.replace(partition / "part-0.parquet")
+    return len(rows)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Export set_muscle_facts to staging Parquet")
+    parser.add_argument("--full", action="store_true", help="Rewrite every month partition")
+    parser.add_argument("--dry-run", action="store_true", help="Show changed months without writing")
+    args = parser.parse_args(argv)
+
+    conn = connect(PG_URI)
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    current = month_summary(cur)
+    previous = {} if args.full else load_state()
+
+    changed = sorted(m for m, summary in current.items() if previous.get(m) != summary)
+    removed = sorted(m for m in previous if m not in current)
+    if args.full and FACTS_DIR.exists():
+        removed = sorted(
+            p.name.split("=", 1)[1] for p in FACTS_DIR.glob("month=*") if p.name.split("=", 1)[1] not in current
+        )
+
+    print(f"set_muscle_facts: {len(current)} months, {len(changed)} changed, {len(removed)} removed")
+
+    if args.dry_run:
+        for month in changed:
+            print(f"  Would export {month} ({current[month][0]:,} rows)")
+        for month in removed:
+            print(f"  Would remove {month}")
+        conn.close()
+        return 0
+
+    total = 0
+    for month in changed:
+        count = export_month(cur, month)
+        total += count
+        print(f"  ✓ {month}: {count:,} rows")
+
+    for month in removed:
+        shutil.rmtree(FACTS_DIR / f"month={month}", ignore_errors=True)
+        print(f"  ✓ {month}: removed")
+
+    cur.close()
+    conn.close()
+
+    save_state(current)
+    print(f"Exported {total:,} rows to {FACTS_DIR}")
+    return 0
+
+
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -376,7 +376,7 @@ def recompute_quality_only(source: str = 'polar'):
 # Main Entry Point
 # =============================================================================
 
-def main():
+def main(argv: list = None):
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(description='HRR Feature Extraction Pipeline')
     parser.add_argument('--session-id', type=int, help='Process specific session')
@@ -389,7 +389,7 @@ def main():
     parser.add_argument('--recompute-quality', action='store_true',
                         help='Recompute quality flags only (no re-extraction)')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.recompute_quality:
         recompute_quality_only(args.source)
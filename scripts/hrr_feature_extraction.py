@@ -13,7 +13,19 @@ Usage:
 This is a shim that imports from the modular hrr/ package.
 """
 
+import sys
+from pathlib import Path
+
 from hrr.cli import main
 
+sys.path.insert(0, str(Path(__file__).parent / "sync"))
+from step_runtime import StepResult, run_main  # noqa: E402
+
+
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     main()
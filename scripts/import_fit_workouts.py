@@ -38,13 +38,14 @@ except ImportError:
     sys.exit(1)
 
 try:
-    import psycopg2
     from psycopg2.extras import execute_values
 except ImportError:
     print("ERROR: psycopg2 not installed. Run: pip install psycopg2-binary")
     sys.exit(1)
 
 from neo4j import GraphDatabase
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "sync"))
+from step_runtime import StepResult, connect, run_main  # noqa: E402
 from dotenv import load_dotenv
 
 load_dotenv(PROJECT_ROOT / ".env")
@@ -494,13 +495,13 @@ def find_fit_files() -> list:
     return fit_files
 
 
-def main():
+def main(argv: list = None):
     parser = argparse.ArgumentParser(description="Import FIT files (Postgres-first per ADR-001)")
     parser.add_argument("--dry-run", action="store_true", help="Preview without importing")
     parser.add_argument("--file", type=Path, help="Import specific FIT file")
     parser.add_argument("--force", action="store_true", help="Re-import even if already in manifest")
     parser.add_argument("--skip-neo4j", action="store_true", help="Skip Neo4j reference creation")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("=" * 60)
     print("FIT File Importer (Postgres-First Architecture)")
@@ -548,7 +549,7 @@ def main():
     
     if not args.dry_run:
         try:
-            pg_conn = psycopg2.connect(POSTGRES_DSN)
+            pg_conn = connect(POSTGRES_DSN)
             print("✓ Connected to Postgres")
         except Exception as e:
             print(f"ERROR: Cannot connect to Postgres: {e}")
@@ -650,5 +651,10 @@ def main():
         neo4j_driver.close()
 
 
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     main()
@@ -17,8 +17,10 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
-import psycopg2
-from psycopg2.extras import execute_batch
+
+sys.path.insert(0, str(Path(__file__).parent / "sync"))
+from step_runtime import StepResult, connect, run_main  # noqa: E402
+from polar_loader import filter_new_sessions, load_sessions  # noqa: E402
 
 
 # Database connection - use env var or default to local brock user
@@ -139,104 +141,57 @@ def import_sessions(folder_path: Path):
     session_files = sorted(folder_path.glob('training-session-*.json'))
     print(f"Found {len(session_files)} training session files")
     
-    conn = psycopg2.connect(PG_URI)
+    conn = connect(PG_URI)
     cur = conn.cursor()
     
-    # EFFICIENCY FIX: Query all known session IDs upfront to avoid per-file DB queries
-    cur.execute("SELECT polar_session_id FROM polar_sessions")
-    known_sessions = {row[0] for row in cur.fetchall()}
-    print(f"  Already imported: {len(known_sessions)} sessions")
+    # Dedupe all candidate session IDs in one query, BEFORE opening any files
+    new_ids = filter_new_sessions(cur, [extract_session_id(f.name) for f in session_files])
+    cur.close()
+    print(f"  Already imported: {len(session_files) - len(new_ids)} sessions")
     
-    # Filter to only new files BEFORE opening them
-    new_files = [
-        f for f in session_files
-        if extract_session_id(f.name) not in known_sessions
-    ]
+    new_files = [f for f in session_files if extract_session_id(f.name) in new_ids]
     
     if not new_files:
         print("  No new sessions to import")
-        cur.close()
         conn.close()
         return
     
     print(f"  New sessions to import: {len(new_files)}")
     
-    sessions_imported = 0
-    samples_imported = 0
-    
+    parsed = []
     for filepath in new_files:
         print(f"Processing {filepath.name}...")
-        
         try:
             result = parse_training_session(filepath)
-            if not result:
-                continue
-            
-            session = result['session']
-            samples = result['samples']
-            
-            # Insert session
-            cur.execute("""
-                INSERT INTO polar_sessions (
-                    polar_session_id, start_time, stop_time, duration_seconds, sport_type,
-                    avg_hr, max_hr, min_hr, calories,
-                    zone_1_seconds, zone_2_seconds, zone_3_seconds, zone_4_seconds, zone_5_seconds,
-                    zone_1_lower, zone_1_upper, zone_2_lower, zone_2_upper,
-                    zone_3_lower, zone_3_upper, zone_4_lower, zone_4_upper,
-                    zone_5_lower, zone_5_upper,
-                    vo2max, resting_hr, max_hr_setting, ftp, weight_kg,
-                    timezone_offset, feeling, note
-                ) VALUES (
-                    %(polar_session_id)s, %(start_time)s, %(stop_time)s, %(duration_seconds)s, %(sport_type)s,
-                    %(avg_hr)s, %(max_hr)s, %(min_hr)s, %(calories)s,
-                    %(zone_1_seconds)s, %(zone_2_seconds)s, %(zone_3_seconds)s, %(zone_4_seconds)s, %(zone_5_seconds)s,
-                    %(zone_1_lower)s, %(zone_1_upper)s, %(zone_2_lower)s, %(zone_2_upper)s,
-                    %(zone_3_lower)s, %(zone_3_upper)s, %(zone_4_lower)s, %(zone_4_upper)s,
-                    %(zone_5_lower)s, %(zone_5_upper)s,
-                    %(vo2max)s, %(resting_hr)s, %(max_hr_setting)s, %(ftp)s, %(weight_kg)s,
-                    %(timezone_offset)s, %(feeling)s, %(note)s
-                ) RETURNING id
-            """, session)
-            
-            session_id = cur.fetchone()[0]
-            sessions_imported += 1
-            
-            # Insert HR samples in batches with source provenance
-            if samples:
-                sample_data = [
-                    (session_id, s['sample_time'], s['hr_value'], 'polar_file')
-                    for s in samples
-                ]
-                execute_batch(
-                    cur,
-                    "INSERT INTO hr_samples (session_id, sample_time, hr_value, source) VALUES (%s, %s, %s, %s)",
-                    sample_data,
-                    page_size=1000
-                )
-                samples_imported += len(samples)
-                print(f"  Imported {len(samples)} HR samples")
-            
-            conn.commit()
-            
         except Exception as e:
-            conn.rollback()
             print(f"  ERROR: {e}")
             continue
-    
-    cur.close()
-    conn.close()
+        if result:
+            parsed.append(result)
+    
+    # One transaction, one savepoint per session file
+    try:
+        result = load_sessions(conn, parsed, source='polar_file')
+    except Exception as e:
+        print(f"  ERROR: {e}")
+        result = {"sessions_imported": 0, "samples_imported": 0}
+    finally:
+        conn.close()
     
     print(f"\n=== Import Complete ===")
-    print(f"Sessions imported: {sessions_imported}")
-    print(f"HR samples imported: {samples_imported}")
+    print(f"Sessions imported: {result['sessions_imported']}")
+    print(f"HR samples imported: {result['samples_imported']}")
+    if result.get("failed"):
+        print(f"Failed (not imported): {len(result['failed'])} sessions")
 
 
-def main():
-    if len(sys.argv) < 2:
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 1:
         print("Usage: python import_polar_sessions.py /path/to/polar-export-folder")
         sys.exit(1)
     
-    folder_path = Path(sys.argv[1])
+    folder_path = Path(argv[0])
     if not folder_path.exists():
         print(f"Error: folder not found: {folder_path}")
         sys.exit(1)
@@ -244,5 +199,10 @@ def main():
     import_sessions(folder_path)
 
 
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == '__main__':
     main()
@@ -70,6 +70,8 @@ def create_workout_node(graph: ArnoldGraph, parsed: Dict[str, Any]) -> str:
 
     query = """
     MERGE (w:Workout {id: $id})
+    ON CREATE SET w.imported_at = datetime()
+    ON MATCH SET w.updated_at = datetime()
     SET w += $props
     RETURN w.id as id
     """
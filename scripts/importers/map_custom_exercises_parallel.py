@@ -12,7 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
 from arnold.graph import ArnoldGraph
-from openai import OpenAI
+from arnold.llm_cache import llm_client, shared_cache
 from dotenv import load_dotenv
 import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -23,7 +23,7 @@ load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = llm_client(OPENAI_API_KEY)
 
 NUM_WORKERS = 6
 MODEL = "gpt-4o-mini"  # Using gpt-4o-mini instead of gpt-5.2
@@ -105,7 +105,8 @@ class CustomExerciseMapper:
         print(f"  ✓ Successfully mapped: {self.stats['mapped']}")
         print(f"  ✓ Novel exercises created: {self.stats['novel_exercises']}")
         print(f"  ✓ Variations linked: {self.stats['variations']}")
-        print(f"  ✗ Failed: {self.stats['failed']}\n")
+        print(f"  ✗ Failed: {self.stats['failed']}")
+        print(f"  {shared_cache().summary()}\n")
 
         # Verify
         self._verify_mappings()
@@ -15,7 +15,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
 from arnold.graph import ArnoldGraph
-from openai import OpenAI
+from arnold.llm_cache import llm_client, shared_cache
 from dotenv import load_dotenv
 import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -24,7 +24,7 @@ from tqdm import tqdm
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = llm_client(OPENAI_API_KEY)
 
 NUM_WORKERS = 6
 MODEL = "gpt-4o-mini"
@@ -162,7 +162,8 @@ class CustomExerciseMapperV2:
         print(f"  ✓ Variations linked: {self.stats['variations']}")
         print(f"  ✓ Novel exercises: {self.stats['novel_exercises']}")
         print(f"  ✓ Average confidence: {self.stats['avg_confidence']:.2f}")
-        print(f"  ✗ Failed: {self.stats['failed']}\n")
+        print(f"  ✗ Failed: {self.stats['failed']}")
+        print(f"  {shared_cache().summary()}\n")
 
         # Verify
         self._verify_mappings()
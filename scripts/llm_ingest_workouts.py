@@ -13,6 +13,9 @@ Usage:
 
     # Specific files
     python scripts/llm_ingest_workouts.py --files 2024-12-16_workout.md,2025-03-12_workout.md
+
+    # Parser: hybrid (default, LLM only for ambiguous lines), llm, grammar (no API calls)
+    python scripts/llm_ingest_workouts.py --full --mode llm
 """
 
 import sys
@@ -27,7 +30,10 @@ import time
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from arnold.graph import ArnoldGraph
-from arnold.llm_ingest import LLMWorkoutParser, get_exercise_database_from_graph
+from arnold.hybrid_ingest import PARSER_MODES, workout_parser
+from arnold.judgment_day.timeline import record_workout
+from arnold.llm_ingest import get_exercise_database_from_graph
+from arnold.llm_cache import shared_cache
 
 
 class WorkoutIngestionPipeline:
@@ -44,15 +50,16 @@ class WorkoutIngestionPipeline:
     7. Calculate volumes and metrics
     """
 
-    def __init__(self, graph: ArnoldGraph):
+    def __init__(self, graph: ArnoldGraph, mode: str = 'hybrid'):
         """
         Initialize ingestion pipeline.
 
         Args:
             graph: ArnoldGraph instance
+            mode: Parser mode (see arnold.hybrid_ingest.workout_parser)
         """
         self.graph = graph
-        self.parser = LLMWorkoutParser()
+        self.parser = workout_parser(mode)
         self.exercise_db = None
         self.stats = {
             'workouts_processed': 0,
@@ -62,6 +69,7 @@ class WorkoutIngestionPipeline:
             'sets_total': 0,
             'volume_total': 0,
             'custom_exercises_created': 0,
+            'llm_calls': 0,
             'parsing_errors': []
         }
 
@@ -112,11 +120,15 @@ class WorkoutIngestionPipeline:
             # Link to Athlete
             self._link_to_athlete(workout_id)
 
+            # Keep an in-process periodization timeline current
+            record_workout(self.graph, workout_id)
+
             # Update stats
             self.stats['workouts_succeeded'] += 1
             self.stats['exercises_total'] += len(parsed.get('exercises', []))
             self.stats['sets_total'] += parsed['summary'].get('total_sets', 0)
             self.stats['volume_total'] += parsed['summary'].get('total_volume', 0)
+            self.stats['llm_calls'] += parsed.get('parsing_metadata', {}).get('llm_calls', 1)
 
             return True
 
@@ -153,7 +165,8 @@ class WorkoutIngestionPipeline:
             muscle_focus: $muscle_focus,
             energy_systems: $energy_systems,
             deviations: $deviations,
-            notes: $notes
+            notes: $notes,
+            imported_at: datetime()
         })
         RETURN w.id as id
         """
@@ -331,6 +344,8 @@ class WorkoutIngestionPipeline:
         print(f"Sets: {self.stats['sets_total']:,}")
         print(f"Total volume: {self.stats['volume_total']:,.0f} lbs")
         print(f"Custom exercises created: {self.stats['custom_exercises_created']}")
+        print(f"\nLLM parse calls: {self.stats['llm_calls']} for {self.stats['workouts_succeeded']} workouts")
+        print(f"{shared_cache().summary()}")
 
         if self.stats['parsing_errors']:
             print(f"\nErrors encountered: {len(self.stats['parsing_errors'])}")
@@ -383,6 +398,8 @@ def main():
     parser.add_argument('--full', action='store_true', help='Ingest all 164 workouts')
     parser.add_argument('--files', type=str, help='Comma-separated list of specific files')
     parser.add_argument('--clear', action='store_true', help='Clear existing workout data before ingestion')
+    parser.add_argument('--mode', choices=PARSER_MODES, default='hybrid',
+                        help='hybrid: LLM only for ambiguous lines; llm: whole files; grammar: no API calls')
 
     args = parser.parse_args()
 
@@ -449,7 +466,7 @@ def main():
             sys.exit(0)
 
     # Run ingestion pipeline
-    pipeline = WorkoutIngestionPipeline(graph)
+    pipeline = WorkoutIngestionPipeline(graph, args.mode)
     pipeline.load_exercise_database()
     pipeline.create_athlete_node()
     pipeline.batch_ingest(workout_files)
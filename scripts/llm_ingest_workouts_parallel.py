@@ -2,41 +2,107 @@
 """
 LLM-Powered Workout Batch Ingestion - PARALLEL VERSION
 
-Uses ThreadPoolExecutor to process multiple workouts simultaneously.
+Parses workouts concurrently through arnold.batch_runner (adaptive
+concurrency, backs off on rate limits). Parsed workouts flow through a
+bounded queue to a single writer thread that persists each workout in one
+UNWIND transaction, so graph writes overlap with LLM latency. Parse and
+write progress are checkpointed (data/cache/checkpoints/), so re-running
+after a crash resumes where it stopped.
 
 Usage:
     python scripts/llm_ingest_workouts_parallel.py --full
     python scripts/llm_ingest_workouts_parallel.py --test
+    python scripts/llm_ingest_workouts_parallel.py --full --restart  # Ignore checkpoint
+    python scripts/llm_ingest_workouts_parallel.py --full --mode llm  # Whole files to the LLM
 """
 
 import sys
 import json
+import queue
 import argparse
+import threading
 from pathlib import Path
 from typing import List, Dict, Any
 from datetime import datetime
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from arnold.batch_runner import BatchRunner, Checkpoint
 from arnold.graph import ArnoldGraph
-from arnold.llm_ingest import LLMWorkoutParser, get_exercise_database_from_graph
-
-MAX_WORKERS = 6  # Parallel LLM calls
-BATCH_SIZE = 10  # For rate limiting pauses
+from arnold.hybrid_ingest import PARSER_MODES, workout_parser
+from arnold.judgment_day.timeline import record_workout
+from arnold.llm_ingest import get_exercise_database_from_graph
+from arnold.llm_cache import shared_cache
+
+MAX_WORKERS = 6  # Upper bound on concurrent LLM calls
+WRITE_QUEUE_SIZE = 12  # Parsed workouts waiting for the writer
+CHECKPOINT_DIR = Path(__file__).parent.parent / "data" / "cache" / "checkpoints"
+
+# One transaction per workout: node, custom exercises, sets, athlete link
+WRITE_WORKOUT_QUERY = """
+CREATE (w:Workout {
+    id: $workout.id,
+    date: date($workout.date),
+    source_file: $workout.source_file,
+    total_volume: $workout.total_volume,
+    total_sets: $workout.total_sets,
+    total_exercises: $workout.total_exercises,
+    periodization_phase: $workout.periodization_phase,
+    perceived_intensity: $workout.perceived_intensity,
+    intended_intensity: $workout.intended_intensity,
+    tags: $workout.tags,
+    goals: $workout.goals,
+    equipment_used: $workout.equipment_used,
+    muscle_focus: $workout.muscle_focus,
+    energy_systems: $workout.energy_systems,
+    deviations: $workout.deviations,
+    notes: $workout.notes,
+    imported_at: datetime()
+})
+WITH w
+CALL {
+    UNWIND $custom_exercises as ce
+    MERGE (e:Exercise {id: ce.id})
+    ON CREATE SET
+        e.name = ce.name,
+        e.custom = true,
+        e.category = ce.category,
+        e.source = 'user_workout_log',
+        e.created_date = datetime()
+    RETURN count(*) as custom_exercises
+}
+CALL {
+    WITH w
+    UNWIND $sets as s
+    MATCH (e:Exercise {id: s.exercise_id})
+    CREATE (st:Set)
+    SET st = s.props
+    CREATE (w)-[:CONTAINS]->(st)
+    CREATE (st)-[:OF_EXERCISE]->(e)
+    RETURN count(st) as sets
+}
+CALL {
+    WITH w
+    MATCH (a:Athlete {name: 'Brock'})
+    MERGE (a)-[:PERFORMED]->(w)
+    RETURN count(a) as linked
+}
+RETURN w.id as id, custom_exercises, sets, linked
+"""
 
 
 class ParallelWorkoutIngestion:
     """
-    Parallel workout ingestion using ThreadPoolExecutor.
+    Pipelined workout ingestion: concurrent LLM parses, one graph writer.
     """
 
-    def __init__(self, graph: ArnoldGraph, exercise_db: List[Dict]):
+    def __init__(self, graph: ArnoldGraph, exercise_db: List[Dict], mode: str = 'hybrid'):
         self.graph = graph
         self.exercise_db = exercise_db
+        self.mode = mode
         self.stats = {
             'workouts_processed': 0,
             'workouts_succeeded': 0,
@@ -45,16 +111,20 @@ class ParallelWorkoutIngestion:
             'sets_total': 0,
             'volume_total': 0,
             'custom_exercises_created': 0,
+            'workouts_written': 0,
+            'write_errors': 0,
+            'llm_calls': 0,
             'parsing_errors': []
         }
+        self._queue = None
 
     def parse_workout_file(self, file_path: Path) -> Dict[str, Any]:
         """
         Parse a single workout file (thread-safe).
 
-        Each thread gets its own LLMWorkoutParser instance.
+        Each call gets its own parser instance (see --mode).
         """
-        parser = LLMWorkoutParser()
+        parser = workout_parser(self.mode)
 
         try:
             parsed = parser.parse_workout_file(file_path, self.exercise_db)
@@ -72,60 +142,30 @@ class ParallelWorkoutIngestion:
 
     def ingest_parsed_workout(self, parsed_data: Dict) -> bool:
         """
-        Ingest a parsed workout into Neo4j.
+        Ingest a parsed workout into Neo4j in one transaction.
+
+        Workout node, custom exercises, every set and the athlete link are
+        written by a single UNWIND query (one round trip per workout).
 
-        NOTE: This uses graph writes so should be synchronized.
+        NOTE: Called from the writer thread only.
         """
         try:
-            # Create Workout node
-            workout_id = self._create_workout_node(parsed_data)
-
-            # Create custom exercises if needed
-            self._create_custom_exercises(parsed_data)
-
-            # Create Set nodes and link to exercises
-            self._create_sets_and_links(workout_id, parsed_data)
-
-            # Link to Athlete
-            self._link_to_athlete(workout_id)
-
-            return True
+            result = self.graph.execute_query(WRITE_WORKOUT_QUERY, self._workout_write_params(parsed_data))
+            if result:
+                record_workout(self.graph, result[0]['id'])
+            return bool(result)
 
         except Exception as e:
             print(f"    ✗ Ingestion error for {parsed_data.get('source_file')}: {e}")
             return False
 
-    def _create_workout_node(self, parsed: Dict[str, Any]) -> str:
-        """Create Workout node from parsed data."""
-        workout_id = f"{parsed['date']}_workout"
-
+    def _workout_write_params(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten a parsed workout into WRITE_WORKOUT_QUERY parameters."""
         metadata = parsed.get('metadata', {})
         summary = parsed.get('summary', {})
 
-        query = """
-        CREATE (w:Workout {
-            id: $workout_id,
-            date: date($date),
-            source_file: $source_file,
-            total_volume: $total_volume,
-            total_sets: $total_sets,
-            total_exercises: $total_exercises,
-            periodization_phase: $periodization_phase,
-            perceived_intensity: $perceived_intensity,
-            intended_intensity: $intended_intensity,
-            tags: $tags,
-            goals: $goals,
-            equipment_used: $equipment_used,
-            muscle_focus: $muscle_focus,
-            energy_systems: $energy_systems,
-            deviations: $deviations,
-            notes: $notes
-        })
-        RETURN w.id as id
-        """
-
-        self.graph.execute_write(query, {
-            'workout_id': workout_id,
+        workout = {
+            'id': f"{parsed['date']}_workout",
             'date': parsed['date'],
             'source_file': parsed.get('source_file', ''),
             'total_volume': summary.get('total_volume', 0),
@@ -141,42 +181,22 @@ class ParallelWorkoutIngestion:
             'energy_systems': metadata.get('energy_systems', []),
             'deviations': metadata.get('deviations', []),
             'notes': parsed.get('notes', '')
-        })
-
-        return workout_id
-
-    def _create_custom_exercises(self, parsed: Dict[str, Any]):
-        """Create custom Exercise nodes for non-standard exercises."""
-        custom_exercises = [
-            ex for ex in parsed.get('exercises', [])
-            if ex.get('is_custom', False)
-        ]
-
-        for exercise in custom_exercises:
-            exercise_id = f"CUSTOM:{exercise['name'].replace(' ', '_')}"
-
-            query = """
-            MERGE (e:Exercise {id: $exercise_id})
-            ON CREATE SET
-                e.name = $name,
-                e.custom = true,
-                e.category = $category,
-                e.source = 'user_workout_log',
-                e.created_date = datetime()
-            RETURN e.id as id
-            """
-
-            self.graph.execute_write(query, {
-                'exercise_id': exercise_id,
-                'name': exercise['name'],
-                'category': exercise.get('category', 'custom')
-            })
-
-            # Update exercise with canonical_id for linking
-            exercise['canonical_id'] = exercise_id
-
-    def _create_sets_and_links(self, workout_id: str, parsed: Dict[str, Any]):
-        """Create Set nodes and link to Workout and Exercise."""
+        }
+
+        # Custom Exercise nodes for non-standard exercises
+        custom_exercises = []
+        for exercise in parsed.get('exercises', []):
+            if exercise.get('is_custom', False):
+                exercise_id = f"CUSTOM:{exercise['name'].replace(' ', '_')}"
+                custom_exercises.append({
+                    'id': exercise_id,
+                    'name': exercise['name'],
+                    'category': exercise.get('category', 'custom')
+                })
+                # Update exercise with canonical_id for linking
+                exercise['canonical_id'] = exercise_id
+
+        sets = []
         for exercise in parsed.get('exercises', []):
             canonical_id = exercise.get('canonical_id')
 
@@ -184,124 +204,129 @@ class ParallelWorkoutIngestion:
                 # Skip exercises without canonical match
                 continue
 
-            # Create each set
             for set_data in exercise.get('sets', []):
                 # Determine if time-based or weight-based
-                is_time_based = 'duration_seconds' in set_data
-
-                if is_time_based:
-                    # Time-based set
-                    query = """
-                    MATCH (w:Workout {id: $workout_id})
-                    MATCH (e:Exercise {id: $exercise_id})
-                    CREATE (s:Set {
-                        set_number: $set_number,
-                        duration_seconds: $duration_seconds,
-                        duration_display: $duration_display,
-                        is_time_based: true,
-                        notes: $notes
-                    })
-                    CREATE (w)-[:CONTAINS]->(s)
-                    CREATE (s)-[:OF_EXERCISE]->(e)
-                    """
-
-                    self.graph.execute_write(query, {
-                        'workout_id': workout_id,
-                        'exercise_id': canonical_id,
+                if 'duration_seconds' in set_data:
+                    props = {
                         'set_number': set_data.get('set_number', 1),
                         'duration_seconds': set_data.get('duration_seconds'),
                         'duration_display': set_data.get('duration_display', ''),
+                        'is_time_based': True,
                         'notes': set_data.get('notes', '')
-                    })
-
+                    }
                 else:
-                    # Weight-based set
-                    query = """
-                    MATCH (w:Workout {id: $workout_id})
-                    MATCH (e:Exercise {id: $exercise_id})
-                    CREATE (s:Set {
-                        set_number: $set_number,
-                        weight: $weight,
-                        weight_unit: $weight_unit,
-                        reps: $reps,
-                        volume: $volume,
-                        rpe: $rpe,
-                        is_time_based: false,
-                        notes: $notes
-                    })
-                    CREATE (w)-[:CONTAINS]->(s)
-                    CREATE (s)-[:OF_EXERCISE]->(e)
-                    """
-
-                    self.graph.execute_write(query, {
-                        'workout_id': workout_id,
-                        'exercise_id': canonical_id,
+                    props = {
                         'set_number': set_data.get('set_number', 1),
                         'weight': set_data.get('weight', 0),
                         'weight_unit': set_data.get('weight_unit', 'lbs'),
                         'reps': set_data.get('reps', 0),
                         'volume': set_data.get('volume', 0),
                         'rpe': set_data.get('rpe'),
+                        'is_time_based': False,
                         'notes': set_data.get('notes', '')
-                    })
-
-    def _link_to_athlete(self, workout_id: str):
-        """Link Workout to Athlete."""
-        query = """
-        MATCH (a:Athlete {name: 'Brock'})
-        MATCH (w:Workout {id: $workout_id})
-        MERGE (a)-[:PERFORMED]->(w)
+                    }
+                sets.append({'exercise_id': canonical_id, 'props': props})
+
+        return {'workout': workout, 'custom_exercises': custom_exercises, 'sets': sets}
+
+    def _parse_or_raise(self, file_path: Path) -> Dict[str, Any]:
+        """Failed parses raise, so the checkpoint records them for retry."""
+        result = self.parse_workout_file(file_path)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        return result['data']
+
+    def _enqueue(self, file_path: Path, parsed: Dict[str, Any]):
+        """Sink: hand a parsed workout to the writer (blocks when the queue is full)."""
+        self.stats['workouts_succeeded'] += 1
+        self.stats['workouts_processed'] += 1
+        self.stats['llm_calls'] += parsed.get('parsing_metadata', {}).get('llm_calls', 1)
+        self._queue.put((file_path.name, parsed))
+
+    def _writer(self, written: Checkpoint):
+        """Writer thread: persist queued workouts until the None sentinel."""
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            name, parsed = entry
+
+            if self.ingest_parsed_workout(parsed):
+                written.append(name, True)
+                self.stats['workouts_written'] += 1
+                self.stats['exercises_total'] += len(parsed.get('exercises', []))
+                self.stats['sets_total'] += parsed['summary'].get('total_sets', 0)
+                self.stats['volume_total'] += parsed['summary'].get('total_volume', 0)
+            else:
+                self.stats['write_errors'] += 1
+
+    def parallel_ingest(self, workout_files: List[Path], checkpoint_dir: Path = CHECKPOINT_DIR):
         """
+        Parse workouts concurrently and pipeline them into Neo4j.
 
-        self.graph.execute_write(query, {'workout_id': workout_id})
+        LLM parses (BatchRunner) feed a bounded queue drained by one writer
+        thread, so graph writes overlap with LLM latency and a slow graph
+        applies backpressure to the parsers.
 
-    def parallel_ingest(self, workout_files: List[Path]):
-        """
-        Ingest workouts in parallel using ThreadPoolExecutor.
+        Two checkpoints make this crash-resumable:
+            llm_ingest_parsed.jsonl   parsed workouts (LLM output)
+            llm_ingest_written.jsonl  workouts committed to Neo4j
+        Workouts parsed but not yet written are re-queued from the parse
+        checkpoint without calling the LLM again.
+
+        Args:
+            workout_files: Markdown workout files
+            checkpoint_dir: Directory for the two checkpoints
         """
         print(f"\n{'=' * 70}")
         print(f"PARALLEL LLM INGESTION: {len(workout_files)} files")
-        print(f"Workers: {MAX_WORKERS}")
+        print(f"Workers: up to {MAX_WORKERS} (adaptive), write queue: {WRITE_QUEUE_SIZE}")
+        print(f"Checkpoints: {checkpoint_dir}")
         print('=' * 70)
 
-        # Step 1: Parse all workouts in parallel (LLM calls)
-        print("\nStep 1: Parsing workouts with LLM (parallel)...")
-        parsed_workouts = []
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_file = {
-                executor.submit(self.parse_workout_file, file_path): file_path
-                for file_path in workout_files
-            }
-
-            with tqdm(total=len(workout_files), desc="Parsing") as pbar:
-                for future in as_completed(future_to_file):
-                    file_path = future_to_file[future]
-                    result = future.result()
-
-                    if result['success']:
-                        parsed_workouts.append(result['data'])
-                        self.stats['workouts_succeeded'] += 1
-                    else:
-                        self.stats['workouts_failed'] += 1
-                        self.stats['parsing_errors'].append({
-                            'file': result['file'],
-                            'error': result['error']
-                        })
-
-                    self.stats['workouts_processed'] += 1
-                    pbar.update(1)
-
-        # Step 2: Ingest into Neo4j (sequential - graph writes need to be synchronized)
-        print("\nStep 2: Writing to Neo4j (sequential)...")
-
-        for parsed in tqdm(parsed_workouts, desc="Ingesting"):
-            success = self.ingest_parsed_workout(parsed)
-
-            if success:
-                self.stats['exercises_total'] += len(parsed.get('exercises', []))
-                self.stats['sets_total'] += parsed['summary'].get('total_sets', 0)
-                self.stats['volume_total'] += parsed['summary'].get('total_volume', 0)
+        written = Checkpoint(checkpoint_dir / "llm_ingest_written.jsonl")
+        already_written = {key for key, record in written.load().items() if record['ok']}
+        pending = [f for f in workout_files if f.name not in already_written]
+
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        writer = threading.Thread(target=self._writer, args=(written,), name="neo4j-writer", daemon=True)
+        writer.start()
+
+        with tqdm(total=len(pending), desc="Parsing") as pbar:
+            runner = BatchRunner(
+                self._parse_or_raise,
+                checkpoint=checkpoint_dir / "llm_ingest_parsed.jsonl",
+                key=lambda file_path: file_path.name,
+                sink=self._enqueue,
+                max_workers=MAX_WORKERS,
+                progress=lambda done, total: pbar.update(done - pbar.n)
+            )
+
+            # Parsed by an earlier run but never written
+            parsed_before = runner.results()
+            for file_path in pending:
+                if file_path.name in parsed_before:
+                    self._enqueue(file_path, parsed_before[file_path.name])
+
+            try:
+                run_stats = runner.run(pending)
+            finally:
+                self._queue.put(None)
+                writer.join()
+
+        if already_written or run_stats['skipped']:
+            print(f"  ✓ Resumed: {len(already_written)} already written, "
+                  f"{run_stats['skipped']} re-queued from parse checkpoint")
+
+        wanted = {file_path.name for file_path in pending}
+        for key, record in runner.checkpoint.load().items():
+            if key in wanted and not record['ok']:
+                self.stats['workouts_failed'] += 1
+                self.stats['workouts_processed'] += 1
+                self.stats['parsing_errors'].append({
+                    'file': key,
+                    'error': record['error']
+                })
 
     def print_stats(self):
         """Print ingestion statistics."""
@@ -314,6 +339,11 @@ class ParallelWorkoutIngestion:
         print(f"\nExercises: {self.stats['exercises_total']}")
         print(f"Sets: {self.stats['sets_total']:,}")
         print(f"Total volume: {self.stats['volume_total']:,.0f} lbs")
+        print(f"Written to Neo4j: {self.stats['workouts_written']} workouts "
+              f"({self.stats['write_errors']} write errors)")
+        print(f"\nLLM parse calls ({self.mode}): {self.stats['llm_calls']} for "
+              f"{self.stats['workouts_succeeded']} workouts")
+        print(f"{shared_cache().summary()}")
 
         if self.stats['parsing_errors']:
             print(f"\nErrors encountered: {len(self.stats['parsing_errors'])}")
@@ -326,6 +356,9 @@ def main():
     parser.add_argument('--test', action='store_true', help='Test on 10 sample workouts')
     parser.add_argument('--full', action='store_true', help='Ingest all 164 workouts')
     parser.add_argument('--files', type=str, help='Comma-separated list of specific files')
+    parser.add_argument('--restart', action='store_true', help='Discard the checkpoint and start over')
+    parser.add_argument('--mode', choices=PARSER_MODES, default='hybrid',
+                        help='hybrid: LLM only for ambiguous lines; llm: whole files; grammar: no API calls')
 
     args = parser.parse_args()
 
@@ -389,7 +422,10 @@ def main():
     print(f"  ✓ Athlete node ready")
 
     # Run parallel ingestion
-    pipeline = ParallelWorkoutIngestion(graph, exercise_db)
+    pipeline = ParallelWorkoutIngestion(graph, exercise_db, args.mode)
+    if args.restart:
+        for name in ("llm_ingest_parsed.jsonl", "llm_ingest_written.jsonl"):
+            (CHECKPOINT_DIR / name).unlink(missing_ok=True)
     pipeline.parallel_ingest(workout_files)
     pipeline.print_stats()
 
@@ -0,0 +1,27 @@
+-- Migration 025: Per-step sync timings
+-- Created: 2026-01-24
+-- Purpose: Record per-step timings for the DAG-scheduled sync pipeline so the
+--          critical path of each run is visible.
+-- See docs/issues/023-sync-pipeline-efficiency.md
+
+-- One row per step per sync run
+CREATE TABLE IF NOT EXISTS sync_step_runs (
+    id SERIAL PRIMARY KEY,
+    sync_id INTEGER NOT NULL REFERENCES sync_history(id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    status TEXT NOT NULL,              -- success | failed
+    started_at TIMESTAMPTZ NOT NULL,
+    completed_at TIMESTAMPTZ NOT NULL,
+    duration_seconds NUMERIC(10, 3) NOT NULL,
+    depends_on TEXT[] NOT NULL DEFAULT '{}',
+    on_critical_path BOOLEAN NOT NULL DEFAULT FALSE,
+    UNIQUE (sync_id, step)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_step_runs_step ON sync_step_runs(step, started_at DESC);
+
+-- Ordered list of steps that bounded the run's wall-clock time
+ALTER TABLE sync_history ADD COLUMN IF NOT EXISTS critical_path JSONB;
+
+COMMENT ON TABLE sync_step_runs IS 'Per-step timings for sync_pipeline.py runs';
+COMMENT ON COLUMN sync_history.critical_path IS 'Longest dependency chain of steps by completion time';
@@ -0,0 +1,327 @@
+-- Migration 026: Materialized exercise progression + resolved-alias index
+-- Created: 2026-01-25
+-- Purpose: One row per (canonical exercise, day) with the best set, e1RM and
+--          volume, maintained incrementally by triggers on `sets`, so
+--          progression queries stop re-deriving e1RM from raw rows and
+--          substring-scanning exercise names.
+--
+-- Readers:
+--   - arnold-analytics MCP get_exercise_history
+--   - ProgressionAnalyzer (src/arnold/judgment_day/analytics.py)
+--
+-- Name lookups go through exercise_aliases (normalized alias -> exercise_id),
+-- populated from logged sets (trigger) and Neo4j names/aliases
+-- (sync_exercise_relationships.py).
+--
+-- Name resolution: SELECT * FROM resolve_exercise_alias('bench press');
+-- Full rebuild:    SELECT refresh_exercise_progression();
+
+-- ============================================================================
+-- ALIAS INDEX
+-- ============================================================================
+
+-- Lowercase, non-alphanumerics to spaces, collapsed whitespace
+CREATE OR REPLACE FUNCTION normalize_exercise_alias(p_name TEXT)
+RETURNS TEXT AS $$
+    SELECT btrim(regexp_replace(lower(coalesce(p_name, '')), '[^a-z0-9]+', ' ', 'g'))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE TABLE IF NOT EXISTS exercise_aliases (
+    alias_norm TEXT NOT NULL,
+    exercise_id TEXT NOT NULL,
+    exercise_name TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT 'logged',   -- logged | neo4j
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (alias_norm, exercise_id)
+);
+
+-- Prefix lookups (alias_norm LIKE 'bench press%')
+CREATE INDEX IF NOT EXISTS idx_exercise_aliases_prefix
+    ON exercise_aliases (alias_norm text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_exercise_aliases_exercise ON exercise_aliases (exercise_id);
+
+-- ============================================================================
+-- DAILY PROGRESSION TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS exercise_daily_progression (
+    exercise_id TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    exercise_name TEXT,
+    best_load_lbs NUMERIC(7,1),          -- Set with highest e1RM
+    best_reps INT,
+    best_e1rm NUMERIC(7,1),              -- Brzycki, reps 1-12
+    max_load_lbs NUMERIC(7,1),
+    total_sets INT NOT NULL DEFAULT 0,
+    total_reps INT NOT NULL DEFAULT 0,
+    volume_lbs NUMERIC(12,1) NOT NULL DEFAULT 0,
+    avg_rpe NUMERIC(3,1),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (exercise_id, session_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_exercise_daily_progression_date
+    ON exercise_daily_progression (session_date DESC);
+
+-- ============================================================================
+-- NAME RESOLUTION
+-- ============================================================================
+
+-- Name -> canonical exercise. Exact normalized alias wins; otherwise the
+-- best prefix match, preferring exercises with the most logged history.
+-- Single implementation shared by ProgressionStore and the analytics MCP.
+CREATE OR REPLACE FUNCTION resolve_exercise_alias(p_name TEXT)
+RETURNS TABLE (exercise_id TEXT, exercise_name TEXT) AS $$
+    WITH q AS (SELECT normalize_exercise_alias(p_name) AS alias)
+    SELECT a.exercise_id, a.exercise_name
+    FROM exercise_aliases a, q
+    WHERE q.alias <> ''
+      AND (a.alias_norm = q.alias OR a.alias_norm LIKE q.alias || '%')
+    ORDER BY
+        (a.alias_norm = q.alias) DESC,
+        (SELECT COUNT(*) FROM exercise_daily_progression p
+         WHERE p.exercise_id = a.exercise_id) DESC,
+        length(a.alias_norm)
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- REFRESH
+-- ============================================================================
+
+-- Recompute rows for the given (exercise_id, session_date) pairs.
+-- Pairs are passed as two parallel arrays; a NULL date means "every date
+-- for that exercise" (used when the parent workout is already gone).
+CREATE OR REPLACE FUNCTION refresh_exercise_progression_keys(
+    p_exercise_ids TEXT[],
+    p_dates DATE[]
+)
+RETURNS INT AS $$
+DECLARE
+    n INT;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _progression_keys (
+        exercise_id TEXT,
+        session_date DATE
+    ) ON COMMIT DROP;
+    TRUNCATE _progression_keys;
+
+    INSERT INTO _progression_keys
+    SELECT DISTINCT k.exercise_id, k.session_date
+    FROM unnest(p_exercise_ids, p_dates) AS k(exercise_id, session_date)
+    WHERE k.exercise_id IS NOT NULL;
+
+    -- A NULL-date key already covers every date of its exercise; drop dated
+    -- keys for the same exercise so the join below can't count a set twice
+    DELETE FROM _progression_keys k
+    USING _progression_keys all_dates
+    WHERE all_dates.exercise_id = k.exercise_id
+      AND all_dates.session_date IS NULL
+      AND k.session_date IS NOT NULL;
+
+    DELETE FROM exercise_daily_progression p
+    USING _progression_keys k
+    WHERE p.exercise_id = k.exercise_id
+      AND (k.session_date IS NULL OR p.session_date = k.session_date);
+
+    WITH set_rows AS (
+        SELECT
+            s.exercise_id,
+            (w.start_time AT TIME ZONE COALESCE(w.timezone, 'America/Los_Angeles'))::date AS session_date,
+            s.exercise_name,
+            s.reps,
+            s.rpe,
+            CASE WHEN s.load_unit = 'kg' THEN s.load * 2.20462 ELSE s.load END AS load_lbs
+        FROM sets s
+        JOIN blocks b ON s.block_id = b.block_id
+        JOIN workouts w ON b.workout_id = w.workout_id
+        WHERE s.exercise_id IN (SELECT exercise_id FROM _progression_keys)
+    ),
+    scoped AS (
+        SELECT r.*,
+            CASE WHEN r.reps BETWEEN 1 AND 12 AND r.load_lbs > 0
+                 THEN r.load_lbs * (36.0 / (37.0 - r.reps))
+            END AS e1rm
+        FROM set_rows r
+        JOIN _progression_keys k
+          ON r.exercise_id = k.exercise_id
+         AND (k.session_date IS NULL OR r.session_date = k.session_date)
+    ),
+    best AS (
+        SELECT DISTINCT ON (exercise_id, session_date)
+            exercise_id, session_date, load_lbs, reps, e1rm
+        FROM scoped
+        WHERE e1rm IS NOT NULL
+        ORDER BY exercise_id, session_date, e1rm DESC
+    ),
+    daily AS (
+        SELECT
+            exercise_id,
+            session_date,
+            MAX(exercise_name) AS exercise_name,
+            MAX(load_lbs) AS max_load_lbs,
+            COUNT(*) AS total_sets,
+            COALESCE(SUM(reps), 0) AS total_reps,
+            COALESCE(SUM(COALESCE(load_lbs, 0) * COALESCE(reps, 0)), 0) AS volume_lbs,
+            AVG(rpe) AS avg_rpe
+        FROM scoped
+        GROUP BY exercise_id, session_date
+    )
+    INSERT INTO exercise_daily_progression (
+        exercise_id, session_date, exercise_name,
+        best_load_lbs, best_reps, best_e1rm, max_load_lbs,
+        total_sets, total_reps, volume_lbs, avg_rpe, updated_at
+    )
+    SELECT
+        d.exercise_id, d.session_date, d.exercise_name,
+        ROUND(b.load_lbs::NUMERIC, 1), b.reps, ROUND(b.e1rm::NUMERIC, 1),
+        ROUND(d.max_load_lbs::NUMERIC, 1),
+        d.total_sets, d.total_reps, ROUND(d.volume_lbs::NUMERIC, 1),
+        ROUND(d.avg_rpe::NUMERIC, 1), NOW()
+    FROM daily d
+    LEFT JOIN best b USING (exercise_id, session_date);
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Full rebuild
+CREATE OR REPLACE FUNCTION refresh_exercise_progression()
+RETURNS INT AS $$
+    SELECT refresh_exercise_progression_keys(
+        ARRAY(SELECT DISTINCT exercise_id FROM sets WHERE exercise_id IS NOT NULL),
+        NULL::DATE[]
+    )
+$$ LANGUAGE sql;
+
+-- ============================================================================
+-- TRIGGERS (statement-level: one refresh per INSERT/UPDATE/DELETE statement)
+-- ============================================================================
+
+DROP TRIGGER IF EXISTS trg_sets_progression_insert ON sets;
+DROP TRIGGER IF EXISTS trg_sets_progression_update ON sets;
+DROP TRIGGER IF EXISTS trg_sets_progression_delete ON sets;
+
+-- Transition tables allow only one event per trigger, and PL/pgSQL can't
+-- reference a transition table the firing trigger doesn't declare, so each
+-- event gets a small function over the rows it has.
+CREATE OR REPLACE FUNCTION sets_progression_after_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    ids TEXT[];
+    dates DATE[];
+BEGIN
+    SELECT array_agg(exercise_id), array_agg(session_date) INTO ids, dates
+    FROM (
+        SELECT DISTINCT
+            n.exercise_id,
+            (w.start_time AT TIME ZONE COALESCE(w.timezone, 'America/Los_Angeles'))::date AS session_date
+        FROM new_rows n
+        JOIN blocks b ON n.block_id = b.block_id
+        JOIN workouts w ON b.workout_id = w.workout_id
+        WHERE n.exercise_id IS NOT NULL
+    ) k;
+
+    IF ids IS NOT NULL THEN
+        PERFORM refresh_exercise_progression_keys(ids, dates);
+    END IF;
+
+    -- Logged names become aliases of the exercise they were resolved to
+    INSERT INTO exercise_aliases (alias_norm, exercise_id, exercise_name, source)
+    SELECT DISTINCT ON (normalize_exercise_alias(n.exercise_name), n.exercise_id)
+        normalize_exercise_alias(n.exercise_name), n.exercise_id, n.exercise_name, 'logged'
+    FROM new_rows n
+    WHERE n.exercise_id IS NOT NULL AND normalize_exercise_alias(n.exercise_name) <> ''
+    ON CONFLICT (alias_norm, exercise_id) DO NOTHING;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sets_progression_after_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    ids TEXT[];
+    dates DATE[];
+BEGIN
+    SELECT array_agg(exercise_id), array_agg(session_date) INTO ids, dates
+    FROM (
+        SELECT DISTINCT
+            c.exercise_id,
+            (w.start_time AT TIME ZONE COALESCE(w.timezone, 'America/Los_Angeles'))::date AS session_date
+        FROM (
+            SELECT exercise_id, block_id FROM new_rows
+            UNION
+            SELECT exercise_id, block_id FROM old_rows
+        ) c
+        JOIN blocks b ON c.block_id = b.block_id
+        JOIN workouts w ON b.workout_id = w.workout_id
+        WHERE c.exercise_id IS NOT NULL
+    ) k;
+
+    IF ids IS NOT NULL THEN
+        PERFORM refresh_exercise_progression_keys(ids, dates);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sets_progression_after_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    ids TEXT[];
+    dates DATE[];
+BEGIN
+    -- On cascaded workout deletes the parent rows are already gone, so the
+    -- date is unknown (NULL) and every date for the exercise is recomputed
+    SELECT array_agg(exercise_id), array_agg(session_date) INTO ids, dates
+    FROM (
+        SELECT DISTINCT
+            o.exercise_id,
+            (w.start_time AT TIME ZONE COALESCE(w.timezone, 'America/Los_Angeles'))::date AS session_date
+        FROM old_rows o
+        LEFT JOIN blocks b ON o.block_id = b.block_id
+        LEFT JOIN workouts w ON b.workout_id = w.workout_id
+        WHERE o.exercise_id IS NOT NULL
+    ) k;
+
+    IF ids IS NOT NULL THEN
+        PERFORM refresh_exercise_progression_keys(ids, dates);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_sets_progression_insert
+    AFTER INSERT ON sets
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sets_progression_after_insert();
+
+CREATE TRIGGER trg_sets_progression_update
+    AFTER UPDATE ON sets
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sets_progression_after_update();
+
+CREATE TRIGGER trg_sets_progression_delete
+    AFTER DELETE ON sets
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sets_progression_after_delete();
+
+-- ============================================================================
+-- BACKFILL
+-- ============================================================================
+
+INSERT INTO exercise_aliases (alias_norm, exercise_id, exercise_name, source)
+SELECT DISTINCT ON (normalize_exercise_alias(exercise_name), exercise_id)
+    normalize_exercise_alias(exercise_name), exercise_id, exercise_name, 'logged'
+FROM sets
+WHERE exercise_id IS NOT NULL AND normalize_exercise_alias(exercise_name) <> ''
+ON CONFLICT (alias_norm, exercise_id) DO NOTHING;
+
+SELECT refresh_exercise_progression();
+
+COMMENT ON TABLE exercise_daily_progression IS 'Per-exercise daily best set / e1RM / volume, maintained by triggers on sets';
+COMMENT ON TABLE exercise_aliases IS 'Normalized exercise name/alias -> canonical exercise_id (logged names + Neo4j aliases)';
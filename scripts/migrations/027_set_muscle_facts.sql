@@ -0,0 +1,207 @@
+-- Migration 027: Set × muscle fact table
+-- Created: 2026-01-26
+-- Purpose: One row per (set, targeted muscle, role) with the set's volume and
+--          a role weight, so muscle balance / weekly volume are plain
+--          group-bys instead of Workout→Exercise→Muscle traversals or
+--          per-query joins against the TARGETS cache.
+--
+-- Source:
+--   sets → blocks → workouts (session date)
+--   neo4j_cache_exercise_muscles (TARGETS, synced by sync_exercise_relationships.py)
+--
+-- Maintenance:
+--   - Triggers on `sets` refresh the facts for the affected workouts
+--   - sync_exercise_relationships.py calls refresh_set_muscle_facts() after
+--     reloading the TARGETS cache
+--   - scripts/export_set_muscle_facts.py mirrors the table to
+--     data/staging/set_muscle_facts/ (Parquet, one partition per month)
+--
+-- Readers:
+--   - muscle_volume_weekly (view below) → coach brief, memory MCP briefing
+--   - ProgressionAnalyzer.get_muscle_group_balance / detect_overtraining
+--   - src/muscle_heatmap.py (Parquet copy)
+--
+-- Full rebuild:  SELECT refresh_set_muscle_facts();
+
+-- ============================================================================
+-- ROLE WEIGHTS
+-- ============================================================================
+
+-- Same weights as the DuckDB muscle_volume_weekly view (setup_analytics.py)
+CREATE OR REPLACE FUNCTION muscle_role_weight(p_role TEXT)
+RETURNS NUMERIC AS $$
+    SELECT CASE p_role
+        WHEN 'primary' THEN 1.0
+        WHEN 'secondary' THEN 0.5
+        ELSE 0.25
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- ============================================================================
+-- FACT TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS set_muscle_facts (
+    set_id UUID NOT NULL,
+    muscle_name TEXT NOT NULL,
+    role TEXT NOT NULL,                  -- primary | secondary | unknown
+    workout_id UUID NOT NULL,
+    session_date DATE NOT NULL,
+    exercise_id TEXT NOT NULL,
+    exercise_name TEXT,
+    muscle_type TEXT,                    -- Muscle | MuscleGroup
+    role_weight NUMERIC(3,2) NOT NULL,
+    reps INT,
+    load_lbs NUMERIC(7,1),
+    volume_lbs NUMERIC(10,1) NOT NULL DEFAULT 0,
+    rpe NUMERIC(3,1),
+    is_warmup BOOLEAN,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (set_id, muscle_name, role)
+);
+
+CREATE INDEX IF NOT EXISTS idx_set_muscle_facts_date ON set_muscle_facts (session_date);
+CREATE INDEX IF NOT EXISTS idx_set_muscle_facts_muscle_date ON set_muscle_facts (muscle_name, session_date);
+CREATE INDEX IF NOT EXISTS idx_set_muscle_facts_workout ON set_muscle_facts (workout_id);
+CREATE INDEX IF NOT EXISTS idx_set_muscle_facts_updated ON set_muscle_facts (updated_at);
+
+-- ============================================================================
+-- REFRESH
+-- ============================================================================
+
+-- Recompute facts for the given workouts (NULL = every workout)
+CREATE OR REPLACE FUNCTION refresh_set_muscle_facts(p_workout_ids UUID[] DEFAULT NULL)
+RETURNS INT AS $$
+DECLARE
+    n INT;
+BEGIN
+    IF p_workout_ids IS NULL THEN
+        TRUNCATE set_muscle_facts;
+    ELSE
+        DELETE FROM set_muscle_facts WHERE workout_id = ANY(p_workout_ids);
+    END IF;
+
+    INSERT INTO set_muscle_facts (
+        set_id, muscle_name, role, workout_id, session_date,
+        exercise_id, exercise_name, muscle_type, role_weight,
+        reps, load_lbs, volume_lbs, rpe, is_warmup, updated_at
+    )
+    SELECT
+        s.set_id,
+        m.muscle_name,
+        m.role,
+        w.workout_id,
+        (w.start_time AT TIME ZONE COALESCE(w.timezone, 'America/Los_Angeles'))::date,
+        s.exercise_id,
+        s.exercise_name,
+        m.muscle_type,
+        muscle_role_weight(m.role),
+        s.reps,
+        ROUND(l.load_lbs::NUMERIC, 1),
+        ROUND((COALESCE(s.reps, 0) * COALESCE(l.load_lbs, 0))::NUMERIC, 1),
+        s.rpe,
+        s.is_warmup,
+        NOW()
+    FROM sets s
+    JOIN blocks b ON s.block_id = b.block_id
+    JOIN workouts w ON b.workout_id = w.workout_id
+    JOIN neo4j_cache_exercise_muscles m ON m.exercise_id = s.exercise_id
+    CROSS JOIN LATERAL (
+        SELECT CASE WHEN s.load_unit = 'kg' THEN s.load * 2.20462 ELSE s.load END AS load_lbs
+    ) l
+    WHERE p_workout_ids IS NULL OR w.workout_id = ANY(p_workout_ids);
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- TRIGGERS (statement-level, one refresh per statement)
+-- ============================================================================
+
+DROP TRIGGER IF EXISTS trg_sets_muscle_facts_insert ON sets;
+DROP TRIGGER IF EXISTS trg_sets_muscle_facts_update ON sets;
+DROP TRIGGER IF EXISTS trg_sets_muscle_facts_delete ON sets;
+
+CREATE OR REPLACE FUNCTION sets_muscle_facts_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_set_muscle_facts(ARRAY(
+        SELECT DISTINCT b.workout_id
+        FROM new_rows n
+        JOIN blocks b ON n.block_id = b.block_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sets_muscle_facts_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_set_muscle_facts(ARRAY(
+        SELECT DISTINCT b.workout_id
+        FROM (
+            SELECT block_id FROM new_rows
+            UNION
+            SELECT block_id FROM old_rows
+        ) c
+        JOIN blocks b ON c.block_id = b.block_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deletes only need the set ids (the parent workout may already be gone)
+CREATE OR REPLACE FUNCTION sets_muscle_facts_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM set_muscle_facts f
+    USING old_rows o
+    WHERE f.set_id = o.set_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_sets_muscle_facts_insert
+    AFTER INSERT ON sets
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sets_muscle_facts_after_insert();
+
+CREATE TRIGGER trg_sets_muscle_facts_update
+    AFTER UPDATE ON sets
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sets_muscle_facts_after_update();
+
+CREATE TRIGGER trg_sets_muscle_facts_delete
+    AFTER DELETE ON sets
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sets_muscle_facts_after_delete();
+
+-- ============================================================================
+-- WEEKLY VIEW (coach brief, memory MCP)
+-- ============================================================================
+
+DROP VIEW IF EXISTS muscle_volume_weekly;
+
+CREATE VIEW muscle_volume_weekly AS
+SELECT
+    date_trunc('week', session_date)::date AS week_start,
+    muscle_name,
+    role,
+    COUNT(DISTINCT set_id) AS total_sets,
+    COALESCE(SUM(reps), 0) AS total_reps,
+    ROUND(SUM(volume_lbs), 0) AS total_volume_lbs,
+    ROUND(SUM(role_weight), 1) AS weighted_sets,
+    ROUND(SUM(volume_lbs * role_weight), 0) AS weighted_volume_lbs
+FROM set_muscle_facts
+GROUP BY 1, 2, 3;
+
+-- ============================================================================
+-- BACKFILL
+-- ============================================================================
+
+SELECT refresh_set_muscle_facts();
+
+COMMENT ON TABLE set_muscle_facts IS 'Set × targeted muscle × role with volume and role weight; maintained by triggers on sets';
+COMMENT ON VIEW muscle_volume_weekly IS 'Sets/reps/volume per muscle per role per week, aggregated from set_muscle_facts';
@@ -21,9 +21,10 @@ from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
-import psycopg2
 from psycopg2.extras import execute_values
 
+from step_runtime import StepResult, connect, run_main
+
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 STAGING_DIR = PROJECT_ROOT / "data" / "staging"
@@ -129,7 +130,7 @@ def upsert_biometric_readings(df: pd.DataFrame, metric_type: str, value_col: str
         return len(records)
     
     # Upsert to Postgres
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect(**DB_CONFIG)
     cur = conn.cursor()
     
     sql = """
@@ -157,13 +158,13 @@ def upsert_biometric_readings(df: pd.DataFrame, metric_type: str, value_col: str
     return inserted
 
 
-def main():
+def main(argv: list = None):
     parser = argparse.ArgumentParser(description="Load Apple Health data to Postgres")
     parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
     parser.add_argument("--verbose", "-v", action="store_true", help="Show details")
     parser.add_argument("--metric", choices=list(METRIC_MAPPINGS.keys()), 
                         help="Load specific metric only")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("Loading Apple Health data to Postgres...")
     
@@ -202,5 +203,10 @@ def main():
     print(f"\n✓ Done: {total_loaded} total records {'would be ' if args.dry_run else ''}loaded")
 
 
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     main()
@@ -50,7 +50,7 @@ from collections import defaultdict
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
-import psycopg2
+from step_runtime import StepResult, connect, run_main
 
 # Paths
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
@@ -114,7 +114,7 @@ def get_cutoff_date(verbose: bool = False) -> Optional[date]:
     Returns None on cold start (no data yet) - will process everything.
     """
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = connect(**DB_CONFIG)
         cur = conn.cursor()
         cur.execute("""
             SELECT MAX(reading_date) 
@@ -890,14 +890,14 @@ def update_import_marker(xml_path: Path):
         json.dump(marker, f, indent=2)
 
 
-def main():
+def main(argv: list = None):
     parser = argparse.ArgumentParser(description="Import Apple Health data")
     parser.add_argument("--verbose", "-v", action="store_true", help="Show progress")
     parser.add_argument("--raw-hr", action="store_true", help="Include raw HR (not aggregated)")
     parser.add_argument("--clinical-only", action="store_true", help="Only process clinical records")
     parser.add_argument("--xml-only", action="store_true", help="Only process export.xml")
     parser.add_argument("--full", action="store_true", help="Process all records (ignore cutoff date)")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("Importing Apple Health data...")
     
@@ -1047,5 +1047,10 @@ def main():
             print(f"  {name}: {len(df):,} rows")
 
 
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     main()
@@ -16,7 +16,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 import psycopg2
-from psycopg2.extras import execute_batch
+
+from polar_loader import load_sessions
 
 PG_URI = os.environ.get("DATABASE_URI", "postgresql://brock@localhost:5432/arnold_analytics")
 
@@ -128,53 +129,6 @@ def parse_polar_csv(filepath: Path) -> dict:
     return {"session": session, "samples": samples, "filename": filepath.name}
 
 
-def import_session(cur, session: dict, samples: list) -> tuple:
-    """Import session and samples. Returns (imported, skipped)."""
-    # Check if exists
-    cur.execute(
-        "SELECT id FROM polar_sessions WHERE polar_session_id = %s",
-        (session["polar_session_id"],)
-    )
-    if cur.fetchone():
-        return (0, 1)  # Already exists
-    
-    cur.execute("""
-        INSERT INTO polar_sessions (
-            polar_session_id, start_time, stop_time, duration_seconds, sport_type,
-            avg_hr, max_hr, min_hr, calories,
-            zone_1_seconds, zone_2_seconds, zone_3_seconds, zone_4_seconds, zone_5_seconds,
-            zone_1_lower, zone_1_upper, zone_2_lower, zone_2_upper,
-            zone_3_lower, zone_3_upper, zone_4_lower, zone_4_upper,
-            zone_5_lower, zone_5_upper,
-            vo2max, resting_hr, max_hr_setting, ftp, weight_kg,
-            timezone_offset, feeling, note
-        ) VALUES (
-            %(polar_session_id)s, %(start_time)s, %(stop_time)s, %(duration_seconds)s, %(sport_type)s,
-            %(avg_hr)s, %(max_hr)s, %(min_hr)s, %(calories)s,
-            %(zone_1_seconds)s, %(zone_2_seconds)s, %(zone_3_seconds)s, %(zone_4_seconds)s, %(zone_5_seconds)s,
-            %(zone_1_lower)s, %(zone_1_upper)s, %(zone_2_lower)s, %(zone_2_upper)s,
-            %(zone_3_lower)s, %(zone_3_upper)s, %(zone_4_lower)s, %(zone_4_upper)s,
-            %(zone_5_lower)s, %(zone_5_upper)s,
-            %(vo2max)s, %(resting_hr)s, %(max_hr_setting)s, %(ftp)s, %(weight_kg)s,
-            %(timezone_offset)s, %(feeling)s, %(note)s
-        ) RETURNING id
-    """, session)
-    
-    session_id = cur.fetchone()[0]
-    
-    # Insert samples
-    if samples:
-        sample_data = [(session_id, s["sample_time"], s["hr_value"]) for s in samples]
-        execute_batch(
-            cur,
-            "INSERT INTO hr_samples (session_id, sample_time, hr_value) VALUES (%s, %s, %s)",
-            sample_data,
-            page_size=1000,
-        )
-    
-    return (1, 0)
-
-
 def main():
     import argparse
     parser = argparse.ArgumentParser(description="Import Polar CSV exports")
@@ -213,29 +167,18 @@ def main():
         print(f"\n[DRY RUN] Would import {len(parsed)} sessions")
         return
     
-    # Import
+    # Import: one dedupe query, then insert + COPY per file under its own savepoint
     conn = psycopg2.connect(PG_URI)
-    cur = conn.cursor()
-    
-    imported = 0
-    skipped = 0
-    total_samples = 0
-    
-    for data in parsed:
-        imp, skip = import_session(cur, data["session"], data["samples"])
-        imported += imp
-        skipped += skip
-        if imp:
-            total_samples += len(data["samples"])
-            print(f"  ✓ {data['filename']}")
-    
-    conn.commit()
-    cur.close()
-    conn.close()
-    
-    print(f"\nImported: {imported} sessions, {total_samples} HR samples")
-    if skipped:
-        print(f"Skipped (already exist): {skipped}")
+    try:
+        result = load_sessions(conn, parsed, source="polar_csv")
+    finally:
+        conn.close()
+    
+    print(f"\nImported: {result['sessions_imported']} sessions, {result['samples_imported']} HR samples")
+    if result["skipped"]:
+        print(f"Skipped (already exist): {result['skipped']}")
+    if result["failed"]:
+        print(f"Failed (not imported): {len(result['failed'])} sessions")
 
 
 if __name__ == "__main__":
@@ -24,6 +24,9 @@ Usage:
   python polar_api.py --days 30          # Sync last 30 days (max API returns)
   python polar_api.py --from 2026-01-01  # Sync from specific date
   python polar_api.py --dry-run          # Preview without writing
+  python polar_api.py --concurrency 8    # Parallel per-session sample fetches
+
+Set POLAR_API_BASE to point the sync at a local stub server for testing.
 
 Scopes: accesslink.read_all
 API: v3 (https://www.polar.com/accesslink-api/)
@@ -39,12 +42,15 @@ from pathlib import Path
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlencode, urlparse, parse_qs
 import base64
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
-import psycopg2
-from psycopg2.extras import execute_batch
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv, set_key
 
+from step_runtime import StepResult, connect, run_main
+from polar_loader import filter_new_sessions, load_sessions
+
 # Load .env from project root
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 ENV_FILE = PROJECT_ROOT / ".env"
@@ -53,7 +59,10 @@ load_dotenv(ENV_FILE)
 # Polar API endpoints
 AUTH_URL = "https://flow.polar.com/oauth2/authorization"  # v3 uses flow.polar.com
 TOKEN_URL = "https://polarremote.com/v2/oauth2/token"        # Token endpoint per docs
-API_BASE = "https://www.polaraccesslink.com/v3"              # v3 API base
+API_BASE = os.environ.get("POLAR_API_BASE", "https://www.polaraccesslink.com/v3")  # v3 API base
+
+# Per-session detail fetches run in parallel over one keep-alive session
+DEFAULT_CONCURRENCY = 4
 
 # Scopes we need for training data
 SCOPES = "accesslink.read_all"
@@ -303,24 +312,28 @@ def _iso_utc_midnight(d: date) -> str:
     return f"{d.isoformat()}T00:00:00+00:00"
 
 
-def fetch_training_sessions(access_token: str, from_date: date, to_date: date) -> list:
+def fetch_training_sessions(access_token: str, from_date: date, to_date: date,
+                            include_samples: bool = True, http=None) -> list:
     """Fetch training sessions from Polar API v3.
     
     Uses /v3/exercises which returns last 30 days of exercises.
     We filter client-side by date range.
+    
+    With include_samples=False only summaries are listed, so the (large)
+    per-second sample payloads can be fetched afterwards for new sessions only.
     """
     headers = {"Authorization": f"Bearer {access_token}"}
 
     # v3 API doesn't take date params - returns last 30 days
     # We filter client-side
     params = {
-        "samples": "true",
+        "samples": "true" if include_samples else "false",
         "zones": "true",
     }
 
     print(f"  Fetching exercises from Polar API v3...")
 
-    response = requests.get(
+    response = (http or requests).get(
         f"{API_BASE}/exercises",
         headers=headers,
         params=params,
@@ -354,6 +367,43 @@ def fetch_training_sessions(access_token: str, from_date: date, to_date: date) -
     return filtered
 
 
+def _api_session(concurrency: int) -> requests.Session:
+    """Keep-alive HTTP session with a connection pool sized for `concurrency`."""
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency), max_retries=2)
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    return http
+
+
+def fetch_exercise_details(access_token: str, exercise_ids: list,
+                           concurrency: int = DEFAULT_CONCURRENCY, http=None) -> dict:
+    """
+    Fetch full exercise payloads (samples + zones) for many exercises concurrently.
+    
+    Returns {exercise_id: payload}; exercises that fail to fetch are omitted.
+    """
+    headers = {"Authorization": f"Bearer {access_token}"}
+    params = {"samples": "true", "zones": "true"}
+    http = http or _api_session(concurrency)
+
+    def fetch_one(exercise_id):
+        try:
+            response = http.get(
+                f"{API_BASE}/exercises/{exercise_id}",
+                headers=headers, params=params, timeout=60,
+            )
+            response.raise_for_status()
+            return exercise_id, response.json()
+        except requests.RequestException as e:
+            print(f"  ✗ exercise {exercise_id}: {e}")
+            return exercise_id, None
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = pool.map(fetch_one, exercise_ids)
+        return {eid: payload for eid, payload in results if payload is not None}
+
+
 def parse_iso_duration(duration_str: str) -> int:
     """Parse ISO 8601 duration (PT4050.564S or PT1H30M45S) to seconds."""
     import re
@@ -464,49 +514,22 @@ def parse_session(session_data: dict) -> dict:
     return {"session": session, "samples": samples}
 
 
-def upsert_session(cur, session: dict) -> int:
-    """Insert or update a training session, return session ID."""
-    # Check if exists
-    cur.execute(
-        "SELECT id FROM polar_sessions WHERE polar_session_id = %s",
-        (session["polar_session_id"],)
-    )
-    existing = cur.fetchone()
-    
-    if existing:
-        return existing[0]  # Already imported
-    
-    cur.execute("""
-        INSERT INTO polar_sessions (
-            polar_session_id, start_time, stop_time, duration_seconds, sport_type,
-            avg_hr, max_hr, min_hr, calories,
-            zone_1_seconds, zone_2_seconds, zone_3_seconds, zone_4_seconds, zone_5_seconds,
-            zone_1_lower, zone_1_upper, zone_2_lower, zone_2_upper,
-            zone_3_lower, zone_3_upper, zone_4_lower, zone_4_upper,
-            zone_5_lower, zone_5_upper,
-            vo2max, resting_hr, max_hr_setting, ftp, weight_kg,
-            timezone_offset, feeling, note
-        ) VALUES (
-            %(polar_session_id)s, %(start_time)s, %(stop_time)s, %(duration_seconds)s, %(sport_type)s,
-            %(avg_hr)s, %(max_hr)s, %(min_hr)s, %(calories)s,
-            %(zone_1_seconds)s, %(zone_2_seconds)s, %(zone_3_seconds)s, %(zone_4_seconds)s, %(zone_5_seconds)s,
-            %(zone_1_lower)s, %(zone_1_upper)s, %(zone_2_lower)s, %(zone_2_upper)s,
-            %(zone_3_lower)s, %(zone_3_upper)s, %(zone_4_lower)s, %(zone_4_upper)s,
-            %(zone_5_lower)s, %(zone_5_upper)s,
-            %(vo2max)s, %(resting_hr)s, %(max_hr_setting)s, %(ftp)s, %(weight_kg)s,
-            %(timezone_offset)s, %(feeling)s, %(note)s
-        ) RETURNING id
-    """, session)
-    
-    return cur.fetchone()[0]
-
-
-def sync_sessions(from_date: date, to_date: date, dry_run: bool = False) -> dict:
-    """Sync training sessions from Polar API to Postgres."""
+def sync_sessions(from_date: date, to_date: date, dry_run: bool = False,
+                  concurrency: int = DEFAULT_CONCURRENCY) -> dict:
+    """Sync training sessions from Polar API to Postgres.
+    
+    Lists session summaries, dedupes them against polar_sessions in one
+    query, fetches sample payloads for new sessions only (concurrently), then
+    loads everything through polar_loader. Sessions whose payload could not
+    be fetched are not imported; they are listed in "failed" and retried by
+    the next sync.
+    """
     access_token = get_valid_access_token()
+    http = _api_session(concurrency)
     
     print(f"Fetching sessions from {from_date} to {to_date}...")
-    sessions = fetch_training_sessions(access_token, from_date, to_date)
+    sessions = fetch_training_sessions(access_token, from_date, to_date,
+                                       include_samples=False, http=http)
     print(f"  Found {len(sessions)} sessions")
     
     if not sessions:
@@ -519,65 +542,47 @@ def sync_sessions(from_date: date, to_date: date, dry_run: bool = False) -> dict
             print(f"  - {start}: {sport}")
         return {"sessions_imported": len(sessions), "samples_imported": 0, "skipped": 0, "dry_run": True}
     
-    conn = psycopg2.connect(PG_URI)
-    cur = conn.cursor()
-    
-    imported = 0
-    skipped = 0
-    total_samples = 0
-    
-    for session_data in sessions:
-        parsed = parse_session(session_data)
-        if not parsed:
-            continue
+    conn = connect(PG_URI)
+    try:
+        cur = conn.cursor()
+        new_ids = filter_new_sessions(cur, [str(ex.get("id", "")) for ex in sessions])
+        cur.close()
         
-        session = parsed["session"]
-        samples = parsed["samples"]
+        new_exercises = [ex for ex in sessions if str(ex.get("id", "")) in new_ids]
+        skipped = len(sessions) - len(new_exercises)
+        if not new_exercises:
+            return {"sessions_imported": 0, "samples_imported": 0, "skipped": skipped}
         
-        # Check if already exists
-        cur.execute(
-            "SELECT id FROM polar_sessions WHERE polar_session_id = %s",
-            (session["polar_session_id"],)
+        print(f"  Fetching samples for {len(new_exercises)} new sessions...")
+        details = fetch_exercise_details(
+            access_token, [ex["id"] for ex in new_exercises], concurrency=concurrency, http=http
         )
-        if cur.fetchone():
-            skipped += 1
-            continue
         
-        session_id = upsert_session(cur, session)
-        imported += 1
-        
-        # Insert HR samples with source provenance
-        if samples:
-            sample_data = [
-                (session_id, s["sample_time"], s["hr_value"], 'polar_api')
-                for s in samples
-            ]
-            execute_batch(
-                cur,
-                "INSERT INTO hr_samples (session_id, sample_time, hr_value, source) VALUES (%s, %s, %s, %s)",
-                sample_data,
-                page_size=1000,
-            )
-            total_samples += len(samples)
-        
-        sport = session.get("sport_type", "unknown")
-        print(f"  ✓ {session['start_time'][:10]}: {sport} ({len(samples)} HR samples)")
-    
-    conn.commit()
-    cur.close()
-    conn.close()
-    
-    return {"sessions_imported": imported, "samples_imported": total_samples, "skipped": skipped}
-
-
-def main():
+        # A session whose detail fetch failed is left out (and reported), so
+        # the next sync sees it as new and fetches its samples again
+        parsed = [parse_session(details[ex["id"]]) for ex in new_exercises if ex["id"] in details]
+        unfetched = [(str(ex["id"]), "detail fetch failed") for ex in new_exercises
+                     if ex["id"] not in details]
+        result = load_sessions(conn, parsed, source="polar_api")
+        result["failed"] = unfetched + result["failed"]
+    finally:
+        conn.close()
+        http.close()
+    
+    result["skipped"] += skipped
+    return result
+
+
+def main(argv: list = None):
     parser = argparse.ArgumentParser(description="Polar AccessLink API Sync")
     parser.add_argument("--setup", action="store_true", help="Run OAuth setup flow")
     parser.add_argument("--days", type=int, default=7, help="Days to sync (default: 7)")
     parser.add_argument("--from", dest="from_date", type=str, help="Start date (YYYY-MM-DD)")
     parser.add_argument("--to", dest="to_date", type=str, help="End date (YYYY-MM-DD)")
     parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
-    args = parser.parse_args()
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Parallel sample fetches (default: {DEFAULT_CONCURRENCY})")
+    args = parser.parse_args(argv)
     
     if args.setup:
         run_oauth_setup()
@@ -597,13 +602,20 @@ def main():
     print(f"{mode}Polar API → Postgres: {from_date} to {to_date}")
     print()
     
-    result = sync_sessions(from_date, to_date, dry_run=args.dry_run)
+    result = sync_sessions(from_date, to_date, dry_run=args.dry_run, concurrency=args.concurrency)
     
     print()
     print(f"{'Would import' if args.dry_run else 'Imported'}: "
           f"{result['sessions_imported']} sessions, {result['samples_imported']} HR samples")
     if result.get("skipped"):
         print(f"Skipped (already exist): {result['skipped']}")
+    if result.get("failed"):
+        print(f"Failed (not imported): {len(result['failed'])} sessions")
+
+
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
 
 
 if __name__ == "__main__":
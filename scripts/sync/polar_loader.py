@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Shared Polar Session Loader
+
+One write path for every Polar source (AccessLink API, JSON export, Flow CSV):
+
+  1. Dedupe all candidate sessions against polar_sessions in one
+     `polar_session_id = ANY(%s)` query.
+  2. Check each new session against the table constraints (NOT NULL,
+     SMALLINT ranges) in Python; a bad file is reported and left out, the
+     rest of the batch still loads.
+  3. Insert the remaining sessions with one multi-row INSERT ... RETURNING
+     and stream all their HR samples through one COPY into hr_samples.
+
+Used by:
+  scripts/sync/polar_api.py
+  scripts/sync/import_polar_csv.py
+  scripts/import_polar_sessions.py
+
+Usage:
+    from polar_loader import filter_new_sessions, load_sessions
+
+    new_ids = filter_new_sessions(cur, [s["polar_session_id"] for s in sessions])
+    result = load_sessions(conn, parsed, source="polar_api")
+    # result["failed"]: [(polar_session_id, error)] for sessions left out
+    # parsed: [{"session": {...polar_sessions columns...}, "samples": [{"sample_time", "hr_value"}]}]
+"""
+
+import io
+from typing import Optional
+
+from psycopg2.extras import execute_values
+
+# polar_sessions columns written by every importer, in insert order
+SESSION_COLUMNS = [
+    "polar_session_id", "start_time", "stop_time", "duration_seconds", "sport_type",
+    "avg_hr", "max_hr", "min_hr", "calories",
+    "zone_1_seconds", "zone_2_seconds", "zone_3_seconds", "zone_4_seconds", "zone_5_seconds",
+    "zone_1_lower", "zone_1_upper", "zone_2_lower", "zone_2_upper",
+    "zone_3_lower", "zone_3_upper", "zone_4_lower", "zone_4_upper",
+    "zone_5_lower", "zone_5_upper",
+    "vo2max", "resting_hr", "max_hr_setting", "ftp", "weight_kg",
+    "timezone_offset", "feeling", "note",
+]
+
+# Constraints checked before loading (scripts/migrations/002_polar_sessions.sql)
+REQUIRED_SESSION_COLUMNS = ("polar_session_id", "start_time", "stop_time", "duration_seconds")
+SMALLINT_COLUMNS = (
+    "avg_hr", "max_hr", "min_hr",
+    "zone_1_lower", "zone_1_upper", "zone_2_lower", "zone_2_upper",
+    "zone_3_lower", "zone_3_upper", "zone_4_lower", "zone_4_upper",
+    "zone_5_lower", "zone_5_upper",
+    "vo2max", "resting_hr", "max_hr_setting", "ftp",
+)
+SMALLINT_RANGE = (-32768, 32767)
+
+
+def filter_new_sessions(cur, polar_session_ids: list) -> set:
+    """Return the subset of polar_session_ids not yet in polar_sessions (one query)."""
+    ids = list({str(i) for i in polar_session_ids if i})
+    if not ids:
+        return set()
+    cur.execute(
+        "SELECT polar_session_id FROM polar_sessions WHERE polar_session_id = ANY(%s)",
+        (ids,)
+    )
+    existing = {row[0] for row in cur.fetchall()}
+    return set(ids) - existing
+
+
+def insert_sessions(cur, sessions: list) -> dict:
+    """
+    Insert sessions in one statement.
+
+    Returns {polar_session_id: polar_sessions.id}.
+    """
+    if not sessions:
+        return {}
+    rows = [tuple(s.get(col) for col in SESSION_COLUMNS) for s in sessions]
+    returned = execute_values(
+        cur,
+        f"INSERT INTO polar_sessions ({', '.join(SESSION_COLUMNS)}) VALUES %s "
+        "RETURNING polar_session_id, id",
+        rows,
+        page_size=len(rows),
+        fetch=True,
+    )
+    return dict(returned)
+
+
+def _smallint(value) -> bool:
+    try:
+        return value == int(value) and SMALLINT_RANGE[0] <= int(value) <= SMALLINT_RANGE[1]
+    except (TypeError, ValueError):
+        return False
+
+
+def validate_session(parsed: dict) -> Optional[str]:
+    """
+    First constraint a parsed session would violate on load, or None.
+
+    Mirrors the polar_sessions / hr_samples NOT NULL and SMALLINT
+    constraints, so one bad file cannot abort the batch insert or COPY.
+    """
+    session = parsed["session"]
+    for col in REQUIRED_SESSION_COLUMNS:
+        if session.get(col) is None:
+            return f"{col} is missing"
+    for col in SMALLINT_COLUMNS:
+        if session.get(col) is not None and not _smallint(session[col]):
+            return f"{col} out of range: {session[col]!r}"
+    for sample in parsed["samples"]:
+        if sample.get("sample_time") is None:
+            return "HR sample without a time"
+        if not _smallint(sample.get("hr_value")):
+            return f"HR sample out of range: {sample.get('hr_value')!r}"
+    return None
+
+
+def _sample_copy_buffer(rows) -> io.StringIO:
+    """Render (session_id, sample_time, hr_value, source) rows as COPY text."""
+    buf = io.StringIO()
+    buf.writelines(
+        f"{session_id}\t{sample_time}\t{hr_value}\t{source}\n"
+        for session_id, sample_time, hr_value, source in rows
+    )
+    buf.seek(0)
+    return buf
+
+
+def copy_hr_samples(cur, rows) -> int:
+    """COPY (session_id, sample_time, hr_value, source) rows into hr_samples."""
+    buf = _sample_copy_buffer(rows)
+    if not buf.getvalue():
+        return 0
+    cur.copy_expert(
+        "COPY hr_samples (session_id, sample_time, hr_value, source) FROM STDIN",
+        buf
+    )
+    return cur.rowcount
+
+
+def load_sessions(conn, parsed: list, source: str, verbose: bool = True) -> dict:
+    """
+    Dedupe, insert and COPY a batch of parsed Polar sessions.
+
+    Three round trips for the batch: the dedupe query, one multi-row INSERT
+    and one COPY of every sample, in one transaction. Sessions that fail
+    validate_session are listed in "failed" and not inserted, so a later
+    run picks them up again.
+
+    Args:
+        conn: Postgres connection (committed on success, rolled back on error)
+        parsed: [{"session": {...}, "samples": [{"sample_time", "hr_value"}, ...]}]
+        source: hr_samples.source provenance ('polar_api', 'polar_file', 'polar_csv')
+
+    Returns {"sessions_imported", "samples_imported", "skipped", "failed"}.
+    """
+    if not parsed:
+        return {"sessions_imported": 0, "samples_imported": 0, "skipped": 0, "failed": []}
+
+    cur = conn.cursor()
+    failed = []
+    try:
+        new_ids = filter_new_sessions(cur, [p["session"]["polar_session_id"] for p in parsed])
+
+        # Keep first occurrence of each new id (same session can appear twice in a batch)
+        to_insert = {}
+        for p in parsed:
+            sid = str(p["session"]["polar_session_id"])
+            if sid in new_ids and sid not in to_insert:
+                to_insert[sid] = p
+        skipped = len(parsed) - len(to_insert)
+
+        for sid, p in list(to_insert.items()):
+            error = validate_session(p)
+            if error:
+                failed.append((sid, error))
+                del to_insert[sid]
+
+        session_ids = insert_sessions(cur, [p["session"] for p in to_insert.values()])
+        samples_imported = copy_hr_samples(cur, (
+            (session_ids[sid], s["sample_time"], s["hr_value"], source)
+            for sid, p in to_insert.items()
+            for s in p["samples"]
+        )) if to_insert else 0
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    if verbose:
+        for p in to_insert.values():
+            session = p["session"]
+            start = str(session.get("start_time") or "unknown")[:10]
+            print(f"  ✓ {start}: {session.get('sport_type') or 'unknown'} "
+                  f"({len(p['samples'])} HR samples)")
+        for sid, error in failed:
+            print(f"  ✗ session {sid}: {error}")
+
+    return {
+        "sessions_imported": len(to_insert),
+        "samples_imported": samples_imported,
+        "skipped": skipped,
+        "failed": failed,
+    }
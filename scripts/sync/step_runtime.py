@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Sync Step Runtime
+
+Shared plumbing that lets sync_pipeline.py run step scripts in-process
+instead of spawning a fresh interpreter per step.
+
+Each step script exposes:
+
+    def run(argv: list = None) -> StepResult
+
+which parses `argv` with the script's own argparse CLI and runs it. When the
+script is executed directly, `main()` behaves exactly as before.
+
+While the pipeline has pooling enabled, `connect()` hands out Postgres
+connections from a shared per-DSN pool; `conn.close()` returns the
+connection to the pool instead of closing it. Outside the pipeline it is a
+plain `psycopg2.connect`.
+
+Usage (in a step script):
+    from step_runtime import StepResult, connect, run_main
+
+    conn = connect(PG_URI)               # instead of psycopg2.connect(PG_URI)
+
+    def run(argv: list = None) -> StepResult:
+        return run_main(main, argv)
+"""
+
+import io
+import sys
+import threading
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+
+@dataclass
+class StepResult:
+    """Outcome of one pipeline step."""
+    success: bool
+    message: str = ""
+    details: dict = field(default_factory=dict)
+
+
+def run_main(main_fn: Callable, argv: Optional[list] = None) -> StepResult:
+    """
+    Call a script's `main(argv)` and translate its exit into a StepResult.
+
+    A None/0 return or SystemExit(0) is success; any other exit code, a
+    SystemExit with a message, or an uncaught exception is failure.
+    """
+    try:
+        code = main_fn(argv)
+    except SystemExit as e:
+        code = e.code
+    except Exception as e:
+        traceback.print_exc()
+        return StepResult(False, message=f"{type(e).__name__}: {e}")
+
+    if code in (None, 0):
+        return StepResult(True)
+    return StepResult(False, message=code if isinstance(code, str) else f"exit code {code}")
+
+
+# --- Connection pooling ---
+
+_pool_lock = threading.Lock()
+_pool_enabled = False
+_idle: dict = {}  # (dsn, kwargs) -> [PooledConnection]
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """
+    Connection whose close() returns it to the shared pool when pooling is on.
+
+    Before going back to the pool the connection is reset to a clean session:
+    pending transaction rolled back, server-side session state cleared
+    (RESET ALL via connection.reset()), and autocommit / isolation level /
+    read-only flags restored to their defaults, so one step's settings never
+    leak into the next borrower.
+    """
+
+    _pool_key = None
+
+    def close(self):
+        if _pool_enabled and self._pool_key is not None and not self.closed:
+            try:
+                self.reset()
+                self.set_session(
+                    isolation_level="DEFAULT", readonly="DEFAULT",
+                    deferrable="DEFAULT", autocommit=False,
+                )
+                self.cursor_factory = None
+            except psycopg2.Error:
+                super().close()
+                return
+            with _pool_lock:
+                _idle.setdefault(self._pool_key, []).append(self)
+            return
+        super().close()
+
+    def really_close(self):
+        super().close()
+
+
+def connect(dsn: Optional[str] = None, **kwargs):
+    """
+    Drop-in replacement for psycopg2.connect(dsn, **kwargs).
+
+    Borrows an idle pooled connection for the same DSN/kwargs when the
+    pipeline has enabled pooling; otherwise opens a new connection.
+    """
+    cursor_factory = kwargs.pop("cursor_factory", None)
+    if not _pool_enabled:
+        return psycopg2.connect(dsn, cursor_factory=cursor_factory, **kwargs)
+
+    key = (dsn, tuple(sorted(kwargs.items())))
+    conn = None
+    with _pool_lock:
+        idle = _idle.get(key, [])
+        while idle and conn is None:
+            candidate = idle.pop()
+            if not candidate.closed:
+                conn = candidate
+    if conn is None:
+        conn = psycopg2.connect(dsn, connection_factory=PooledConnection, **kwargs)
+        conn._pool_key = key
+    conn.cursor_factory = cursor_factory
+    return conn
+
+
+@contextmanager
+def pooling():
+    """Enable the shared connection pool for the duration of the block."""
+    global _pool_enabled
+    _pool_enabled = True
+    try:
+        yield
+    finally:
+        _pool_enabled = False
+        with _pool_lock:
+            conns = [c for idle in _idle.values() for c in idle]
+            _idle.clear()
+        for conn in conns:
+            conn.really_close()
+
+
+# --- Per-thread output capture ---
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """sys.stdout proxy that diverts writes from capturing threads to their buffer."""
+
+    def __init__(self, real):
+        self._real = real
+        self._local = threading.local()
+
+    def write(self, s):
+        buf = getattr(self._local, "buffer", None)
+        return (buf or self._real).write(s)
+
+    def flush(self):
+        buf = getattr(self._local, "buffer", None)
+        (buf or self._real).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._real, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+@contextmanager
+def capture_output():
+    """
+    Capture stdout/stderr written by the current thread into a StringIO.
+
+    Safe to use from concurrent pipeline workers: other threads keep writing
+    to the real streams (or their own buffers).
+    """
+    with _stdout_lock:
+        for name in ("stdout", "stderr"):
+            if not isinstance(getattr(sys, name), _ThreadLocalStdout):
+                setattr(sys, name, _ThreadLocalStdout(getattr(sys, name)))
+    buf = io.StringIO()
+    sys.stdout._local.buffer = buf
+    sys.stderr._local.buffer = buf
+    try:
+        yield buf
+    finally:
+        sys.stdout._local.buffer = None
+        sys.stderr._local.buffer = None
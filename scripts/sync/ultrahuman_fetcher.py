@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Concurrent Ultrahuman Date-Range Fetcher
+
+Fetches /metrics for many dates in parallel over a single keep-alive HTTP
+session. Concurrency is bounded by a worker pool and request rate is bounded
+by a token bucket, so long backfills spend their time overlapping network
+latency instead of sleeping between serial calls.
+
+Used by:
+  scripts/sync_ultrahuman.py            (readings + time-series samples)
+  scripts/sync/ultrahuman_to_postgres.py (daily readings)
+
+Usage:
+    from ultrahuman_fetcher import UltrahumanFetcher
+
+    fetcher = UltrahumanFetcher(token, email, concurrency=4, rate=2.0)
+    for day, response in fetcher.fetch_range(start_date, end_date):
+        ...  # response is None for days with no data (404) or failed retries
+
+Testing against a local stub:
+    Point ULTRAHUMAN_API_URL (or base_url=...) at any HTTP server that answers
+    GET /metrics?email=...&date=YYYY-MM-DD, e.g. a http.server subclass on
+    http://127.0.0.1:8765/api/v1.
+
+CLI:
+    python ultrahuman_fetcher.py --days 30 --concurrency 8 --rate 4
+    python ultrahuman_fetcher.py --start 2025-06-01 --base-url http://127.0.0.1:8765/api/v1
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Load .env from project root
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+load_dotenv(PROJECT_ROOT / ".env")
+
+# Configuration
+BASE_URL = os.environ.get("ULTRAHUMAN_API_URL", "https://partner.ultrahuman.com/api/v1")
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0        # requests per second (sustained)
+DEFAULT_BURST = 4         # token bucket capacity
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 2      # exponential backoff base
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class UltrahumanAuthError(Exception):
+    """Raised when the API rejects the auth token (HTTP 401)."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    `acquire()` blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: int = DEFAULT_BURST):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class UltrahumanFetcher:
+    """Rate-limited, thread-pooled fetcher for the Ultrahuman /metrics endpoint."""
+
+    def __init__(
+        self,
+        token: str,
+        email: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        base_url: Optional[str] = None,
+        max_retries: int = MAX_RETRIES,
+        verbose: bool = False,
+    ):
+        self.email = email
+        self.concurrency = max(1, concurrency)
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.verbose = verbose
+        self.bucket = TokenBucket(rate, burst)
+
+        # One keep-alive session shared by all workers; pool sized to concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": token,
+            "Content-Type": "application/json",
+        })
+
+        self.stats = {"requests": 0, "retries": 0, "not_found": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fetch_day(self, target_date: date) -> Optional[dict]:
+        """
+        Fetch metrics for a single date.
+
+        Returns parsed JSON, or None for 404 / exhausted retries.
+        Raises UltrahumanAuthError on 401 (retrying won't help).
+        """
+        params = {"email": self.email, "date": target_date.isoformat()}
+
+        for attempt in range(self.max_retries):
+            retry_after = None
+            self.bucket.acquire()
+            self._count("requests")
+            try:
+                response = self.session.get(
+                    f"{self.base_url}/metrics", params=params, timeout=REQUEST_TIMEOUT
+                )
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code == 401:
+                    raise UltrahumanAuthError("Invalid API token")
+                if response.status_code == 404:
+                    self._count("not_found")
+                    return None
+                if response.status_code not in RETRYABLE_STATUS:
+                    self._count("failed")
+                    if self.verbose:
+                        print(f"  ✗ {target_date}: HTTP {response.status_code}")
+                    return None
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt < self.max_retries - 1:
+                delay = RETRY_BASE_DELAY ** (attempt + 1)
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                self._count("retries")
+                if self.verbose:
+                    print(f"  {target_date}: {error}, retrying in {delay}s...")
+                time.sleep(delay)
+
+        self._count("failed")
+        if self.verbose:
+            print(f"  ✗ {target_date}: failed after {self.max_retries} attempts")
+        return None
+
+    def fetch_range(self, start_date: date, end_date: date) -> Iterator[tuple[date, Optional[dict]]]:
+        """
+        Fetch every date in [start_date, end_date] concurrently.
+
+        Yields (date, response) as requests complete (not in date order).
+        At most 2x concurrency requests are in flight or buffered, so memory
+        stays flat for arbitrarily long backfills.
+        """
+        pending_dates = deque(
+            start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)
+        )
+        window = self.concurrency * 2
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            in_flight = {}
+            while pending_dates or in_flight:
+                while pending_dates and len(in_flight) < window:
+                    d = pending_dates.popleft()
+                    in_flight[pool.submit(self.fetch_day, d)] = d
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    d = in_flight.pop(future)
+                    try:
+                        yield d, future.result()
+                    except UltrahumanAuthError:
+                        for f in in_flight:
+                            f.cancel()
+                        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent Ultrahuman fetch (no database writes)")
+    parser.add_argument("--days", type=int, default=7, help="Days to fetch ending today (default: 7)")
+    parser.add_argument("--start", type=str, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, help="End date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Parallel requests (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Max requests per second (default: {DEFAULT_RATE})")
+    parser.add_argument("--base-url", type=str, help="Override API base URL (e.g. local stub)")
+    args = parser.parse_args()
+
+    token = os.environ.get("ULTRAHUMAN_AUTH_TOKEN")
+    email = os.environ.get("ULTRAHUMAN_USER_EMAIL")
+    if not token or not email:
+        print("ERROR: ULTRAHUMAN_AUTH_TOKEN and ULTRAHUMAN_USER_EMAIL must be set")
+        sys.exit(1)
+
+    end_date = date.fromisoformat(args.end) if args.end else date.today()
+    start_date = date.fromisoformat(args.start) if args.start else end_date - timedelta(days=args.days - 1)
+
+    print(f"Fetching {start_date} → {end_date} "
+          f"(concurrency={args.concurrency}, rate={args.rate}/s)")
+
+    t0 = time.monotonic()
+    days_with_data = 0
+    with UltrahumanFetcher(token, email, args.concurrency, args.rate,
+                           base_url=args.base_url, verbose=True) as fetcher:
+        for d, response in fetcher.fetch_range(start_date, end_date):
+            if response:
+                days_with_data += 1
+        elapsed = time.monotonic() - t0
+        print(f"\n{days_with_data} days with data in {elapsed:.1f}s  {fetcher.stats}")
+
+
+if __name__ == "__main__":
+    main()
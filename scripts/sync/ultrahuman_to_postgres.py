@@ -16,25 +16,30 @@ Usage:
   python ultrahuman_to_postgres.py --date 2025-12-07 # Sync specific date
   python ultrahuman_to_postgres.py --start 2025-12-07 --end 2026-01-05  # Date range
   python ultrahuman_to_postgres.py --days 30 --dry-run  # Preview without writing
+  python ultrahuman_to_postgres.py --start 2025-06-01 --concurrency 8 --rate 4  # Fast backfill
 """
 
 import os
+import sys
 import argparse
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from pathlib import Path
 from typing import Optional
-import requests
-import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+from ultrahuman_fetcher import (
+    UltrahumanAuthError, UltrahumanFetcher, DEFAULT_CONCURRENCY, DEFAULT_RATE
+)
+from step_runtime import StepResult, connect, run_main
+
 # Load .env from project root
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 load_dotenv(PROJECT_ROOT / ".env")
 
 # Configuration
-BASE_URL = "https://partner.ultrahuman.com/api/v1"
 PG_URI = os.environ.get("DATABASE_URI", "postgresql://brock@localhost:5432/arnold_analytics")
+UPSERT_BATCH_DAYS = 14  # days of rows buffered per upsert
 
 # API response field → biometric_readings.metric_type mapping
 # Based on actual Ultrahuman API response structure (metric_data array)
@@ -65,29 +70,6 @@ def get_credentials() -> tuple[str, str]:
     return token, email
 
 
-def fetch_day(token: str, email: str, target_date: date) -> dict:
-    """Fetch metrics for a single date from Ultrahuman API."""
-    headers = {
-        "Authorization": token,
-        "Content-Type": "application/json"
-    }
-    
-    params = {
-        "email": email,
-        "date": target_date.isoformat()
-    }
-    
-    response = requests.get(
-        f"{BASE_URL}/metrics",
-        headers=headers,
-        params=params,
-        timeout=30
-    )
-    
-    response.raise_for_status()
-    return response.json()
-
-
 def extract_metrics(api_response: dict, target_date: date) -> list[tuple]:
     """
     Extract metrics from API response into rows for biometric_readings.
@@ -117,10 +99,11 @@ def extract_metrics(api_response: dict, target_date: date) -> list[tuple]:
     return rows
 
 
-def upsert_to_postgres(rows: list[tuple], dry_run: bool = False) -> int:
+def upsert_to_postgres(rows: list[tuple], dry_run: bool = False, conn=None) -> int:
     """
     Upsert rows to biometric_readings table.
     
+    Pass `conn` to reuse an open connection across batches.
     Returns count of rows upserted.
     """
     if not rows:
@@ -129,7 +112,9 @@ def upsert_to_postgres(rows: list[tuple], dry_run: bool = False) -> int:
     if dry_run:
         return len(rows)
     
-    conn = psycopg2.connect(PG_URI)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect(PG_URI)
     cur = conn.cursor()
     
     sql = """
@@ -145,7 +130,8 @@ def upsert_to_postgres(rows: list[tuple], dry_run: bool = False) -> int:
     
     count = len(rows)
     cur.close()
-    conn.close()
+    if owns_conn:
+        conn.close()
     
     return count
 
@@ -156,54 +142,79 @@ def sync_date_range(
     start_date: date,
     end_date: date,
     dry_run: bool = False,
-    verbose: bool = True
+    verbose: bool = True,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: float = DEFAULT_RATE,
+    batch_days: int = UPSERT_BATCH_DAYS,
+    base_url: Optional[str] = None,
 ) -> dict:
     """
     Sync a date range from Ultrahuman API to Postgres.
     
+    Days are fetched concurrently (bounded by `concurrency` and `rate`) and
+    extracted rows are upserted in batches of `batch_days` over one connection.
+    
     Returns summary dict with counts.
     """
     total_rows = 0
     days_synced = 0
     days_failed = 0
     
-    current = start_date
-    while current <= end_date:
-        try:
-            api_data = fetch_day(token, email, current)
-            rows = extract_metrics(api_data, current)
+    conn = None if dry_run else connect(PG_URI)
+    batch = []
+    batch_count = 0
+    
+    fetcher = UltrahumanFetcher(
+        token, email, concurrency=concurrency, rate=rate, base_url=base_url
+    )
+    try:
+        for current, api_data in fetcher.fetch_range(start_date, end_date):
+            if api_data is None:
+                days_failed += 1
+                if verbose:
+                    print(f"  ✗ {current}: no response")
+                continue
+            
+            try:
+                rows = extract_metrics(api_data, current)
+            except Exception as e:
+                days_failed += 1
+                if verbose:
+                    print(f"  ✗ {current}: {e}")
+                continue
             
             if rows:
-                count = upsert_to_postgres(rows, dry_run=dry_run)
-                total_rows += count
+                batch.extend(rows)
+                batch_count += 1
+                total_rows += len(rows)
                 days_synced += 1
                 if verbose:
-                    print(f"  ✓ {current}: {count} metrics")
-            else:
-                if verbose:
-                    print(f"  - {current}: no data")
-                    print(f"    API response: {api_data}")
-                    
-        except requests.HTTPError as e:
-            days_failed += 1
-            if verbose:
-                print(f"  ✗ {current}: HTTP {e.response.status_code}")
-        except Exception as e:
-            days_failed += 1
-            if verbose:
-                print(f"  ✗ {current}: {e}")
+                    print(f"  ✓ {current}: {len(rows)} metrics")
+            elif verbose:
+                print(f"  - {current}: no data")
+                print(f"    API response: {api_data}")
+            
+            if batch_count >= batch_days:
+                upsert_to_postgres(batch, dry_run=dry_run, conn=conn)
+                batch, batch_count = [], 0
         
-        current += timedelta(days=1)
+        upsert_to_postgres(batch, dry_run=dry_run, conn=conn)
+    finally:
+        fetcher.close()
+        if conn is not None:
+            conn.close()
     
     return {
         "days_synced": days_synced,
         "days_failed": days_failed,
         "total_rows": total_rows,
-        "dry_run": dry_run
+        "dry_run": dry_run,
+        "api_requests": fetcher.stats["requests"],
+        "api_retries": fetcher.stats["retries"],
     }
 
 
-def main():
+def main(argv: list = None):
     parser = argparse.ArgumentParser(
         description="Sync Ultrahuman metrics directly to Postgres"
     )
@@ -231,8 +242,20 @@ def main():
         "--quiet", "-q", action="store_true",
         help="Suppress per-day output"
     )
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help=f"Parallel API requests (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=DEFAULT_RATE,
+        help=f"Max API requests per second (default: {DEFAULT_RATE})"
+    )
+    parser.add_argument(
+        "--base-url", type=str,
+        help="Override API base URL (e.g. local stub server)"
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Determine date range
     yesterday = date.today() - timedelta(days=1)
@@ -261,11 +284,19 @@ def main():
         print(f"  User: {email}\n")
     
     # Sync
-    result = sync_date_range(
-        token, email, start_date, end_date,
-        dry_run=args.dry_run,
-        verbose=not args.quiet
-    )
+    try:
+        result = sync_date_range(
+            token, email, start_date, end_date,
+            dry_run=args.dry_run,
+            verbose=not args.quiet,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            base_url=args.base_url,
+        )
+    except UltrahumanAuthError:
+        print("\n✗ Ultrahuman rejected the auth token (HTTP 401).")
+        print("  Refresh ULTRAHUMAN_AUTH_TOKEN in .env and re-run.")
+        return 1
     
     # Summary
     print(f"\n{'Would sync' if args.dry_run else 'Synced'}: "
@@ -273,7 +304,13 @@ def main():
     
     if result['days_failed']:
         print(f"Failed: {result['days_failed']} days")
+    return 0
+
+
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -9,12 +9,16 @@ This script exports annotations from Neo4j and upserts into Postgres.
 """
 
 import os
+import sys
 from datetime import datetime
-import psycopg2
+from pathlib import Path
 from psycopg2.extras import execute_values
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent / "sync"))
+from step_runtime import StepResult, connect, run_main  # noqa: E402
+
 # Load environment
 load_dotenv()
 
@@ -70,7 +74,7 @@ def upsert_to_postgres(annotations: list):
         print("No annotations to sync")
         return 0
     
-    conn = psycopg2.connect(PG_CONN)
+    conn = connect(PG_CONN)
     cur = conn.cursor()
     
     # Clear existing and insert fresh (simpler than true upsert for this case)
@@ -108,7 +112,7 @@ def upsert_to_postgres(annotations: list):
     return count
 
 
-def main():
+def main(argv: list = None):
     print(f"[{datetime.now().isoformat()}] Syncing annotations Neo4j → Postgres")
     
     # Fetch from Neo4j
@@ -125,5 +129,10 @@ def main():
         print(f"    [{a['reason_code']}] {a['target_metric']}: {a['annotation_date']} {status}")
 
 
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     main()
@@ -6,6 +6,10 @@ This script syncs two relationship types:
 1. INVOLVES: Exercise → MovementPattern (for pattern tracking)
 2. TARGETS: Exercise → Muscle/MuscleGroup (for volume tracking)
 
+It also refreshes the Neo4j half of the exercise_aliases index
+(Exercise.name + Exercise.aliases, migration 026) used for name lookups,
+and rebuilds set_muscle_facts (migration 027) from the new TARGETS cache.
+
 Architecture (per ADR-001):
 - Neo4j is SOURCE OF TRUTH for relationships
 - Postgres cache tables are READ-ONLY copies for analytics joins
@@ -19,10 +23,13 @@ QC output helps validate sync quality and identifies coverage gaps.
 import os
 import sys
 from datetime import datetime
+from pathlib import Path
 from neo4j import GraphDatabase
-import psycopg2
 from psycopg2.extras import execute_values
 
+sys.path.insert(0, str(Path(__file__).parent / "sync"))
+from step_runtime import StepResult, connect, run_main  # noqa: E402
+
 # Neo4j connection
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
@@ -129,6 +136,55 @@ def get_muscle_relationships():
     return data
 
 
+def get_exercise_aliases():
+    """Extract exercise names and aliases from Neo4j."""
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    
+    query = """
+    MATCH (e:Exercise)
+    RETURN 
+        e.id as exercise_id,
+        e.name as exercise_name,
+        coalesce(e.aliases, []) as aliases
+    ORDER BY e.id
+    """
+    
+    with driver.session(database=NEO4J_DATABASE) as session:
+        result = session.run(query)
+        data = [dict(r) for r in result]
+    
+    driver.close()
+    return data
+
+
+def sync_aliases(conn, data):
+    """Replace the neo4j-sourced rows of exercise_aliases (logged rows are trigger-maintained)."""
+    cur = conn.cursor()
+    
+    cur.execute("DELETE FROM exercise_aliases WHERE source = 'neo4j'")
+    
+    rows = [
+        (alias, d['exercise_id'], d['exercise_name'])
+        for d in data
+        if d['exercise_name']
+        for alias in [d['exercise_name']] + list(d['aliases'])
+        if alias
+    ]
+    
+    sql = """
+        INSERT INTO exercise_aliases (alias_norm, exercise_id, exercise_name, source)
+        VALUES %s
+        ON CONFLICT (alias_norm, exercise_id) DO NOTHING
+    """
+    
+    execute_values(cur, sql, rows, template="(normalize_exercise_alias(%s), %s, %s, 'neo4j')")
+    cur.execute("DELETE FROM exercise_aliases WHERE alias_norm = ''")
+    conn.commit()
+    cur.close()
+    
+    return len(rows)
+
+
 def sync_patterns(conn, data):
     """Sync pattern relationships to Postgres."""
     cur = conn.cursor()
@@ -190,6 +246,17 @@ def sync_muscles(conn, data):
     return len(rows)
 
 
+def rebuild_muscle_facts(conn):
+    """Rebuild set_muscle_facts against the freshly synced TARGETS cache."""
+    cur = conn.cursor()
+    cur.execute("SELECT refresh_set_muscle_facts()")
+    count = cur.fetchone()[0]
+    conn.commit()
+    cur.close()
+    
+    return count
+
+
 def run_qc(conn):
     """Run quality control checks and return results."""
     cur = conn.cursor()
@@ -359,14 +426,14 @@ def print_qc_report(qc):
     print("\n" + "="*60)
 
 
-def main():
+def main(argv: list = None):
     print(f"Neo4j → Postgres Relationship Sync")
     print(f"Started: {datetime.now().isoformat()}")
     print("-" * 40)
     
     # Connect to Postgres
     print("\n1. Connecting to Postgres...")
-    conn = psycopg2.connect(PG_URI)
+    conn = connect(PG_URI)
     
     # Ensure tables exist
     print("2. Ensuring cache tables exist...")
@@ -390,8 +457,16 @@ def main():
     muscle_count = sync_muscles(conn, muscle_data)
     print(f"   Synced {muscle_count:,} rows")
     
+    print("7. Syncing exercise aliases to Postgres...")
+    alias_count = sync_aliases(conn, get_exercise_aliases())
+    print(f"   Synced {alias_count:,} aliases")
+    
+    print("8. Rebuilding set × muscle facts...")
+    fact_count = rebuild_muscle_facts(conn)
+    print(f"   Rebuilt {fact_count:,} fact rows")
+    
     # Run QC
-    print("7. Running QC checks...")
+    print("9. Running QC checks...")
     qc_results = run_qc(conn)
     
     conn.close()
@@ -409,5 +484,10 @@ def main():
     return 0
 
 
+def run(argv: list = None) -> StepResult:
+    """Pipeline entry point (in-process mode of sync_pipeline.py)."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     sys.exit(main())
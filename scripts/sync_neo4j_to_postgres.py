@@ -2,15 +2,44 @@
 """
 Sync workout data from Neo4j to Postgres analytics database.
 
-Run: python scripts/sync_neo4j_to_postgres.py
+Incremental (change-data-capture style): each Workout's version is
+coalesce(w.updated_at, w.imported_at). Workouts whose version is at or past
+the stored watermark (data/sync_state/neo4j_workouts.json) are pulled; the
+workouts at the watermark itself are pulled again, which is harmless since
+unchanged rows are not rewritten. Workout writers stamp imported_at on
+CREATE, and writers that modify an existing workout SET w.updated_at =
+datetime().
+
+Changed rows are COPYed into a temp staging table and applied with one
+INSERT ... ON CONFLICT; rows identical to what is already stored are left
+alone. training_trends is refreshed only when a row actually changed, and
+the affected weeks are reported. Postgres cannot refresh part of a
+materialized view; the weeks are the changed workout dates, old and new,
+plus the 3 following weeks that their LAG / 4-week windows feed.
+biometric_trends (biometric_readings only) is refreshed on every run, as
+before the sync was incremental.
+
+Workouts without any version property are treated as changed and pulled on
+every run until a writer stamps them. Deleted Neo4j workouts are not
+propagated.
+
+Usage:
+    python scripts/sync_neo4j_to_postgres.py            # Changes since last sync
+    python scripts/sync_neo4j_to_postgres.py --full     # Every workout
+    python scripts/sync_neo4j_to_postgres.py --dry-run  # Pull and report, no writes
 """
 
+import argparse
+import io
 import os
 import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Set
+
 from neo4j import GraphDatabase
 import psycopg2
-from psycopg2.extras import execute_values
-from datetime import datetime
 
 # Neo4j connection
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -21,19 +50,60 @@ NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "arnold")
 # Postgres connection
 PG_URI = os.getenv("DATABASE_URI", "postgresql://brock@localhost:5432/arnold_analytics")
 
+STATE_FILE = Path(__file__).parent.parent / "data" / "sync_state" / "neo4j_workouts.json"
+
+# training_trends rows that read a given week: itself (+ LAG next week, 4-week rolling avg)
+TRENDS_LOOKAHEAD_WEEKS = 3
+
+STAGE_COLUMNS = (
+    "neo4j_id", "workout_date", "workout_name", "workout_type", "duration_minutes",
+    "set_count", "total_volume_lbs", "patterns", "exercises", "source",
+)
+
+
+def load_watermark() -> Optional[int]:
+    """Highest workout version (ns since epoch) already synced."""
+    if STATE_FILE.exists():
+        with open(STATE_FILE) as f:
+            return json.load(f).get("version")
+    return None
 
-def get_neo4j_workouts():
-    """Extract all workouts from Neo4j with exercise details."""
+
+def save_watermark(version: int, synced: int):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, "w") as f:
+        json.dump({
+            "version": version,
+            "synced_at": datetime.now().isoformat(timespec="seconds"),
+            "workouts": synced,
+        }, f, indent=2)
+
+
+def get_neo4j_workouts(since: Optional[int] = None):
+    """
+    Extract workouts from Neo4j with exercise details.
+
+    Args:
+        since: Version watermark; workouts with this version or newer, and
+               workouts without a version, are returned (None = all workouts)
+
+    Returns:
+        (workouts, unversioned): workout dicts (each with 'version', ns since
+        epoch or None) and the count of workouts that have no version
+    """
     driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    
-    # Two-phase extraction: first get workout summaries, then exercise details
-    
+
+    # Two-phase extraction: first get changed workout summaries, then exercise details
+
     # Phase 1: Workout summaries with patterns
     summary_query = """
     MATCH (w:Workout)
+    WITH w, coalesce(w.updated_at, w.imported_at) as v
+    WITH w, CASE WHEN v IS NULL THEN NULL ELSE v.epochSeconds * 1000000000 + v.nanosecond END as version
+    WHERE $since IS NULL OR version IS NULL OR version >= $since
     OPTIONAL MATCH (w)-[:HAS_BLOCK]->(wb:WorkoutBlock)-[:CONTAINS]->(s:Set)
     OPTIONAL MATCH (s)-[:OF_EXERCISE]->(e:Exercise)-[:INVOLVES]->(mp:MovementPattern)
-    WITH w, 
+    WITH w, version,
          COUNT(DISTINCT s) as set_count,
          SUM(COALESCE(s.load_lbs, 0) * COALESCE(s.reps, 0)) as total_volume,
          COLLECT(DISTINCT mp.name) as patterns
@@ -45,14 +115,16 @@ def get_neo4j_workouts():
            set_count,
            total_volume as total_volume_lbs,
            patterns,
-           w.source as source
+           w.source as source,
+           version
     ORDER BY w.date DESC
     """
-    
-    # Phase 2: Exercise details per workout
+
+    # Phase 2: Exercise details for the changed workouts only
     exercise_query = """
     MATCH (w:Workout)-[:HAS_BLOCK]->(wb:WorkoutBlock)-[:CONTAINS]->(s:Set)-[:OF_EXERCISE]->(e:Exercise)
-    WITH w.id as workout_id, e.name as exercise_name, 
+    WHERE w.id IN $ids
+    WITH w.id as workout_id, e.name as exercise_name,
          COLLECT({
              set_num: s.set_number,
              reps: s.reps,
@@ -64,7 +136,7 @@ def get_neo4j_workouts():
          SIZE(sets) as set_count,
          REDUCE(max_load = 0, s IN sets | CASE WHEN COALESCE(s.load_lbs, 0) > max_load THEN s.load_lbs ELSE max_load END) as max_load,
          REDUCE(total_reps = 0, s IN sets | total_reps + COALESCE(s.reps, 0)) as total_reps
-    RETURN workout_id, 
+    RETURN workout_id,
            COLLECT({
                name: exercise_name,
                sets: set_count,
@@ -73,81 +145,150 @@ def get_neo4j_workouts():
                set_details: sets
            }) as exercises
     """
-    
+
+    unversioned_query = """
+    MATCH (w:Workout)
+    WHERE w.updated_at IS NULL AND w.imported_at IS NULL
+    RETURN count(w) as n
+    """
+
     with driver.session(database=NEO4J_DATABASE) as session:
         # Get summaries
-        result = session.run(summary_query)
+        result = session.run(summary_query, since=since)
         workouts = {r['neo4j_id']: dict(r) for r in result}
-        
+
         # Get exercise details
-        result = session.run(exercise_query)
-        for r in result:
-            workout_id = r['workout_id']
-            if workout_id in workouts:
-                workouts[workout_id]['exercises'] = r['exercises']
-    
+        if workouts:
+            result = session.run(exercise_query, ids=list(workouts))
+            for r in result:
+                workout_id = r['workout_id']
+                if workout_id in workouts:
+                    workouts[workout_id]['exercises'] = r['exercises']
+
+        unversioned = session.run(unversioned_query).single()['n']
+
     driver.close()
-    return list(workouts.values())
+    return list(workouts.values()), unversioned
+
+
+def _summary_row(w) -> tuple:
+    """workout_summaries row (STAGE_COLUMNS order) for one Neo4j workout."""
+    # Process exercises - convert Neo4j types and clean up
+    exercises = w.get('exercises', [])
+    if exercises:
+        clean_exercises = []
+        for ex in exercises:
+            clean_ex = {
+                'name': ex['name'],
+                'sets': ex['sets'],
+                'max_load': float(ex['max_load']) if ex['max_load'] else None,
+                'total_reps': int(ex['total_reps']) if ex['total_reps'] else 0,
+            }
+            # Include set details for exercise history queries
+            if ex.get('set_details'):
+                clean_ex['set_details'] = [
+                    {
+                        'set_num': s.get('set_num'),
+                        'reps': s.get('reps'),
+                        'load_lbs': float(s['load_lbs']) if s.get('load_lbs') else None,
+                        'rpe': float(s['rpe']) if s.get('rpe') else None,
+                        'duration_sec': s.get('duration_sec')
+                    }
+                    for s in ex['set_details']
+                ]
+            clean_exercises.append(clean_ex)
+        exercises_json = json.dumps(clean_exercises)
+    else:
+        exercises_json = None
+
+    return (
+        w['neo4j_id'],
+        w['workout_date'],
+        w['workout_name'],
+        w['workout_type'],
+        w['duration_minutes'],
+        w['set_count'],
+        float(w['total_volume_lbs']) if w['total_volume_lbs'] else 0,
+        json.dumps(w['patterns']) if w['patterns'] else '[]',
+        exercises_json,
+        w.get('source', 'imported')
+    )
+
+
+def _copy_field(value) -> str:
+    """One value in COPY text format (\\N for NULL, backslash escapes)."""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
 
 
-def load_to_postgres(workouts):
-    """Load workouts into Postgres."""
+def _copy_buffer(rows) -> io.StringIO:
+    lines = ("\t".join(_copy_field(v) for v in row) for row in rows)
+    return io.StringIO("".join(line + "\n" for line in lines))
+
+
+def affected_weeks(dates: Set[date]) -> List[date]:
+    """training_trends weeks (Mondays) that read any of the given workout dates."""
+    weeks = set()
+    for d in dates:
+        monday = d - timedelta(days=d.weekday())
+        for i in range(TRENDS_LOOKAHEAD_WEEKS + 1):
+            weeks.add(monday + timedelta(weeks=i))
+    return sorted(weeks)
+
+
+def load_to_postgres(workouts) -> dict:
+    """
+    Upsert workouts into workout_summaries via COPY into a staging table.
+
+    Returns:
+        {'staged', 'changed', 'dates'}: rows staged, rows inserted or
+        updated, and the workout dates (old and new) those rows touched
+    """
+    rows = [_summary_row(w) for w in workouts if w['workout_date']]
+    if not rows:
+        return {'staged': 0, 'changed': 0, 'dates': set()}
+
     conn = psycopg2.connect(PG_URI)
     cur = conn.cursor()
-    
-    # Prepare data for insertion
-    rows = []
-    for w in workouts:
-        if not w['workout_date']:
-            continue
-        
-        # Process exercises - convert Neo4j types and clean up
-        exercises = w.get('exercises', [])
-        if exercises:
-            clean_exercises = []
-            for ex in exercises:
-                clean_ex = {
-                    'name': ex['name'],
-                    'sets': ex['sets'],
-                    'max_load': float(ex['max_load']) if ex['max_load'] else None,
-                    'total_reps': int(ex['total_reps']) if ex['total_reps'] else 0,
-                }
-                # Include set details for exercise history queries
-                if ex.get('set_details'):
-                    clean_ex['set_details'] = [
-                        {
-                            'set_num': s.get('set_num'),
-                            'reps': s.get('reps'),
-                            'load_lbs': float(s['load_lbs']) if s.get('load_lbs') else None,
-                            'rpe': float(s['rpe']) if s.get('rpe') else None,
-                            'duration_sec': s.get('duration_sec')
-                        }
-                        for s in ex['set_details']
-                    ]
-                clean_exercises.append(clean_ex)
-            exercises_json = json.dumps(clean_exercises)
-        else:
-            exercises_json = None
-            
-        rows.append((
-            w['neo4j_id'],
-            w['workout_date'],
-            w['workout_name'],
-            w['workout_type'],
-            w['duration_minutes'],
-            w['set_count'],
-            float(w['total_volume_lbs']) if w['total_volume_lbs'] else 0,
-            json.dumps(w['patterns']) if w['patterns'] else '[]',
-            exercises_json,
-            w.get('source', 'imported')
-        ))
-    
-    # Upsert
-    sql = """
-    INSERT INTO workout_summaries 
-        (neo4j_id, workout_date, workout_name, workout_type, duration_minutes, 
+
+    cur.execute("""
+        CREATE TEMP TABLE workout_summaries_stage (
+            neo4j_id TEXT,
+            workout_date DATE,
+            workout_name TEXT,
+            workout_type TEXT,
+            duration_minutes DOUBLE PRECISION,
+            set_count INT,
+            total_volume_lbs DOUBLE PRECISION,
+            patterns TEXT,
+            exercises TEXT,
+            source TEXT
+        ) ON COMMIT DROP
+    """)
+    cur.copy_expert(
+        f"COPY workout_summaries_stage ({', '.join(STAGE_COLUMNS)}) FROM STDIN",
+        _copy_buffer(rows)
+    )
+
+    # Dates a changed row used to have (a workout can move to another day)
+    cur.execute("""
+        SELECT DISTINCT ws.workout_date
+        FROM workout_summaries ws
+        JOIN workout_summaries_stage st ON st.neo4j_id = ws.neo4j_id
+        WHERE ws.workout_date IS DISTINCT FROM st.workout_date
+    """)
+    old_dates = {r[0] for r in cur.fetchall()}
+
+    # Upsert; rows identical to what is stored are not rewritten
+    cur.execute("""
+    INSERT INTO workout_summaries
+        (neo4j_id, workout_date, workout_name, workout_type, duration_minutes,
          set_count, total_volume_lbs, patterns, exercises, source)
-    VALUES %s
+    SELECT neo4j_id, workout_date, workout_name, workout_type, duration_minutes,
+           set_count, total_volume_lbs, patterns::jsonb, exercises::jsonb, source
+    FROM workout_summaries_stage
     ON CONFLICT (neo4j_id) DO UPDATE SET
         workout_date = EXCLUDED.workout_date,
         workout_name = EXCLUDED.workout_name,
@@ -159,37 +300,88 @@ def load_to_postgres(workouts):
         exercises = EXCLUDED.exercises,
         source = EXCLUDED.source,
         synced_at = NOW()
-    """
-    
-    execute_values(cur, sql, rows)
+    WHERE (workout_summaries.workout_date, workout_summaries.workout_name, workout_summaries.workout_type,
+           workout_summaries.duration_minutes, workout_summaries.set_count, workout_summaries.total_volume_lbs,
+           workout_summaries.patterns, workout_summaries.exercises, workout_summaries.source)
+          IS DISTINCT FROM
+          (EXCLUDED.workout_date, EXCLUDED.workout_name, EXCLUDED.workout_type,
+           EXCLUDED.duration_minutes, EXCLUDED.set_count, EXCLUDED.total_volume_lbs,
+           EXCLUDED.patterns, EXCLUDED.exercises, EXCLUDED.source)
+    RETURNING workout_date
+    """)
+    new_dates = {r[0] for r in cur.fetchall()}
+    changed = cur.rowcount
     conn.commit()
-    
-    print(f"Synced {len(rows)} workouts to Postgres")
-    
-    # Refresh materialized views that depend on workout_summaries
-    print("Refreshing materialized views...")
+
+    cur.close()
+    conn.close()
+
+    return {'staged': len(rows), 'changed': changed, 'dates': new_dates | old_dates if changed else set()}
+
+
+def refresh_trends(training: bool = True):
+    """
+    Refresh biometric_trends, and training_trends if `training`.
+
+    Whole views; Postgres has no partial refresh.
+    """
+    conn = psycopg2.connect(PG_URI)
+    cur = conn.cursor()
     cur.execute("REFRESH MATERIALIZED VIEW biometric_trends;")
-    cur.execute("REFRESH MATERIALIZED VIEW training_trends;")
+    if training:
+        cur.execute("REFRESH MATERIALIZED VIEW training_trends;")
     conn.commit()
-    
     cur.close()
     conn.close()
 
 
-def main():
-    print("Extracting workouts from Neo4j...")
-    workouts = get_neo4j_workouts()
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Incremental Neo4j → Postgres workout sync")
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and sync every workout")
+    parser.add_argument("--dry-run", action="store_true", help="Pull changes and report, no writes")
+    args = parser.parse_args(argv)
+
+    since = None if args.full else load_watermark()
+    print(f"Extracting workouts from Neo4j ({'all' if since is None else 'changed since last sync'})...")
+    workouts, unversioned = get_neo4j_workouts(since)
     print(f"Found {len(workouts)} workouts")
-    
+
     # Count workouts with exercise data
     with_exercises = sum(1 for w in workouts if w.get('exercises'))
     print(f"  - {with_exercises} with exercise details")
-    
-    print("Loading to Postgres...")
-    load_to_postgres(workouts)
-    
+    if unversioned:
+        print(f"  - {unversioned} workouts have no updated_at/imported_at (pulled on every run)")
+
+    versions = [w['version'] for w in workouts if w['version'] is not None]
+    watermark = max(versions + ([since] if since is not None else [])) if versions else since
+
+    if args.dry_run:
+        dates = {date.fromisoformat(w['workout_date'][:10]) for w in workouts if w['workout_date']}
+        if dates:
+            print(f"Would upsert {len(workouts)} workouts ({min(dates)} – {max(dates)})")
+        return 0
+
+    if workouts:
+        print("Loading to Postgres...")
+        result = load_to_postgres(workouts)
+        print(f"Synced {result['staged']} workouts to Postgres ({result['changed']} inserted/changed)")
+    else:
+        print("No workout changes")
+        result = {'staged': 0, 'changed': 0, 'dates': set()}
+
+    if result['changed']:
+        weeks = affected_weeks(result['dates'])
+        print(f"Refreshing training_trends ({len(weeks)} affected weeks, {weeks[0]} – {weeks[-1]}) "
+              "and biometric_trends...")
+    else:
+        print("Refreshing biometric_trends (training_trends unchanged)...")
+    refresh_trends(training=bool(result['changed']))
+
+    if watermark is not None:
+        save_watermark(watermark, result['staged'])
     print("Done!")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -8,8 +8,19 @@ Usage:
     python scripts/sync_pipeline.py              # Run all steps
     python scripts/sync_pipeline.py --step neo4j # Run specific step
     python scripts/sync_pipeline.py --dry-run    # Show what would run
+    python scripts/sync_pipeline.py --workers 1  # Run steps one at a time
+    python scripts/sync_pipeline.py --isolate    # One interpreter per step script
 
-Steps (in order):
+Steps run as a dependency graph (STEP_DEPENDENCIES): independent ingestion
+steps (polar, ultrahuman, fit, apple) run concurrently, and downstream steps
+start once their inputs finish. Per-step timings and the critical path are
+recorded in sync_step_runs / sync_history.critical_path (migration 025).
+
+Step scripts run in-process through their run(argv) -> StepResult entry
+points (scripts/sync/step_runtime.py), sharing one Postgres connection pool
+and imported modules. Scripts without run() fall back to a subprocess.
+
+Steps (priority order):
     1. polar        - Import new Polar HR exports from data/raw/
     2. ultrahuman   - Fetch new data from Ultrahuman API (if configured)
     3. fit          - Import FIT files (Suunto/Garmin/Wahoo) from data/raw/
@@ -19,8 +30,9 @@ Steps (in order):
     7. neo4j        - DEPRECATED (skipped) - workout_summaries is now a VIEW
     8. annotations  - Sync annotations from Neo4j to Postgres
     9. relationships - Sync exercise relationships (INVOLVES, TARGETS) from Neo4j
-    10. clean       - Run outlier detection on biometrics
-    11. refresh     - Refresh Postgres materialized views
+    10. muscle_facts - Export set × muscle facts to staging Parquet
+    11. clean       - Run outlier detection on biometrics
+    12. refresh     - Refresh Postgres materialized views
 
 Run via launchd (macOS):
     See ~/Library/LaunchAgents/com.arnold.sync-daily.plist (daily at 6 AM, skips relationships)
@@ -41,16 +53,20 @@ Or via cron:
 import os
 import sys
 import json
+import time
+import importlib.util
 import argparse
 import subprocess
 import shutil
 import tempfile
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 import psycopg2
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_values
 
 # Load .env from project root
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -64,15 +80,80 @@ LOGS = PROJECT_ROOT / "logs"
 # Ensure logs directory exists
 LOGS.mkdir(exist_ok=True)
 
+# Step scripts import siblings (hrr/, ultrahuman_fetcher, step_runtime) by
+# bare name, as they would when run from their own directory.
+for _path in (SCRIPTS / "sync", SCRIPTS):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from step_runtime import capture_output, pooling  # noqa: E402
+
+# In-process execution: step scripts exposing run(argv) -> StepResult are
+# imported once and called directly, sharing pooled Postgres connections and
+# already-imported modules. --isolate restores one interpreter per step.
+IN_PROCESS = True
+_step_modules = {}
+_step_modules_lock = threading.Lock()
+
+
+# Steps may run concurrently; keep each log line (and each script's captured
+# output block) from interleaving with other steps.
+_LOG_LOCK = threading.RLock()
+
 
 def log(msg: str, level: str = "INFO"):
     """Log with timestamp."""
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{ts}] [{level}] {msg}")
+    with _LOG_LOCK:
+        print(f"[{ts}] [{level}] {msg}", flush=True)
+
+
+def _load_step_module(script_name: str):
+    """Import a step script once; None if it can't run in-process."""
+    with _step_modules_lock:
+        if script_name in _step_modules:
+            return _step_modules[script_name]
+        
+        module_name = "sync_step_" + script_name.removesuffix(".py").replace("/", "_")
+        module = None
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, SCRIPTS / script_name)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            if not callable(getattr(module, "run", None)):
+                log(f"{script_name} has no run() entry point, using subprocess", "WARN")
+                module = None
+        except (Exception, SystemExit) as e:
+            log(f"Cannot import {script_name} ({e}), using subprocess", "WARN")
+            module = None
+        
+        _step_modules[script_name] = module
+        return module
+
+
+def _run_in_process(script_name: str, module, args: list) -> bool:
+    """Call a step script's run(argv) and log its captured output."""
+    log(f"Running (in-process): {script_name}")
+    with capture_output() as buf:
+        result = module.run(list(args))
+    
+    with _LOG_LOCK:
+        output = buf.getvalue().strip()
+        if output:
+            for line in output.split('\n'):
+                log(f"  [{script_name}] {line}")
+        if not result.success:
+            log(f"Script failed: {result.message}", "ERROR")
+            return False
+    return True
 
 
 def run_script(script_name: str, args: list = None, dry_run: bool = False) -> bool:
-    """Run a Python script from the scripts directory."""
+    """Run a Python script from the scripts directory.
+    
+    In-process via the script's run() entry point when available, otherwise
+    (or with --isolate) in a child interpreter.
+    """
     script_path = SCRIPTS / script_name
     if not script_path.exists():
         log(f"Script not found: {script_path}", "ERROR")
@@ -84,18 +165,28 @@ def run_script(script_name: str, args: list = None, dry_run: bool = False) -> bo
         log(f"Would run: {' '.join(cmd)}", "DRY-RUN")
         return True
     
+    if IN_PROCESS:
+        module = _load_step_module(script_name)
+        if module is not None:
+            try:
+                return _run_in_process(script_name, module, args or [])
+            except Exception as e:
+                log(f"Failed to run script: {e}", "ERROR")
+                return False
+    
     log(f"Running: {script_name}")
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, cwd=PROJECT_ROOT)
-        if result.stdout:
-            for line in result.stdout.strip().split('\n'):
-                log(f"  {line}")
-        if result.returncode != 0:
-            log(f"Script failed with code {result.returncode}", "ERROR")
-            if result.stderr:
-                for line in result.stderr.strip().split('\n'):
-                    log(f"  {line}", "ERROR")
-            return False
+        with _LOG_LOCK:
+            if result.stdout:
+                for line in result.stdout.strip().split('\n'):
+                    log(f"  [{script_name}] {line}")
+            if result.returncode != 0:
+                log(f"Script failed with code {result.returncode}", "ERROR")
+                if result.stderr:
+                    for line in result.stderr.strip().split('\n'):
+                        log(f"  [{script_name}] {line}", "ERROR")
+                return False
         return True
     except Exception as e:
         log(f"Failed to run script: {e}", "ERROR")
@@ -332,6 +423,16 @@ def step_relationships(dry_run: bool = False) -> bool:
     return run_script("sync_exercise_relationships.py", dry_run=dry_run)
 
 
+def step_muscle_facts(dry_run: bool = False) -> bool:
+    """Mirror set_muscle_facts (kept current by triggers) to staging Parquet.
+    
+    Only months whose rows changed since the last export are rewritten.
+    """
+    log("=== Step: Set × Muscle Facts → Parquet ===")
+    args = ["--dry-run"] if dry_run else []
+    return run_script("export_set_muscle_facts.py", args, dry_run=False)  # Script handles dry-run
+
+
 def step_clean(dry_run: bool = False) -> bool:
     """Run outlier detection on biometrics."""
     log("=== Step: Biometric Outlier Detection ===")
@@ -381,11 +482,114 @@ STEPS = {
     "neo4j": step_neo4j,
     "annotations": step_annotations,
     "relationships": step_relationships,
+    "muscle_facts": step_muscle_facts,
     "clean": step_clean,
     "refresh": step_refresh,
 }
 
-STEP_ORDER = ["polar", "ultrahuman", "fit", "apple_export", "apple", "hrr", "neo4j", "annotations", "relationships", "clean", "refresh"]
+STEP_ORDER = ["polar", "ultrahuman", "fit", "apple_export", "apple", "hrr", "neo4j", "annotations", "relationships", "muscle_facts", "clean", "refresh"]
+
+# Ingestion steps write raw data; everything downstream reads it
+INGEST_STEPS = ["polar", "ultrahuman", "fit", "apple"]
+
+# Step → steps that must finish first. Dependencies on steps not selected for
+# this run (--step/--skip) are ignored. A failed dependency does not block its
+# dependents, matching the old serial behaviour where every step ran.
+STEP_DEPENDENCIES = {
+    "polar": [],
+    "ultrahuman": [],
+    "fit": [],
+    "apple_export": [],
+    "apple": ["apple_export"],
+    "hrr": ["polar", "fit", "apple"],
+    "neo4j": INGEST_STEPS,
+    "annotations": [],
+    "relationships": ["neo4j"],
+    "muscle_facts": ["relationships"],
+    "clean": INGEST_STEPS,
+    "refresh": ["hrr", "neo4j", "annotations", "relationships", "clean"],
+}
+
+DEFAULT_WORKERS = 4
+
+
+def _run_timed_step(step_name: str, dry_run: bool) -> dict:
+    """Run one step, returning its status and wall-clock timing."""
+    started_at = datetime.now().astimezone()
+    t0 = time.monotonic()
+    try:
+        success = STEPS[step_name](dry_run=dry_run)
+    except Exception as e:
+        log(f"Step {step_name} raised: {e}", "ERROR")
+        success = False
+    return {
+        "status": "success" if success else "failed",
+        "started_at": started_at,
+        "completed_at": datetime.now().astimezone(),
+        "duration_seconds": round(time.monotonic() - t0, 3),
+    }
+
+
+def run_steps(steps: list, dry_run: bool = False, workers: int = DEFAULT_WORKERS) -> tuple[dict, dict]:
+    """
+    Run steps as a dependency DAG, up to `workers` at a time.
+    
+    Ready steps are started in STEP_ORDER priority as soon as all of their
+    (selected) dependencies have finished.
+    
+    Returns (results, timings): {step: status}, {step: timing dict}.
+    """
+    selected = set(steps)
+    deps = {s: {d for d in STEP_DEPENDENCIES.get(s, []) if d in selected} for s in steps}
+    pending = list(steps)
+    results = {}
+    timings = {}
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        running = {}
+        while pending or running:
+            ready = [s for s in pending if deps[s] <= results.keys()]
+            for step_name in ready:
+                pending.remove(step_name)
+                running[pool.submit(_run_timed_step, step_name, dry_run)] = step_name
+            
+            if not running:
+                # Unsatisfiable dependencies (cycle) - should never happen
+                for step_name in pending:
+                    log(f"Step {step_name} has unresolved dependencies, not run", "ERROR")
+                    results[step_name] = "failed"
+                break
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step_name = running.pop(future)
+                timing = future.result()
+                timing["depends_on"] = sorted(deps[step_name])
+                timings[step_name] = timing
+                results[step_name] = timing["status"]
+                log(f"Step {step_name}: {timing['status']} in {timing['duration_seconds']:.1f}s")
+    
+    return results, timings
+
+
+def critical_path(timings: dict) -> list:
+    """
+    Chain of steps that bounded wall-clock time.
+    
+    Walks back from the last step to finish, at each hop following the
+    dependency that finished last.
+    """
+    if not timings:
+        return []
+    step = max(timings, key=lambda s: timings[s]["completed_at"])
+    path = [step]
+    while True:
+        deps = [d for d in timings[step].get("depends_on", []) if d in timings]
+        if not deps:
+            break
+        step = max(deps, key=lambda d: timings[d]["completed_at"])
+        path.append(step)
+    return list(reversed(path))
 
 # Database connection
 PG_URI = os.environ.get("DATABASE_URI", "postgresql://brock@localhost:5432/arnold_analytics")
@@ -409,8 +613,9 @@ def log_sync_start(triggered_by: str) -> int:
         return None
 
 
-def log_sync_end(sync_id: int, results: dict, error_message: str = None):
-    """Log sync completion to history table."""
+def log_sync_end(sync_id: int, results: dict, error_message: str = None,
+                 timings: dict = None, path: list = None):
+    """Log sync completion and per-step timings to history tables."""
     if sync_id is None:
         return
     
@@ -439,6 +644,37 @@ def log_sync_end(sync_id: int, results: dict, error_message: str = None):
         conn.close()
     except Exception as e:
         log(f"Failed to log sync end: {e}", "WARN")
+    
+    if timings:
+        log_step_timings(sync_id, timings, path or [])
+
+
+def log_step_timings(sync_id: int, timings: dict, path: list):
+    """Record per-step timings and the critical path (migration 025)."""
+    try:
+        conn = psycopg2.connect(PG_URI)
+        cur = conn.cursor()
+        execute_values(
+            cur,
+            """INSERT INTO sync_step_runs
+                   (sync_id, step, status, started_at, completed_at,
+                    duration_seconds, depends_on, on_critical_path)
+               VALUES %s
+               ON CONFLICT (sync_id, step) DO NOTHING""",
+            [
+                (sync_id, step, t["status"], t["started_at"], t["completed_at"],
+                 t["duration_seconds"], t["depends_on"], step in path)
+                for step, t in timings.items()
+            ]
+        )
+        cur.execute(
+            "UPDATE sync_history SET critical_path = %s WHERE id = %s",
+            [Json(path), sync_id]
+        )
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        log(f"Failed to log step timings: {e}", "WARN")
 
 
 def main():
@@ -447,8 +683,15 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Show what would run without executing")
     parser.add_argument("--skip", nargs="+", choices=STEPS.keys(), default=[], help="Skip specific steps")
     parser.add_argument("--trigger", choices=["scheduled", "manual", "mcp"], default="manual", help="What triggered this sync")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Max steps to run concurrently (default: {DEFAULT_WORKERS}, 1 = serial)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run each step script in its own interpreter instead of in-process")
     args = parser.parse_args()
     
+    global IN_PROCESS
+    IN_PROCESS = not args.isolate
+    
     log("=" * 60)
     log("Arnold Data Sync Pipeline")
     log("=" * 60)
@@ -467,16 +710,18 @@ def main():
     steps_to_run = [s for s in steps_to_run if s not in args.skip]
     
     results = {}
+    timings = {}
     error_message = None
     
+    pipeline_start = time.monotonic()
     try:
-        for step_name in steps_to_run:
-            step_fn = STEPS[step_name]
-            success = step_fn(dry_run=args.dry_run)
-            results[step_name] = "success" if success else "failed"
+        with pooling():
+            results, timings = run_steps(steps_to_run, dry_run=args.dry_run, workers=args.workers)
     except Exception as e:
         error_message = str(e)
         log(f"Pipeline error: {e}", "ERROR")
+    wall_clock = time.monotonic() - pipeline_start
+    path = critical_path(timings)
     
     # Mark skipped steps
     for step_name in args.skip:
@@ -484,13 +729,20 @@ def main():
     
     log("=" * 60)
     log("Summary:")
-    for step_name, status in results.items():
+    for step_name in [s for s in STEP_ORDER if s in results]:
+        status = results[step_name]
         icon = "✓" if status == "success" else "✗" if status == "failed" else "-"
-        log(f"  {icon} {step_name}: {status}")
+        duration = f" ({timings[step_name]['duration_seconds']:.1f}s)" if step_name in timings else ""
+        log(f"  {icon} {step_name}: {status}{duration}")
+    
+    step_total = sum(t["duration_seconds"] for t in timings.values())
+    log(f"Wall clock: {wall_clock:.1f}s (sum of steps: {step_total:.1f}s, workers: {args.workers})")
+    if path:
+        log(f"Critical path: {' → '.join(path)}")
     
     # Log sync end
     if not args.dry_run:
-        log_sync_end(sync_id, results, error_message)
+        log_sync_end(sync_id, results, error_message, timings=timings, path=path)
     
     failed = [s for s, r in results.items() if r == "failed"]
     if failed:
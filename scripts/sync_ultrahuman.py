@@ -18,14 +18,17 @@ Usage:
     python scripts/sync_ultrahuman.py --days 30   # Fetch last 30 days
     python scripts/sync_ultrahuman.py --since 2026-01-01  # Fetch since date
     python scripts/sync_ultrahuman.py --test      # Test API connection
+    python scripts/sync_ultrahuman.py --since 2025-06-01 --concurrency 8 --rate 4  # Fast backfill
+    python scripts/sync_ultrahuman.py --test --base-url http://127.0.0.1:8765/api/v1  # Local stub
 """
 
+import io
 import os
 import sys
 import json
 import argparse
-import time
-import requests
+import numpy as np
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -34,38 +37,14 @@ from dotenv import load_dotenv
 PROJECT_ROOT = Path(__file__).parent.parent
 load_dotenv(PROJECT_ROOT / ".env")
 
+sys.path.insert(0, str(Path(__file__).parent / "sync"))
+from ultrahuman_fetcher import (  # noqa: E402
+    UltrahumanFetcher, UltrahumanAuthError, DEFAULT_CONCURRENCY, DEFAULT_RATE
+)
+
 # Configuration
-API_URL = "https://partner.ultrahuman.com/api/v1/metrics"
 PG_URI = os.environ.get("DATABASE_URI", "postgresql://brock@localhost:5432/arnold_analytics")
-API_RATE_LIMIT_DELAY = 0.5  # seconds between API calls
-MAX_RETRIES = 3
-RETRY_BASE_DELAY = 2  # exponential backoff base
-
-
-def retry_with_backoff(func, *args, max_retries=MAX_RETRIES, **kwargs):
-    """
-    Retry a function with exponential backoff.
-    Returns (result, success) tuple.
-    """
-    for attempt in range(max_retries):
-        try:
-            result = func(*args, **kwargs)
-            return result, True
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                delay = RETRY_BASE_DELAY ** (attempt + 1)
-                print(f"timeout, retrying in {delay}s...", end=" ")
-                time.sleep(delay)
-            else:
-                return None, False
-        except requests.exceptions.RequestException as e:
-            if attempt < max_retries - 1:
-                delay = RETRY_BASE_DELAY ** (attempt + 1)
-                print(f"error ({e}), retrying in {delay}s...", end=" ")
-                time.sleep(delay)
-            else:
-                return None, False
-    return None, False
+UPSERT_BATCH_DAYS = 14  # days of extracted data buffered per upsert
 
 
 def get_credentials():
@@ -83,34 +62,6 @@ def get_credentials():
     return token, email
 
 
-def fetch_metrics(date_str: str) -> dict:
-    """Fetch metrics for a specific date."""
-    token, email = get_credentials()
-    
-    headers = {
-        "Authorization": token,
-        "Content-Type": "application/json"
-    }
-    params = {
-        "email": email,
-        "date": date_str
-    }
-    
-    response = requests.get(API_URL, headers=headers, params=params, timeout=30)
-    
-    if response.status_code == 401:
-        print("ERROR: Invalid API token")
-        sys.exit(1)
-    elif response.status_code == 404:
-        return None  # No data for this date
-    elif response.status_code != 200:
-        print(f"ERROR: API returned {response.status_code}")
-        print(response.text)
-        return None
-    
-    return response.json()
-
-
 def extract_biometrics(api_response: dict, date_str: str) -> list:
     """
     Extract biometric readings from API response.
@@ -342,8 +293,12 @@ def extract_biometrics(api_response: dict, date_str: str) -> list:
     return readings
 
 
-def upsert_biometrics(readings: list):
-    """Insert or update biometric readings in Postgres."""
+def upsert_biometrics(readings: list, conn=None):
+    """Insert or update biometric readings in Postgres.
+    
+    Pass `conn` to reuse an open connection across batches; otherwise a
+    connection is opened and closed for this call.
+    """
     if not readings:
         print("No readings to insert")
         return 0
@@ -351,7 +306,9 @@ def upsert_biometrics(readings: list):
     import psycopg2
     from psycopg2.extras import execute_values
     
-    conn = psycopg2.connect(PG_URI)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = psycopg2.connect(PG_URI)
     cur = conn.cursor()
     
     # Prepare rows: (reading_date, metric_type, value, source)
@@ -374,207 +331,346 @@ def upsert_biometrics(readings: list):
     """
     
     execute_values(cur, sql, rows)
-    affected = cur.rowcount
     conn.commit()
     cur.close()
-    conn.close()
+    if owns_conn:
+        conn.close()
     
     return len(rows)
 
 
-def extract_samples(api_response: dict) -> list:
+# Ultrahuman time-series type → biometric_samples.metric_type
+SAMPLE_SERIES = {
+    "hr": "hr",
+    "hrv": "hrv",
+    "temp": "skin_temp",
+    "night_rhr": "night_rhr",  # during sleep
+}
+
+# Sleep cycle types → sleep_stage labels (unmapped types are dropped)
+SLEEP_STAGE_MAP = {
+    "light_sleep": "LIGHT",
+    "deep_sleep": "DEEP",
+    "rem_sleep": "REM",
+    "awake": "AWAKE",
+}
+
+
+class SampleColumns:
+    """
+    Columnar batch of biometric_samples rows.
+    
+    Columns are parallel NumPy arrays:
+    - ts: float64 epoch seconds (converted to timestamps in Postgres)
+    - metric_type: str
+    - value: float64, NaN where absent (sleep_stage)
+    - text_value: object, None where absent (numeric metrics)
+    """
+    
+    def __init__(self, ts, metric_type, value, text_value):
+        self.ts = ts
+        self.metric_type = metric_type
+        self.value = value
+        self.text_value = text_value
+    
+    @classmethod
+    def empty(cls) -> "SampleColumns":
+        return cls(
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=object),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=object),
+        )
+    
+    @classmethod
+    def concat(cls, batches: list) -> "SampleColumns":
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        return cls(
+            np.concatenate([b.ts for b in batches]),
+            np.concatenate([b.metric_type for b in batches]),
+            np.concatenate([b.value for b in batches]),
+            np.concatenate([b.text_value for b in batches]),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.ts)
+    
+    def take(self, idx) -> "SampleColumns":
+        return SampleColumns(self.ts[idx], self.metric_type[idx], self.value[idx], self.text_value[idx])
+    
+    def dedupe(self) -> "SampleColumns":
+        """Drop duplicate (ts, metric_type) keys, keeping the last occurrence."""
+        if len(self) < 2:
+            return self
+        # Reverse so np.unique's first-occurrence index is the original last
+        rev = np.arange(len(self))[::-1]
+        keys = np.rec.fromarrays([self.ts[rev], self.metric_type[rev].astype(str)])
+        _, first = np.unique(keys, return_index=True)
+        return self.take(np.sort(rev[first]))
+    
+    def head(self, n: int = 10) -> list:
+        """First n rows as dicts (for previews only)."""
+        rows = []
+        for i in range(min(n, len(self))):
+            val = self.value[i]
+            rows.append({
+                "sample_time": datetime.fromtimestamp(self.ts[i]),
+                "metric_type": self.metric_type[i],
+                "value": None if np.isnan(val) else float(val),
+                "text_value": self.text_value[i],
+            })
+        return rows
+
+
+def _as_float(value) -> float:
+    """Guarded float cast: None and non-numeric values ('n/a', '') become NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _series_columns(values: list, metric_type: str) -> SampleColumns:
     """
-    Extract time-series samples from API response.
+    Build columns from an API values array of {timestamp, value} objects.
     
-    Returns list of samples with:
-    - sample_time: datetime
-    - metric_type: hr, hrv, skin_temp, sleep_stage
-    - value: numeric value (or None for sleep_stage)
-    - text_value: text label (for sleep_stage)
+    Values are cast per element, so a stray 'n/a' or null drops that sample
+    (NaN -> skipped) instead of failing the whole day.
+    """
+    ts = np.fromiter(
+        (_as_float(v.get("timestamp")) for v in values), dtype=np.float64, count=len(values)
+    )
+    val = np.fromiter(
+        (_as_float(v.get("value")) for v in values), dtype=np.float64, count=len(values)
+    )
+    keep = (ts > 0) & np.isfinite(val)
+    n = int(keep.sum())
+    return SampleColumns(
+        ts[keep],
+        np.full(n, metric_type, dtype=object),
+        val[keep],
+        np.full(n, None, dtype=object),
+    )
+
+
+def extract_samples(api_response: dict) -> SampleColumns:
+    """
+    Extract time-series samples from API response as typed columns.
+    
+    Metric types: hr, hrv, skin_temp, night_rhr (numeric value) and
+    sleep_stage (text_value). Builds one array per field straight from the
+    JSON arrays instead of a dict + datetime per point.
     """
-    samples = []
     data = api_response.get("data", {})
     metric_data = data.get("metric_data", [])
     
     if not metric_data:
-        return samples
+        return SampleColumns.empty()
     
     # Build lookup by type
     metrics = {m["type"]: m.get("object", {}) for m in metric_data}
     
-    # Heart rate time series
-    if "hr" in metrics:
-        obj = metrics["hr"]
-        for v in obj.get("values", []):
-            ts = v.get("timestamp")
-            val = v.get("value")
-            if ts and val is not None:
-                samples.append({
-                    "sample_time": datetime.fromtimestamp(ts),
-                    "metric_type": "hr",
-                    "value": val,
-                    "text_value": None
-                })
-    
-    # HRV time series
-    if "hrv" in metrics:
-        obj = metrics["hrv"]
-        for v in obj.get("values", []):
-            ts = v.get("timestamp")
-            val = v.get("value")
-            if ts and val is not None:
-                samples.append({
-                    "sample_time": datetime.fromtimestamp(ts),
-                    "metric_type": "hrv",
-                    "value": val,
-                    "text_value": None
-                })
-    
-    # Skin temperature time series
-    if "temp" in metrics:
-        obj = metrics["temp"]
-        for v in obj.get("values", []):
-            ts = v.get("timestamp")
-            val = v.get("value")
-            if ts and val is not None:
-                samples.append({
-                    "sample_time": datetime.fromtimestamp(ts),
-                    "metric_type": "skin_temp",
-                    "value": val,
-                    "text_value": None
-                })
-    
-    # Night RHR time series (during sleep)
-    if "night_rhr" in metrics:
-        obj = metrics["night_rhr"]
-        for v in obj.get("values", []):
-            ts = v.get("timestamp")
-            val = v.get("value")
-            if ts and val is not None:
-                samples.append({
-                    "sample_time": datetime.fromtimestamp(ts),
-                    "metric_type": "night_rhr",
-                    "value": val,
-                    "text_value": None
-                })
+    batches = []
+    for api_type, metric_type in SAMPLE_SERIES.items():
+        if api_type in metrics:
+            values = metrics[api_type].get("values") or []
+            if values:
+                batches.append(_series_columns(values, metric_type))
     
     # Sleep stages from sleep_cycles in Sleep object
     if "Sleep" in metrics:
-        sleep_obj = metrics["Sleep"]
-        sleep_cycles = sleep_obj.get("sleep_cycles", {})
-        for cycle in sleep_cycles.get("cycles", []):
-            start_ts = cycle.get("startTime")
-            cycle_type = cycle.get("cycleType")
-            if start_ts and cycle_type:
-                # Map cycle types to stage names
-                stage_map = {
-                    "light_sleep": "LIGHT",
-                    "deep_sleep": "DEEP",
-                    "rem_sleep": "REM",
-                    "awake": "AWAKE",
-                    "none": None,
-                    "complete": None,
-                    "partial": None
-                }
-                stage = stage_map.get(cycle_type)
-                if stage:
-                    samples.append({
-                        "sample_time": datetime.fromtimestamp(start_ts),
-                        "metric_type": "sleep_stage",
-                        "value": None,
-                        "text_value": stage
-                    })
+        cycles = metrics["Sleep"].get("sleep_cycles", {}).get("cycles", [])
+        stages = [
+            (c["startTime"], SLEEP_STAGE_MAP[c.get("cycleType")])
+            for c in cycles
+            if c.get("startTime") and c.get("cycleType") in SLEEP_STAGE_MAP
+        ]
+        if stages:
+            n = len(stages)
+            batches.append(SampleColumns(
+                np.array([t for t, _ in stages], dtype=np.float64),
+                np.full(n, "sleep_stage", dtype=object),
+                np.full(n, np.nan, dtype=np.float64),
+                np.array([stage for _, stage in stages], dtype=object),
+            ))
+    
+    return SampleColumns.concat(batches)
+
+
+class SampleRateStats:
+    """
+    Running per-metric ingestion volume, updated one batch at a time.
     
-    return samples
+    Keeps count, first/last timestamp and a histogram of whole-second sample
+    intervals per metric, so memory stays flat however many days are synced.
+    Intervals are measured within each batch (a day of samples); the gap
+    between batches is not counted.
+    """
+    
+    def __init__(self):
+        self._metrics = {}  # metric_type -> {count, first, last, intervals}
+    
+    def add(self, samples: SampleColumns) -> None:
+        for metric in set(samples.metric_type):
+            ts = np.sort(samples.ts[samples.metric_type == metric])
+            stats = self._metrics.setdefault(
+                metric, {"count": 0, "first": ts[0], "last": ts[-1], "intervals": Counter()}
+            )
+            stats["count"] += len(ts)
+            stats["first"] = min(stats["first"], ts[0])
+            stats["last"] = max(stats["last"], ts[-1])
+            if len(ts) > 1:
+                steps, counts = np.unique(np.rint(np.diff(ts)).astype(np.int64), return_counts=True)
+                stats["intervals"].update(dict(zip(steps.tolist(), counts.tolist())))
+    
+    def summary(self) -> dict:
+        """
+        Returns {metric_type: {count, first, last, median_interval_sec, per_hour}}.
+        """
+        summary = {}
+        for metric in sorted(self._metrics):
+            stats = self._metrics[metric]
+            span_hours = (stats["last"] - stats["first"]) / 3600
+            summary[metric] = {
+                "count": stats["count"],
+                "first": datetime.fromtimestamp(stats["first"]),
+                "last": datetime.fromtimestamp(stats["last"]),
+                "median_interval_sec": _histogram_median(stats["intervals"]),
+                "per_hour": round(float(stats["count"] / span_hours), 1) if span_hours else None,
+            }
+        return summary
 
 
-def upsert_samples(samples: list):
+def _histogram_median(histogram: Counter):
+    """Median of a {value: count} histogram (mean of the middle pair for even totals)."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    lower_rank, upper_rank = (total - 1) // 2, total // 2
+    lower = upper = None
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            upper = value
+            break
+    return (lower + upper) / 2
+
+
+def sample_rate_summary(samples: SampleColumns) -> dict:
+    """Per-metric ingestion volume for a single batch (see SampleRateStats)."""
+    stats = SampleRateStats()
+    stats.add(samples)
+    return stats.summary()
+
+
+def _copy_buffer(samples: SampleColumns) -> io.StringIO:
+    """Render columns as COPY text format (tab-separated, \\N for NULL)."""
+    ts = np.char.mod("%.3f", samples.ts)
+    value = np.where(np.isnan(samples.value), "\\N", np.char.mod("%.10g", samples.value))
+    text_value = np.where(samples.text_value == None, "\\N", samples.text_value)  # noqa: E711
+    lines = "\n".join(map("\t".join, zip(ts, samples.metric_type, value, text_value)))
+    return io.StringIO(lines + "\n")
+
+
+def upsert_samples(samples: SampleColumns, conn=None):
     """
     Insert or update time-series samples in biometric_samples table.
+    
+    Bulk-loads the columns with COPY into a temporary staging table, then
+    applies one set-based INSERT ... SELECT ... ON CONFLICT.
+    Pass `conn` to reuse an open connection across batches.
     """
-    if not samples:
+    if not len(samples):
         return 0
     
     import psycopg2
-    from psycopg2.extras import execute_values
     
-    conn = psycopg2.connect(PG_URI)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = psycopg2.connect(PG_URI)
     cur = conn.cursor()
     
     # Dedupe by (sample_time, metric_type) - keep last occurrence
-    seen = {}
-    for s in samples:
-        key = (s['sample_time'], s['metric_type'])
-        seen[key] = s
-    deduped = list(seen.values())
-    
-    # Prepare rows: (sample_time, metric_type, value, text_value, source)
-    rows = []
-    for s in deduped:
-        val = s['value']
-        # Convert value to float if numeric, else None
-        if val is not None and isinstance(val, (int, float)) and not isinstance(val, bool):
-            val = float(val)
-        else:
-            val = None
-        rows.append((
-            s['sample_time'],
-            s['metric_type'],
-            val,
-            s.get('text_value'),
-            'ultrahuman'
-        ))
+    deduped = samples.dedupe()
+    
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS biometric_samples_stage (
+            ts DOUBLE PRECISION,
+            metric_type TEXT,
+            value DOUBLE PRECISION,
+            text_value TEXT
+        ) ON COMMIT DELETE ROWS
+    """)
+    cur.copy_expert(
+        "COPY biometric_samples_stage (ts, metric_type, value, text_value) FROM STDIN",
+        _copy_buffer(deduped)
+    )
     
     # Upsert
-    sql = """
+    cur.execute("""
     INSERT INTO biometric_samples (sample_time, metric_type, value, text_value, source)
-    VALUES %s
+    SELECT to_timestamp(ts), metric_type, value, text_value, 'ultrahuman'
+    FROM biometric_samples_stage
     ON CONFLICT (sample_time, metric_type, source) DO UPDATE SET
         value = EXCLUDED.value,
         text_value = EXCLUDED.text_value,
         imported_at = NOW()
-    """
-    
-    execute_values(cur, sql, rows)
+    """)
     conn.commit()
     cur.close()
-    conn.close()
+    if owns_conn:
+        conn.close()
     
-    return len(rows)
+    return len(deduped)
 
 
-def test_connection():
+def test_connection(base_url=None):
     """Test API connection with today's date."""
     print("Testing Ultrahuman API connection...")
     token, email = get_credentials()
     print(f"  Email: {email}")
     print(f"  Token: {token[:20]}...{token[-10:]}")
     
-    today = datetime.now().strftime("%Y-%m-%d")
-    print(f"  Fetching data for: {today}")
+    today = datetime.now().date()
+    print(f"  Fetching data for: {today.isoformat()}")
     
-    try:
-        response = fetch_metrics(today)
-        if response is None:
-            print("  No data returned (might be normal if no data for today yet)")
-        else:
-            print("  SUCCESS! Response:")
-            print(json.dumps(response, indent=2))
-    except Exception as e:
-        print(f"  ERROR: {e}")
+    with UltrahumanFetcher(token, email, base_url=base_url, verbose=True) as fetcher:
+        try:
+            response = fetcher.fetch_day(today)
+        except UltrahumanAuthError:
+            print("ERROR: Invalid API token")
+            sys.exit(1)
+    
+    if response is None:
+        print("  No data returned (might be normal if no data for today yet)")
+    else:
+        print("  SUCCESS! Response:")
+        print(json.dumps(response, indent=2))
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Sync data from Ultrahuman API")
     parser.add_argument("--days", type=int, default=7, help="Days of history to fetch (default: 7)")
     parser.add_argument("--since", type=str, help="Fetch since date (YYYY-MM-DD)")
     parser.add_argument("--dry-run", action="store_true", help="Fetch but don't save")
     parser.add_argument("--test", action="store_true", help="Test API connection only")
     parser.add_argument("--raw", action="store_true", help="Show raw API responses")
-    args = parser.parse_args()
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Parallel API requests (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Max API requests per second (default: {DEFAULT_RATE})")
+    parser.add_argument("--batch-days", type=int, default=UPSERT_BATCH_DAYS,
+                        help=f"Days buffered per database upsert (default: {UPSERT_BATCH_DAYS})")
+    parser.add_argument("--base-url", type=str, help="Override API base URL (e.g. local stub server)")
+    args = parser.parse_args(argv)
     
     if args.test:
-        test_connection()
+        test_connection(args.base_url)
         return
     
     # Calculate date range
@@ -586,65 +682,102 @@ def main():
     
     print(f"Fetching Ultrahuman data from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
-    all_readings = []
-    all_samples = []
-    current_date = start_date
+    token, email = get_credentials()
     
-    while current_date <= end_date:
-        date_str = current_date.strftime("%Y-%m-%d")
-        print(f"  {date_str}...", end=" ")
-        
-        try:
-            response, success = retry_with_backoff(fetch_metrics, date_str)
-            
-            if not success:
-                print("failed after retries")
-                current_date += timedelta(days=1)
-                time.sleep(API_RATE_LIMIT_DELAY)
-                continue
+    conn = None
+    if not args.dry_run:
+        import psycopg2
+        conn = psycopg2.connect(PG_URI)
+    
+    total_readings = 0
+    total_samples = 0
+    preview_readings = []
+    preview_samples = []
+    rate_stats = SampleRateStats()
+    batch_readings = []
+    batch_samples = []
+    batch_days = 0
+    
+    def flush():
+        nonlocal batch_readings, batch_samples, batch_days
+        if conn is not None:
+            if batch_readings:
+                upsert_biometrics(batch_readings, conn=conn)
+            if batch_samples:
+                upsert_samples(SampleColumns.concat(batch_samples), conn=conn)
+        batch_readings, batch_samples, batch_days = [], [], 0
+    
+    fetcher = UltrahumanFetcher(token, email, concurrency=args.concurrency, rate=args.rate,
+                                base_url=args.base_url)
+    try:
+        # Results stream back as they complete; extraction and upserts overlap
+        # with requests still in flight.
+        for day, response in fetcher.fetch_range(start_date.date(), end_date.date()):
+            date_str = day.isoformat()
             
             if args.raw and response:
-                print()
+                print(f"  {date_str}:")
                 print(json.dumps(response, indent=2))
             
             if response and response.get("status") == 200:
                 readings = extract_biometrics(response, date_str)
                 samples = extract_samples(response)
-                all_readings.extend(readings)
-                all_samples.extend(samples)
-                print(f"{len(readings)} metrics, {len(samples)} samples")
+                batch_readings.extend(readings)
+                batch_samples.append(samples)
+                rate_stats.add(samples)
+                total_readings += len(readings)
+                total_samples += len(samples)
+                if len(preview_readings) < 10:
+                    preview_readings.extend(readings[:10 - len(preview_readings)])
+                if len(preview_samples) < 10:
+                    preview_samples.extend(samples.head(10 - len(preview_samples)))
+                print(f"  {date_str}... {len(readings)} metrics, {len(samples)} samples")
             elif response is None:
-                print("no data")
+                print(f"  {date_str}... no data")
             else:
-                print(f"error: {response.get('error', 'unknown')}")
-        except Exception as e:
-            print(f"error: {e}")
-        
-        current_date += timedelta(days=1)
-        
-        # Rate limit: pause between API calls
-        if current_date <= end_date:
-            time.sleep(API_RATE_LIMIT_DELAY)
-    
-    print(f"\nTotal: {len(all_readings)} daily readings, {len(all_samples)} time-series samples")
+                print(f"  {date_str}... error: {response.get('error', 'unknown')}")
+            
+            batch_days += 1
+            if batch_days >= args.batch_days:
+                flush()
+        flush()
+    except UltrahumanAuthError:
+        print("ERROR: Invalid API token")
+        sys.exit(1)
+    finally:
+        fetcher.close()
+        if conn is not None:
+            conn.close()
+    
+    print(f"\nTotal: {total_readings} daily readings, {total_samples} time-series samples")
+    print(f"API: {fetcher.stats['requests']} requests, {fetcher.stats['retries']} retries, "
+          f"{fetcher.stats['failed']} failed")
+    
+    summary = rate_stats.summary()
+    if summary:
+        print("\nSample rates:")
+        for metric, stats in summary.items():
+            interval = stats["median_interval_sec"]
+            interval_str = f"{interval:.0f}s" if interval is not None else "-"
+            print(f"  {metric:<12} {stats['count']:>7} samples  "
+                  f"median interval {interval_str:>6}  "
+                  f"{stats['per_hour'] or '-'} /hr")
     
     if args.dry_run:
         print("\nDRY RUN - not saving to database")
-        if all_readings:
+        if preview_readings:
             print("\nSample daily readings:")
-            for r in all_readings[:10]:
+            for r in preview_readings:
                 print(f"  {r['date']} {r['metric_type']}: {r['value']}")
-        if all_samples:
+        if preview_samples:
             print("\nSample time-series:")
-            for s in all_samples[:10]:
+            for s in preview_samples:
                 print(f"  {s['sample_time']} {s['metric_type']}: {s['value'] or s['text_value']}")
     else:
-        if all_readings:
-            count = upsert_biometrics(all_readings)
-            print(f"Upserted {count} daily readings to biometric_readings")
-        if all_samples:
-            count = upsert_samples(all_samples)
-            print(f"Upserted {count} samples to biometric_samples")
+        if total_readings:
+            print(f"Upserted {total_readings} daily readings to biometric_readings")
+        if total_samples:
+            print(f"Upserted {total_samples} samples to biometric_samples")
     
     print("Done")
 
@@ -614,25 +614,39 @@ async def get_exercise_history(exercise: str, days: int):
     conn = get_db()
     cur = conn.cursor()
     
-    # Query exercise data from workout_summaries
-    exercise_lower = exercise.lower()
+    # Resolve name -> canonical exercise via the alias index (migration 026)
+    try:
+        cur.execute(
+            "SELECT exercise_id, exercise_name FROM resolve_exercise_alias(%s)", [exercise]
+        )
+    except (psycopg2.errors.UndefinedFunction, psycopg2.errors.UndefinedTable):
+        conn.close()
+        return [TextContent(type="text", text=json.dumps({
+            "exercise": exercise,
+            "error": "Exercise progression tables missing - apply "
+                     "scripts/migrations/026_exercise_progression.sql",
+            "sessions": 0
+        }, indent=2))]
+    resolved = cur.fetchone()
     
-    cur.execute("""
-        SELECT 
-            ws.workout_date,
-            ex->>'name' as exercise_name,
-            (ex->>'max_load')::numeric as max_load,
-            (ex->>'total_reps')::int as total_reps,
-            (ex->>'sets')::int as sets,
-            ex->'set_details' as set_details
-        FROM workout_summaries ws,
-             jsonb_array_elements(ws.exercises) as ex
-        WHERE LOWER(ex->>'name') LIKE %s
-          AND ws.workout_date >= %s
-        ORDER BY ws.workout_date DESC
-    """, [f"%{exercise_lower}%", start_date])
-    
-    progression = cur.fetchall()
+    progression = []
+    if resolved:
+        # Materialized per-day best set / e1RM / volume
+        cur.execute("""
+            SELECT 
+                session_date,
+                max_load_lbs,
+                total_sets,
+                total_reps,
+                best_load_lbs,
+                best_reps,
+                best_e1rm
+            FROM exercise_daily_progression
+            WHERE exercise_id = %s
+              AND session_date >= %s
+            ORDER BY session_date DESC
+        """, [resolved['exercise_id'], start_date])
+        progression = cur.fetchall()
     conn.close()
     
     if not progression:
@@ -642,33 +656,7 @@ async def get_exercise_history(exercise: str, days: int):
             "sessions": 0
         }, indent=2))]
     
-    # Get canonical name from first result
-    canonical_name = progression[0]['exercise_name']
-    
-    # Calculate estimated 1RM for each session (Brzycki formula)
-    def e1rm(weight, reps):
-        if not weight or not reps or reps > 12:
-            return None
-        return round(float(weight) * (36 / (37 - reps)))
-    
-    # Find best set from set_details for each session
-    def get_best_set(set_details):
-        """Find the set with highest e1RM."""
-        if not set_details:
-            return None, None
-        best_load = None
-        best_reps = None
-        best_e1rm = 0
-        for s in set_details:
-            load = s.get('load_lbs')
-            reps = s.get('reps')
-            if load and reps:
-                est = e1rm(load, reps)
-                if est and est > best_e1rm:
-                    best_e1rm = est
-                    best_load = load
-                    best_reps = reps
-        return best_load, best_reps
+    canonical_name = resolved['exercise_name']
     
     # Process progression data
     sessions = []
@@ -676,21 +664,12 @@ async def get_exercise_history(exercise: str, days: int):
     pr_e1rm = 0
     
     for p in progression:
-        load = float(p['max_load']) if p['max_load'] else None
-        set_details = p['set_details'] if p['set_details'] else []
-        
-        # Find best set for e1RM calculation
-        best_load, best_reps = get_best_set(set_details)
-        if not best_load:
-            best_load = load
-            best_reps = p['total_reps'] // p['sets'] if p['sets'] and p['total_reps'] else None
-        
-        est_1rm = e1rm(best_load, best_reps)
+        est_1rm = round(float(p['best_e1rm'])) if p['best_e1rm'] else None
         
         sessions.append({
-            "date": str(p['workout_date']),
-            "max_load": load,
-            "sets": p['sets'],
+            "date": str(p['session_date']),
+            "max_load": float(p['max_load_lbs']) if p['max_load_lbs'] else None,
+            "sets": p['total_sets'],
             "total_reps": p['total_reps'],
             "e1rm": est_1rm
         })
@@ -699,9 +678,9 @@ async def get_exercise_history(exercise: str, days: int):
         if est_1rm and est_1rm > pr_e1rm:
             pr_e1rm = est_1rm
             pr = {
-                "load": best_load,
-                "reps": best_reps,
-                "date": str(p['workout_date']),
+                "load": float(p['best_load_lbs']),
+                "reps": p['best_reps'],
+                "date": str(p['session_date']),
                 "e1rm": est_1rm
             }
     
@@ -720,6 +699,7 @@ async def get_exercise_history(exercise: str, days: int):
     
     result = {
         "exercise": canonical_name,
+        "exercise_id": resolved['exercise_id'],
         "sessions": len(sessions),
         "date_range": {
             "first": sessions[-1]['date'] if sessions else None,
@@ -9,6 +9,36 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _constraint_concerns(
+    exercise_name: str,
+    patterns: List[str],
+    constraints: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Constraints an exercise conflicts with."""
+    # Simple keyword matching for constraint violations
+    # TODO: Make this smarter with graph relationships
+    concerns = []
+    exercise_name = (exercise_name or "").lower()
+    patterns = [p.lower() for p in patterns]
+    
+    for c in constraints:
+        constraint_desc = (c["constraint"] or "").lower()
+        
+        # Check for obvious conflicts
+        if "avoid" in constraint_desc:
+            # Extract what to avoid
+            if "deep flexion" in constraint_desc and "squat" in exercise_name:
+                concerns.append(c)
+            elif "rotation" in constraint_desc and any("rotation" in p for p in patterns):
+                concerns.append(c)
+            elif "impact" in constraint_desc and "jump" in exercise_name:
+                concerns.append(c)
+            elif "overhead" in constraint_desc and ("press" in exercise_name or "overhead" in exercise_name):
+                concerns.append(c)
+    
+    return concerns
+
+
 class Neo4jTrainingClient:
     """Neo4j database client for training operations."""
 
@@ -360,26 +390,7 @@ class Neo4jTrainingClient:
             if not record:
                 return {"safe": True, "concerns": [], "exercise": None}
             
-            # Simple keyword matching for constraint violations
-            # TODO: Make this smarter with graph relationships
-            concerns = []
-            exercise_name = record["exercise"].lower()
-            patterns = [p.lower() for p in record["patterns"]]
-            
-            for c in record["constraints"]:
-                constraint_desc = c["constraint"].lower()
-                
-                # Check for obvious conflicts
-                if "avoid" in constraint_desc:
-                    # Extract what to avoid
-                    if "deep flexion" in constraint_desc and "squat" in exercise_name:
-                        concerns.append(c)
-                    elif "rotation" in constraint_desc and any("rotation" in p for p in patterns):
-                        concerns.append(c)
-                    elif "impact" in constraint_desc and "jump" in exercise_name:
-                        concerns.append(c)
-                    elif "overhead" in constraint_desc and ("press" in exercise_name or "overhead" in exercise_name):
-                        concerns.append(c)
+            concerns = _constraint_concerns(record["exercise"], record["patterns"], record["constraints"])
             
             return {
                 "exercise": record["exercise"],
@@ -389,6 +400,70 @@ class Neo4jTrainingClient:
                 "muscles": record["muscles"]
             }
 
+    def check_exercises_safety(self, exercise_ids: List[str], person_id: str) -> Dict[str, Any]:
+        """
+        Check many exercises against current constraints in one query.
+        
+        Constraints are collected once, then every exercise is matched
+        against them. Used to validate a whole plan before it is saved.
+        
+        Returns:
+            - safe: True if no exercise has a concern
+            - constraints: active constraints (matrix columns)
+            - exercise_ids: unique exercise IDs checked (matrix rows)
+            - matrix: one 0/1 row per exercise, one entry per constraint
+            - unsafe: exercise_id -> {exercise, concerns} for flagged exercises
+            - unknown: exercise IDs not found in the graph
+        """
+        exercise_ids = list(dict.fromkeys(exercise_ids))
+        
+        with self.driver.session(database=self.database) as session:
+            result = session.run("""
+                // Get person's constraints once (Person direct, no Athlete)
+                OPTIONAL MATCH (p:Person {id: $person_id})-[:HAS_INJURY]->(i:Injury)
+                WHERE i.status IN ['active', 'recovering']
+                OPTIONAL MATCH (i)-[:CREATES]->(c:Constraint)
+                WITH collect(DISTINCT CASE WHEN c IS NOT NULL THEN {
+                    injury: i.name,
+                    constraint: c.description,
+                    type: c.constraint_type
+                } END) as constraints
+                
+                UNWIND $exercise_ids as exercise_id
+                OPTIONAL MATCH (e:Exercise {id: exercise_id})
+                OPTIONAL MATCH (e)-[:INVOLVES]->(mp:MovementPattern)
+                RETURN exercise_id,
+                       e.name as exercise,
+                       collect(DISTINCT mp.name) as patterns,
+                       constraints
+            """, exercise_ids=exercise_ids, person_id=person_id)
+            
+            records = list(result)
+        
+        constraints = records[0]["constraints"] if records else []
+        found = {r["exercise_id"]: r for r in records if r["exercise"] is not None}
+        
+        matrix = []
+        unsafe = {}
+        for exercise_id in exercise_ids:
+            record = found.get(exercise_id)
+            concerns = (
+                _constraint_concerns(record["exercise"], record["patterns"], constraints)
+                if record else []
+            )
+            matrix.append([1 if c in concerns else 0 for c in constraints])
+            if concerns:
+                unsafe[exercise_id] = {"exercise": record["exercise"], "concerns": concerns}
+        
+        return {
+            "safe": len(unsafe) == 0,
+            "constraints": constraints,
+            "exercise_ids": exercise_ids,
+            "matrix": matrix,
+            "unsafe": unsafe,
+            "unknown": [eid for eid in exercise_ids if eid not in found]
+        }
+
     def find_substitutes(
         self, 
         exercise_id: str, 
@@ -883,11 +958,12 @@ class Neo4jTrainingClient:
                         }]->(ps)
                     """, deviations=rep_load_changes)
                 
-                # Update execution compliance
+                # Update execution compliance; the sets changed, so bump the workout version
                 session.run("""
                     MATCH (w:Workout)-[ef:EXECUTED_FROM]->(pw:PlannedWorkout)
                     WHERE pw.plan_id = $plan_id OR pw.id = $plan_id
-                    SET ef.compliance = 'with_deviations'
+                    SET ef.compliance = 'with_deviations',
+                        w.updated_at = datetime()
                 """, plan_id=plan_id)
             
             return {
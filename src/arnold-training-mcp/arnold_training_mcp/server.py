@@ -884,6 +884,18 @@ async def call_tool_handler(name: str, arguments: dict[str, Any]) -> list[types.
                     set_data["id"] = f"PLANSET:{uuid.uuid4()}"
                     set_data["order"] = j + 1
             
+            # Validate the whole plan against constraints in one query
+            # (sets without an exercise_id, e.g. rest or note sets, are skipped)
+            exercise_ids = [
+                set_data.get("exercise_id")
+                for block in plan_data.get("blocks", [])
+                for set_data in block.get("sets", [])
+            ]
+            safety = neo4j_client.check_exercises_safety(
+                [eid for eid in exercise_ids if eid is not None],
+                person_id
+            )
+            
             result = neo4j_client.create_planned_workout(plan_data)
 
             # Mirror planned sets to Postgres for FK joins (Phase 6b)
@@ -902,6 +914,16 @@ async def call_tool_handler(name: str, arguments: dict[str, Any]) -> list[types.
                 for b in plan_data.get("blocks", [])
             ])
             
+            if safety["safe"]:
+                safety_summary = f"✓ {len(safety['exercise_ids'])} exercises clear of active constraints"
+            else:
+                safety_summary = "\n".join([
+                    f"  ⚠️ {u['exercise']}: " + "; ".join(
+                        f"{c['injury']} - {c['constraint']}" for c in u["concerns"]
+                    )
+                    for u in safety["unsafe"].values()
+                ])
+            
             return [types.TextContent(
                 type="text",
                 text=f"""✅ Workout plan created!
@@ -914,6 +936,9 @@ async def call_tool_handler(name: str, arguments: dict[str, Any]) -> list[types.
 **Blocks:**
 {block_summary}
 
+**Constraint check:**
+{safety_summary}
+
 Use `confirm_plan` when ready to lock it in."""
             )]
             
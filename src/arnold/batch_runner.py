@@ -0,0 +1,386 @@
+"""
+Checkpointed Batch Runner
+
+Runs a function over many items on a thread pool, for LLM-driven
+pipelines (classification, workout ingestion, exercise mapping).
+
+- Every finished item is appended to a JSONL checkpoint (one line per
+  item, flushed immediately). A restart skips items already recorded,
+  so a crash at item 3,000 costs one item, not 3,000.
+- Results are handed to a sink on the calling thread as they complete
+  (e.g. a Neo4j write), instead of being held until the end.
+- Concurrency adapts to the endpoint (AIMD): it grows while latency stays
+  near the best observed, shrinks when latency climbs, and halves on a
+  rate limit (HTTP 429) with the item re-queued after a backoff. No fixed
+  sleeps between calls.
+- run_packed sends several items per call (e.g. N exercises per prompt)
+  and re-queues only the items a packed call failed to answer, one by one.
+
+Usage:
+    from arnold.batch_runner import BatchRunner
+
+    runner = BatchRunner(
+        classify_one,
+        checkpoint=Path("data/checkpoints/classify.jsonl"),
+        key=lambda ex: ex['id'],
+        sink=write_to_neo4j,
+    )
+    stats = runner.run(exercises)
+
+Testing against a local fake LLM endpoint:
+    python scripts/benchmarks/fake_llm_server.py --port 8766 --capacity 4 &
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=test \\
+        python scripts/classify_all_exercises_parallel.py --test
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+DEFAULT_MIN_WORKERS = 1
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_INITIAL_WORKERS = 4
+MAX_RATE_LIMIT_RETRIES = 8
+RETRY_BASE_DELAY = 1.0       # seconds, doubled per rate-limit retry
+LATENCY_SLOWDOWN = 2.0       # shrink when EWMA latency exceeds best × this
+EWMA_ALPHA = 0.2
+
+
+class RateLimited(Exception):
+    """Raise from the work function to signal a 429 explicitly."""
+
+    def __init__(self, message: str = "rate limited", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_rate_limit(exc: BaseException) -> bool:
+    """True for 429s from openai / requests / RateLimited."""
+    if isinstance(exc, RateLimited):
+        return True
+    if type(exc).__name__ == "RateLimitError":
+        return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Retry-After seconds from the exception, if the server sent one."""
+    if getattr(exc, "retry_after", None) is not None:
+        return float(exc.retry_after)
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Checkpoint:
+    """Append-only JSONL log of finished items, keyed by item key."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Latest record per key. A torn last line (crash mid-write) is ignored."""
+        records: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return records
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                records[record["key"]] = record
+        return records
+
+    def append(self, key: str, ok: bool, result: Any = None, error: Optional[str] = None):
+        line = json.dumps({
+            "key": key,
+            "ok": ok,
+            "result": result,
+            "error": error,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }, default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+                f.flush()
+
+
+class ConcurrencyController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    +1 after `limit` consecutive healthy completions, -1 when the latency
+    EWMA drifts past LATENCY_SLOWDOWN × best, halved on a rate limit.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.ewma: Optional[float] = None
+        self.best: Optional[float] = None
+        self._streak = 0
+        self.history = [self.limit]
+
+    def _set(self, limit: int):
+        limit = min(max(limit, self.minimum), self.maximum)
+        if limit != self.limit:
+            self.limit = limit
+            self.history.append(limit)
+        self._streak = 0
+
+    def on_success(self, latency: float):
+        self.ewma = latency if self.ewma is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma
+        self.best = latency if self.best is None else min(self.best, latency)
+
+        if self.ewma > self.best * LATENCY_SLOWDOWN:
+            self._set(self.limit - 1)
+            # Re-baseline so one slow stretch doesn't pin the limit at the floor
+            self.best = self.ewma / LATENCY_SLOWDOWN
+            return
+
+        self._streak += 1
+        if self._streak >= self.limit:
+            self._set(self.limit + 1)
+
+    def on_rate_limit(self):
+        self._set(self.limit // 2)
+
+
+class BatchRunner:
+    """Checkpointed, adaptively concurrent map over items with a streaming sink."""
+
+    def __init__(
+        self,
+        fn: Callable[[Any], Any],
+        checkpoint: Optional[Path] = None,
+        key: Callable[[Any], str] = str,
+        sink: Optional[Callable[[Any, Any], None]] = None,
+        initial_workers: int = DEFAULT_INITIAL_WORKERS,
+        min_workers: int = DEFAULT_MIN_WORKERS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        retry_failed: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None
+    ):
+        """
+        Args:
+            fn: Work function, called on a worker thread with one item
+            checkpoint: JSONL checkpoint file (created if missing; None = in-memory run)
+            key: Stable identity of an item (used to skip finished items)
+            sink: Called on the calling thread with (item, result) as each
+                  item completes; the item is checkpointed after the sink
+                  returns, so a sink failure means the item is redone on resume
+            initial_workers / min_workers / max_workers: Concurrency bounds
+            retry_failed: Re-run items recorded as failed in the checkpoint
+            progress: Called with (done, total) after each item
+        """
+        self.fn = fn
+        self.checkpoint = Checkpoint(checkpoint) if checkpoint else None
+        self.key = key
+        self.sink = sink
+        self.controller = ConcurrencyController(initial_workers, min_workers, max_workers)
+        self.retry_failed = retry_failed
+        self.progress = progress
+        self.stats = {
+            "total": 0, "skipped": 0, "succeeded": 0, "failed": 0,
+            "rate_limited": 0, "elapsed_s": 0.0,
+        }
+
+    def completed_keys(self) -> Set[str]:
+        """Keys the checkpoint says are finished (and won't be re-run)."""
+        if self.checkpoint is None:
+            return set()
+        return {
+            key for key, record in self.checkpoint.load().items()
+            if record["ok"] or not self.retry_failed
+        }
+
+    def results(self) -> Dict[str, Any]:
+        """Successful results from the checkpoint, by key."""
+        if self.checkpoint is None:
+            return {}
+        return {key: r["result"] for key, r in self.checkpoint.load().items() if r["ok"]}
+
+    def _call(self, item):
+        start = time.monotonic()
+        try:
+            return True, self.fn(item), time.monotonic() - start
+        except Exception as e:
+            return False, e, time.monotonic() - start
+
+    def run(self, items: Iterable[Any]) -> Dict[str, Any]:
+        """Process every item not already in the checkpoint. Returns stats."""
+        started = time.monotonic()
+        done_keys = self.completed_keys()
+
+        pending = deque()
+        for item in items:
+            self.stats["total"] += 1
+            if self.key(item) in done_keys:
+                self.stats["skipped"] += 1
+            else:
+                pending.append((item, 0))
+
+        done = self.stats["skipped"]
+        total = self.stats["total"]
+        delayed = []            # (ready_at, item, attempts) after a rate limit
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.controller.maximum) as executor:
+            while pending or delayed or in_flight:
+                now = time.monotonic()
+                for entry in [d for d in delayed if d[0] <= now]:
+                    delayed.remove(entry)
+                    pending.appendleft((entry[1], entry[2]))
+
+                while pending and len(in_flight) < self.controller.limit:
+                    item, attempts = pending.popleft()
+                    in_flight[executor.submit(self._call, item)] = (item, attempts)
+
+                if not in_flight:
+                    time.sleep(max(0.0, min(d[0] for d in delayed) - time.monotonic()))
+                    continue
+
+                timeout = max(0.0, min(d[0] for d in delayed) - now) if delayed else None
+                finished, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    item, attempts = in_flight.pop(future)
+                    ok, value, latency = future.result()
+                    key = self.key(item)
+
+                    if not ok and is_rate_limit(value) and attempts < MAX_RATE_LIMIT_RETRIES:
+                        self.stats["rate_limited"] += 1
+                        self.controller.on_rate_limit()
+                        backoff = retry_after(value) or RETRY_BASE_DELAY * (2 ** attempts)
+                        delayed.append((time.monotonic() + backoff * random.uniform(1.0, 1.25), item, attempts + 1))
+                        continue
+
+                    if ok:
+                        self.controller.on_success(latency)
+                        if self.sink is not None:
+                            self.sink(item, value)
+                        if self.checkpoint:
+                            self.checkpoint.append(key, True, value)
+                        self.stats["succeeded"] += 1
+                    else:
+                        if self.checkpoint:
+                            self.checkpoint.append(key, False, error=f"{type(value).__name__}: {value}")
+                        self.stats["failed"] += 1
+
+                    done += 1
+                    if self.progress:
+                        self.progress(done, total)
+
+        self.stats["elapsed_s"] = round(time.monotonic() - started, 3)
+        self.stats["concurrency"] = self.controller.history
+        return self.stats
+
+
+def run_packed(
+    fn_many: Callable[[List[Any]], List[Optional[Any]]],
+    fn_one: Callable[[Any], Any],
+    items: Iterable[Any],
+    pack_size: int,
+    checkpoint: Optional[Path] = None,
+    key: Callable[[Any], str] = str,
+    sink: Optional[Callable[[Any, Any], None]] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    **runner_kwargs
+) -> Dict[str, Any]:
+    """
+    Run items pack_size at a time, re-running failed items one by one.
+
+    fn_many gets a list of items and returns one result per item, or None
+    for items it could not answer (e.g. missing or invalid in a JSON-array
+    response). Those items, and every item of a pack whose call raised, are
+    re-queued through fn_one. Both phases share the item-level checkpoint,
+    so a resumed run skips items finished in either phase.
+
+    Args:
+        fn_many: Work function for a pack of items
+        fn_one: Work function for a single item (fallback)
+        items: Items to process
+        pack_size: Items per fn_many call (1 = no packing)
+        checkpoint / key / sink / progress: As for BatchRunner (per item)
+        **runner_kwargs: Concurrency bounds passed to both BatchRunners
+
+    Returns:
+        Stats: total, skipped, packed_calls, packed_items, requeued,
+        succeeded, failed, rate_limited, elapsed_s, concurrency
+    """
+    started = time.monotonic()
+    items = list(items)
+    store = Checkpoint(checkpoint) if checkpoint else None
+    done_keys = {k for k, record in store.load().items() if record["ok"]} if store else set()
+    pending = [item for item in items if key(item) not in done_keys]
+
+    stats = {
+        "total": len(items), "skipped": len(items) - len(pending),
+        "packed_calls": 0, "packed_items": 0, "requeued": 0,
+    }
+    counted = {"done": stats["skipped"]}
+    answered: Set[str] = set()
+
+    def tick():
+        counted["done"] += 1
+        if progress:
+            progress(counted["done"], len(items))
+
+    def call_pack(pack):
+        try:
+            return fn_many(pack)
+        except Exception as e:
+            if is_rate_limit(e):
+                raise
+            return [None] * len(pack)
+
+    def sink_pack(pack, results):
+        stats["packed_calls"] += 1
+        results = list(results or [])
+        results += [None] * (len(pack) - len(results))
+        for item, result in zip(pack, results):
+            if result is None:
+                continue
+            answered.add(key(item))
+            if sink is not None:
+                sink(item, result)
+            if store:
+                store.append(key(item), True, result)
+            stats["packed_items"] += 1
+            tick()
+
+    packs = [pending[i:i + pack_size] for i in range(0, len(pending), pack_size)] if pack_size > 1 else []
+    packed = BatchRunner(call_pack, key=lambda pack: key(pack[0]), sink=sink_pack, **runner_kwargs)
+    packed_stats = packed.run(packs)
+
+    # Unanswered items, including packs that gave up after repeated rate limits
+    requeue = [item for item in pending if key(item) not in answered]
+
+    def sink_one(item, result):
+        if sink is not None:
+            sink(item, result)
+        tick()
+
+    single = BatchRunner(fn_one, checkpoint=checkpoint, key=key, sink=sink_one, **runner_kwargs)
+    single_stats = single.run(requeue)
+
+    stats["requeued"] = len(requeue) if packs else 0
+    stats["succeeded"] = stats["packed_items"] + single_stats["succeeded"]
+    stats["failed"] = single_stats["failed"]
+    stats["rate_limited"] = packed_stats["rate_limited"] + single_stats["rate_limited"]
+    stats["elapsed_s"] = round(time.monotonic() - started, 3)
+    stats["concurrency"] = packed.controller.history + single.controller.history[1:]
+    return stats
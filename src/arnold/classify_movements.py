@@ -7,10 +7,70 @@ Enables injury-aware programming for custom and unconventional exercises.
 Codename: PATTERN-RECOGNITION-ALPHA
 """
 
-import os
 import json
+from pathlib import Path
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+
+from arnold.batch_runner import Checkpoint, is_rate_limit, run_packed
+from arnold.llm_cache import llm_client
+
+
+DEFAULT_PACK_SIZE = 10  # Exercises per classification request
+
+# Shared by the single-exercise and packed prompts
+CLASSIFICATION_INSTRUCTIONS = """CLASSIFICATION INSTRUCTIONS:
+
+1. Identify PRIMARY joint actions:
+   - Which joints move? (hip, knee, ankle, shoulder, elbow, spine)
+   - What type of movement? (flexion, extension, abduction, rotation)
+   - What plane? (sagittal, frontal, transverse)
+
+2. Match to movement patterns:
+   - Use 1-3 patterns (most exercises are 1-2, complex movements may be 3)
+   - Prioritize PRIMARY movers over stabilizers
+   - If the exercise involves rotation/anti-rotation, always include it
+   - Carries (loaded walking/marching) should include CARRY
+   - Asymmetric loads require ANTI_ROTATION (suitcase carry, single-arm work)
+
+3. Biomechanical reasoning:
+   - Explain which muscles produce the movement
+   - Describe the joint actions
+   - Note any stabilization requirements
+
+4. Confidence score:
+   - 1.0: Textbook exercise (e.g., barbell back squat = SQUAT)
+   - 0.9: Clear pattern, minor variation (e.g., goblet squat = SQUAT)
+   - 0.8: Compound movement, multiple clear patterns (e.g., deadlift = HINGE + PULL)
+   - 0.7: Unconventional but clear mechanics (e.g., sandbag shouldering = HINGE)
+   - 0.5: Unconventional exercise, pattern inferred (e.g., tire flip)
+   - <0.5: Flag for manual review (cannot determine pattern)"""
+
+CLASSIFICATION_EXAMPLES = """EXAMPLES FOR REFERENCE:
+
+1. Barbell Back Squat:
+   - movements: ["SQUAT"]
+   - reasoning: "Hip and knee flexion/extension in sagittal plane with vertical torso. Quadriceps, glutes, hamstrings produce movement."
+   - confidence: 1.0
+
+2. Deadlift:
+   - movements: ["HINGE", "PULL"]
+   - reasoning: "Primary hip extension (hinge) with secondary scapular retraction and elbow flexion (pull). Glutes/hamstrings dominant, lats/traps stabilize."
+   - confidence: 0.95
+
+3. Suitcase Carry:
+   - movements: ["CARRY", "ANTI_ROTATION"]
+   - reasoning: "Loaded walking (carry) with asymmetric load requiring lateral spinal stabilization (anti-rotation). Core prevents lateral flexion, glutes/obliques work isometrically."
+   - confidence: 0.9
+
+4. Tire Flip:
+   - movements: ["HINGE", "PUSH"]
+   - reasoning: "Initiates as deadlift (hinge), transitions to overhead press finish (vertical push). Primarily posterior chain (glutes/hamstrings/low back), secondary triceps/delts."
+   - confidence: 0.75
+
+5. Bearhug March:
+   - movements: ["CARRY", "ANTI_ROTATION"]
+   - reasoning: "Loaded walking with anterior load position (bear hug). Hip flexors/extensors produce gait, core stabilizes spine against anterior load and prevents flexion. Anti-rotation from asymmetric loading during single-leg stance."
+   - confidence: 0.85"""
 
 
 class MovementClassifier:
@@ -27,8 +87,10 @@ class MovementClassifier:
 
         Args:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
+
+        Responses are cached on disk (see arnold.llm_cache).
         """
-        self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self.client = llm_client(api_key)
         self.model = "gpt-5-mini"  # MoE model - no temperature settings
 
     def classify_exercise(
@@ -80,6 +142,8 @@ class MovementClassifier:
             return self._validate_classification(result, exercise_name)
 
         except Exception as e:
+            if is_rate_limit(e):
+                raise  # Let the batch runner back off and retry
             print(f"Error classifying {exercise_name}: {e}")
             return {
                 "exercise": exercise_name,
@@ -89,6 +153,69 @@ class MovementClassifier:
                 "error": str(e)
             }
 
+    def classify_exercises(
+        self,
+        exercises: List[Dict[str, str]],
+        movement_taxonomy: List[Dict[str, str]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Classify several exercises in one request.
+
+        The system prompt, taxonomy and instructions are sent once for the
+        whole pack; the response is a JSON array with one classification
+        per exercise, each checked by _validate_classification.
+
+        Args:
+            exercises: Exercise dicts with 'name', 'category', 'equipment'
+            movement_taxonomy: List of available movement patterns
+
+        Returns:
+            One classification per exercise (same order), or None where the
+            response had no usable entry (caller retries those individually)
+
+        Raises:
+            Rate limits and request failures (the whole pack failed)
+        """
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self._get_system_prompt()},
+                {"role": "user", "content": self._build_batch_prompt(exercises, movement_taxonomy)}
+            ],
+            response_format={"type": "json_object"}
+        )
+
+        payload = json.loads(response.choices[0].message.content)
+        entries = payload.get('classifications', []) if isinstance(payload, dict) else payload
+        if not isinstance(entries, list):
+            entries = []
+
+        by_index: Dict[int, Dict[str, Any]] = {}
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get('movements'), list):
+                continue
+            if isinstance(entry.get('index'), int):
+                by_index.setdefault(entry['index'], entry)
+            if isinstance(entry.get('exercise'), str):
+                by_name.setdefault(entry['exercise'].strip().lower(), entry)
+
+        results: List[Optional[Dict[str, Any]]] = []
+        for i, exercise in enumerate(exercises):
+            name = exercise['name'].strip().lower()
+            entry = by_index.get(i)
+            # Index must agree with the name when both are present
+            if entry is not None and str(entry.get('exercise', name)).strip().lower() != name:
+                entry = None
+            entry = entry or by_name.get(name)
+            if entry is None:
+                results.append(None)
+                continue
+            entry = dict(entry, exercise=exercise['name'])
+            entry.pop('index', None)
+            results.append(self._validate_classification(entry, exercise['name']))
+        return results
+
     def _get_system_prompt(self) -> str:
         """Get system prompt for movement classification."""
         return """You are a biomechanics expert specializing in exercise science and functional movement patterns.
@@ -130,32 +257,7 @@ EQUIPMENT: {equipment or 'bodyweight/unknown'}
 AVAILABLE MOVEMENT PATTERNS:
 {taxonomy_str}
 
-CLASSIFICATION INSTRUCTIONS:
-
-1. Identify PRIMARY joint actions:
-   - Which joints move? (hip, knee, ankle, shoulder, elbow, spine)
-   - What type of movement? (flexion, extension, abduction, rotation)
-   - What plane? (sagittal, frontal, transverse)
-
-2. Match to movement patterns:
-   - Use 1-3 patterns (most exercises are 1-2, complex movements may be 3)
-   - Prioritize PRIMARY movers over stabilizers
-   - If the exercise involves rotation/anti-rotation, always include it
-   - Carries (loaded walking/marching) should include CARRY
-   - Asymmetric loads require ANTI_ROTATION (suitcase carry, single-arm work)
-
-3. Biomechanical reasoning:
-   - Explain which muscles produce the movement
-   - Describe the joint actions
-   - Note any stabilization requirements
-
-4. Confidence score:
-   - 1.0: Textbook exercise (e.g., barbell back squat = SQUAT)
-   - 0.9: Clear pattern, minor variation (e.g., goblet squat = SQUAT)
-   - 0.8: Compound movement, multiple clear patterns (e.g., deadlift = HINGE + PULL)
-   - 0.7: Unconventional but clear mechanics (e.g., sandbag shouldering = HINGE)
-   - 0.5: Unconventional exercise, pattern inferred (e.g., tire flip)
-   - <0.5: Flag for manual review (cannot determine pattern)
+{CLASSIFICATION_INSTRUCTIONS}
 
 REQUIRED JSON SCHEMA:
 
@@ -172,34 +274,55 @@ REQUIRED JSON SCHEMA:
   "notes": "Any special considerations or variations"
 }}
 
-EXAMPLES FOR REFERENCE:
+{CLASSIFICATION_EXAMPLES}
 
-1. Barbell Back Squat:
-   - movements: ["SQUAT"]
-   - reasoning: "Hip and knee flexion/extension in sagittal plane with vertical torso. Quadriceps, glutes, hamstrings produce movement."
-   - confidence: 1.0
+Return ONLY the JSON object. Be thorough but concise in reasoning.
+"""
 
-2. Deadlift:
-   - movements: ["HINGE", "PULL"]
-   - reasoning: "Primary hip extension (hinge) with secondary scapular retraction and elbow flexion (pull). Glutes/hamstrings dominant, lats/traps stabilize."
-   - confidence: 0.95
+    def _build_batch_prompt(self, exercises: List[Dict[str, str]], taxonomy: List[Dict]) -> str:
+        """Prompt for a pack of exercises (taxonomy and instructions sent once)."""
+        taxonomy_str = "\n".join([
+            f"- {m['name'].upper()}: {m.get('description', 'Fundamental movement pattern')}"
+            for m in taxonomy
+        ])
+        exercises_str = "\n".join([
+            f"{i}. {e['name']} | CATEGORY: {e.get('category', 'unknown')} | "
+            f"EQUIPMENT: {e.get('equipment') or 'bodyweight/unknown'}"
+            for i, e in enumerate(exercises)
+        ])
 
-3. Suitcase Carry:
-   - movements: ["CARRY", "ANTI_ROTATION"]
-   - reasoning: "Loaded walking (carry) with asymmetric load requiring lateral spinal stabilization (anti-rotation). Core prevents lateral flexion, glutes/obliques work isometrically."
-   - confidence: 0.9
+        return f"""Classify each of these {len(exercises)} exercises into movement patterns, independently.
 
-4. Tire Flip:
-   - movements: ["HINGE", "PUSH"]
-   - reasoning: "Initiates as deadlift (hinge), transitions to overhead press finish (vertical push). Primarily posterior chain (glutes/hamstrings/low back), secondary triceps/delts."
-   - confidence: 0.75
+EXERCISES (index. name | category | equipment):
+{exercises_str}
 
-5. Bearhug March:
-   - movements: ["CARRY", "ANTI_ROTATION"]
-   - reasoning: "Loaded walking with anterior load position (bear hug). Hip flexors/extensors produce gait, core stabilizes spine against anterior load and prevents flexion. Anti-rotation from asymmetric loading during single-leg stance."
-   - confidence: 0.85
+AVAILABLE MOVEMENT PATTERNS:
+{taxonomy_str}
 
-Return ONLY the JSON object. Be thorough but concise in reasoning.
+{CLASSIFICATION_INSTRUCTIONS}
+
+REQUIRED JSON SCHEMA (one entry per exercise, same index and exact name):
+
+{{
+  "classifications": [
+    {{
+      "index": 0,
+      "exercise": "<exercise name>",
+      "movements": ["PATTERN1", "PATTERN2"],
+      "reasoning": "This exercise involves... The primary joint action is... Stabilization requires...",
+      "primary_muscles": ["muscle1", "muscle2", "muscle3"],
+      "joint_actions": [
+        {{"joint": "hip", "action": "extension", "plane": "sagittal"}}
+      ],
+      "confidence": 0.85,
+      "notes": "Any special considerations or variations"
+    }}
+  ]
+}}
+
+{CLASSIFICATION_EXAMPLES}
+
+Return ONLY the JSON object with all {len(exercises)} classifications. Be thorough but concise in reasoning.
 """
 
     def _validate_classification(
@@ -249,38 +372,93 @@ def classify_batch(
     exercises: List[Dict[str, str]],
     movement_taxonomy: List[Dict[str, str]],
     api_key: Optional[str] = None,
-    delay: float = 0.5
+    max_workers: int = 6,
+    checkpoint: Optional[Path] = None,
+    pack_size: int = DEFAULT_PACK_SIZE
 ) -> List[Dict[str, Any]]:
     """
     Classify a batch of exercises.
 
+    pack_size exercises go in each request (classify_exercises); entries
+    missing or invalid in a response are retried one exercise per request.
+    Calls run concurrently through arnold.batch_runner, which backs off on
+    rate limits instead of sleeping between calls. With a checkpoint, an
+    interrupted batch resumes where it stopped.
+
     Args:
         exercises: List of exercise dicts with 'name', 'category', 'equipment'
         movement_taxonomy: Available movement patterns
         api_key: OpenAI API key
-        delay: Seconds to wait between API calls (rate limiting)
+        max_workers: Upper bound on concurrent API calls
+        checkpoint: Optional JSONL checkpoint (keyed by exercise name)
+        pack_size: Exercises per request (1 = one request per exercise)
 
     Returns:
-        List of classification results
+        List of classification results (same order as exercises)
     """
-    import time
     from tqdm import tqdm
 
     classifier = MovementClassifier(api_key=api_key)
-    results = []
 
-    for exercise in tqdm(exercises, desc="Classifying exercises"):
-        classification = classifier.classify_exercise(
-            exercise['name'],
-            exercise.get('category', 'unknown'),
-            exercise.get('equipment'),
-            movement_taxonomy
+    errors: Dict[str, str] = {}
+
+    def classify(exercise: Dict[str, str]) -> Dict[str, Any]:
+        """Failed classifications raise, so the checkpoint records them for retry."""
+        try:
+            result = classifier.classify_exercise(
+                exercise['name'],
+                exercise.get('category', 'unknown'),
+                exercise.get('equipment'),
+                movement_taxonomy
+            )
+            if result.get('error'):
+                raise RuntimeError(result['error'])
+        except Exception as e:
+            errors[exercise['name']] = f"{type(e).__name__}: {e}"
+            raise
+        return result
+
+    def classify_pack(pack: List[Dict[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        return classifier.classify_exercises(pack, movement_taxonomy)
+
+    results = {}
+
+    def collect(exercise: Dict[str, str], classification: Dict[str, Any]):
+        results[exercise['name']] = classification
+
+    with tqdm(total=len(exercises), desc="Classifying exercises") as pbar:
+        run_packed(
+            classify_pack,
+            classify,
+            exercises,
+            pack_size,
+            checkpoint=checkpoint,
+            key=lambda exercise: exercise['name'],
+            sink=collect,
+            max_workers=max_workers,
+            progress=lambda done, total: pbar.update(done - pbar.n)
         )
 
-        results.append(classification)
-        time.sleep(delay)  # Rate limit protection
+    # Items finished by an earlier (interrupted) run; the recorded error of
+    # the latest attempt for the rest
+    if checkpoint:
+        for name, record in Checkpoint(checkpoint).load().items():
+            if record['ok']:
+                results.setdefault(name, record['result'])
+            elif record.get('error'):
+                errors[name] = record['error']
+
+    def failed(name: str) -> Dict[str, Any]:
+        error = errors.get(name, "not classified")
+        return {
+            "exercise": name,
+            "movements": [],
+            "reasoning": f"Classification failed: {error}",
+            "confidence": 0.0,
+            "error": error
+        }
 
-    return results
+    return [results.get(exercise['name']) or failed(exercise['name']) for exercise in exercises]
 
 
 # Example usage
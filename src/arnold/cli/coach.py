@@ -6,11 +6,14 @@ Internal Codename: SKYCOACH
 Command-line coaching interface for Arnold.
 
 Usage:
-    arnold plan [--date DATE] [--focus FOCUS]
+    arnold plan [--date DATE] [--focus FOCUS] [--days DAYS]
     arnold status
     arnold analyze --exercise EXERCISE [--weeks WEEKS]
     arnold alt --exercise EXERCISE [--reason REASON]
     arnold volume [--weeks WEEKS] [--by {muscle,exercise}]
+    arnold reindex
+    arnold progressions [--if-stale]
+    arnold audit [--start DATE] [--end DATE]
 """
 
 import click
@@ -25,6 +28,7 @@ from arnold.judgment_day import (
     ConstraintChecker,
     ExerciseVariationSuggester
 )
+from arnold.queries.progressions import ProgressionGraph
 
 
 @click.group()
@@ -41,8 +45,9 @@ def cli():
 @click.option('--date', 'date_str', type=str, help='Plan date (YYYY-MM-DD), default: tomorrow')
 @click.option('--focus', type=str, help='Workout focus (e.g., "Upper Push")')
 @click.option('--type', 'workout_type', type=str, default='strength', help='Workout type (strength/conditioning/skill)')
-def plan(date_str: Optional[str], focus: Optional[str], workout_type: str):
-    """Generate a workout plan."""
+@click.option('--days', type=int, default=1, help='Number of consecutive days to plan (microcycle)')
+def plan(date_str: Optional[str], focus: Optional[str], workout_type: str, days: int):
+    """Generate a workout plan (or a multi-day microcycle with --days)."""
     graph = ArnoldGraph()
 
     if not graph.verify_connectivity():
@@ -58,15 +63,24 @@ def plan(date_str: Optional[str], focus: Optional[str], workout_type: str):
         plan_date = date.today() + timedelta(days=1)
 
     try:
-        workout_plan = planner.generate_daily_plan(
-            plan_date=plan_date,
-            focus=focus,
-            workout_type=workout_type
-        )
+        if days > 1:
+            workout_plans = planner.generate_microcycle(
+                start=plan_date,
+                days=days,
+                workout_type=workout_type,
+                focuses=[focus] if focus else None
+            )
+        else:
+            workout_plans = [planner.generate_daily_plan(
+                plan_date=plan_date,
+                focus=focus,
+                workout_type=workout_type
+            )]
 
         # Format and display
-        formatted = planner.format_plan_text(workout_plan)
-        click.echo(formatted)
+        for workout_plan in workout_plans:
+            formatted = planner.format_plan_text(workout_plan)
+            click.echo(formatted)
 
     except Exception as e:
         click.echo(f"❌ Error generating plan: {e}")
@@ -315,5 +329,94 @@ def volume(weeks: int, group_by: str):
         graph.close()
 
 
+@cli.command()
+def reindex():
+    """Rebuild the exercise contraindication index (after kernel changes)."""
+    graph = ArnoldGraph()
+
+    if not graph.verify_connectivity():
+        click.echo("❌ Could not connect to CYBERDYNE-CORE")
+        return
+
+    try:
+        checker = ConstraintChecker(graph)
+        checker.rebuild_index()
+        index = checker.index
+
+        click.echo(f"✓ Indexed {len(index.exercise_ids)} exercises × {len(index.columns)} contraindications")
+        click.echo(f"  {index.path}")
+        for column, count in index.stats().items():
+            click.echo(f"  {column:<32} {count:>5}")
+
+    except Exception as e:
+        click.echo(f"❌ Error: {e}")
+    finally:
+        graph.close()
+
+
+@cli.command()
+@click.option('--if-stale', is_flag=True, help='Only rebuild if the exercise kernel changed')
+def progressions(if_stale: bool):
+    """Rebuild the PROGRESSES_TO progression graph (after kernel changes)."""
+    graph = ArnoldGraph()
+
+    if not graph.verify_connectivity():
+        click.echo("❌ Could not connect to CYBERDYNE-CORE")
+        return
+
+    try:
+        progression_graph = ProgressionGraph(graph)
+        counts = progression_graph.ensure_built() if if_stale else progression_graph.rebuild()
+        if counts is None:
+            click.echo("✓ PROGRESSES_TO edges are current")
+            return
+
+        click.echo(f"✓ Rebuilt PROGRESSES_TO edges ({sum(counts.values())} total)")
+        for progression_type, count in counts.items():
+            click.echo(f"  {progression_type:<12} {count:>6}")
+
+    except Exception as e:
+        click.echo(f"❌ Error: {e}")
+    finally:
+        graph.close()
+
+
+@cli.command()
+@click.option('--start', 'start_date', type=str, help='First plan date (YYYY-MM-DD)')
+@click.option('--end', 'end_date', type=str, help='Last plan date (YYYY-MM-DD)')
+def audit(start_date: Optional[str], end_date: Optional[str]):
+    """Validate every planned workout in a date range against injury constraints."""
+    graph = ArnoldGraph()
+
+    if not graph.verify_connectivity():
+        click.echo("❌ Could not connect to CYBERDYNE-CORE")
+        return
+
+    try:
+        checker = ConstraintChecker(graph)
+        result = checker.audit_planned_workouts(start_date, end_date)
+        matrix = result['matrix']
+
+        click.echo(
+            f"✓ Audited {len(result['plans'])} plans, {len(matrix['exercise_ids'])} exercises "
+            f"× {len(matrix['columns'])} active constraints"
+        )
+        for plan_id, plan in result['plans'].items():
+            if not plan['forbidden']:
+                continue
+            click.echo(f"\n⚠️  {result['dates'][plan_id]}  {plan_id}")
+            for exercise_id in plan['forbidden']:
+                reasons = ", ".join(
+                    f"{v['column']} ({'/'.join(v['injuries'])})"
+                    for v in matrix['violations'][exercise_id]
+                )
+                click.echo(f"   {exercise_id}: {reasons}")
+
+    except Exception as e:
+        click.echo(f"❌ Error: {e}")
+    finally:
+        graph.close()
+
+
 if __name__ == '__main__':
     cli()
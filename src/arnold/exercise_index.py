@@ -0,0 +1,240 @@
+"""
+Exercise Retrieval Index
+
+Local lexical index over the canonical exercise catalog. Used to narrow the
+exercise context in LLM prompts: exercise names are pulled out of a workout
+log with the deterministic arnold.parser helpers, and only the top-k
+canonical matches per name are sent, instead of a fixed slice of the catalog.
+
+Scoring is the Dice coefficient over character trigrams of the normalized
+name (arnold.normalizer), against the exercise name and every alias
+(graph aliases plus COMMON_EXERCISE_MAPPINGS). Exact name/alias hits score 1.
+
+Usage:
+    from arnold.exercise_index import ExerciseIndex, extract_exercise_names
+
+    index = ExerciseIndex.for_database(exercise_db)
+    names = extract_exercise_names(markdown)
+    candidates = index.retrieve(names, k=5)
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from arnold.normalizer import (
+    COMMON_EXERCISE_MAPPINGS,
+    is_non_exercise,
+    normalize_exercise_name_for_matching,
+)
+from arnold.parser import parse_frontmatter, parse_workout_body
+
+DEFAULT_TOP_K = 5
+MIN_SCORE = 0.3  # Dice similarity below this is noise
+SHARED_INDEXES = 4  # Catalogs kept by ExerciseIndex.for_database
+
+# Set/rep/load notation trailing an exercise name ("3×15", "135x5", "60 lb", "8/side", "4 min")
+_NOTATION = re.compile(
+    r'\b\d+(?:\.\d+)?\s*(?:[×x]\s*\d+|lbs?|kgs?|/\s*side|sec(?:onds?)?|mins?(?:utes?)?|reps?|steps?|rounds?|m)\b(?:\s*/\s*side)?'
+    r'|\b\d+:\d+\b',
+    re.IGNORECASE
+)
+# Separators between exercises on a compound line, and between name and details
+_COMPOUND_SPLIT = re.compile(r'\s*(?:\+|&|;|,|\bthen\b)\s*', re.IGNORECASE)
+_DETAIL_SPLIT = re.compile(r'\s*(?::(?!\d)|@|\s[—–-]\s)')
+_LIST_ITEM = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+(.+)$')
+# Bare count after a name ("push-ups 10"): reps, not part of the name
+_TRAILING_COUNT = re.compile(r'\s+\d+\s*$')
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _clean_name(raw: str) -> str:
+    """Exercise name without markdown, parentheticals and set notation."""
+    name = re.sub(r'[*_`]+', '', raw)
+    name = re.sub(r'\([^)]*\)|\[[^\]]*\]', '', name)
+    name = _DETAIL_SPLIT.split(name, maxsplit=1)[0]
+    name = _NOTATION.sub('', name)
+    name = re.sub(r'\s+', ' ', name).strip(' .-')
+    return _TRAILING_COUNT.sub('', name).rstrip(' .-')
+
+
+def _catalog_key(exercises: List[Dict[str, Any]]) -> str:
+    """Content hash of the catalog fields an index reads or returns."""
+    digest = hashlib.sha1()
+    for row in exercises:
+        aliases = '\x1e'.join(str(a) for a in row.get('aliases') or [])
+        digest.update(f"{row.get('id')}\x1f{row.get('name')}\x1f{row.get('category')}\x1f{aliases}\x1d".encode())
+    return digest.hexdigest()
+
+
+def extract_exercise_names(workout_markdown: str) -> List[str]:
+    """
+    Candidate exercise names in a workout log, in order of appearance.
+
+    Combines the structured section parser (arnold.parser) with a scan of
+    every list item, splitting compound lines ("KB swings + push-ups").
+    Detail lines (Reps:, Load:, ...) and other non-exercises are dropped.
+
+    Args:
+        workout_markdown: Raw markdown content (frontmatter allowed)
+
+    Returns:
+        De-duplicated raw names (not normalized)
+    """
+    _, body = parse_frontmatter(workout_markdown)
+
+    raw = [
+        exercise['name_raw']
+        for section in parse_workout_body(body)
+        for exercise in section['exercises']
+    ]
+    for line in body.splitlines():
+        match = _LIST_ITEM.match(line)
+        if match:
+            raw.append(match.group(1))
+
+    names = []
+    seen = set()
+    for entry in raw:
+        if is_non_exercise(re.sub(r'[*_`]+', '', entry).strip()):
+            continue
+        for part in _COMPOUND_SPLIT.split(entry):
+            name = _clean_name(part)
+            key = normalize_exercise_name_for_matching(name)
+            if key and key not in seen and not is_non_exercise(name):
+                seen.add(key)
+                names.append(name)
+    return names
+
+
+class ExerciseIndex:
+    """Trigram index over exercise names and aliases."""
+
+    _shared: 'OrderedDict[str, ExerciseIndex]' = OrderedDict()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, exercises: List[Dict[str, Any]]):
+        """
+        Args:
+            exercises: Catalog rows with at least id and name (aliases optional)
+        """
+        self.exercises = exercises
+        self._exact: Dict[str, int] = {}
+        self._keys: List[Tuple[int, int]] = []          # (exercise index, trigram count)
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        by_id = {row.get('id'): i for i, row in enumerate(exercises)}
+        extra_aliases: Dict[int, List[str]] = defaultdict(list)
+        for alias, suffix in COMMON_EXERCISE_MAPPINGS.items():
+            i = by_id.get(f"EXERCISE:{suffix}")
+            if i is not None:
+                extra_aliases[i].append(alias)
+
+        # Names first, so an exact name wins over another exercise's alias
+        for i, row in enumerate(exercises):
+            if row.get('name'):
+                self._add_key(i, normalize_exercise_name_for_matching(row['name']))
+        for i, row in enumerate(exercises):
+            for alias in list(row.get('aliases') or []) + extra_aliases[i]:
+                if alias:
+                    self._add_key(i, normalize_exercise_name_for_matching(alias))
+
+    def _add_key(self, i: int, key: str):
+        if not key:
+            return
+        self._exact.setdefault(key, i)
+        grams = _trigrams(key)
+        key_id = len(self._keys)
+        self._keys.append((i, len(grams)))
+        for gram in grams:
+            self._postings[gram].append(key_id)
+
+    @classmethod
+    def for_database(cls, exercises: List[Dict[str, Any]]) -> 'ExerciseIndex':
+        """
+        Index built once per catalog and shared across parsers/threads.
+
+        Keyed by a hash of the catalog contents (ids, names, aliases); the
+        SHARED_INDEXES most recently used catalogs are kept.
+        """
+        key = _catalog_key(exercises)
+        with cls._shared_lock:
+            index = cls._shared.get(key)
+            if index is None:
+                index = cls._shared[key] = cls(exercises)
+                while len(cls._shared) > SHARED_INDEXES:
+                    cls._shared.popitem(last=False)
+            else:
+                cls._shared.move_to_end(key)
+            return index
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def search(self, name: str, k: int = DEFAULT_TOP_K) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Top-k catalog rows for one name.
+
+        Returns:
+            (exercise row, score) pairs, best first
+        """
+        query = normalize_exercise_name_for_matching(name)
+        if query not in self._exact:
+            query = normalize_exercise_name_for_matching(_TRAILING_COUNT.sub('', name)) or query
+        if not query:
+            return []
+
+        best: Dict[int, float] = {}
+        exact = self._exact.get(query)
+        if exact is not None:
+            best[exact] = 1.0
+
+        grams = _trigrams(query)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for key_id in self._postings.get(gram, ()):
+                shared[key_id] += 1
+
+        for key_id, overlap in shared.items():
+            i, size = self._keys[key_id]
+            score = 2 * overlap / (len(grams) + size)
+            if score >= MIN_SCORE and score > best.get(i, 0.0):
+                best[i] = score
+
+        ranked = sorted(
+            best.items(),
+            key=lambda item: (-item[1], item[0] != exact, self.exercises[item[0]].get('name') or '')
+        )
+        return [(self.exercises[i], round(score, 3)) for i, score in ranked[:k]]
+
+    def retrieve(self, names: List[str], k: int = DEFAULT_TOP_K) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Top-k candidates per name, for prompt context.
+
+        Args:
+            names: Raw exercise names (e.g. from extract_exercise_names)
+            k: Candidates per name
+
+        Returns:
+            {name: [{id, name, category}, ...]}; names without a candidate map to []
+        """
+        return {
+            name: [
+                {'id': row.get('id'), 'name': row.get('name'), 'category': row.get('category')}
+                for row, _ in self.search(name, k)
+            ]
+            for name in names
+        }
+
+    def best_match(self, name: str, threshold: float = 1.0) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Single best row if its score reaches threshold (1.0 = exact name/alias)."""
+        hits = self.search(name, k=1)
+        if hits and hits[0][1] >= threshold:
+            return hits[0]
+        return None
@@ -5,14 +5,96 @@ Internal Codename: CYBERDYNE-CORE
 The neural net processor - a knowledge graph at the core of Arnold's reasoning.
 """
 
+import json
 import os
-from typing import Any, Dict, List, Optional
-from neo4j import GraphDatabase, Driver, Session
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+from neo4j import GraphDatabase, Driver, Session, READ_ACCESS
 import yaml
 from pathlib import Path
 from dotenv import load_dotenv
 
 
+# Clauses and procedure calls that make a query a write. Cypher keywords are
+# case-insensitive; a keyword preceded by `.` or `$` is a property/parameter
+# name (`s.set`, `$create`), and `s.set_number` never matches `\bSET\b`.
+WRITE_CLAUSE = re.compile(
+    r'(?<![.$])\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b'
+    r'|\bCALL\s+(?:'
+    r'apoc\.(?:create|merge|refactor|periodic|do|atomic|lock|nodes\.delete|schema\.assert)'
+    r'|db\.(?:create|index\.fulltext\.create|index\.vector\.create)'
+    r'|gds\.[\w.]*\.(?:write|mutate)'
+    r')\b',
+    re.IGNORECASE,
+)
+# Queries that must run in an auto-commit transaction
+AUTOCOMMIT_CLAUSE = re.compile(r'\bIN TRANSACTIONS\b|\bPERIODIC COMMIT\b', re.IGNORECASE)
+
+# Latency histogram bucket upper bounds (milliseconds); last bucket is overflow
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+DEFAULT_FETCH_SIZE = 1000
+
+
+def is_write_query(query: str) -> bool:
+    """True if a Cypher query contains a write clause."""
+    return bool(WRITE_CLAUSE.search(query))
+
+
+def _query_key(query: str) -> str:
+    """Whitespace-normalised query text used for stats and cache keys."""
+    return ' '.join(query.split())
+
+
+class QueryStats:
+    """Thread-safe per-query latency histogram."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, query: str, seconds: float, cached: bool = False):
+        ms = seconds * 1000
+        key = _query_key(query)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {
+                    'count': 0, 'cache_hits': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            entry['count'] += 1
+            if cached:
+                entry['cache_hits'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['buckets'][bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-query stats, slowest total first."""
+        with self._lock:
+            rows = [
+                {
+                    'query': key,
+                    **{k: v for k, v in entry.items() if k != 'buckets'},
+                    'mean_ms': entry['total_ms'] / entry['count'],
+                    'histogram': dict(zip(
+                        [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"],
+                        entry['buckets']
+                    )),
+                }
+                for key, entry in self._stats.items()
+            ]
+        return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
 class ArnoldGraph:
     """
     Main interface to the Arnold knowledge graph.
@@ -21,12 +103,14 @@ class ArnoldGraph:
     "The more contact I have with humans, the more I learn."
     """
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, cache_size: int = 0):
         """
         Initialize connection to Neo4j.
 
         Args:
             config_path: Path to neo4j.yaml config file. If None, uses default.
+            cache_size: Max entries in the read-query LRU cache (0 = disabled).
+                Only queries run with cache=True are cached.
         """
         load_dotenv()
 
@@ -44,11 +128,20 @@ class ArnoldGraph:
         if not self.password:
             raise ValueError("NEO4J_PASSWORD environment variable must be set")
 
+        # Managed transactions retry transient failures for up to this long
+        self.max_retry_time = float(config.get("max_transaction_retry_time", 30))
+
         self.driver: Driver = GraphDatabase.driver(
             self.uri,
-            auth=(self.user, self.password)
+            auth=(self.user, self.password),
+            max_transaction_retry_time=self.max_retry_time
         )
 
+        self.stats = QueryStats()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
     def close(self):
         """Close the database connection."""
         if self.driver:
@@ -77,21 +170,95 @@ class ArnoldGraph:
     def execute_query(
         self,
         query: str,
-        parameters: Optional[Dict[str, Any]] = None
+        parameters: Optional[Dict[str, Any]] = None,
+        cache: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Execute a Cypher query and return results.
 
+        Read queries run in a managed read transaction, queries with write
+        clauses in a managed write transaction; both are retried on
+        transient errors. `CALL {...} IN TRANSACTIONS` runs auto-commit.
+
         Args:
             query: Cypher query string
             parameters: Optional query parameters
+            cache: Serve/store the result in the LRU cache. Only for idempotent
+                reads over static kernel data (exercises, anatomy, patterns).
 
         Returns:
             List of result records as dictionaries
         """
+        parameters = parameters or {}
+        start = time.perf_counter()
+
+        cache_key = None
+        if cache and self.cache_size > 0 and not is_write_query(query):
+            cache_key = (_query_key(query), json.dumps(parameters, sort_keys=True, default=str))
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+            if cached is not None:
+                self.stats.record(query, time.perf_counter() - start, cached=True)
+                return [dict(record) for record in cached]
+
+        def work(tx):
+            return [dict(record) for record in tx.run(query, parameters)]
+
         with self.driver.session(database=self.database) as session:
-            result = session.run(query, parameters or {})
-            return [dict(record) for record in result]
+            if AUTOCOMMIT_CLAUSE.search(query):
+                records = [dict(record) for record in session.run(query, parameters)]
+            elif is_write_query(query):
+                records = session.execute_write(work)
+            else:
+                records = session.execute_read(work)
+
+        self.stats.record(query, time.perf_counter() - start)
+
+        if cache_key is not None:
+            with self._cache_lock:
+                self._cache[cache_key] = records
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return [dict(record) for record in records]
+
+        return records
+
+    def iter_query(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        fetch_size: int = DEFAULT_FETCH_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a read query's results without materializing them.
+
+        Records are pulled from the server `fetch_size` at a time, so exports
+        of arbitrary size run in constant memory. Consume the generator fully
+        (or close it) to release the session.
+
+        Args:
+            query: Cypher query string
+            parameters: Optional query parameters
+            fetch_size: Records per network round trip
+
+        Yields:
+            Result records as dictionaries
+        """
+        start = time.perf_counter()
+        try:
+            with self.driver.session(
+                database=self.database,
+                default_access_mode=READ_ACCESS,
+                fetch_size=fetch_size
+            ) as session:
+                for record in session.run(query, parameters or {}):
+                    yield dict(record)
+        finally:
+            # Also recorded when the consumer stops early or the query fails
+            self.stats.record(query, time.perf_counter() - start)
 
     def execute_write(
         self,
@@ -101,6 +268,9 @@ class ArnoldGraph:
         """
         Execute a write transaction.
 
+        Runs as a managed write transaction (retried on transient errors),
+        except `CALL {...} IN TRANSACTIONS`, which must run auto-commit.
+
         Args:
             query: Cypher query string
             parameters: Optional query parameters
@@ -108,9 +278,33 @@ class ArnoldGraph:
         Returns:
             Query result summary
         """
+        start = time.perf_counter()
+
         with self.driver.session(database=self.database) as session:
-            result = session.run(query, parameters or {})
-            return result.consume()
+            if AUTOCOMMIT_CLAUSE.search(query):
+                summary = session.run(query, parameters or {}).consume()
+            else:
+                summary = session.execute_write(
+                    lambda tx: tx.run(query, parameters or {}).consume()
+                )
+
+        self.stats.record(query, time.perf_counter() - start)
+        return summary
+
+    def clear_cache(self):
+        """Drop all cached read results (call after kernel imports)."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def latency_report(self, top: int = 10) -> List[Dict[str, Any]]:
+        """
+        Per-query latency stats, slowest total first.
+
+        Returns:
+            List of dicts with query, count, cache_hits, total_ms, mean_ms,
+            max_ms and a bucketed latency histogram
+        """
+        return self.stats.report()[:top]
 
     def create_constraints(self):
         """Create uniqueness constraints and indexes for the schema."""
@@ -226,3 +420,14 @@ def print_stats(stats: Dict[str, int]):
             key = f"{node}_count"
             if key in stats:
                 print(f"  {node.title()}: {stats[key]}")
+
+
+def print_latency_report(graph: ArnoldGraph, top: int = 10):
+    """Pretty print the slowest queries by total time."""
+    print("\n=== Query Latency ===")
+    for row in graph.latency_report(top):
+        query = row['query'] if len(row['query']) <= 70 else row['query'][:67] + '...'
+        print(f"\n{query}")
+        print(f"  calls: {row['count']} (cached: {row['cache_hits']})  "
+              f"mean: {row['mean_ms']:.1f}ms  max: {row['max_ms']:.1f}ms  total: {row['total_ms']:.0f}ms")
+        print("  " + "  ".join(f"{bucket}:{n}" for bucket, n in row['histogram'].items() if n))
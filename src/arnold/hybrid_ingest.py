@@ -0,0 +1,451 @@
+"""
+Hybrid Workout Ingestion
+
+Rule-based fast path in front of LLMWorkoutParser. Everything the set
+notation grammar covers (arnold.parser.tokenize_set_notation) and whose
+exercise name resolves in the local catalog index (arnold.exercise_index)
+is parsed locally. Only the ambiguous exercise blocks (compound lines,
+unknown or custom names, unclear notation) go to the LLM, in one call per
+file. Files the grammar fully covers make no API call.
+
+Every exercise records where it came from:
+    exercise['provenance'] = {'source': 'grammar' | 'llm', 'lines': [12, 13]}
+
+Output matches LLMWorkoutParser.parse_workout, so ingestion scripts can
+swap parsers.
+
+Usage:
+    from arnold.hybrid_ingest import HybridWorkoutParser
+
+    parser = HybridWorkoutParser(LLMWorkoutParser())
+    parsed = parser.parse_workout_file(path, exercise_db)
+"""
+
+import re
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from arnold.exercise_index import ExerciseIndex
+from arnold.llm_ingest import LLMWorkoutParser
+from arnold.normalizer import is_non_exercise
+from arnold.parser import SET_TOKEN_PATTERN, parse_frontmatter, tokenize_set_notation
+
+MATCH_THRESHOLD = 0.85       # Index score needed to resolve a name without the LLM
+MAX_SETS_COUNT = 10          # "a×b" without a unit is sets×reps up to here...
+MIN_LOAD = 20                # ...and load×reps from here; in between is ambiguous
+
+# Metadata keys copied from frontmatter (same as the LLM schema)
+METADATA_KEYS = (
+    'tags', 'goals', 'periodization_phase', 'equipment_used', 'muscle_focus',
+    'energy_systems', 'deviations', 'perceived_intensity', 'intended_intensity'
+)
+LIST_METADATA_KEYS = {'tags', 'goals', 'equipment_used', 'muscle_focus', 'energy_systems', 'deviations'}
+
+# Detail lines ("**Reps:** 3×10") whose value is set notation; the rest are notes
+NOTATION_DETAILS = {'reps', 'sets', 'load', 'weight', 'duration', 'time', 'rpe'}
+
+# Sections whose lines are notes, not exercises
+NOTE_SECTIONS = {'overview', 'perceived effort', 'summary', 'summary / day notes', 'day notes', 'notes'}
+
+_LIST_ITEM = re.compile(r'^(?:[-*+]|\d+[.)])\s+(.*)$')
+_HEADING = re.compile(r'^(#{1,6})\s*(.*?)\s*#*$')
+_NUMBERED_HEADING = re.compile(r'^\d+[.)]\s*(.+)$')
+_SECTION = re.compile(r'^\*\*([^*]+?):?\*\*:?$')
+_DETAIL = re.compile(
+    r'^\**(reps|sets|load|weight|duration|time|distance|rpe|notes?)\**\s*:\s*\**\s*(.*)$',
+    re.IGNORECASE
+)
+_BOLD_NAME = re.compile(r'^\*\*(.+?)\*\*:?\s*(.*)$')
+_NAME_END = re.compile(r'\s*(?::(?!\d)|@|\s[—–-]\s)\s*')  # not the colon of "1:30"
+_COMPOUND = re.compile(r'\s(?:\+|&|and|then)\s|;', re.IGNORECASE)
+_PARENTHETICAL = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+_TRAILING_COUNT = re.compile(r'\s\d+\s*$')  # "Push-ups 10": notation, not name
+
+
+class Ambiguous(ValueError):
+    """A block the grammar can't parse with confidence (goes to the LLM)."""
+
+
+def _unit(raw: Optional[str]) -> str:
+    return 'kg' if raw and raw.lower().startswith('kg') else 'lbs'
+
+
+def _seconds(token: Dict[str, Any]) -> int:
+    if token['kind'] == 'clock':
+        return int(token['clock_m']) * 60 + int(token['clock_s'])
+    value = float(token['dur_n'])
+    return int(value * 60) if token['dur_unit'].lower().startswith('m') else int(value)
+
+
+class _Block:
+    """An exercise line plus the detail lines under it."""
+
+    def __init__(self, block_id: int, line_no: int, text: str, section: Optional[str]):
+        self.id = block_id
+        self.lines: List[Tuple[int, str]] = [(line_no, text)]
+        self.section = section
+        self.details: List[Tuple[str, str]] = []
+
+    @property
+    def line_numbers(self) -> List[int]:
+        return [n for n, _ in self.lines]
+
+    @property
+    def source(self) -> List[str]:
+        return [text for _, text in self.lines]
+
+
+class HybridWorkoutParser:
+    """
+    Grammar-first workout parser with per-block LLM fallback.
+
+    Pass llm=None for a grammar-only parse: ambiguous blocks are skipped and
+    listed in parsing_metadata.parsing_warnings.
+    """
+
+    def __init__(self, llm: Optional[LLMWorkoutParser] = None, match_threshold: float = MATCH_THRESHOLD):
+        """
+        Args:
+            llm: Parser used for ambiguous blocks (None = grammar only)
+            match_threshold: Index score needed to accept a name locally
+        """
+        self.llm = llm
+        self.match_threshold = match_threshold
+
+    # --- Entry points (same signatures as LLMWorkoutParser) ---
+
+    def parse_workout_file(self, file_path: Path, exercise_database: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Parse a workout file. See parse_workout."""
+        content = file_path.read_text(encoding='utf-8')
+        parsed = self.parse_workout(content, exercise_database, file_path.name)
+        parsed['source_file'] = file_path.name
+        return parsed
+
+    def parse_workout(
+        self,
+        workout_markdown: str,
+        exercise_database: List[Dict[str, str]],
+        workout_filename: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Parse workout markdown, calling the LLM only for ambiguous blocks.
+
+        Args:
+            workout_markdown: Raw markdown content from workout file
+            exercise_database: List of canonical exercises for matching
+            workout_filename: Original filename (date fallback, LLM context)
+
+        Returns:
+            Structured workout data (LLMWorkoutParser schema) with per-exercise
+            provenance and grammar/LLM counts in parsing_metadata
+        """
+        frontmatter, body = parse_frontmatter(workout_markdown)
+        first_body_line = len(workout_markdown.splitlines()) - len(body.splitlines()) + 1
+        index = ExerciseIndex.for_database(exercise_database)
+
+        blocks, notes = self._split_blocks(body, first_body_line)
+
+        parsed_blocks: Dict[int, List[Dict[str, Any]]] = {}
+        ambiguous: Dict[int, _Block] = {}
+        reasons: Dict[int, str] = {}
+        for block in blocks:
+            try:
+                parsed_blocks[block.id] = [self._parse_block(block, index)]
+            except Ambiguous as e:
+                ambiguous[block.id] = block
+                reasons[block.id] = str(e)
+
+        warnings = []
+
+        llm_calls = 0
+        if ambiguous and self.llm is not None:
+            llm_calls = 1
+            results = self.llm.parse_exercise_blocks(
+                {block_id: block.source for block_id, block in ambiguous.items()},
+                exercise_database,
+                workout_filename
+            )
+            for block_id, block in ambiguous.items():
+                exercises = results.get(block_id, [])
+                for exercise in exercises:
+                    exercise['provenance'] = {
+                        'source': 'llm',
+                        'lines': block.line_numbers,
+                        'reason': reasons[block_id]
+                    }
+                parsed_blocks[block_id] = exercises
+        else:
+            warnings = [
+                f"line {block.line_numbers[0]} skipped (no LLM): {reasons[block_id]}"
+                for block_id, block in ambiguous.items()
+            ]
+
+        exercises = []
+        for block in blocks:
+            for exercise in parsed_blocks.get(block.id, []):
+                exercise['order_in_workout'] = len(exercises) + 1
+                exercises.append(exercise)
+
+        parsed = {
+            'date': self._workout_date(frontmatter, workout_filename),
+            'source_file': workout_filename,
+            'metadata': self._metadata(frontmatter),
+            'exercises': exercises,
+            'summary': {
+                'total_exercises': len(exercises),
+                'total_sets': 0,
+                'total_volume': 0
+            },
+            'notes': '\n'.join(notes),
+            'parsing_metadata': {
+                'parser': 'hybrid',
+                'exercises_matched_to_db': sum(1 for e in exercises if e.get('canonical_id') and not e.get('is_custom')),
+                'custom_exercises_created': sum(1 for e in exercises if e.get('is_custom')),
+                'blocks_total': len(blocks),
+                'blocks_grammar': len(blocks) - len(ambiguous),
+                'blocks_llm': len(ambiguous) if self.llm is not None else 0,
+                'llm_calls': llm_calls,
+                'parsing_warnings': warnings
+            }
+        }
+        # Shared totals / validation with the LLM path
+        return LLMWorkoutParser._validate_parsed_data(parsed)
+
+    # --- Structure ---
+
+    def _split_blocks(self, body: str, first_line: int) -> Tuple[List[_Block], List[str]]:
+        """Group body lines into exercise blocks; everything else is notes."""
+        blocks: List[_Block] = []
+        notes: List[str] = []
+        section: Optional[str] = None
+        current: Optional[_Block] = None
+
+        for offset, raw in enumerate(body.splitlines()):
+            line_no = first_line + offset
+            line = raw.strip()
+            if not line or re.match(r'^-{3,}$', line):
+                continue
+
+            heading = _HEADING.match(line)
+            if heading:
+                numbered = _NUMBERED_HEADING.match(heading.group(2))
+                if len(heading.group(1)) >= 3 and numbered:
+                    # ### 1) Exercise Name
+                    current = _Block(len(blocks), line_no, numbered.group(1), section)
+                    blocks.append(current)
+                else:
+                    section, current = heading.group(2).strip(' :*'), None
+                continue
+
+            section_match = _SECTION.match(line)
+            if section_match:
+                section, current = section_match.group(1).strip(), None
+                continue
+
+            in_notes = section is not None and section.lower() in NOTE_SECTIONS
+            item = _LIST_ITEM.match(line)
+            if item is None or in_notes:
+                notes.append(re.sub(r'^[-*+]\s+', '', line))
+                continue
+
+            content = item.group(1).strip()
+            detail = _DETAIL.match(content)
+            if detail and current is not None:
+                current.lines.append((line_no, content))
+                key, value = detail.group(1).lower(), detail.group(2).strip('* ')
+                if key == 'sets' and value.isdigit():
+                    value = f"{value} sets"
+                current.details.append((key, value))
+                continue
+
+            if is_non_exercise(re.sub(r'[*_`]+', '', content)):
+                if current is not None:
+                    current.lines.append((line_no, content))
+                    current.details.append(('notes', content))
+                else:
+                    notes.append(content)
+                continue
+
+            current = _Block(len(blocks), line_no, content, section)
+            blocks.append(current)
+
+        return blocks, notes
+
+    # --- One block ---
+
+    def _parse_block(self, block: _Block, index: ExerciseIndex) -> Dict[str, Any]:
+        """Exercise from a block, or raise Ambiguous."""
+        header = block.lines[0][1]
+
+        bold = _BOLD_NAME.match(header)
+        if bold:
+            name, rest = bold.group(1), bold.group(2)
+        else:
+            name, rest = header, ''
+        name = re.sub(r'[*_`]+', '', name)
+
+        # Parentheticals ("(60 lb)", "(straight bar)") are notation or notes
+        qualifiers = ' '.join(_PARENTHETICAL.findall(name))
+        name = _PARENTHETICAL.sub('', name)
+
+        # Name ends at the first separator or notation token
+        parts = _NAME_END.split(name, maxsplit=1)
+        if len(parts) == 2:
+            name, rest = parts[0], f"{parts[1]} {rest}"
+        first = SET_TOKEN_PATTERN.search(name)
+        if first:
+            name, rest = name[:first.start()], f"{name[first.start():]} {rest}"
+        count = _TRAILING_COUNT.search(name)
+        if count:
+            name, rest = name[:count.start()], f"{count.group().strip()} {rest}"
+        name = name.strip(' .,-:')
+        if not name:
+            raise Ambiguous("no exercise name")
+        if _COMPOUND.search(name) or ',' in name:
+            raise Ambiguous(f"compound line: {name!r}")
+
+        match = index.best_match(name, threshold=self.match_threshold)
+        if match is None:
+            raise Ambiguous(f"no catalog match for {name!r}")
+        row, _ = match
+
+        notation = ' '.join([qualifiers, rest] + [
+            value for key, value in block.details if key in NOTATION_DETAILS
+        ])
+        notes = [value for key, value in block.details if key not in NOTATION_DETAILS]
+        sets = self._sets_from_notation(re.sub(r'[*_`]+', '', notation), notes)
+
+        return {
+            'name': name,
+            'canonical_id': row.get('id'),
+            'canonical_name': row.get('name'),
+            'is_custom': False,
+            'category': row.get('category'),
+            'sets': sets,
+            'notes': '; '.join(notes),
+            'provenance': {'source': 'grammar', 'lines': block.line_numbers}
+        }
+
+    def _sets_from_notation(self, text: str, notes: List[str]) -> List[Dict[str, Any]]:
+        """Expand tokens into set objects, or raise Ambiguous."""
+        tokens, leftover = tokenize_set_notation(text)
+        if re.search(r'\d', leftover):
+            raise Ambiguous(f"unparsed notation: {leftover!r}")
+        if leftover.strip(' ,;/()[]—–-.'):
+            notes.append(leftover.strip(' ,;()[]—–-'))
+
+        load: Optional[Tuple[float, str]] = None
+        rpe = None
+        multiplier = 1
+        sets: List[Dict[str, Any]] = []
+
+        for token in tokens:
+            kind = token['kind']
+            if kind == 'load':
+                load = (float(token['load_n']), _unit(token.get('load_unit')))
+            elif kind == 'rpe':
+                rpe = float(token['rpe_n'])
+            elif kind == 'rounds':
+                multiplier = int(token['rounds_n'])
+
+        def weighted(weight, unit, reps, side=False):
+            return {
+                'weight': weight,
+                'weight_unit': unit,
+                'reps': reps,
+                'volume': weight * reps if isinstance(weight, (int, float)) else 0,
+                'rpe': rpe,
+                'notes': 'per side' if side else ''
+            }
+
+        def bodyweight_or_load(reps, side=False):
+            if load:
+                return weighted(load[0], load[1], reps, side)
+            return weighted(None, 'bodyweight', reps, side)
+
+        for token in tokens:
+            kind = token['kind']
+            if kind == 'sets_at':
+                for _ in range(int(token['sa_sets'])):
+                    sets.append(weighted(float(token['sa_load']), _unit(token.get('sa_unit')),
+                                         int(token['sa_reps']), bool(token.get('sa_side'))))
+            elif kind == 'bw':
+                sets.append(weighted(None, 'bodyweight', int(token['bw_reps']), bool(token.get('bw_side'))))
+            elif kind == 'load_reps':
+                first, reps = float(token['lr_load']), int(token['lr_reps'])
+                side = bool(token.get('lr_side'))
+                if token.get('lr_unit') or first >= MIN_LOAD:
+                    sets.append(weighted(first, _unit(token.get('lr_unit')), reps, side))
+                elif first <= MAX_SETS_COUNT and first == int(first):
+                    sets.extend(bodyweight_or_load(reps, side) for _ in range(int(first)))
+                else:
+                    raise Ambiguous(f"sets or load? {token['text']!r}")
+            elif kind in ('clock', 'duration'):
+                seconds = _seconds(token)
+                sets.append({'duration_seconds': seconds, 'duration_display': token['text'].strip(), 'notes': ''})
+            elif kind == 'steps':
+                sets.append({**bodyweight_or_load(int(token['steps_n'])), 'notes': 'steps'})
+            elif kind == 'side':
+                sets.append(bodyweight_or_load(int(token['side_n']), side=True))
+            elif kind == 'reps':
+                sets.append(bodyweight_or_load(int(token['reps_n'])))
+
+        if multiplier > 1:
+            if len(sets) == 1:
+                sets = [dict(sets[0]) for _ in range(multiplier)]
+            elif sets and len(sets) != multiplier:
+                raise Ambiguous(f"{multiplier} rounds but {len(sets)} sets")
+
+        for number, set_data in enumerate(sets, start=1):
+            set_data['set_number'] = number
+        return sets
+
+    # --- Frontmatter ---
+
+    def _workout_date(self, frontmatter: Dict[str, Any], filename: str) -> str:
+        value = frontmatter.get('date')
+        if isinstance(value, date):
+            return value.isoformat()
+        if value:
+            return str(value)[:10]
+        match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
+        if match:
+            return match.group(1)
+        raise ValueError("Missing required field: date")
+
+    def _metadata(self, frontmatter: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = {}
+        for key in METADATA_KEYS:
+            value = frontmatter.get(key)
+            if key in LIST_METADATA_KEYS:
+                if value is None:
+                    value = []
+                elif not isinstance(value, list):
+                    value = [value]
+            metadata[key] = value
+        return metadata
+
+
+PARSER_MODES = ('hybrid', 'llm', 'grammar')
+
+
+def workout_parser(mode: str = 'hybrid', api_key: Optional[str] = None):
+    """
+    Parser for an ingestion mode.
+
+    Args:
+        mode: hybrid (grammar, LLM for ambiguous blocks), llm (whole file
+              to the LLM) or grammar (no API calls; ambiguous blocks skipped)
+        api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
+
+    Returns:
+        Object with parse_workout_file(path, exercise_database)
+    """
+    if mode == 'llm':
+        return LLMWorkoutParser(api_key)
+    if mode == 'hybrid':
+        return HybridWorkoutParser(LLMWorkoutParser(api_key))
+    if mode == 'grammar':
+        return HybridWorkoutParser(None)
+    raise ValueError(f"Unknown parser mode {mode!r} (expected one of {', '.join(PARSER_MODES)})")
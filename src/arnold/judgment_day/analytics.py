@@ -9,6 +9,12 @@ from typing import List, Dict, Optional, Tuple
 from datetime import date, timedelta
 from collections import defaultdict
 
+from .progression_store import ProgressionStore
+
+# Weighted sets/week above which a muscle counts as high volume
+# (same threshold as muscle_volume_weekly.volume_status in setup_analytics.py)
+HIGH_WEEKLY_MUSCLE_SETS = 20
+
 
 class ProgressionAnalyzer:
     """
@@ -22,14 +28,25 @@ class ProgressionAnalyzer:
     - Overtraining signals
     """
 
-    def __init__(self, graph):
+    def __init__(self, graph, store: Optional[ProgressionStore] = None):
         """
         Initialize progression analyzer.
 
         Args:
             graph: ArnoldGraph instance
+            store: Optional ProgressionStore (connects via DATABASE_URI if omitted)
         """
         self.graph = graph
+        self._store = store
+        self._store_checked = store is not None
+
+    @property
+    def store(self) -> Optional[ProgressionStore]:
+        """Materialized progression store, or None if Postgres is unavailable."""
+        if not self._store_checked:
+            self._store = ProgressionStore.connect()
+            self._store_checked = True
+        return self._store
 
     def get_volume_trend(self, weeks: int = 12) -> List[Dict]:
         """
@@ -77,6 +94,10 @@ class ProgressionAnalyzer:
         Returns:
             List of workout records with date, weight, reps, sets, RPE
         """
+        if self.store is not None:
+            return self._get_materialized_progression(exercise_name, weeks)
+
+        # Fallback (no Postgres): substring scan over ExerciseInstances
         query = """
         MATCH (w:Workout)-[:CONTAINS]->(ei:ExerciseInstance)
         WHERE toLower(ei.exercise_name_raw) CONTAINS toLower($exercise_name)
@@ -122,6 +143,32 @@ class ProgressionAnalyzer:
 
         return progression
 
+    def _get_materialized_progression(self, exercise_name: str, weeks: int) -> List[Dict]:
+        """Progression from exercise_daily_progression, resolved via the alias index."""
+        exercise = self.store.resolve_exercise(exercise_name)
+
+        if not exercise:
+            return []
+
+        rows = self.store.get_daily_progression(exercise['exercise_id'], days=weeks * 7)
+
+        return [
+            {
+                'date': r['session_date'],
+                'name': r['exercise_name'],
+                'canonical_name': exercise['exercise_name'],
+                'exercise_id': exercise['exercise_id'],
+                'weight': r['max_load_lbs'],
+                'reps': r['total_reps'],
+                'sets': r['total_sets'],
+                'rpe': r['avg_rpe'],
+                'estimated_1rm': r['best_e1rm'],
+                'best_set': {'load': r['best_load_lbs'], 'reps': r['best_reps']},
+                'volume': r['volume_lbs']
+            }
+            for r in rows
+        ]
+
     def get_muscle_group_balance(self, weeks: int = 4) -> Dict[str, float]:
         """
         Analyze volume distribution across muscle groups.
@@ -132,6 +179,14 @@ class ProgressionAnalyzer:
         Returns:
             Dictionary of {muscle_group: volume_percentage}
         """
+        if self.store is not None:
+            results = [
+                {'muscle': r['muscle_name'], 'volume': r['volume_lbs']}
+                for r in self.store.get_muscle_volume(days=weeks * 7, role='primary')
+            ]
+            return self._volume_percentages(results)
+
+        # Fallback (no Postgres): traverse to each exercise's primary muscles
         query = """
         MATCH (w:Workout)-[:CONTAINS]->(ei:ExerciseInstance)-[:INSTANCE_OF]->(e:Exercise)
         WHERE w.date >= date() - duration({weeks: $weeks})
@@ -143,7 +198,10 @@ class ProgressionAnalyzer:
         """
 
         results = self.graph.execute_query(query, {'weeks': weeks})
+        return self._volume_percentages(results)
 
+    def _volume_percentages(self, results: List[Dict]) -> Dict[str, float]:
+        """{muscle: % of total volume} from [{'muscle', 'volume'}] rows."""
         if not results:
             return {}
 
@@ -229,6 +287,7 @@ class ProgressionAnalyzer:
         - High deviation frequency
         - Consistently high RPE
         - Decreasing performance despite high effort
+        - Muscles averaging more than 20 weighted sets/week (needs Postgres)
 
         Args:
             weeks: Number of weeks to analyze
@@ -281,6 +340,16 @@ class ProgressionAnalyzer:
             if recent_avg > early_avg + 0.5:
                 signals.append(f'Increasing RPE trend: {early_avg:.1f} → {recent_avg:.1f}')
 
+        # Check 4: Excessive weekly volume per muscle (set × muscle facts)
+        if self.store is not None and weeks > 0:
+            high_volume = [
+                f"{m['muscle_name']} ({m['weighted_sets'] / weeks:.0f})"
+                for m in self.store.get_muscle_volume(days=weeks * 7)
+                if m['weighted_sets'] / weeks > HIGH_WEEKLY_MUSCLE_SETS
+            ]
+            if high_volume:
+                signals.append(f"High weekly volume (weighted sets/week): {', '.join(high_volume)}")
+
         # Determine risk level
         if len(signals) >= 2:
             risk = 'high'
@@ -13,10 +13,10 @@ from pathlib import Path
 # Import biomechanical data
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from biomechanics import (
-    INJURY_CONTRAINDICATIONS,
     get_movement_patterns_for_exercise,
     check_exercise_injury_compatibility
 )
+from .contraindications import ContraindicationIndex, PATTERN_KEYWORDS, injury_columns, match_known_injury
 
 
 @dataclass
@@ -40,16 +40,26 @@ class ConstraintChecker:
     - Maintain training safety
     """
 
-    def __init__(self, graph):
+    def __init__(self, graph, index: Optional[ContraindicationIndex] = None):
         """
         Initialize constraint checker.
 
         Args:
             graph: ArnoldGraph instance
+            index: Optional preloaded ContraindicationIndex (loaded lazily otherwise)
         """
         self.graph = graph
+        self._index = index
         self._constraints_cache = None
         self._forbidden_exercises_cache = None
+        self._active_columns_cache = None
+
+    @property
+    def index(self) -> ContraindicationIndex:
+        """Persistent exercise × contraindication index (rebuilt if the kernel changed)."""
+        if self._index is None:
+            self._index = ContraindicationIndex(self.graph).load()
+        return self._index
 
     def load_constraints(self) -> List[InjuryConstraint]:
         """
@@ -103,91 +113,56 @@ class ConstraintChecker:
         """
         patterns = []
 
-        # Common pattern keywords
-        pattern_keywords = {
-            'deep flexion': 'deep_flexion',
-            'rotation under load': 'rotation_under_load',
-            'impact': 'high_impact',
-            'jumping': 'plyometric',
-            'overhead': 'overhead_pressing',
-            'heavy loading': 'maximal_loading',
-            'ballistic': 'ballistic_movement',
-        }
-
         description_lower = description.lower()
-        for keyword, pattern in pattern_keywords.items():
+        for keyword, pattern in PATTERN_KEYWORDS.items():
             if keyword in description_lower:
                 patterns.append(pattern)
 
         return patterns
 
-    def _get_biomechanically_forbidden_exercises(self) -> Set[str]:
+    def active_columns(self) -> Dict[str, List[str]]:
         """
-        Get exercises forbidden based on biomechanical contraindications.
+        Index columns switched on by the current injuries and constraints.
 
-        Uses Movement patterns and JointActions from the graph to determine
-        which exercises involve contraindicated movements for known injuries.
+        Combines the biomechanical contraindications of known injuries
+        (joint actions, positions) with the location and pattern rules
+        of each Constraint node.
 
         Returns:
-            Set of exercise IDs that are biomechanically incompatible
+            Dictionary mapping column name -> injury names that activate it
         """
-        forbidden = set()
+        if self._active_columns_cache is not None:
+            return self._active_columns_cache
+
+        active: Dict[str, List[str]] = {}
+
+        def activate(column: str, injury_name: str):
+            sources = active.setdefault(column, [])
+            if injury_name not in sources:
+                sources.append(injury_name)
 
-        # Get active injuries from graph
+        # Method 1: Biomechanical contraindications (Movement / JointAction)
         query = """
         MATCH (i:Injury)
         RETURN i.name as injury_name, i.location as location
         """
 
-        injuries = self.graph.execute_query(query)
-
-        for injury in injuries:
-            injury_name = injury['injury_name'].lower()
-
-            # Check if we have contraindication data for this injury
-            matching_contraindication = None
-            for known_injury, contraindication in INJURY_CONTRAINDICATIONS.items():
-                if known_injury.lower() in injury_name or injury_name in known_injury.lower():
-                    matching_contraindication = contraindication
-                    break
-
-            if not matching_contraindication:
-                continue
-
-            avoid_actions = matching_contraindication.get('avoid_actions', [])
-            avoid_positions = matching_contraindication.get('avoid_positions', [])
+        for injury in self.graph.execute_query(query):
+            known_injury = match_known_injury(injury['injury_name'])
+            if known_injury:
+                for column in injury_columns(known_injury):
+                    activate(column, injury['injury_name'])
 
-            # Query exercises that involve contraindicated joint actions
-            if avoid_actions:
-                query = """
-                MATCH (e:Exercise)-[:INVOLVES]->(m:Movement)-[:REQUIRES_ACTION]->(ja:JointAction)
-                WHERE ja.id IN $action_ids
-                RETURN DISTINCT e.id as exercise_id, e.name as exercise_name
-                """
-
-                action_ids = [f"JOINT_ACTION:{action.name}" for action in avoid_actions]
-                results = self.graph.execute_query(query, {'action_ids': action_ids})
-
-                for r in results:
-                    forbidden.add(r['exercise_id'])
-
-            # Query exercises with contraindicated positions
-            if avoid_positions:
-                for position in avoid_positions:
-                    position_query = """
-                    MATCH (e:Exercise)
-                    WHERE toLower(e.name) CONTAINS $position
-                    RETURN e.id as exercise_id
-                    """
-
-                    results = self.graph.execute_query(position_query, {
-                        'position': position.replace('_', ' ')
-                    })
-
-                    for r in results:
-                        forbidden.add(r['exercise_id'])
+        # Method 2: Traditional pattern-based filtering (fallback)
+        for constraint in self.load_constraints():
+            location_keywords = (constraint.location or '').lower().split('_')
+            if location_keywords and location_keywords[0]:
+                activate(self.index.ensure_location(location_keywords[0]), constraint.injury_name)
+            for pattern in constraint.forbidden_patterns:
+                activate(f"pattern:{pattern}", constraint.injury_name)
 
-        return forbidden
+        self._active_columns_cache = active
+        return active
 
     def get_forbidden_exercises(self) -> Set[str]:
         """
@@ -198,39 +173,9 @@ class ConstraintChecker:
         Returns:
             Set of forbidden exercise IDs
         """
-        if self._forbidden_exercises_cache is not None:
-            return self._forbidden_exercises_cache
-
-        constraints = self.load_constraints()
-        forbidden = set()
-
-        # Method 1: Use biomechanical contraindications
-        forbidden.update(self._get_biomechanically_forbidden_exercises())
-
-        # Method 2: Traditional pattern-based filtering (fallback)
-        for constraint in constraints:
-            # Query exercises that match forbidden patterns
-            query = """
-            MATCH (e:Exercise)
-            WHERE
-                toLower(e.name) CONTAINS $location
-                OR toLower(e.category) IN $patterns
-                OR ANY(muscle IN e.primary_muscles WHERE toLower(muscle) CONTAINS $location)
-            RETURN e.id as exercise_id
-            """
-
-            location_keywords = constraint.location.lower().split('_')
-
-            results = self.graph.execute_query(query, {
-                'location': location_keywords[0] if location_keywords else '',
-                'patterns': constraint.forbidden_patterns
-            })
-
-            for r in results:
-                forbidden.add(r['exercise_id'])
-
-        self._forbidden_exercises_cache = forbidden
-        return forbidden
+        if self._forbidden_exercises_cache is None:
+            self._forbidden_exercises_cache = self.index.forbidden(self.active_columns())
+        return self._forbidden_exercises_cache
 
     def is_exercise_allowed(self, exercise_id: str) -> bool:
         """
@@ -270,6 +215,120 @@ class ConstraintChecker:
 
         return result
 
+    def violation_matrix(self, exercise_ids: List[str]) -> Dict:
+        """
+        Resolve constraint violations for many exercises at once.
+
+        Reads the precomputed contraindication index: the active columns
+        are computed once, then each exercise is a single bitmap lookup.
+        No per-exercise graph queries.
+
+        Args:
+            exercise_ids: Exercise IDs to check (duplicates are collapsed)
+
+        Returns:
+            Dictionary with:
+                'exercise_ids': Unique exercise IDs, in first-seen order (rows)
+                'columns': Active contraindication columns
+                'matrix': One 0/1 row per exercise, one entry per column
+                'violations': exercise_id -> [{'column', 'injuries'}] for forbidden exercises
+                'unknown': Exercise IDs missing from the index
+        """
+        active = self.active_columns()
+        columns = sorted(active)
+        unique_ids = list(dict.fromkeys(exercise_ids))
+
+        bit_of = {col: i for i, col in enumerate(self.index.columns)}
+        rows = self.index.rows(unique_ids, self.index.mask(columns))
+
+        matrix = []
+        violations = {}
+        unknown = []
+        for exercise_id in unique_ids:
+            bits = rows[exercise_id]
+            if bits is None:
+                unknown.append(exercise_id)
+                bits = 0
+            row = [1 if bits >> bit_of[col] & 1 else 0 for col in columns]
+            matrix.append(row)
+            if bits:
+                violations[exercise_id] = [
+                    {'column': col, 'injuries': active[col]}
+                    for col, hit in zip(columns, row) if hit
+                ]
+
+        return {
+            'exercise_ids': unique_ids,
+            'columns': columns,
+            'matrix': matrix,
+            'violations': violations,
+            'unknown': unknown,
+        }
+
+    def validate_plans(self, plans: Dict[str, List[str]]) -> Dict:
+        """
+        Validate many workout plans against constraints in one pass.
+
+        Args:
+            plans: Dictionary mapping plan ID -> exercise IDs in that plan
+
+        Returns:
+            Dictionary with:
+                'plans': plan_id -> {'allowed', 'forbidden'} (same shape as validate_plan)
+                'matrix': violation_matrix() over every exercise in every plan
+        """
+        matrix = self.violation_matrix([eid for ids in plans.values() for eid in ids])
+        violations = matrix['violations']
+
+        results = {}
+        for plan_id, exercise_ids in plans.items():
+            results[plan_id] = {
+                'allowed': [eid for eid in exercise_ids if eid not in violations],
+                'forbidden': [eid for eid in exercise_ids if eid in violations],
+            }
+
+        return {'plans': results, 'matrix': matrix}
+
+    def audit_planned_workouts(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict:
+        """
+        Validate every PlannedWorkout in a date range.
+
+        One query loads all plans and their prescribed exercises; the
+        violations come from validate_plans().
+
+        Args:
+            start_date: First plan date, YYYY-MM-DD (None = no lower bound)
+            end_date: Last plan date, YYYY-MM-DD (None = no upper bound)
+
+        Returns:
+            validate_plans() result, plus 'dates': plan_id -> plan date
+        """
+        query = """
+        MATCH (pw:PlannedWorkout)
+        WHERE ($start_date IS NULL OR pw.date >= date($start_date))
+          AND ($end_date IS NULL OR pw.date <= date($end_date))
+        OPTIONAL MATCH (pw)-[:HAS_PLANNED_BLOCK]->(:PlannedBlock)
+                       -[:CONTAINS_PLANNED]->(:PlannedSet)-[:PRESCRIBES]->(e:Exercise)
+        RETURN
+            coalesce(pw.plan_id, pw.id) as plan_id,
+            toString(pw.date) as date,
+            collect(DISTINCT e.id) as exercise_ids
+        ORDER BY date
+        """
+
+        results = self.graph.execute_query(query, {
+            'start_date': start_date,
+            'end_date': end_date
+        })
+
+        audit = self.validate_plans({r['plan_id']: r['exercise_ids'] for r in results})
+        audit['dates'] = {r['plan_id']: r['date'] for r in results}
+        return audit
+
     def get_constraint_violations(self, exercise_id: str) -> List[InjuryConstraint]:
         """
         Get all constraints violated by an exercise.
@@ -328,57 +387,76 @@ class ConstraintChecker:
         Returns:
             Dictionary with compatibility info and warnings
         """
-        # Get exercise name for biomechanical lookup
-        query = """
-        MATCH (e:Exercise {id: $exercise_id})
-        RETURN e.name as name
-        """
+        return self.check_exercises_biomechanics([exercise_id])[exercise_id]
 
-        result = self.graph.execute_query(query, {'exercise_id': exercise_id})
-
-        if not result:
-            return {'compatible': True, 'warnings': [], 'reason': 'Exercise not found'}
+    def check_exercises_biomechanics(self, exercise_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Biomechanical compatibility for many exercises (two queries total).
 
-        exercise_name = result[0]['name']
+        Args:
+            exercise_ids: Exercise IDs to check
 
-        # Get movement patterns for this exercise
-        movement_patterns = get_movement_patterns_for_exercise(exercise_name)
+        Returns:
+            Dictionary mapping exercise ID -> check_exercise_biomechanics() result
+        """
+        # Get exercise names for biomechanical lookup
+        query = """
+        UNWIND $exercise_ids as exercise_id
+        MATCH (e:Exercise {id: exercise_id})
+        RETURN e.id as id, e.name as name
+        """
 
-        if not movement_patterns:
-            return {'compatible': True, 'warnings': [], 'reason': 'No movement patterns mapped'}
+        names = {
+            r['id']: r['name']
+            for r in self.graph.execute_query(query, {'exercise_ids': list(exercise_ids)})
+        }
 
-        # Get active injuries
+        # Get active injuries, matched to known contraindications once
         injury_query = """
         MATCH (i:Injury)
         RETURN i.name as injury_name
         """
 
-        injuries = self.graph.execute_query(injury_query)
+        known_injuries = []
+        for injury in self.graph.execute_query(injury_query):
+            known_injury = match_known_injury(injury['injury_name'])
+            if known_injury:
+                known_injuries.append(known_injury)
 
-        # Check against each injury
-        all_warnings = []
-        is_compatible = True
+        results = {}
+        for exercise_id in exercise_ids:
+            if exercise_id not in names:
+                results[exercise_id] = {'compatible': True, 'warnings': [], 'reason': 'Exercise not found'}
+                continue
 
-        for injury in injuries:
-            injury_name = injury['injury_name'].lower()
+            # Get movement patterns for this exercise
+            movement_patterns = get_movement_patterns_for_exercise(names[exercise_id])
 
-            # Find matching contraindication
-            for known_injury in INJURY_CONTRAINDICATIONS.keys():
-                if known_injury.lower() in injury_name or injury_name in known_injury.lower():
-                    compatibility = check_exercise_injury_compatibility(
-                        movement_patterns,
-                        known_injury
-                    )
+            if not movement_patterns:
+                results[exercise_id] = {'compatible': True, 'warnings': [], 'reason': 'No movement patterns mapped'}
+                continue
 
-                    if not compatibility['compatible']:
-                        is_compatible = False
-                        all_warnings.extend(compatibility.get('warnings', []))
+            # Check against each injury
+            all_warnings = []
+            is_compatible = True
 
-        return {
-            'compatible': is_compatible,
-            'warnings': all_warnings,
-            'movement_patterns': [p.value for p in movement_patterns]
-        }
+            for known_injury in known_injuries:
+                compatibility = check_exercise_injury_compatibility(
+                    movement_patterns,
+                    known_injury
+                )
+
+                if not compatibility['compatible']:
+                    is_compatible = False
+                    all_warnings.extend(compatibility.get('warnings', []))
+
+            results[exercise_id] = {
+                'compatible': is_compatible,
+                'warnings': all_warnings,
+                'movement_patterns': [p.value for p in movement_patterns]
+            }
+
+        return results
 
     def suggest_alternatives(self, forbidden_exercise_id: str, limit: int = 5) -> List[Dict]:
         """
@@ -440,6 +518,7 @@ class ConstraintChecker:
         # Score and filter alternatives
         scored_alternatives = []
         forbidden_set = self.get_forbidden_exercises()
+        biomech_checks = self.check_exercises_biomechanics([alt['id'] for alt in alternatives])
 
         for alt in alternatives:
             # Skip if forbidden
@@ -447,7 +526,7 @@ class ConstraintChecker:
                 continue
 
             # Check biomechanical compatibility
-            biomech_check = self.check_exercise_biomechanics(alt['id'])
+            biomech_check = biomech_checks[alt['id']]
 
             if not biomech_check['compatible']:
                 continue
@@ -477,3 +556,9 @@ class ConstraintChecker:
         """Clear cached constraints (call after injury updates)."""
         self._constraints_cache = None
         self._forbidden_exercises_cache = None
+        self._active_columns_cache = None
+
+    def rebuild_index(self):
+        """Force a rebuild of the contraindication index (call after kernel edits)."""
+        self._index = ContraindicationIndex(self.graph).load(rebuild=True)
+        self.clear_cache()
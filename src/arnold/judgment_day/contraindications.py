@@ -0,0 +1,382 @@
+"""
+Contraindication Index
+
+Internal Codename: JUDGMENT-DAY
+Persistent exercise × contraindication bitmap used by ConstraintChecker.
+
+Each column is one contraindication feature:
+    action:<JOINT_ACTION>   exercise INVOLVES a Movement that REQUIRES_ACTION it
+    position:<position>     exercise name contains the avoided position
+    pattern:<pattern>       exercise category equals the forbidden pattern
+    location:<keyword>      exercise name or a primary muscle contains the keyword
+
+Each exercise gets an integer bitmap over those columns. The index is built
+once from INJURY_CONTRAINDICATIONS and the graph, saved to
+data/cache/contraindication_index.json, and reused until the exercise
+kernel changes. Computing the forbidden set for the current injuries is
+then a union of precomputed column sets - no per-injury name scans.
+
+Staleness is checked in two steps. Every load runs one aggregate query
+(exercise / INVOLVES / REQUIRES_ACTION counts and the latest exercise
+timestamp); only if that watermark moved is the full content hash
+computed, and the index rebuilt only if the hash moved too. `arnold
+reindex` always rebuilds with the full hash.
+
+Location columns depend on which injuries exist, so they are added on first
+use (one query per new keyword) and persisted with the rest of the index.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from biomechanics import INJURY_CONTRAINDICATIONS
+
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = Path(os.getenv(
+    "ARNOLD_CONTRAINDICATION_INDEX",
+    Path(__file__).parent.parent.parent.parent / "data" / "cache" / "contraindication_index.json"
+))
+
+# Constraint description keyword -> forbidden pattern (matched against e.category)
+PATTERN_KEYWORDS = {
+    'deep flexion': 'deep_flexion',
+    'rotation under load': 'rotation_under_load',
+    'impact': 'high_impact',
+    'jumping': 'plyometric',
+    'overhead': 'overhead_pressing',
+    'heavy loading': 'maximal_loading',
+    'ballistic': 'ballistic_movement',
+}
+
+
+def match_known_injury(injury_name: str) -> Optional[str]:
+    """Return the INJURY_CONTRAINDICATIONS key matching an Injury node name, if any."""
+    injury_name = (injury_name or '').lower()
+    if not injury_name:
+        return None
+    for known_injury in INJURY_CONTRAINDICATIONS:
+        if known_injury.lower() in injury_name or injury_name in known_injury.lower():
+            return known_injury
+    return None
+
+
+def injury_columns(known_injury: str) -> List[str]:
+    """Index columns that forbid exercises for a known injury."""
+    contraindication = INJURY_CONTRAINDICATIONS[known_injury]
+    columns = [f"action:{action.name}" for action in contraindication.get('avoid_actions', [])]
+    columns += [f"position:{position}" for position in contraindication.get('avoid_positions', [])]
+    return columns
+
+
+def _rules_digest() -> str:
+    """Hash of the static contraindication rules baked into the index."""
+    rules = {
+        injury: {
+            key: [getattr(v, 'name', v) for v in values] if isinstance(values, list) else values
+            for key, values in spec.items()
+        }
+        for injury, spec in INJURY_CONTRAINDICATIONS.items()
+    }
+    payload = json.dumps([INDEX_VERSION, rules, PATTERN_KEYWORDS], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ContraindicationIndex:
+    """
+    Exercise × contraindication bitmap with a persistent on-disk copy.
+
+    Usage:
+        index = ContraindicationIndex(graph)
+        forbidden = index.forbidden(['action:FLEXION', 'position:overhead'])
+    """
+
+    def __init__(self, graph, path: Optional[Path] = None):
+        """
+        Args:
+            graph: ArnoldGraph instance
+            path: Index file (default: data/cache/contraindication_index.json)
+        """
+        self.graph = graph
+        self.path = Path(path) if path else DEFAULT_INDEX_PATH
+        self.fingerprint: Optional[str] = None
+        self.watermark: Optional[str] = None
+        self.columns: List[str] = []
+        self.exercise_ids: List[str] = []
+        self.bitmaps: List[int] = []
+        self._postings: Dict[str, Set[str]] = {}
+        self._row_of: Dict[str, int] = {}
+
+    # --- Fingerprint ---
+
+    def kernel_watermark(self) -> str:
+        """
+        Cheap staleness signal: one server-side aggregate over the kernel.
+
+        Counts of exercises and of the INVOLVES / REQUIRES_ACTION edges plus
+        the latest exercise updated_at / created_at, together with the static
+        rules. Unchanged watermark => the cached index is used as is.
+        """
+        result = self.graph.execute_query("""
+        MATCH (e:Exercise)
+        WITH count(e) as exercises, toString(max(coalesce(e.updated_at, e.created_at))) as last_changed
+        OPTIONAL MATCH (:Exercise)-[i:INVOLVES]->()
+        WITH exercises, last_changed, count(i) as involves
+        OPTIONAL MATCH (:Movement)-[r:REQUIRES_ACTION]->()
+        RETURN exercises, last_changed, involves, count(r) as requires
+        """)
+        row = result[0] if result else {}
+        payload = json.dumps([
+            _rules_digest(),
+            [row.get(k) for k in ('exercises', 'last_changed', 'involves', 'requires')],
+        ], default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def kernel_fingerprint(self) -> str:
+        """
+        Content hash of everything the index is derived from.
+
+        Hashes the sorted (id, name, category, primary_muscles) rows of every
+        exercise plus the INVOLVES / REQUIRES_ACTION edge lists, together with
+        the static rules in biomechanics.py. Any edit to those properties or
+        edges - not just a change in counts - invalidates the cached index.
+        """
+        exercises = self.graph.execute_query("""
+        MATCH (e:Exercise)
+        RETURN e.id as id, coalesce(e.name, '') as name, coalesce(e.category, '') as category,
+               coalesce(e.primary_muscles, []) as primary_muscles
+        ORDER BY id
+        """)
+        involves = self.graph.execute_query("""
+        MATCH (e:Exercise)-[:INVOLVES]->(m:Movement)
+        RETURN e.id as source, m.id as target
+        ORDER BY source, target
+        """)
+        requires = self.graph.execute_query("""
+        MATCH (m:Movement)-[:REQUIRES_ACTION]->(ja:JointAction)
+        RETURN m.id as source, ja.id as target
+        ORDER BY source, target
+        """)
+
+        digest = hashlib.sha1(_rules_digest().encode())
+        for section, rows, keys in (
+            ('exercises', exercises, ('id', 'name', 'category', 'primary_muscles')),
+            ('involves', involves, ('source', 'target')),
+            ('requires', requires, ('source', 'target')),
+        ):
+            digest.update(section.encode())
+            for row in rows:
+                digest.update(json.dumps([row.get(k) for k in keys], default=str).encode())
+                digest.update(b'\n')
+        return digest.hexdigest()
+
+    # --- Load / build / save ---
+
+    def load(self, rebuild: bool = False) -> 'ContraindicationIndex':
+        """
+        Load the index from disk, rebuilding it if missing or stale.
+
+        The cached index is trusted while the kernel watermark is unchanged.
+        When it moved, the full content hash decides: same hash => keep the
+        index and record the new watermark, different hash => rebuild.
+        rebuild=True skips the cache entirely (arnold reindex).
+        """
+        watermark = self.kernel_watermark()
+        data = None if rebuild else self._read()
+
+        fingerprint = None
+        if data is not None and data.get('watermark') != watermark:
+            fingerprint = self.kernel_fingerprint()
+            if data['fingerprint'] != fingerprint:
+                data = None
+
+        if data is not None:
+            self.fingerprint = data['fingerprint']
+            self.watermark = watermark
+            self.columns = data['columns']
+            self.exercise_ids = data['exercise_ids']
+            self.bitmaps = data['bitmaps']
+            self._build_postings()
+            if fingerprint is not None:
+                self.save()  # record the new watermark
+            return self
+
+        self.build(fingerprint)
+        self.watermark = watermark
+        self.save()
+        return self
+
+    def _read(self) -> Optional[Dict]:
+        """The saved index (bitmaps decoded), or None if missing, unreadable or outdated."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION or not all(
+                key in data for key in ('fingerprint', 'columns', 'exercise_ids')
+            ):
+                return None
+            data['bitmaps'] = [int(b, 16) for b in data['bitmaps']]
+            return data
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def build(self, fingerprint: Optional[str] = None):
+        """Build the static (kernel-derived) columns from the graph."""
+        self.fingerprint = fingerprint or self.kernel_fingerprint()
+
+        action_ids = sorted({
+            action.name
+            for spec in INJURY_CONTRAINDICATIONS.values()
+            for action in spec.get('avoid_actions', [])
+        })
+        positions = sorted({
+            position
+            for spec in INJURY_CONTRAINDICATIONS.values()
+            for position in spec.get('avoid_positions', [])
+        })
+        patterns = sorted(set(PATTERN_KEYWORDS.values()))
+
+        self.columns = (
+            [f"action:{a}" for a in action_ids]
+            + [f"position:{p}" for p in positions]
+            + [f"pattern:{p}" for p in patterns]
+        )
+        col_bit = {col: 1 << i for i, col in enumerate(self.columns)}
+
+        # One pass over exercises for name/category columns
+        exercises = self.graph.execute_query("""
+        MATCH (e:Exercise)
+        RETURN e.id as id, toLower(coalesce(e.name, '')) as name,
+               toLower(coalesce(e.category, '')) as category
+        ORDER BY e.id
+        """)
+
+        self.exercise_ids = [ex['id'] for ex in exercises]
+        self.bitmaps = [0] * len(self.exercise_ids)
+        row_of = {eid: i for i, eid in enumerate(self.exercise_ids)}
+
+        for i, ex in enumerate(exercises):
+            bits = 0
+            for position in positions:
+                if position.replace('_', ' ') in ex['name']:
+                    bits |= col_bit[f"position:{position}"]
+            if ex['category'] in patterns:
+                bits |= col_bit[f"pattern:{ex['category']}"]
+            self.bitmaps[i] = bits
+
+        # One traversal for all contraindicated joint actions
+        if action_ids:
+            results = self.graph.execute_query("""
+            MATCH (e:Exercise)-[:INVOLVES]->(:Movement)-[:REQUIRES_ACTION]->(ja:JointAction)
+            WHERE ja.id IN $action_ids
+            RETURN e.id as exercise_id, collect(DISTINCT ja.id) as actions
+            """, {'action_ids': [f"JOINT_ACTION:{a}" for a in action_ids]})
+
+            for r in results:
+                i = row_of.get(r['exercise_id'])
+                if i is None:
+                    continue
+                for ja_id in r['actions']:
+                    self.bitmaps[i] |= col_bit[f"action:{ja_id.split(':', 1)[1]}"]
+
+        self._build_postings()
+
+    def save(self):
+        """Persist the index (atomic replace)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': INDEX_VERSION,
+            'fingerprint': self.fingerprint,
+            'watermark': self.watermark,
+            'columns': self.columns,
+            'exercise_ids': self.exercise_ids,
+            'bitmaps': [format(b, 'x') for b in self.bitmaps],
+        }
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        tmp.replace(self.path)
+
+    def _build_postings(self):
+        """Column -> set of exercise IDs, derived from the bitmaps."""
+        self._row_of = {eid: i for i, eid in enumerate(self.exercise_ids)}
+        self._postings = {}
+        for bit, col in enumerate(self.columns):
+            mask = 1 << bit
+            self._postings[col] = {
+                eid for eid, bits in zip(self.exercise_ids, self.bitmaps) if bits & mask
+            }
+
+    # --- Dynamic columns ---
+
+    def ensure_location(self, keyword: str) -> str:
+        """Add a location:<keyword> column if missing; returns the column name."""
+        keyword = keyword.lower()
+        column = f"location:{keyword}"
+        if column in self._postings:
+            return column
+
+        results = self.graph.execute_query("""
+        MATCH (e:Exercise)
+        WHERE toLower(e.name) CONTAINS $location
+           OR ANY(muscle IN e.primary_muscles WHERE toLower(muscle) CONTAINS $location)
+        RETURN e.id as exercise_id
+        """, {'location': keyword})
+        matched = {r['exercise_id'] for r in results}
+
+        mask = 1 << len(self.columns)
+        self.columns.append(column)
+        for i, eid in enumerate(self.exercise_ids):
+            if eid in matched:
+                self.bitmaps[i] |= mask
+        self._postings[column] = matched & set(self.exercise_ids)
+        self.save()
+        return column
+
+    # --- Queries ---
+
+    def forbidden(self, columns: Iterable[str]) -> Set[str]:
+        """Exercise IDs flagged by any of the given columns."""
+        result: Set[str] = set()
+        for col in columns:
+            result |= self._postings.get(col, set())
+        return result
+
+    def violations(self, exercise_id: str) -> List[str]:
+        """Columns set for an exercise (empty if unknown)."""
+        i = self._row_of.get(exercise_id)
+        if i is None:
+            return []
+        bits = self.bitmaps[i]
+        return [col for i, col in enumerate(self.columns) if bits & (1 << i)]
+
+    def mask(self, columns: Iterable[str]) -> int:
+        """Bitmask selecting the given columns (unknown columns are ignored)."""
+        bit_of = {col: i for i, col in enumerate(self.columns)}
+        mask = 0
+        for col in columns:
+            if col in bit_of:
+                mask |= 1 << bit_of[col]
+        return mask
+
+    def rows(self, exercise_ids: Iterable[str], mask: int = -1) -> Dict[str, Optional[int]]:
+        """
+        Bitmaps for many exercises at once, restricted to `mask`.
+
+        Unknown exercise IDs map to None so callers can tell them apart
+        from exercises with no violations (0).
+        """
+        result: Dict[str, Optional[int]] = {}
+        for eid in exercise_ids:
+            i = self._row_of.get(eid)
+            result[eid] = None if i is None else self.bitmaps[i] & mask
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Exercise count per column."""
+        return {col: len(ids) for col, ids in self._postings.items()}
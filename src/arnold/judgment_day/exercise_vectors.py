@@ -0,0 +1,233 @@
+"""
+Exercise Feature Vectors
+
+Internal Codename: JUDGMENT-DAY
+Columnar catalog features for scoring every exercise against a target at once.
+
+Loaded once per ExerciseVariationSuggester from three queries:
+    - the exercise catalog (muscles, category, equipment, level)
+    - the user's equipment
+    - last-performed date per exercise
+
+Muscle features are an exercise × muscle matrix. The vocabulary is small
+(~20 muscle names), so a dense float32 matrix is both smaller and faster
+than a sparse one for the ~4,100-exercise catalog. Relevance for all
+exercises is one matrix-vector product plus a category comparison; novelty
+is arithmetic on the recency vector.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Relevance weights (same scale as the original per-candidate scorer)
+PRIMARY_WEIGHT = 10.0
+SECONDARY_WEIGHT = 3.0
+CATEGORY_BONUS = 2.0
+NEVER_DONE = -1
+
+
+class ExerciseVectors:
+    """Exercise × feature arrays for vectorized relevance/novelty scoring."""
+
+    def __init__(self, graph):
+        """
+        Args:
+            graph: ArnoldGraph instance
+        """
+        self.graph = graph
+        self.rows: List[Dict] = []
+        self.muscles: List[str] = []
+        self.primary = np.zeros((0, 0), dtype=np.float32)
+        self.weighted = np.zeros((0, 0), dtype=np.float32)
+        self.categories: List[str] = []
+        self.category_codes = np.zeros(0, dtype=np.int32)
+        self.is_strength = np.zeros(0, dtype=bool)
+        self.name_rank = np.zeros(0, dtype=np.int64)
+        self.equipment_available = np.zeros(0, dtype=bool)
+        self.last_done = np.zeros(0, dtype=np.int64)
+        self._names: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._muscle_col: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def load(self) -> 'ExerciseVectors':
+        """Load catalog, equipment and recency features from the graph."""
+        exercises = self.graph.execute_query("""
+        MATCH (e:Exercise)
+        RETURN
+            e.id as id,
+            e.name as name,
+            e.primary_muscles as muscles,
+            e.secondary_muscles as secondary_muscles,
+            e.equipment as equipment,
+            e.category as category,
+            e.level as level
+        ORDER BY e.id
+        """)
+
+        self.rows = [
+            {**ex, 'muscles': ex.get('muscles') or [], 'secondary_muscles': ex.get('secondary_muscles') or []}
+            for ex in exercises
+        ]
+        self._names = [(ex.get('name') or '').lower() for ex in self.rows]
+        self._row_of = {ex['id']: i for i, ex in enumerate(self.rows)}
+
+        # Muscle vocabulary and matrices
+        self.muscles = sorted({
+            m for ex in self.rows for m in ex['muscles'] + ex['secondary_muscles'] if m
+        })
+        self._muscle_col = {m: j for j, m in enumerate(self.muscles)}
+
+        n, k = len(self.rows), len(self.muscles)
+        self.primary = np.zeros((n, k), dtype=np.float32)
+        secondary = np.zeros((n, k), dtype=np.float32)
+        for i, ex in enumerate(self.rows):
+            for m in ex['muscles']:
+                if m in self._muscle_col:
+                    self.primary[i, self._muscle_col[m]] = 1.0
+            for m in ex['secondary_muscles']:
+                if m in self._muscle_col:
+                    secondary[i, self._muscle_col[m]] = 1.0
+        self.weighted = PRIMARY_WEIGHT * self.primary + SECONDARY_WEIGHT * secondary
+
+        # Category codes
+        self.categories = sorted({ex.get('category') or '' for ex in self.rows})
+        category_index = {c: j for j, c in enumerate(self.categories)}
+        self.category_codes = np.array(
+            [category_index[ex.get('category') or ''] for ex in self.rows], dtype=np.int32
+        )
+        self.is_strength = self.category_codes == category_index.get('Strength', -1)
+
+        # Position of each row in name order (ties broken like ORDER BY e.name)
+        self.name_rank = np.empty(n, dtype=np.int64)
+        self.name_rank[sorted(range(n), key=lambda i: self.rows[i].get('name') or '')] = np.arange(n)
+
+        # Equipment availability (user's equipment or bodyweight)
+        owned = self.graph.execute_query("""
+        MATCH (:User)-[:HAS_EQUIPMENT]->(eq:Equipment)
+        RETURN collect(DISTINCT eq.name) as names
+        """)
+        owned_names = set(owned[0]['names']) if owned else set()
+        self.equipment_available = np.array(
+            [ex.get('equipment') == 'Body Only' or ex.get('equipment') in owned_names for ex in self.rows],
+            dtype=bool
+        )
+
+        self.refresh_recency()
+        return self
+
+    def refresh_recency(self):
+        """Reload last-performed dates (call after logging workouts)."""
+        results = self.graph.execute_query("""
+        MATCH (w:Workout)-[:CONTAINS]->(:ExerciseInstance)-[:INSTANCE_OF]->(e:Exercise)
+        RETURN e.id as exercise_id, toString(max(w.date)) as last_date
+        """)
+
+        self.last_done = np.full(len(self.rows), NEVER_DONE, dtype=np.int64)
+        for r in results:
+            i = self._row_of.get(r['exercise_id'])
+            if i is not None and r['last_date']:
+                self.last_done[i] = date.fromisoformat(r['last_date'][:10]).toordinal()
+
+    # --- Lookup ---
+
+    def row(self, exercise_id: str) -> Optional[int]:
+        """Row index for an exercise ID."""
+        return self._row_of.get(exercise_id)
+
+    def find(self, name_fragment: str) -> Optional[int]:
+        """First exercise (by ID order) whose name contains the fragment, case-insensitive."""
+        fragment = name_fragment.lower()
+        for i, name in enumerate(self._names):
+            if fragment in name:
+                return i
+        return None
+
+    def muscle_vector(self, muscles: List[str]) -> np.ndarray:
+        """Binary target vector over the muscle vocabulary."""
+        vec = np.zeros(len(self.muscles), dtype=np.float32)
+        for m in muscles or []:
+            j = self._muscle_col.get(m)
+            if j is not None:
+                vec[j] = 1.0
+        return vec
+
+    def muscle_group_match(self, muscle_group: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Case-insensitive primary-muscle match for every exercise.
+
+        Returns:
+            (a primary muscle contains the group name, a primary muscle equals it)
+        """
+        group = muscle_group.lower()
+        contains = [j for j, m in enumerate(self.muscles) if group in m.lower()]
+        exact = [j for j, m in enumerate(self.muscles) if m.lower() == group]
+        return self.primary[:, contains].any(axis=1), self.primary[:, exact].any(axis=1)
+
+    # --- Scoring ---
+
+    def relevance(self, target_muscles: List[str], target_category: Optional[str] = None) -> np.ndarray:
+        """
+        Relevance of every exercise to a target (0-15).
+
+        10 × primary overlap fraction + 3 × secondary overlap fraction
+        + 2 if the category matches.
+        """
+        target = self.muscle_vector(target_muscles)
+        n_target = len(set(target_muscles or []))
+        scores = self.weighted @ target
+        if n_target:
+            scores /= n_target
+        if target_category and target_category in self.categories:
+            scores += CATEGORY_BONUS * (self.category_codes == self.categories.index(target_category))
+        return scores
+
+    def primary_overlap(self, target_muscles: List[str]) -> np.ndarray:
+        """Count of target muscles among each exercise's primary muscles."""
+        return self.primary @ self.muscle_vector(target_muscles)
+
+    def days_since(self, today: Optional[date] = None) -> np.ndarray:
+        """Days since each exercise was last done (-1 = never)."""
+        today = (today or date.today()).toordinal()
+        return np.where(self.last_done == NEVER_DONE, NEVER_DONE, today - self.last_done)
+
+    def novelty(self, days: int = 30, today: Optional[date] = None) -> np.ndarray:
+        """Novelty 0-10 for every exercise: 0 if done today, 10 if never or ≥ `days` ago."""
+        since = self.days_since(today)
+        scores = np.minimum(10.0, since / float(days) * 10.0)
+        return np.where(since == NEVER_DONE, 10.0, scores)
+
+    def recent_mask(self, days: int, today: Optional[date] = None) -> np.ndarray:
+        """True for exercises done within the last `days` days."""
+        since = self.days_since(today)
+        return (since != NEVER_DONE) & (since <= days)
+
+    def rank_for_muscle_group(
+        self,
+        muscle_group: str,
+        limit: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[int]:
+        """
+        Rows matching a muscle group, ranked like suggest_for_muscle_groups:
+        exact primary match first, then Strength category, then name.
+        """
+        contains, exact = self.muscle_group_match(muscle_group)
+        rows = np.flatnonzero(contains if mask is None else contains & mask)
+        order = np.lexsort((self.name_rank[rows], ~self.is_strength[rows], ~exact[rows]))
+        return rows[order[:limit]].tolist()
+
+    def top_k(self, scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[int]:
+        """Row indices of the k highest scores (ties broken by row order) among masked rows."""
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+        if k <= 0 or not len(candidates):
+            return []
+        if len(candidates) > k:
+            part = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order].tolist()
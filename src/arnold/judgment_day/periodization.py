@@ -3,12 +3,17 @@ Periodization Logic Engine
 
 Internal Codename: JUDGMENT-DAY
 Implements training periodization cycles and phase management.
+
+Decisions read the in-memory TrainingTimeline (one query per process)
+rather than querying workouts each time.
 """
 
 from datetime import date, timedelta
 from typing import Dict, Optional, Tuple
 from enum import Enum
 
+from .timeline import TrainingTimeline
+
 
 class PeriodizationPhase(Enum):
     """Training phases in a 4-week microcycle."""
@@ -76,14 +81,23 @@ class PeriodizationEngine:
     - Week 4: Realization OR Deload (depending on fatigue)
     """
 
-    def __init__(self, graph):
+    def __init__(self, graph, timeline: Optional[TrainingTimeline] = None):
         """
         Initialize periodization engine.
 
         Args:
             graph: ArnoldGraph instance
+            timeline: Optional preloaded TrainingTimeline (shared per graph otherwise)
         """
         self.graph = graph
+        self._timeline = timeline
+
+    @property
+    def timeline(self) -> TrainingTimeline:
+        """Workout history for this graph, loaded once and refreshed incrementally."""
+        if self._timeline is not None:
+            return self._timeline
+        return TrainingTimeline.shared(self.graph)
 
     def get_current_phase(self) -> Tuple[PeriodizationPhase, int, date]:
         """
@@ -92,23 +106,14 @@ class PeriodizationEngine:
         Returns:
             Tuple of (phase, week_in_cycle, cycle_start_date)
         """
-        # Query for most recent workout with periodization phase
-        query = """
-        MATCH (w:Workout)
-        WHERE w.periodization_phase IS NOT NULL
-        RETURN w.periodization_phase as phase, w.date as date
-        ORDER BY w.date DESC
-        LIMIT 1
-        """
-
-        result = self.graph.execute_query(query)
+        # Most recent workout with periodization phase
+        last = self.timeline.last_phase()
 
-        if not result:
+        if last is None:
             # No phase set - start new cycle
             return PeriodizationPhase.ACCUMULATION, 1, date.today()
 
-        last_phase = result[0]['phase']
-        last_date = date.fromisoformat(result[0]['date']) if isinstance(result[0]['date'], str) else result[0]['date']
+        last_phase, last_date = last
 
         # Calculate days since last phase
         days_since = (date.today() - last_date).days
@@ -147,11 +152,11 @@ class PeriodizationEngine:
                 return progression[idx + 1]
             else:
                 # Cycle complete, decide deload or restart
-                return self._should_deload()
+                return self.should_deload()
         except ValueError:
             return PeriodizationPhase.ACCUMULATION
 
-    def _should_deload(self) -> PeriodizationPhase:
+    def should_deload(self) -> PeriodizationPhase:
         """
         Determine if deload is needed based on fatigue signals.
 
@@ -160,21 +165,11 @@ class PeriodizationEngine:
         - Deviation frequency
         - Session adherence
         """
-        query = """
-        MATCH (w:Workout)
-        WHERE w.date >= date() - duration({weeks: 4})
-        RETURN
-            avg(w.perceived_intensity) as avg_intensity,
-            count(CASE WHEN size(w.deviations) > 0 THEN 1 END) as deviations,
-            count(w) as total_sessions
-        """
-
-        result = self.graph.execute_query(query)
+        r = self.timeline.fatigue_since(date.today() - timedelta(weeks=4))
 
-        if result:
-            r = result[0]
-            avg_intensity = r.get('avg_intensity', 5)
-            deviation_rate = r.get('deviations', 0) / max(r.get('total_sessions', 1), 1)
+        if r['total_sessions']:
+            avg_intensity = r['avg_intensity']
+            deviation_rate = r['deviations'] / r['total_sessions']
 
             # Deload if high fatigue signals
             if avg_intensity and avg_intensity > 7.5:
@@ -220,13 +215,15 @@ class PeriodizationEngine:
         """
         query = """
         MATCH (w:Workout {id: $workout_id})
-        SET w.periodization_phase = $phase
+        SET w.periodization_phase = $phase,
+            w.updated_at = datetime()
         """
 
         self.graph.execute_write(query, {
             'workout_id': workout_id,
             'phase': new_phase.value
         })
+        self.timeline.set_phase(workout_id, new_phase.value)
 
     def get_adherence_rate(self, weeks: int = 4) -> float:
         """
@@ -238,18 +235,8 @@ class PeriodizationEngine:
         Returns:
             Adherence rate as percentage (0-100)
         """
-        query = """
-        MATCH (w:Workout)
-        WHERE w.date >= date() - duration({weeks: $weeks})
-        RETURN count(w) as completed
-        """
-
-        result = self.graph.execute_query(query, {'weeks': weeks})
-
-        if result:
-            completed = result[0]['completed']
-            # Assume 4 sessions per week as baseline
-            planned = weeks * 4
-            return (completed / planned) * 100 if planned > 0 else 0
+        completed = self.timeline.count_since(date.today() - timedelta(weeks=weeks))
 
-        return 0
+        # Assume 4 sessions per week as baseline
+        planned = weeks * 4
+        return (completed / planned) * 100 if planned > 0 else 0
@@ -7,15 +7,95 @@ Internal Codename: JUDGMENT-DAY
 Generates intelligent, periodized workout plans.
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import date, timedelta
 import random
 
+import numpy as np
+
+from .exercise_vectors import NEVER_DONE
 from .periodization import PeriodizationEngine, PeriodizationPhase
 from .constraints import ConstraintChecker
 from .analytics import ProgressionAnalyzer
 from .variation import ExerciseVariationSuggester
 
+FOCUS_OPTIONS = [
+    "Upper Push",
+    "Upper Pull",
+    "Lower Body",
+    "Full Body",
+    "Core & Accessory"
+]
+
+# Weekly working sets per muscle group at 100% phase volume
+WEEKLY_SETS_PER_MUSCLE = 16
+
+# Days a muscle group should rest before it is planned again
+MUSCLE_RECOVERY_DAYS = 2
+
+
+class MicrocycleState:
+    """
+    In-memory planning state shared by every day of a microcycle.
+
+    Tracks remaining weekly set budget per muscle group, how often each
+    focus has been planned, when each muscle group was last trained, and
+    the (planned or performed) date each exercise was last done.
+    """
+
+    def __init__(self, vectors, forbidden: Set[str], volume_multiplier: float = 1.0):
+        self.vectors = vectors
+        self.volume_multiplier = volume_multiplier
+        self.last_done = vectors.last_done.copy()
+        self.allowed = vectors.equipment_available.copy()
+        for exercise_id in forbidden:
+            row = vectors.row(exercise_id)
+            if row is not None:
+                self.allowed[row] = False
+
+        self.focus_counts: Dict[str, int] = {f: 0 for f in FOCUS_OPTIONS}
+        self.budget: Dict[str, float] = {}
+        self.last_trained: Dict[str, int] = {}
+        self._group_masks: Dict[str, np.ndarray] = {}
+
+    def group_mask(self, muscle_group: str) -> np.ndarray:
+        if muscle_group not in self._group_masks:
+            self._group_masks[muscle_group] = self.vectors.muscle_group_match(muscle_group)[0]
+        return self._group_masks[muscle_group]
+
+    def start_week(self, volume_multiplier: float):
+        """Reset per-muscle budgets (each 7-day block gets a fresh budget)."""
+        self.volume_multiplier = volume_multiplier
+        self.budget = {}
+        self.focus_counts = {f: 0 for f in FOCUS_OPTIONS}
+
+    def remaining(self, muscle_group: str) -> float:
+        return self.budget.get(muscle_group, WEEKLY_SETS_PER_MUSCLE * self.volume_multiplier)
+
+    def days_since_trained(self, muscle_group: str, day: date) -> Optional[int]:
+        """Days since the group was last trained (performed or planned), None if never."""
+        if muscle_group not in self.last_trained:
+            mask = self.group_mask(muscle_group)
+            done = self.last_done[mask]
+            done = done[done != NEVER_DONE]
+            self.last_trained[muscle_group] = int(done.max()) if done.size else NEVER_DONE
+        last = self.last_trained[muscle_group]
+        return None if last == NEVER_DONE else day.toordinal() - last
+
+    def available(self, day: date, exclude_recent_days: int) -> np.ndarray:
+        """Rows that are allowed and not done within `exclude_recent_days` of `day`."""
+        since = day.toordinal() - self.last_done
+        recent = (self.last_done != NEVER_DONE) & (since <= exclude_recent_days)
+        return self.allowed & ~recent
+
+    def record(self, day: date, focus: str, rows: List[int], groups: List[str], sets: List[int]):
+        """Commit one planned day to the shared state."""
+        self.focus_counts[focus] = self.focus_counts.get(focus, 0) + 1
+        for row, group, n_sets in zip(rows, groups, sets):
+            self.last_done[row] = day.toordinal()
+            self.last_trained[group] = day.toordinal()
+            self.budget[group] = self.remaining(group) - n_sets
+
 
 class WorkoutPlanner:
     """
@@ -80,6 +160,173 @@ class WorkoutPlanner:
             workout_type=workout_type
         )
 
+        return self._assemble_plan(
+            plan_date, focus, workout_type, phase, week, phase_targets, exercises,
+            overtraining=self.analytics.detect_overtraining(weeks=4)
+        )
+
+    def generate_microcycle(
+        self,
+        start: Optional[date] = None,
+        days: int = 7,
+        workout_type: str = 'strength',
+        focuses: Optional[List[Optional[str]]] = None
+    ) -> List[Dict]:
+        """
+        Plan consecutive days in one call.
+
+        Context (phase, forbidden exercises, exercise catalog, recency,
+        overtraining signals) is loaded once; each day is then planned
+        in memory against a shared MicrocycleState so that the week
+        respects a per-muscle set budget, rotates focus, rests recently
+        trained muscle groups and never repeats an exercise within 7 days.
+        Phase advances every 7 days through the 4-week cycle.
+
+        Args:
+            start: First day (default: tomorrow)
+            days: Number of days to plan
+            workout_type: Type of workout ('strength', 'conditioning', 'skill')
+            focuses: Optional per-day focus (None entries are chosen automatically)
+
+        Returns:
+            List of daily plan dictionaries (same shape as generate_daily_plan)
+        """
+        if start is None:
+            start = date.today() + timedelta(days=1)
+
+        phase, week, _ = self.periodization.get_current_phase()
+        forbidden = self.constraints.get_forbidden_exercises()
+        overtraining = self.analytics.detect_overtraining(weeks=4)
+        vectors = self.variation.vectors
+
+        state = MicrocycleState(vectors, forbidden)
+        schedule = self._phase_schedule(phase, week, (days + 6) // 7)
+
+        plans = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            day_phase, day_week = schedule[offset // 7]
+            phase_targets = self.periodization.get_phase_targets(day_phase)
+            if offset % 7 == 0:
+                state.start_week(phase_targets['volume_multiplier'])
+
+            focus = focuses[offset] if focuses and offset < len(focuses) else None
+            if focus is None:
+                focus = self._choose_focus(state, day)
+
+            exercises = self._select_exercises_from_state(
+                state, day, focus, day_phase, phase_targets
+            )
+
+            # Alternatives skip anything done or planned within 7 days of this day
+            plans.append(self._assemble_plan(
+                day, focus, workout_type, day_phase, day_week, phase_targets, exercises,
+                overtraining=overtraining,
+                available=state.available(day, exclude_recent_days=7)
+            ))
+
+        return plans
+
+    def _phase_schedule(
+        self,
+        phase: PeriodizationPhase,
+        week: int,
+        weeks: int
+    ) -> List[Tuple[PeriodizationPhase, int]]:
+        """(phase, week_in_cycle) for each of the next `weeks` weeks."""
+        schedule = [(phase, week)]
+        deload_decision = None
+        for _ in range(weeks - 1):
+            week = week % 4 + 1
+            if week in (1, 2):
+                phase = PeriodizationPhase.ACCUMULATION
+            elif week == 3:
+                phase = PeriodizationPhase.INTENSIFICATION
+            else:
+                if deload_decision is None:
+                    deload_decision = self.periodization.should_deload()
+                phase = (
+                    PeriodizationPhase.DELOAD
+                    if deload_decision == PeriodizationPhase.DELOAD
+                    else PeriodizationPhase.REALIZATION
+                )
+            schedule.append((phase, week))
+        return schedule
+
+    def _choose_focus(self, state: MicrocycleState, day: date) -> str:
+        """
+        Pick the focus with the most remaining budget, least coverage this
+        week, and no muscle group still recovering.
+        """
+        def score(focus: str) -> Tuple[int, int, float]:
+            groups = self._get_muscle_groups_for_focus(focus)
+            since = [state.days_since_trained(g, day) for g in groups]
+            recovering = sum(1 for d in since if d is not None and d < MUSCLE_RECOVERY_DAYS)
+            budget = sum(max(state.remaining(g), 0) for g in groups) / len(groups)
+            return (-recovering, -state.focus_counts.get(focus, 0), budget)
+
+        return max(FOCUS_OPTIONS, key=score)
+
+    def _select_exercises_from_state(
+        self,
+        state: MicrocycleState,
+        day: date,
+        focus: str,
+        phase: PeriodizationPhase,
+        phase_targets: Dict
+    ) -> List[Dict]:
+        """In-memory counterpart of _select_exercises for one microcycle day."""
+        vectors = state.vectors
+        exercise_count = self._exercise_count(phase)
+
+        # Groups with budget left first (stable within equal budget)
+        muscle_groups = self._get_muscle_groups_for_focus(focus)
+        target_groups = sorted(
+            muscle_groups[:exercise_count],
+            key=lambda g: state.remaining(g) <= 0
+        )
+
+        available = state.available(day, exclude_recent_days=7)
+        exercises, rows, groups, sets_planned = [], [], [], []
+
+        for i, muscle_group in enumerate(target_groups):
+            candidates = vectors.rank_for_muscle_group(muscle_group, limit=10, mask=available)
+            if not candidates:
+                continue
+
+            if i == 0:
+                compound = [r for r in candidates if vectors.is_strength[r]]
+                row = compound[0] if compound else candidates[0]
+            else:
+                row = candidates[0]
+            available[row] = False
+
+            sets_range = phase_targets['sets_per_exercise']
+            sets = random.randint(sets_range[0], sets_range[1])
+            if state.remaining(muscle_group) <= 0:
+                sets = sets_range[0]
+
+            exercises.append(self._prescribe(vectors.rows[row], phase_targets, sets, i))
+            rows.append(row)
+            groups.append(muscle_group)
+            sets_planned.append(sets)
+
+        state.record(day, focus, rows, groups, sets_planned)
+        return exercises
+
+    def _assemble_plan(
+        self,
+        plan_date: date,
+        focus: str,
+        workout_type: str,
+        phase: PeriodizationPhase,
+        week: int,
+        phase_targets: Dict,
+        exercises: List[Dict],
+        overtraining: Optional[Dict] = None,
+        available: Optional[np.ndarray] = None
+    ) -> Dict:
+        """Wrap selected exercises into a full plan dictionary."""
         # Build warmup
         warmup = self._generate_warmup(focus)
 
@@ -87,7 +334,7 @@ class WorkoutPlanner:
         cooldown = self._generate_cooldown()
 
         # Get alternatives for main exercises
-        alternatives = self._get_alternatives(exercises)
+        alternatives = self._get_alternatives(exercises, plan_date, phase, available)
 
         plan = {
             "date": str(plan_date),
@@ -104,7 +351,7 @@ class WorkoutPlanner:
             "warmup": warmup,
             "cooldown": cooldown,
             "alternatives": alternatives,
-            "notes": self._generate_notes(phase, focus)
+            "notes": self._generate_notes(phase, focus, overtraining)
         }
 
         return plan
@@ -125,15 +372,6 @@ class WorkoutPlanner:
             tags = w.get('tags', [])
             recent_tags.extend(tags)
 
-        # Define focus rotation
-        focus_options = [
-            "Upper Push",
-            "Upper Pull",
-            "Lower Body",
-            "Full Body",
-            "Core & Accessory"
-        ]
-
         # Simple rotation - avoid repeating last focus
         last_workout_type = (recent_workouts[0].get('type') or '').lower() if recent_workouts else ''
 
@@ -144,7 +382,7 @@ class WorkoutPlanner:
         elif 'lower' in recent_tags_str:
             return random.choice(["Upper Push", "Upper Pull"])
         else:
-            return random.choice(focus_options)
+            return random.choice(FOCUS_OPTIONS)
 
     def _select_exercises(
         self,
@@ -170,30 +408,27 @@ class WorkoutPlanner:
         # Get muscle groups for focus
         muscle_groups = self._get_muscle_groups_for_focus(focus)
 
-        # Determine exercise count based on phase
-        if phase == PeriodizationPhase.ACCUMULATION:
-            exercise_count = random.randint(5, 7)
-        elif phase == PeriodizationPhase.INTENSIFICATION:
-            exercise_count = random.randint(4, 6)
-        else:  # Realization or Deload
-            exercise_count = random.randint(3, 5)
+        exercise_count = self._exercise_count(phase)
 
         # Get forbidden exercises
         forbidden = self.constraints.get_forbidden_exercises()
 
-        # Select main compound movements first
-        for i, muscle_group in enumerate(muscle_groups[:exercise_count]):
-            # Get exercise suggestions
-            suggestions = self.variation.suggest_by_muscle_group(
-                muscle_group=muscle_group,
-                limit=10,
-                exclude_recent_days=7
-            )
+        # One query for every target group; forbidden/recent excluded server-side
+        target_groups = muscle_groups[:exercise_count]
+        candidates = self.variation.suggest_for_muscle_groups(
+            target_groups,
+            limit=10,
+            exclude_recent_days=7,
+            exclude_ids=forbidden
+        )
 
-            # Filter out forbidden
+        # Select main compound movements first
+        selected_ids = set()
+        for i, muscle_group in enumerate(target_groups):
+            # Don't program the same exercise twice (groups overlap, e.g. Chest/Shoulders)
             allowed_suggestions = [
-                s for s in suggestions
-                if s['id'] not in forbidden
+                s for s in candidates.get(muscle_group, [])
+                if s['id'] not in selected_ids
             ]
 
             if not allowed_suggestions:
@@ -206,31 +441,43 @@ class WorkoutPlanner:
                 exercise = compound[0] if compound else allowed_suggestions[0]
             else:
                 exercise = allowed_suggestions[0]
+            selected_ids.add(exercise['id'])
 
-            # Determine sets/reps based on phase
+            # Determine sets based on phase
             sets_range = phase_targets['sets_per_exercise']
-            reps_range = phase_targets['reps_per_set']
-
             sets = random.randint(sets_range[0], sets_range[1])
-            reps_low = reps_range[0]
-            reps_high = reps_range[1]
-
-            exercise_prescription = {
-                "name": exercise['name'],
-                "exercise_id": exercise['id'],
-                "sets": sets,
-                "reps": f"{reps_low}-{reps_high}" if reps_low != reps_high else str(reps_low),
-                "intensity": f"RPE {phase_targets['rpe_range'][0]}-{phase_targets['rpe_range'][1]}",
-                "rest": f"{phase_targets['rest_seconds']}s",
-                "equipment": exercise.get('equipment'),
-                "muscles": exercise.get('muscles', []),
-                "notes": self._generate_exercise_notes(exercise, i)
-            }
+
+            exercise_prescription = self._prescribe(exercise, phase_targets, sets, i)
 
             exercises.append(exercise_prescription)
 
         return exercises
 
+    def _exercise_count(self, phase: PeriodizationPhase) -> int:
+        """Exercise count for a session based on phase."""
+        if phase == PeriodizationPhase.ACCUMULATION:
+            return random.randint(5, 7)
+        elif phase == PeriodizationPhase.INTENSIFICATION:
+            return random.randint(4, 6)
+        else:  # Realization or Deload
+            return random.randint(3, 5)
+
+    def _prescribe(self, exercise: Dict, phase_targets: Dict, sets: int, position: int) -> Dict:
+        """Sets/reps/intensity prescription for a selected exercise."""
+        reps_low, reps_high = phase_targets['reps_per_set']
+
+        return {
+            "name": exercise['name'],
+            "exercise_id": exercise['id'],
+            "sets": sets,
+            "reps": f"{reps_low}-{reps_high}" if reps_low != reps_high else str(reps_low),
+            "intensity": f"RPE {phase_targets['rpe_range'][0]}-{phase_targets['rpe_range'][1]}",
+            "rest": f"{phase_targets['rest_seconds']}s",
+            "equipment": exercise.get('equipment'),
+            "muscles": exercise.get('muscles', []),
+            "notes": self._generate_exercise_notes(exercise, position)
+        }
+
     def _get_muscle_groups_for_focus(self, focus: str) -> List[str]:
         """Get muscle groups to target for a focus."""
         focus_map = {
@@ -307,22 +554,51 @@ class WorkoutPlanner:
 
         return "; ".join(notes) if notes else ""
 
-    def _get_alternatives(self, exercises: List[Dict]) -> Dict[str, List[str]]:
-        """Get alternative exercises for each main exercise."""
+    def _get_alternatives(
+        self,
+        exercises: List[Dict],
+        plan_date: date,
+        phase: PeriodizationPhase,
+        available: Optional[np.ndarray] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Get alternative exercises for each main exercise.
+
+        Recency is measured from the planned day, not today, and a deload
+        week never offers Expert-level swaps.
+
+        Args:
+            exercises: Exercises selected for the day
+            plan_date: Day being planned
+            phase: Periodization phase of that day
+            available: Candidate mask from a microcycle state (default: owned
+                equipment, not done within 7 days of plan_date)
+        """
+        vectors = self.variation.vectors
+        if available is None:
+            available = vectors.equipment_available & ~vectors.recent_mask(7, today=plan_date)
+        if phase == PeriodizationPhase.DELOAD:
+            available = available & np.array([r.get('level') != 'Expert' for r in vectors.rows], dtype=bool)
+
         alternatives = {}
 
         for ex in exercises[:3]:  # Get alternatives for first 3 exercises
             variations = self.variation.suggest_variations(
                 exercise_name=ex['name'],
                 limit=3,
-                exclude_recent_days=7
+                available=available
             )
 
             alternatives[ex['name']] = [v['name'] for v in variations]
 
         return alternatives
 
-    def _generate_notes(self, phase: PeriodizationPhase, focus: str) -> List[str]:
+    def _generate_notes(
+        self,
+        phase: PeriodizationPhase,
+        focus: str,
+        overtraining: Optional[Dict] = None
+    ) -> List[str]:
         """Generate workout notes and coaching cues."""
         notes = [
             f"Phase: {phase.value} - {self.periodization.get_phase_targets(phase)['focus']}",
@@ -344,7 +620,8 @@ class WorkoutPlanner:
             notes.append("Focus on technique and mobility")
 
         # Check for overtraining signals
-        overtraining = self.analytics.detect_overtraining(weeks=4)
+        if overtraining is None:
+            overtraining = self.analytics.detect_overtraining(weeks=4)
         if overtraining['overtraining_risk'] in ['moderate', 'high']:
             notes.append(f"⚠️  {overtraining['recommendation']}")
 
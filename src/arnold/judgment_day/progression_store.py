@@ -0,0 +1,178 @@
+"""
+Progression Store
+
+Internal Codename: JUDGMENT-DAY
+Read access to the materialized training tables in Postgres.
+
+exercise_daily_progression holds one row per (canonical exercise, day) with
+the best set, Brzycki e1RM and volume (migration 026). Exercise names
+resolve through the exercise_aliases index rather than substring scans.
+
+set_muscle_facts holds one row per (set, targeted muscle, role) with the
+set's volume and role weight (migration 027), so muscle balance is a
+group-by rather than a graph traversal.
+
+Both are kept current by triggers on `sets`. connect() returns None (and the
+callers fall back to the graph) when either migration hasn't been applied.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+try:
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+except ImportError:  # Postgres is optional for the graph-only CLI
+    psycopg2 = None
+
+
+PG_URI = os.environ.get("DATABASE_URI", "postgresql://brock@localhost:5432/arnold_analytics")
+
+# Database objects each migration provides -> migration file
+REQUIRED_OBJECTS = {
+    "resolve_exercise_alias(text)": "026_exercise_progression.sql",
+    "exercise_daily_progression": "026_exercise_progression.sql",
+    "set_muscle_facts": "027_set_muscle_facts.sql",
+}
+
+
+class ProgressionStore:
+    """Alias resolution, daily progression and muscle volume reads."""
+
+    def __init__(self, dsn: str = PG_URI):
+        """
+        Args:
+            dsn: Postgres connection string (default: DATABASE_URI)
+        """
+        self.dsn = dsn
+        self._conn = None
+
+    @classmethod
+    def connect(cls, dsn: str = PG_URI) -> Optional['ProgressionStore']:
+        """
+        Return a connected store, or None if Postgres isn't reachable or the
+        progression migrations (026/027) haven't been applied.
+        """
+        if psycopg2 is None:
+            return None
+        store = cls(dsn)
+        try:
+            missing = store.missing_migrations()
+        except psycopg2.Error:
+            return None
+        if missing:
+            print(f"ProgressionStore: apply scripts/migrations/{', '.join(missing)} "
+                  f"to enable materialized progression (using graph fallback)")
+            store.close()
+            return None
+        return store
+
+    def missing_migrations(self) -> List[str]:
+        """Migration files whose tables/functions are absent from the database."""
+        cur = self.conn.cursor()
+        missing = []
+        for name, migration in REQUIRED_OBJECTS.items():
+            lookup = "to_regprocedure" if name.endswith(")") else "to_regclass"
+            cur.execute(f"SELECT {lookup}(%s) IS NOT NULL AS present", (name,))
+            if not cur.fetchone()['present'] and migration not in missing:
+                missing.append(migration)
+        cur.close()
+        return missing
+
+    @property
+    def conn(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.dsn, cursor_factory=RealDictCursor)
+            self._conn.autocommit = True
+        return self._conn
+
+    def close(self):
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+
+    def resolve_exercise(self, name: str) -> Optional[Dict]:
+        """
+        Resolve a name to a canonical exercise via the alias index.
+
+        Ranking lives in the resolve_exercise_alias() SQL function (migration
+        026): exact normalized match wins, otherwise the best prefix match with
+        the most logged history.
+
+        Returns:
+            {'exercise_id', 'exercise_name'} or None
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT exercise_id, exercise_name FROM resolve_exercise_alias(%s)", (name,))
+        row = cur.fetchone()
+        cur.close()
+        return dict(row) if row else None
+
+    def get_daily_progression(
+        self,
+        exercise_id: str,
+        days: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Daily progression rows for an exercise, oldest first.
+
+        Args:
+            exercise_id: Canonical exercise ID
+            days: Lookback window (None = all history)
+        """
+        cur = self.conn.cursor()
+        cur.execute("""
+            SELECT
+                session_date, exercise_name,
+                best_load_lbs, best_reps, best_e1rm, max_load_lbs,
+                total_sets, total_reps, volume_lbs, avg_rpe
+            FROM exercise_daily_progression
+            WHERE exercise_id = %s
+              AND (%s::int IS NULL OR session_date >= CURRENT_DATE - %s::int)
+            ORDER BY session_date
+        """, (exercise_id, days, days))
+        rows = [
+            {k: (float(v) if k.endswith(('_lbs', '_e1rm', '_rpe')) and v is not None else v)
+             for k, v in r.items()}
+            for r in cur.fetchall()
+        ]
+        cur.close()
+        return rows
+
+    def get_muscle_volume(
+        self,
+        days: int,
+        role: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Per-muscle totals over the last `days` days, highest volume first.
+
+        Args:
+            days: Lookback window
+            role: Restrict to 'primary' / 'secondary' (None = all roles)
+
+        Returns:
+            [{'muscle_name', 'sets', 'reps', 'volume_lbs',
+              'weighted_sets', 'weighted_volume_lbs'}]
+        """
+        cur = self.conn.cursor()
+        cur.execute("""
+            SELECT
+                muscle_name,
+                COUNT(DISTINCT set_id) AS sets,
+                COALESCE(SUM(reps), 0) AS reps,
+                COALESCE(SUM(volume_lbs), 0) AS volume_lbs,
+                COALESCE(SUM(role_weight), 0) AS weighted_sets,
+                COALESCE(SUM(volume_lbs * role_weight), 0) AS weighted_volume_lbs
+            FROM set_muscle_facts
+            WHERE session_date >= CURRENT_DATE - %s::int
+              AND (%s::text IS NULL OR role = %s::text)
+            GROUP BY muscle_name
+            ORDER BY weighted_volume_lbs DESC
+        """, (days, role, role))
+        rows = [
+            {k: (float(v) if k in ('volume_lbs', 'weighted_sets', 'weighted_volume_lbs') else v)
+             for k, v in r.items()}
+            for r in cur.fetchall()
+        ]
+        cur.close()
+        return rows
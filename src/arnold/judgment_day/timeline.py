@@ -0,0 +1,322 @@
+"""
+Training Timeline
+
+Internal Codename: JUDGMENT-DAY
+Compact in-memory history of completed workouts for periodization.
+
+One row per Workout, ordered by date, held in parallel numpy arrays
+(date ordinal, tonnage, perceived intensity, deviation count, phase code).
+Loaded with a single query per process and extended incrementally, so
+phase, deload and adherence decisions are array slices instead of graph
+queries.
+"""
+
+import time
+import weakref
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Seconds before a shared timeline pulls newer workouts from the graph
+DEFAULT_MAX_AGE = 300.0
+
+NO_PHASE = -1
+
+_SHARED: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def _to_date(value) -> date:
+    if isinstance(value, date):
+        return value
+    if hasattr(value, 'to_native'):
+        return value.to_native()
+    return date.fromisoformat(str(value)[:10])
+
+
+def record_workout(graph, workout_id: str) -> bool:
+    """
+    Bring a just-written workout into the graph's shared timeline.
+
+    Call from workout write paths. A no-op (False) when no timeline has been
+    loaded for `graph` in this process; the next load reads it anyway.
+    """
+    timeline = _SHARED.get(graph)
+    if timeline is None:
+        return False
+    return timeline.reload_workout(workout_id)
+
+
+class TrainingTimeline:
+    """
+    Workout dates, loads, RPEs and phase transitions as parallel arrays.
+
+    Usage:
+        timeline = TrainingTimeline.shared(graph)
+        rows = timeline.since(date.today() - timedelta(weeks=4))
+        timeline.intensity[rows]
+    """
+
+    def __init__(self, graph=None, capacity: int = 256):
+        """
+        Args:
+            graph: ArnoldGraph instance (None for a detached timeline)
+            capacity: Initial array capacity (grows by doubling)
+        """
+        self.graph = graph
+        self.loaded_at = 0.0
+        self.watermark: Optional[int] = None
+        self.workout_ids: List[Optional[str]] = []
+        self.phase_names: List[str] = []
+        self._phase_code: Dict[str, int] = {}
+        self._row_of: Dict[str, int] = {}
+        self._n = 0
+        self._dates = np.zeros(capacity, dtype=np.int32)
+        self._tonnage = np.zeros(capacity, dtype=np.float64)
+        self._intensity = np.full(capacity, np.nan, dtype=np.float32)
+        self._deviations = np.zeros(capacity, dtype=np.int16)
+        self._phase = np.full(capacity, NO_PHASE, dtype=np.int8)
+
+    @classmethod
+    def shared(cls, graph, max_age: float = DEFAULT_MAX_AGE) -> 'TrainingTimeline':
+        """Process-wide timeline for a graph, refreshed if older than `max_age`."""
+        timeline = _SHARED.get(graph)
+        if timeline is None:
+            timeline = _SHARED[graph] = cls(graph).load()
+        elif time.monotonic() - timeline.loaded_at > max_age:
+            timeline.refresh()
+        return timeline
+
+    # --- Views ---
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Workout dates as proleptic ordinals (date.toordinal()), ascending."""
+        return self._dates[:self._n]
+
+    @property
+    def tonnage(self) -> np.ndarray:
+        return self._tonnage[:self._n]
+
+    @property
+    def intensity(self) -> np.ndarray:
+        """Perceived intensity (RPE), NaN where not recorded."""
+        return self._intensity[:self._n]
+
+    @property
+    def deviations(self) -> np.ndarray:
+        return self._deviations[:self._n]
+
+    @property
+    def phase(self) -> np.ndarray:
+        """Phase codes into `phase_names`, NO_PHASE where not recorded."""
+        return self._phase[:self._n]
+
+    # --- Load / append ---
+
+    def load(self) -> 'TrainingTimeline':
+        """Load every workout from the graph (one query)."""
+        self._truncate(0)
+        self.watermark = None
+        self._extend(self._fetch())
+        self.loaded_at = time.monotonic()
+        return self
+
+    def refresh(self) -> int:
+        """
+        Pull workouts written or edited since the last load.
+
+        Workouts are versioned by coalesce(updated_at, imported_at), as in
+        scripts/sync_neo4j_to_postgres.py, so back-logged sessions dated
+        before the newest loaded day are picked up too. The last loaded day
+        is also re-read in full, for writers that stamp neither property.
+        Returns the number of rows fetched.
+        """
+        if self._n == 0:
+            self.load()
+            return self._n
+
+        last_day = int(self._dates[self._n - 1])
+        records = self._fetch(since=date.fromordinal(last_day), watermark=self.watermark)
+        self._truncate(int(np.searchsorted(self.dates, last_day, side='left')))
+        self._extend(records)
+        self.loaded_at = time.monotonic()
+        return len(records)
+
+    def reload_workout(self, workout_id: str) -> bool:
+        """Re-read one workout from the graph (after a write); False if not found."""
+        records = self._fetch(workout_id=workout_id)
+        self._extend(records)
+        return bool(records)
+
+    def _fetch(
+        self,
+        since: Optional[date] = None,
+        watermark: Optional[int] = None,
+        workout_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Workouts as timeline rows, ordered by date.
+
+        With no arguments every workout is returned. Otherwise rows dated on
+        or after `since`, with a version at or past `watermark` (ns since
+        epoch), or with id `workout_id`.
+        """
+        query = """
+        MATCH (w:Workout)
+        WHERE w.date IS NOT NULL
+        WITH w, coalesce(w.updated_at, w.imported_at) as v
+        WITH w, CASE WHEN v IS NULL THEN NULL ELSE v.epochSeconds * 1000000000 + v.nanosecond END as version
+        WHERE ($since IS NULL AND $watermark IS NULL AND $id IS NULL)
+           OR w.date >= date($since)
+           OR version >= $watermark
+           OR w.id = $id
+        OPTIONAL MATCH (w)-[:CONTAINS]->(ei:ExerciseInstance)
+        WITH w, version, sum(COALESCE(ei.max_weight, 0) * COALESCE(ei.total_reps, 0)) as tonnage
+        RETURN
+            w.id as id,
+            toString(w.date) as date,
+            tonnage,
+            w.perceived_intensity as intensity,
+            size(coalesce(w.deviations, [])) as deviations,
+            w.periodization_phase as phase,
+            version
+        ORDER BY date
+        """
+        return self.graph.execute_query(query, {
+            'since': since.isoformat() if since else None,
+            'watermark': watermark,
+            'id': workout_id,
+        })
+
+    def _extend(self, records: List[Dict]):
+        for r in records:
+            if r.get('version') is not None:
+                self.watermark = max(self.watermark or 0, r['version'])
+            self.append(
+                _to_date(r['date']),
+                tonnage=r.get('tonnage') or 0.0,
+                intensity=r.get('intensity'),
+                deviations=r.get('deviations') or 0,
+                phase=r.get('phase'),
+                workout_id=r.get('id'),
+            )
+
+    def append(
+        self,
+        workout_date: date,
+        tonnage: float = 0.0,
+        intensity: Optional[float] = None,
+        deviations: int = 0,
+        phase: Optional[str] = None,
+        workout_id: Optional[str] = None
+    ):
+        """
+        Add one workout. Rows stay date-ordered; an out-of-order date is
+        inserted in place (rare: back-logged sessions). A workout_id that is
+        already loaded is replaced.
+        """
+        if workout_id is not None and workout_id in self._row_of:
+            self._remove(self._row_of[workout_id])
+        if self._n == len(self._dates):
+            self._grow()
+
+        day = workout_date.toordinal()
+        row = self._n
+        if row and day < self._dates[row - 1]:
+            row = int(np.searchsorted(self.dates, day, side='right'))
+            for arr in self._arrays():
+                arr[row + 1:self._n + 1] = arr[row:self._n]
+            self.workout_ids.insert(row, workout_id)
+            self._row_of = {wid: i for i, wid in enumerate(self.workout_ids) if wid is not None}
+        else:
+            self.workout_ids.append(workout_id)
+            if workout_id is not None:
+                self._row_of[workout_id] = row
+
+        self._dates[row] = day
+        self._tonnage[row] = tonnage
+        self._intensity[row] = np.nan if intensity is None else intensity
+        self._deviations[row] = deviations
+        self._phase[row] = self._code(phase)
+        self._n += 1
+
+    def set_phase(self, workout_id: str, phase: str) -> bool:
+        """Record a phase transition on a loaded workout; False if unknown."""
+        row = self._row_of.get(workout_id)
+        if row is None:
+            return False
+        self._phase[row] = self._code(phase)
+        return True
+
+    def _code(self, phase: Optional[str]) -> int:
+        if phase is None:
+            return NO_PHASE
+        code = self._phase_code.get(phase)
+        if code is None:
+            code = self._phase_code[phase] = len(self.phase_names)
+            self.phase_names.append(phase)
+        return code
+
+    def _arrays(self) -> Tuple[np.ndarray, ...]:
+        return (self._dates, self._tonnage, self._intensity, self._deviations, self._phase)
+
+    def _grow(self):
+        capacity = max(2 * len(self._dates), 1)
+        self._dates = np.resize(self._dates, capacity)
+        self._tonnage = np.resize(self._tonnage, capacity)
+        self._intensity = np.resize(self._intensity, capacity)
+        self._deviations = np.resize(self._deviations, capacity)
+        self._phase = np.resize(self._phase, capacity)
+
+    def _remove(self, row: int):
+        for arr in self._arrays():
+            arr[row:self._n - 1] = arr[row + 1:self._n]
+        del self.workout_ids[row]
+        self._n -= 1
+        self._row_of = {wid: i for i, wid in enumerate(self.workout_ids) if wid is not None}
+
+    def _truncate(self, n: int):
+        self._n = n
+        del self.workout_ids[n:]
+        self._row_of = {wid: i for i, wid in enumerate(self.workout_ids) if wid is not None}
+
+    # --- Queries ---
+
+    def since(self, start: date) -> slice:
+        """Rows dated on or after `start`."""
+        return slice(int(np.searchsorted(self.dates, start.toordinal(), side='left')), self._n)
+
+    def count_since(self, start: date) -> int:
+        rows = self.since(start)
+        return rows.stop - rows.start
+
+    def last_phase(self) -> Optional[Tuple[str, date]]:
+        """Most recent (phase name, workout date) with a phase recorded."""
+        rows = np.flatnonzero(self.phase != NO_PHASE)
+        if not len(rows):
+            return None
+        row = rows[-1]
+        return self.phase_names[self._phase[row]], date.fromordinal(int(self._dates[row]))
+
+    def fatigue_since(self, start: date) -> Dict:
+        """
+        Fatigue signals over workouts dated on or after `start`.
+
+        Returns:
+            Dictionary with avg_intensity (None if no RPEs), deviations
+            (sessions with any deviation), total_sessions, tonnage
+        """
+        rows = self.since(start)
+        intensity = self.intensity[rows]
+        rated = intensity[~np.isnan(intensity)]
+        return {
+            'avg_intensity': float(rated.mean()) if len(rated) else None,
+            'deviations': int(np.count_nonzero(self.deviations[rows])),
+            'total_sessions': rows.stop - rows.start,
+            'tonnage': float(self.tonnage[rows].sum()),
+        }
@@ -6,7 +6,10 @@ Suggests exercise variations based on muscle targets, equipment, and novelty.
 """
 
 from typing import List, Dict, Optional, Set
-from datetime import date, timedelta
+
+import numpy as np
+
+from .exercise_vectors import ExerciseVectors
 
 
 class ExerciseVariationSuggester:
@@ -29,13 +32,15 @@ class ExerciseVariationSuggester:
             graph: ArnoldGraph instance
         """
         self.graph = graph
+        self._vectors: Optional[ExerciseVectors] = None
 
     def suggest_variations(
         self,
         exercise_name: str,
         limit: int = 5,
         equipment_only: Optional[List[str]] = None,
-        exclude_recent_days: int = 14
+        exclude_recent_days: int = 14,
+        available: Optional[np.ndarray] = None
     ) -> List[Dict]:
         """
         Suggest variations for an exercise.
@@ -45,123 +50,43 @@ class ExerciseVariationSuggester:
             limit: Maximum number of suggestions
             equipment_only: List of equipment IDs to filter by (None = user's equipment)
             exclude_recent_days: Don't suggest exercises done in last N days
+            available: Row mask of allowed suggestions; replaces the equipment
+                and recency filters (e.g. a planner's state for a future day)
 
         Returns:
             List of exercise variation dictionaries
         """
-        # Get target exercise details
-        query = """
-        MATCH (e:Exercise)
-        WHERE toLower(e.name) CONTAINS toLower($exercise_name)
-        RETURN
-            e.id as id,
-            e.name as name,
-            e.primary_muscles as muscles,
-            e.equipment as equipment,
-            e.category as category
-        LIMIT 1
-        """
+        vectors = self.vectors
 
-        result = self.graph.execute_query(query, {'exercise_name': exercise_name})
+        # Get target exercise
+        target_row = vectors.find(exercise_name)
 
-        if not result:
+        if target_row is None:
             return []
 
-        target = result[0]
-        target_muscles = target.get('muscles', [])
-        target_category = target.get('category')
-
-        # Get recently performed exercises to exclude
-        recent_exercises = self._get_recent_exercises(exclude_recent_days)
-
-        # Find variations targeting same muscles
-        query = """
-        MATCH (e:Exercise)
-        WHERE
-            e.id <> $target_id
-            AND ANY(muscle IN $target_muscles WHERE muscle IN e.primary_muscles)
-            AND NOT e.id IN $recent_exercises
-        OPTIONAL MATCH (u:User)-[:HAS_EQUIPMENT]->(eq:Equipment)
-        WHERE e.equipment = eq.name OR e.equipment = 'Body Only'
-        WITH e, count(eq) as equipment_available
-        WHERE equipment_available > 0 OR e.equipment = 'Body Only'
-        RETURN
-            e.id as id,
-            e.name as name,
-            e.primary_muscles as muscles,
-            e.secondary_muscles as secondary_muscles,
-            e.equipment as equipment,
-            e.category as category,
-            e.level as level
-        LIMIT $limit
-        """
-
-        variations = self.graph.execute_query(query, {
-            'target_id': target['id'],
-            'target_muscles': target_muscles,
-            'recent_exercises': list(recent_exercises),
-            'limit': limit * 2  # Get extra to filter
-        })
+        target = vectors.rows[target_row]
+        target_muscles = target['muscles']
 
-        # Calculate relevance score for each variation
-        scored_variations = []
-        for v in variations:
-            score = self._calculate_relevance_score(
-                target_muscles,
-                v['muscles'],
-                v.get('secondary_muscles', []),
-                target_category,
-                v.get('category')
-            )
+        # Score the whole catalog against the target in one pass
+        scores = vectors.relevance(target_muscles, target.get('category'))
 
-            scored_variations.append({
-                **v,
-                'relevance_score': score
-            })
+        # Candidates: share a primary muscle, equipment available, not done recently
+        if available is None:
+            available = vectors.equipment_available & ~vectors.recent_mask(exclude_recent_days)
+        mask = (vectors.primary_overlap(target_muscles) > 0) & available
+        mask[target_row] = False
 
-        # Sort by relevance and return top N
-        scored_variations.sort(key=lambda x: x['relevance_score'], reverse=True)
+        return [
+            {**vectors.rows[i], 'relevance_score': float(scores[i])}
+            for i in vectors.top_k(scores, limit, mask)
+        ]
 
-        return scored_variations[:limit]
-
-    def _calculate_relevance_score(
-        self,
-        target_muscles: List[str],
-        candidate_primary: List[str],
-        candidate_secondary: List[str],
-        target_category: str,
-        candidate_category: str
-    ) -> float:
-        """Calculate relevance score for a variation candidate."""
-        score = 0.0
-
-        # Primary muscle overlap (most important)
-        if target_muscles and candidate_primary:
-            overlap = len(set(target_muscles) & set(candidate_primary))
-            score += (overlap / len(target_muscles)) * 10
-
-        # Secondary muscle bonus
-        if target_muscles and candidate_secondary:
-            overlap = len(set(target_muscles) & set(candidate_secondary))
-            score += (overlap / len(target_muscles)) * 3
-
-        # Same category bonus
-        if target_category and candidate_category == target_category:
-            score += 2
-
-        return score
-
-    def _get_recent_exercises(self, days: int = 14) -> Set[str]:
-        """Get set of exercise IDs performed recently."""
-        query = """
-        MATCH (w:Workout)-[:CONTAINS]->(ei:ExerciseInstance)-[:INSTANCE_OF]->(e:Exercise)
-        WHERE w.date >= date() - duration({days: $days})
-        RETURN DISTINCT e.id as exercise_id
-        """
-
-        results = self.graph.execute_query(query, {'days': days})
-
-        return {r['exercise_id'] for r in results}
+    @property
+    def vectors(self) -> ExerciseVectors:
+        """Catalog feature vectors (loaded on first use)."""
+        if self._vectors is None:
+            self._vectors = ExerciseVectors(self.graph).load()
+        return self._vectors
 
     def suggest_progressions(
         self,
@@ -260,34 +185,82 @@ class ExerciseVariationSuggester:
         Returns:
             List of exercises targeting the muscle group
         """
-        recent_exercises = self._get_recent_exercises(exclude_recent_days)
+        return self.suggest_for_muscle_groups(
+            [muscle_group],
+            limit=limit,
+            exclude_recent_days=exclude_recent_days
+        ).get(muscle_group, [])
+
+    def suggest_for_muscle_groups(
+        self,
+        muscle_groups: List[str],
+        limit: int = 10,
+        exclude_recent_days: int = 7,
+        exclude_ids: Optional[Set[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Suggest exercises for several muscle groups in one query.
+
+        Recent-exercise, equipment and `exclude_ids` (e.g. injury-forbidden)
+        filtering all happen server-side. Candidates are ranked per group:
+        exact primary-muscle match first, then Strength category, then name.
+
+        Args:
+            muscle_groups: Muscle group names (e.g., ['Chest', 'Shoulders'])
+            limit: Maximum candidates per group
+            exclude_recent_days: Don't suggest exercises done in last N days
+            exclude_ids: Exercise IDs to never return
+
+        Returns:
+            Dictionary of muscle_group: [exercise dicts], in input order
+        """
+        if not muscle_groups:
+            return {}
 
         query = """
-        MATCH (e:Exercise)
-        WHERE
-            ANY(muscle IN e.primary_muscles WHERE toLower(muscle) CONTAINS toLower($muscle_group))
-            AND NOT e.id IN $recent_exercises
-        OPTIONAL MATCH (u:User)-[:HAS_EQUIPMENT]->(eq:Equipment)
-        WHERE e.equipment = eq.name OR e.equipment = 'Body Only'
-        WITH e, count(eq) as equipment_available
-        WHERE equipment_available > 0 OR e.equipment = 'Body Only'
-        RETURN
-            e.id as id,
-            e.name as name,
-            e.primary_muscles as muscles,
-            e.equipment as equipment,
-            e.category as category,
-            e.level as level
-        LIMIT $limit
+        CALL {
+            MATCH (w:Workout)-[:CONTAINS]->(:ExerciseInstance)-[:INSTANCE_OF]->(r:Exercise)
+            WHERE w.date >= date() - duration({days: $days})
+            RETURN collect(DISTINCT r.id) as recent_ids
+        }
+        OPTIONAL MATCH (:User)-[:HAS_EQUIPMENT]->(eq:Equipment)
+        WITH recent_ids, collect(DISTINCT eq.name) as owned_equipment
+        UNWIND $muscle_groups as muscle_group
+        CALL {
+            WITH muscle_group, recent_ids, owned_equipment
+            MATCH (e:Exercise)
+            WHERE
+                ANY(muscle IN e.primary_muscles WHERE toLower(muscle) CONTAINS toLower(muscle_group))
+                AND NOT e.id IN recent_ids
+                AND NOT e.id IN $exclude_ids
+                AND (e.equipment = 'Body Only' OR e.equipment IN owned_equipment)
+            WITH e,
+                 CASE WHEN ANY(muscle IN e.primary_muscles WHERE toLower(muscle) = toLower(muscle_group))
+                      THEN 1 ELSE 0 END as exact_match,
+                 CASE WHEN e.category = 'Strength' THEN 1 ELSE 0 END as is_strength
+            ORDER BY exact_match DESC, is_strength DESC, e.name
+            LIMIT $limit
+            RETURN collect({
+                id: e.id,
+                name: e.name,
+                muscles: e.primary_muscles,
+                equipment: e.equipment,
+                category: e.category,
+                level: e.level
+            }) as candidates
+        }
+        RETURN muscle_group, candidates
         """
 
-        exercises = self.graph.execute_query(query, {
-            'muscle_group': muscle_group,
-            'recent_exercises': list(recent_exercises),
+        results = self.graph.execute_query(query, {
+            'muscle_groups': list(muscle_groups),
+            'days': exclude_recent_days,
+            'exclude_ids': list(exclude_ids or []),
             'limit': limit
         })
 
-        return exercises
+        by_group = {r['muscle_group']: r['candidates'] for r in results}
+        return {group: by_group.get(group, []) for group in muscle_groups}
 
     def suggest_for_equipment(
         self,
@@ -350,29 +323,10 @@ class ExerciseVariationSuggester:
         Returns:
             Novelty score (0-10)
         """
-        query = """
-        MATCH (w:Workout)-[:CONTAINS]->(ei:ExerciseInstance)-[:INSTANCE_OF]->(e:Exercise {id: $exercise_id})
-        WHERE w.date >= date() - duration({days: $days})
-        WITH w.date as last_date
-        ORDER BY last_date DESC
-        LIMIT 1
-        RETURN last_date
-        """
-
-        result = self.graph.execute_query(query, {
-            'exercise_id': exercise_id,
-            'days': days
-        })
-
-        if not result or not result[0]['last_date']:
-            return 10.0  # Never done = maximum novelty
-
-        last_date_str = result[0]['last_date']
-        last_date = date.fromisoformat(last_date_str) if isinstance(last_date_str, str) else last_date_str
-
-        days_since = (date.today() - last_date).days
+        vectors = self.vectors
+        row = vectors.row(exercise_id)
 
-        # Score: 0 if done today, 10 if done 30+ days ago
-        score = min(10.0, (days_since / days) * 10)
+        if row is None:
+            return 10.0  # Unknown exercise = never done
 
-        return score
+        return float(vectors.novelty(days)[row])
@@ -0,0 +1,237 @@
+"""
+LLM Response Cache
+
+Content-addressed, persistent cache in front of the OpenAI chat API.
+
+Every request is keyed by a SHA-256 over the model, the messages and the
+remaining request parameters (response_format, temperature, ...), and the
+response text is stored in SQLite (data/cache/llm_responses.sqlite).
+Re-running a classification, ingestion or mapping job over unchanged
+inputs is then served locally.
+
+CachedLLMClient mirrors the part of the OpenAI client the pipelines use
+(`client.chat.completions.create(...)` → `.choices[0].message.content`),
+so callers only swap the constructor:
+
+    from arnold.llm_cache import llm_client
+    client = llm_client(api_key)
+
+Modes (ARNOLD_LLM_CACHE, or the `mode` argument):
+    readwrite  Serve hits, call the API on misses and store them (default)
+    refresh    Always call the API, overwrite stored responses
+    replay     Never call the API; misses go to the stub (ARNOLD_LLM_STUB,
+               "module:function") or raise LLMCacheMiss
+    off        Bypass the cache entirely
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(os.getenv(
+    "ARNOLD_LLM_CACHE_PATH",
+    Path(__file__).parent.parent.parent / "data" / "cache" / "llm_responses.sqlite"
+))
+
+MODES = ("readwrite", "refresh", "replay", "off")
+
+# Parameters that never change the response text
+_UNKEYED_PARAMS = {"timeout", "extra_headers", "user"}
+
+
+class LLMCacheMiss(LookupError):
+    """Raised in replay mode when a request is not cached and no stub is set."""
+
+
+def request_key(params: Dict[str, Any]) -> str:
+    """Content address of a chat completion request."""
+    keyed = {k: v for k, v in params.items() if k not in _UNKEYED_PARAMS}
+    canonical = json.dumps(keyed, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_stub(spec: str) -> Callable[..., str]:
+    """Resolve a "module:function" stub spec."""
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "stub")
+
+
+def _completion(content: str, model: Optional[str], finish_reason: str = "stop") -> SimpleNamespace:
+    """Minimal stand-in for a ChatCompletion (what the pipelines read)."""
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+        usage=None,
+        cached=True,
+    )
+
+
+class LLMCache:
+    """SQLite store of response text by request key, with hit/miss counters."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: SQLite file (default: data/cache/llm_responses.sqlite)
+        """
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response_format TEXT,
+                content TEXT NOT NULL,
+                finish_reason TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "stubbed": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT model, content, finish_reason FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self.stats["hits" if row else "misses"] += 1
+        if row is None:
+            return None
+        return {"model": row[0], "content": row[1], "finish_reason": row[2]}
+
+    def put(self, key: str, params: Dict[str, Any], content: str, finish_reason: Optional[str] = None):
+        response_format = params.get("response_format")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    params.get("model"),
+                    json.dumps(response_format, sort_keys=True) if response_format else None,
+                    content,
+                    finish_reason,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+            self.stats["stored"] += 1
+
+    def note_stubbed(self):
+        """Count a replay miss answered by the stub."""
+        with self._lock:
+            self.stats["stubbed"] += 1
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def summary(self) -> str:
+        """One-line hit/miss report for the end of a run."""
+        s = self.stats
+        lookups = s["hits"] + s["misses"]
+        rate = 100 * s["hits"] / lookups if lookups else 0.0
+        line = f"LLM cache: {s['hits']} hits / {s['misses']} misses ({rate:.0f}% hit rate), {s['stored']} stored"
+        if s["stubbed"]:
+            line += f", {s['stubbed']} stubbed"
+        return line
+
+
+class _Completions:
+    def __init__(self, owner: 'CachedLLMClient'):
+        self._owner = owner
+
+    def create(self, **params):
+        return self._owner.create(**params)
+
+
+class CachedLLMClient:
+    """OpenAI-compatible chat client that reads through an LLMCache."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMCache] = None,
+        mode: Optional[str] = None,
+        stub: Optional[Callable[..., str]] = None
+    ):
+        """
+        Args:
+            api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
+            cache: Response store (default: process-wide shared cache)
+            mode: readwrite / refresh / replay / off (default: ARNOLD_LLM_CACHE)
+            stub: Callable(**params) -> response text for replay misses
+                  (default: ARNOLD_LLM_STUB)
+        """
+        self.mode = mode or os.getenv("ARNOLD_LLM_CACHE", "readwrite")
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode {self.mode!r} (expected one of {', '.join(MODES)})")
+
+        self.cache = cache or shared_cache()
+        self.stub = stub
+        if self.stub is None and os.getenv("ARNOLD_LLM_STUB"):
+            self.stub = load_stub(os.environ["ARNOLD_LLM_STUB"])
+
+        self._api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self._client = None
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    @property
+    def client(self):
+        """Underlying OpenAI client (created on first API call, never in replay)."""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self._api_key)
+        return self._client
+
+    def create(self, **params):
+        """chat.completions.create with the cache in front."""
+        if self.mode == "off":
+            return self.client.chat.completions.create(**params)
+
+        key = request_key(params)
+
+        if self.mode != "refresh":
+            hit = self.cache.get(key)
+            if hit is not None:
+                return _completion(hit["content"], hit["model"], hit["finish_reason"] or "stop")
+
+        if self.mode == "replay":
+            if self.stub is None:
+                raise LLMCacheMiss(f"No cached response for request {key[:12]} (model {params.get('model')})")
+            self.cache.note_stubbed()
+            return _completion(self.stub(**params), params.get("model"))
+
+        response = self.client.chat.completions.create(**params)
+        choice = response.choices[0]
+        # Truncated or empty responses are not worth replaying
+        if choice.message.content and choice.finish_reason in (None, "stop"):
+            self.cache.put(key, params, choice.message.content, choice.finish_reason)
+        return response
+
+
+_SHARED: Dict[str, LLMCache] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_cache(path: Optional[Path] = None) -> LLMCache:
+    """One LLMCache per file per process, so counters aggregate across callers."""
+    path = Path(path) if path else DEFAULT_CACHE_PATH
+    with _SHARED_LOCK:
+        if str(path) not in _SHARED:
+            _SHARED[str(path)] = LLMCache(path)
+        return _SHARED[str(path)]
+
+
+def llm_client(api_key: Optional[str] = None, **kwargs) -> CachedLLMClient:
+    """Cached chat client (see module docstring for modes)."""
+    return CachedLLMClient(api_key=api_key, **kwargs)
@@ -8,14 +8,14 @@ Internal Codename: SKYNET-READER 2.0
 "I'll read everything. I'll understand context. I'll be back... with perfect data."
 """
 
-import os
 import json
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import date
 import time
 
-from openai import OpenAI
+from arnold.exercise_index import DEFAULT_TOP_K, ExerciseIndex, extract_exercise_names
+from arnold.llm_cache import llm_client
 
 
 class LLMWorkoutParser:
@@ -30,15 +30,20 @@ class LLMWorkoutParser:
     - Set/rep/weight extraction
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, top_k: int = DEFAULT_TOP_K):
         """
         Initialize LLM parser.
 
         Args:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
+            top_k: Canonical candidates sent per exercise name found in the log
+
+        Responses are cached on disk (see arnold.llm_cache), so re-parsing an
+        unchanged workout file costs nothing.
         """
-        self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self.client = llm_client(api_key)
         self.model = "gpt-5-mini"  # MoE model - no temperature settings
+        self.top_k = top_k
 
     def parse_workout(
         self,
@@ -58,11 +63,15 @@ class LLMWorkoutParser:
             Structured workout data with exercises, sets, metadata
         """
 
+        # Only the catalog entries relevant to this log go into the prompt
+        candidates = self._retrieve_candidates(workout_markdown, exercise_database)
+
         # Build comprehensive prompt
         prompt = self._build_parsing_prompt(
             workout_markdown,
             exercise_database,
-            workout_filename
+            workout_filename,
+            candidates
         )
 
         # Call OpenAI API with structured output
@@ -88,6 +97,9 @@ class LLMWorkoutParser:
 
             # Validate and post-process
             validated = self._validate_parsed_data(parsed_json)
+            validated.setdefault('parsing_metadata', {})['context_exercises'] = len({
+                c['id'] for group in candidates.values() for c in group
+            }) if candidates else min(len(exercise_database), 100)
 
             return validated
 
@@ -113,16 +125,45 @@ Key skills:
 
 Return ONLY valid JSON. No markdown, no explanations."""
 
+    def _retrieve_candidates(
+        self,
+        workout_markdown: str,
+        exercise_database: List[Dict[str, str]]
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Top-k canonical matches per exercise name found in the log.
+
+        Returns:
+            {name in log: [candidate exercises]}; empty if no names were found
+        """
+        if not exercise_database:
+            return {}
+        names = extract_exercise_names(workout_markdown)
+        return ExerciseIndex.for_database(exercise_database).retrieve(names, self.top_k)
+
     def _build_parsing_prompt(
         self,
         workout_markdown: str,
         exercise_database: List[Dict[str, str]],
-        filename: str
+        filename: str,
+        candidates: Optional[Dict[str, List[Dict[str, str]]]] = None
     ) -> str:
         """Build the parsing prompt with context."""
 
-        # Sample a subset of exercise database for context
-        db_sample = exercise_database[:100] if len(exercise_database) > 100 else exercise_database
+        if candidates:
+            context = f"""CANONICAL EXERCISE CANDIDATES (closest of {len(exercise_database)} database exercises, per exercise name found in the log):
+```json
+{json.dumps(candidates, separators=(',', ':'))}
+```
+Use the candidate IDs for canonical_id. An empty list means nothing in the database is close:
+treat it as custom unless it is an obvious variant of another listed candidate."""
+        else:
+            # No names recognised in the log: fall back to a sample of the database
+            db_sample = exercise_database[:100] if len(exercise_database) > 100 else exercise_database
+            context = f"""CANONICAL EXERCISE DATABASE (sample of {len(exercise_database)} total):
+```json
+{json.dumps(db_sample, indent=2)}
+```"""
 
         prompt = f"""Parse this workout log into structured JSON.
 
@@ -133,10 +174,7 @@ WORKOUT LOG:
 {workout_markdown}
 ```
 
-CANONICAL EXERCISE DATABASE (sample of {len(exercise_database)} total):
-```json
-{json.dumps(db_sample, indent=2)}
-```
+{context}
 
 PARSING INSTRUCTIONS:
 
@@ -289,7 +327,86 @@ Return ONLY the JSON object. No markdown code blocks, no explanations.
 """
         return prompt
 
-    def _validate_parsed_data(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    def parse_exercise_blocks(
+        self,
+        blocks: Dict[int, List[str]],
+        exercise_database: List[Dict[str, str]],
+        workout_filename: str = ""
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Parse only the exercise blocks a rule-based parser could not resolve.
+
+        Used by arnold.hybrid_ingest: one call per file, covering just the
+        ambiguous lines, with catalog candidates retrieved for those lines.
+
+        Args:
+            blocks: Block id -> source lines (exercise line plus its detail lines)
+            exercise_database: Canonical exercises for matching
+            workout_filename: Original filename for context
+
+        Returns:
+            Block id -> exercise objects (same schema as parse_workout)
+        """
+        candidates = self._retrieve_candidates(
+            "\n".join(line for lines in blocks.values() for line in lines),
+            exercise_database
+        )
+
+        prompt = f"""Parse these exercise blocks from a workout log into structured JSON.
+A rule-based parser already handled the rest of the file; these blocks were ambiguous
+(compound lines, unknown names, unclear notation).
+
+WORKOUT FILE: {workout_filename}
+
+BLOCKS (id -> lines):
+```json
+{json.dumps({str(k): v for k, v in blocks.items()}, indent=1)}
+```
+
+CANONICAL EXERCISE CANDIDATES (closest database exercises per name found in the blocks):
+```json
+{json.dumps(candidates, separators=(',', ':'))}
+```
+
+Return: {{"blocks": [{{"id": 0, "exercises": [...]}}]}}
+
+Each exercise: name, canonical_id, canonical_name, is_custom, category, equipment, sets, notes.
+Each set: set_number, weight, weight_unit, reps, volume (weight × reps), rpe, notes;
+or for time-based sets: set_number, duration_seconds, duration_display, notes.
+
+RULES:
+- Split compound lines into separate exercises
+- Expand sets (e.g., "3×15" → 3 set objects)
+- Use candidate IDs for canonical_id; if nothing fits, is_custom true and canonical_id null
+- A block that is not an exercise (notes, prose) gets an empty exercises list
+
+Return ONLY the JSON object. No markdown code blocks, no explanations.
+"""
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self._get_system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+
+        parsed = json.loads(response.choices[0].message.content)
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        for block in parsed.get('blocks', []):
+            try:
+                block_id = int(block['id'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if block_id in blocks:
+                exercises = [e for e in block.get('exercises', []) if isinstance(e, dict) and e.get('name')]
+                for exercise in exercises:
+                    exercise.setdefault('sets', [])
+                results[block_id] = exercises
+        return results
+
+    @staticmethod
+    def _validate_parsed_data(parsed: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate and clean parsed data.
 
@@ -385,7 +502,7 @@ def get_exercise_database_from_graph(graph) -> List[Dict[str, str]]:
         graph: ArnoldGraph instance
 
     Returns:
-        List of exercise dictionaries with id, name, category
+        List of exercise dictionaries with id, name, category, aliases
     """
     query = """
     MATCH (e:Exercise)
@@ -394,11 +511,13 @@ def get_exercise_database_from_graph(graph) -> List[Dict[str, str]]:
         e.name as name,
         e.category as category,
         e.force_type as force_type,
-        e.mechanic as mechanic
+        e.mechanic as mechanic,
+        coalesce(e.aliases, []) as aliases
     ORDER BY e.name
     """
 
-    exercises = graph.execute_query(query)
+    # Static kernel data: served from the graph's query cache after the first load
+    exercises = graph.execute_query(query, cache=True)
     return exercises
 
 
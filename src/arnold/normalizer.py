@@ -3,10 +3,18 @@ Normalization utilities for workout data.
 
 Internal Codename: SKYNET-READER
 Clean and normalize messy workout data.
+
+Patterns are compiled once at import. normalize_exercise_name_for_matching
+is memoized (importers see the same raw names over and over), and canonical
+lookup goes through AliasIndex, a token-level Aho-Corasick automaton over
+the static mappings plus any aliases learned from the graph.
 """
 
 import re
-from typing import List, Optional
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 
 # Patterns that indicate this is NOT an exercise
@@ -35,6 +43,29 @@ NON_EXERCISE_PATTERNS = [
     r'^\d+ (seconds?|sec|mins?|minutes?) ',  # "30 seconds rest"
 ]
 
+# All of the above in one anchored alternation
+_NON_EXERCISE = re.compile('|'.join(f'(?:{p})' for p in NON_EXERCISE_PATTERNS), re.IGNORECASE)
+_ONLY_SYMBOLS = re.compile(r'^[\W_]+$')
+_ONLY_NUMBER = re.compile(r'^\d+\s*$')
+
+# Everything stripped before lowercasing, as one pass:
+# parentheticals ("(5/side)", "(30 sec)"), weights, "weighted" prefix,
+# "with" clauses, static/dynamic descriptors
+_NOISE = re.compile(
+    r'\([^)]*\)'
+    r'|\d+\s*(?:lbs?|kgs?)'
+    r'|^\s*weighted\s+'
+    r'|\s+with\s+.*'
+    r'|\s+(?:static|dynamic|isometric)',
+    re.IGNORECASE
+)
+_EDGES = re.compile(r'^[\W_]+|[\W_]+$')
+_SEPARATORS = re.compile(r'[\s\-_]+')
+_KEEP_PLURAL = ('press', 'swiss', 'cross')
+_WORD = re.compile(r'[^\W_]+')
+
+NORMALIZE_CACHE_SIZE = 16384
+
 
 def is_non_exercise(name: str) -> bool:
     """
@@ -45,25 +76,25 @@ def is_non_exercise(name: str) -> bool:
     name = name.strip()
 
     # Check against patterns
-    for pattern in NON_EXERCISE_PATTERNS:
-        if re.match(pattern, name, re.IGNORECASE):
-            return True
+    if _NON_EXERCISE.match(name):
+        return True
 
     # Too short
     if len(name) < 3:
         return True
 
     # Just punctuation/symbols
-    if re.match(r'^[\W_]+$', name):
+    if _ONLY_SYMBOLS.match(name):
         return True
 
     # Starts with number only (likely reps/sets)
-    if re.match(r'^\d+\s*$', name):
+    if _ONLY_NUMBER.match(name):
         return True
 
     return False
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_exercise_name_for_matching(name: str) -> str:
     """
     Normalize exercise name for fuzzy matching to canonical exercises.
@@ -75,39 +106,14 @@ def normalize_exercise_name_for_matching(name: str) -> str:
     - Strip whitespace
     - Singularize common plurals
     """
-    # Remove parentheticals (includes reps like "(5/side)" and durations like "(30 sec)")
-    name = re.sub(r'\([^)]*\)', '', name)
-
-    # Remove weight indicators
-    name = re.sub(r'\d+\s*(lb|kg|lbs|kgs)', '', name, flags=re.IGNORECASE)
-
-    # Remove "weighted" prefix
-    name = re.sub(r'^\s*weighted\s+', '', name, flags=re.IGNORECASE)
-
-    # Remove "with" clauses
-    name = re.sub(r'\s+with\s+.*', '', name, flags=re.IGNORECASE)
-
-    # Remove static/dynamic descriptors
-    name = re.sub(r'\s+(static|dynamic|isometric)', '', name, flags=re.IGNORECASE)
-
-    # Lowercase
-    name = name.lower()
-
-    # Remove leading/trailing special chars (including trailing periods and colons)
-    name = re.sub(r'^[\W_]+|[\W_]+$', '', name)
-
-    # Replace multiple spaces/special chars with single space
-    name = re.sub(r'[\s\-_]+', ' ', name)
-
-    # Strip
-    name = name.strip()
+    name = _NOISE.sub('', name).lower()
+    name = _SEPARATORS.sub(' ', _EDGES.sub('', name)).strip()
 
     # Common plurals to singular
     if name.endswith('s') and not name.endswith('ss'):
-        singular = name[:-1]
         # But keep if it's a common plural form
-        if not any(x in name for x in ['press', 'swiss', 'cross']):
-            name = singular
+        if not any(x in name for x in _KEEP_PLURAL):
+            name = name[:-1].rstrip()
 
     return name
 
@@ -182,20 +188,172 @@ COMMON_EXERCISE_MAPPINGS = {
 }
 
 
-def find_canonical_exercise_id(normalized_name: str) -> Optional[str]:
+def _alias_tokens(text: str) -> List[str]:
+    """Word tokens with plural "s" dropped, so "rows**" matches "row"."""
+    return [
+        token[:-1] if len(token) > 2 and token.endswith('s') and not token.endswith('ss') else token
+        for token in _WORD.findall(text)
+    ]
+
+
+class AliasIndex:
+    """
+    Longest-match alias lookup.
+
+    Aliases are normalized and split into word tokens; a token-level
+    Aho-Corasick automaton finds every alias occurring in a name in one
+    pass, and the longest (most tokens, then characters) wins. Ties go to
+    the alias registered first, so static mappings beat graph aliases.
+    """
+
+    def __init__(self, mappings: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            mappings: {alias: exercise_id} to start with (full IDs)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._terminal: List[Optional[Tuple[int, int, int, str]]] = [None]  # (tokens, chars, -order, id)
+        self._output: List[Optional[Tuple[int, int, int, str]]] = []
+        self._exact: Dict[str, str] = {}
+        self._spans: Dict[str, str] = {}    # word spans of aliases, for names shorter than any alias
+        self._built = False
+        self._lock = threading.Lock()
+        for alias, exercise_id in (mappings or {}).items():
+            self.add(alias, exercise_id)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, alias: str, exercise_id: str) -> bool:
+        """
+        Register an alias (normalized here). First registration of a key wins.
+
+        Returns:
+            True if the alias was new
+        """
+        key = normalize_exercise_name_for_matching(alias or '')
+        if not key or key in self._exact:
+            return False
+
+        with self._lock:
+            self._exact[key] = exercise_id
+            tokens = _alias_tokens(key)
+            node = 0
+            for token in tokens:
+                nxt = self._goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][token] = nxt
+                    self._goto.append({})
+                    self._terminal.append(None)
+                node = nxt
+            self._terminal[node] = (len(tokens), len(key), -len(self._exact), exercise_id)
+
+            for start in range(len(tokens)):
+                for end in range(start + 1, len(tokens) + 1):
+                    self._spans.setdefault(' '.join(tokens[start:end]), exercise_id)
+            self._built = False
+        return True
+
+    def add_graph_aliases(self, graph) -> int:
+        """
+        Register every Exercise name and alias from the graph.
+
+        Args:
+            graph: ArnoldGraph (or anything with execute_query)
+
+        Returns:
+            Number of new aliases
+        """
+        rows = graph.execute_query("""
+        MATCH (e:Exercise)
+        RETURN e.id as id, e.name as name, coalesce(e.aliases, []) as aliases
+        ORDER BY e.id
+        """)
+        added = 0
+        for row in rows:
+            for alias in [row['name']] + list(row['aliases']):
+                added += self.add(alias, row['id'])
+        return added
+
+    def _build(self):
+        """Failure links (BFS) and per-node best output."""
+        fail = [0] * len(self._goto)
+        output = list(self._terminal)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                state = fail[node]
+                while state and token not in self._goto[state]:
+                    state = fail[state]
+                fail[child] = self._goto[state].get(token, 0)
+                # Own alias is the longest ending here; otherwise inherit the suffix's
+                if output[child] is None:
+                    output[child] = output[fail[child]]
+                queue.append(child)
+        self._fail = fail
+        self._output = output
+        self._built = True
+
+    def lookup(self, normalized_name: str) -> Optional[str]:
+        """
+        Exercise ID for a normalized name.
+
+        Order: exact alias, longest alias contained in the name, then an
+        alias containing the name as whole words.
+        """
+        if not normalized_name:
+            return None
+        exact = self._exact.get(normalized_name)
+        if exact is not None:
+            return exact
+
+        with self._lock:
+            if not self._built:
+                self._build()
+            goto, fail, output = self._goto, self._fail, self._output
+
+        best = None
+        node = 0
+        tokens = _alias_tokens(normalized_name)
+        for token in tokens:
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            hit = output[node]
+            if hit is not None and (best is None or hit[:3] > best[:3]):
+                best = hit
+        if best is not None:
+            return best[3]
+
+        return self._spans.get(' '.join(tokens))
+
+
+_default_index: Optional[AliasIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def default_alias_index() -> AliasIndex:
+    """Shared index over COMMON_EXERCISE_MAPPINGS (add graph aliases to it as needed)."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = AliasIndex({
+                alias: f"EXERCISE:{suffix}" for alias, suffix in COMMON_EXERCISE_MAPPINGS.items()
+            })
+        return _default_index
+
+
+def find_canonical_exercise_id(normalized_name: str, index: Optional[AliasIndex] = None) -> Optional[str]:
     """
     Map normalized exercise name to canonical exercise ID.
 
+    Args:
+        normalized_name: Output of normalize_exercise_name_for_matching
+        index: Alias index to use (default: static mappings only)
+
     Returns:
         exercise_id if match found, None otherwise
     """
-    # Direct mapping
-    if normalized_name in COMMON_EXERCISE_MAPPINGS:
-        return f"EXERCISE:{COMMON_EXERCISE_MAPPINGS[normalized_name]}"
-
-    # Partial match
-    for key, value in COMMON_EXERCISE_MAPPINGS.items():
-        if key in normalized_name or normalized_name in key:
-            return f"EXERCISE:{value}"
-
-    return None
+    return (index or default_alias_index()).lookup(normalized_name)
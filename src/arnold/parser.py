@@ -308,3 +308,54 @@ def normalize_exercise_name(name: str) -> str:
     name = re.sub(r'\s+', ' ', name)
 
     return name
+
+
+# One precompiled alternation for every set notation the logs use. At each
+# position the first alternative that matches wins, so longer forms come first.
+SET_TOKEN_PATTERN = re.compile(r"""
+      (?P<rpe>\bRPE\s*(?P<rpe_n>\d+(?:\.\d+)?))
+    | (?P<sets_at>(?P<sa_sets>\d+)\s*[×x]\s*(?P<sa_reps>\d+)(?P<sa_side>\s*/\s*side)?
+        \s*@\s*(?P<sa_load>\d+(?:\.\d+)?)\s*(?P<sa_unit>lbs?|kgs?)?)
+    | (?P<bw>\b(?:BW|bodyweight)\s*[×x]\s*(?P<bw_reps>\d+)(?P<bw_side>\s*/\s*side)?)
+    | (?P<load_reps>(?P<lr_load>\d+(?:\.\d+)?)\s*(?P<lr_unit>lbs?|kgs?)?\s*[×x]\s*(?P<lr_reps>\d+)
+        (?P<lr_side>\s*/\s*side)?)
+    | (?P<clock>\b(?P<clock_m>\d+):(?P<clock_s>[0-5]\d)\b)
+    | (?P<duration>(?P<dur_n>\d+(?:\.\d+)?)\s*(?P<dur_unit>min(?:ute)?s?|sec(?:ond)?s?|s)\b)
+    | (?P<steps>(?P<steps_n>\d+)\s*steps?\b)
+    | (?P<rounds>(?P<rounds_n>\d+)\s*(?:rounds?|sets?)\b)
+    | (?P<side>(?P<side_n>\d+)\s*/\s*side\b)
+    | (?P<reps>(?P<reps_n>\d+)\s*reps?\b)
+    | (?P<load>(?P<load_n>\d+(?:\.\d+)?)\s*(?P<load_unit>lbs?|kgs?)\b)
+""", re.IGNORECASE | re.VERBOSE)
+
+SET_TOKEN_KINDS = (
+    'rpe', 'sets_at', 'bw', 'load_reps', 'clock', 'duration',
+    'steps', 'rounds', 'side', 'reps', 'load'
+)
+
+
+def tokenize_set_notation(text: str) -> tuple[List[Dict[str, Any]], str]:
+    """
+    Split text into set-notation tokens and the text they don't cover.
+
+    Examples:
+        "135×5, 225×5" → [load_reps 135×5, load_reps 225×5], ", "
+        "3×15 @ 35 lb" → [sets_at 3×15@35 lb], ""
+        "4 min"        → [duration 4 min], ""
+
+    Returns:
+        (tokens, leftover): each token has 'kind', 'text' and the named
+        groups of its alternative (e.g. lr_load, lr_unit, lr_reps)
+    """
+    tokens = []
+    leftover = []
+    last = 0
+    for match in SET_TOKEN_PATTERN.finditer(text):
+        kind = next(k for k in SET_TOKEN_KINDS if match.group(k) is not None)
+        token = {'kind': kind, 'text': match.group(0)}
+        token.update({k: v for k, v in match.groupdict().items() if v is not None and k not in SET_TOKEN_KINDS})
+        tokens.append(token)
+        leftover.append(text[last:match.start()])
+        last = match.end()
+    leftover.append(text[last:])
+    return tokens, ' '.join(part.strip() for part in leftover if part.strip())
@@ -21,6 +21,7 @@ from biomechanics import (
     get_movement_patterns_for_exercise,
     get_joint_actions_for_movement
 )
+from .progressions import ProgressionGraph
 
 
 class BiomechanicalQueries:
@@ -36,6 +37,7 @@ class BiomechanicalQueries:
             graph: ArnoldGraph instance
         """
         self.graph = graph
+        self.progressions = ProgressionGraph(graph)
 
     def find_exercises_by_muscle_avoiding_action(
         self,
@@ -131,21 +133,8 @@ class BiomechanicalQueries:
             List of safe alternative exercises
         """
         # Find the target exercise
-        find_exercise = """
-        MATCH (e:Exercise)
-        WHERE toLower(e.name) CONTAINS toLower($name)
-        OPTIONAL MATCH (e)-[:TARGETS]->(muscle:Muscle)
-        OPTIONAL MATCH (e)-[:INVOLVES]->(m:Movement)
-        WITH e, collect(DISTINCT muscle.name) as muscles, collect(DISTINCT m.name) as movements
-        RETURN
-            e.id as id,
-            e.name as name,
-            muscles,
-            movements as movement_patterns
-        LIMIT 1
-        """
-
-        target = self.graph.execute_query(find_exercise, {'name': exercise_name})
+        target_id = self.progressions.resolve(exercise_name)
+        target = self.progressions.exercise_details([target_id]) if target_id else []
 
         if not target:
             return []
@@ -207,23 +196,25 @@ class BiomechanicalQueries:
         # Filter out exercises that involve contraindicated actions
         action_ids = [f"JOINT_ACTION:{action.name}" for action in injury_contraindicated_actions]
 
-        safe_alternatives = []
-
-        for candidate in candidates:
-            # Check if candidate involves any contraindicated actions
-            check_query = """
-            MATCH (e:Exercise {id: $exercise_id})-[:INVOLVES]->(m:Movement)-[:REQUIRES_ACTION]->(ja:JointAction)
-            WHERE ja.id IN $action_ids
-            RETURN count(*) as violation_count
-            """
+        # One query for every candidate's violations
+        check_query = """
+        MATCH (e:Exercise)-[:INVOLVES]->(m:Movement)-[:REQUIRES_ACTION]->(ja:JointAction)
+        WHERE e.id IN $exercise_ids AND ja.id IN $action_ids
+        RETURN DISTINCT e.id as exercise_id
+        """
 
-            result = self.graph.execute_query(check_query, {
-                'exercise_id': candidate['id'],
+        violating = {
+            r['exercise_id'] for r in self.graph.execute_query(check_query, {
+                'exercise_ids': [c['id'] for c in candidates],
                 'action_ids': action_ids
             })
+        }
+
+        safe_alternatives = []
 
+        for candidate in candidates:
             # If no violations, add to alternatives
-            if result and result[0]['violation_count'] == 0:
+            if candidate['id'] not in violating:
                 # Calculate similarity score
                 candidate_patterns = set(candidate['movements'])
                 target_patterns_set = set(target_patterns)
@@ -261,6 +252,10 @@ class BiomechanicalQueries:
         - 'intensity': Increase load/difficulty (beginner → intermediate → expert)
         - 'volume': Increase sets/reps (same exercise, suggest set/rep schemes)
         - 'complexity': Increase movement complexity (add patterns, instability)
+        - 'load': Move up the equipment ladder (bodyweight → dumbbell → kettlebell → barbell)
+
+        Chains are a beam search over precomputed PROGRESSES_TO edges
+        (see progressions.py); unknown types return just the base exercise.
 
         Args:
             base_exercise_name: Starting exercise
@@ -270,171 +265,7 @@ class BiomechanicalQueries:
         Returns:
             Ordered list of exercises forming progression chain
         """
-        # Find base exercise
-        find_base = """
-        MATCH (e:Exercise)
-        WHERE toLower(e.name) CONTAINS toLower($name)
-        OPTIONAL MATCH (e)-[:TARGETS]->(muscle:Muscle)
-        OPTIONAL MATCH (e)-[:INVOLVES]->(m:Movement)
-        WITH e, collect(DISTINCT muscle.name) as muscles, collect(DISTINCT m.name) as movements
-        RETURN
-            e.id as id,
-            e.name as name,
-            e.difficulty as level,
-            muscles,
-            e.category as equipment,
-            e.complexity_score as complexity,
-            movements as movement_patterns
-        LIMIT 1
-        """
-
-        base = self.graph.execute_query(find_base, {'name': base_exercise_name})
-
-        if not base:
-            return []
-
-        base_ex = base[0]
-
-        progression_chain = [base_ex]
-
-        if progression_type == 'intensity':
-            # Progress by difficulty level
-            level_order = ['Beginner', 'Intermediate', 'Expert']
-            current_level = base_ex.get('level', 'Beginner')
-
-            try:
-                current_level_idx = level_order.index(current_level)
-            except ValueError:
-                current_level_idx = 0
-
-            # Find exercises at higher levels with same movement patterns
-            for i in range(steps - 1):
-                target_level_idx = min(current_level_idx + i + 1, len(level_order) - 1)
-                target_level = level_order[target_level_idx]
-
-                find_next = """
-                MATCH (e:Exercise)-[:TARGETS]->(muscle:Muscle)
-                WHERE
-                    e.difficulty = $target_level
-                    AND toLower(muscle.name) IN [m IN $target_muscles | toLower(m)]
-                    AND e.id <> $base_id
-                WITH DISTINCT e
-                OPTIONAL MATCH (e)-[:TARGETS]->(muscle2:Muscle)
-                OPTIONAL MATCH (e)-[:INVOLVES]->(m:Movement)
-                WITH e, collect(DISTINCT muscle2.name) as muscles, collect(DISTINCT m.name) as movements
-                WHERE ANY(pattern IN $base_patterns WHERE pattern IN movements)
-                RETURN
-                    e.id as id,
-                    e.name as name,
-                    e.difficulty as level,
-                    muscles,
-                    e.category as equipment,
-                    e.complexity_score as complexity,
-                    movements as movement_patterns
-                LIMIT 1
-                """
-
-                next_ex = self.graph.execute_query(find_next, {
-                    'target_level': target_level,
-                    'target_muscles': base_ex['muscles'],
-                    'base_id': base_ex['id'],
-                    'base_patterns': base_ex['movement_patterns']
-                })
-
-                if next_ex:
-                    progression_chain.append(next_ex[0])
-                else:
-                    break
-
-        elif progression_type == 'complexity':
-            # Progress by complexity score
-            base_complexity = base_ex.get('complexity_score', 5)
-
-            find_next_complex = """
-            MATCH (e:Exercise)-[:TARGETS]->(muscle:Muscle)
-            WHERE
-                e.complexity_score > $min_complexity
-                AND toLower(muscle.name) IN [m IN $target_muscles | toLower(m)]
-                AND e.id <> $base_id
-            WITH DISTINCT e
-            OPTIONAL MATCH (e)-[:TARGETS]->(muscle2:Muscle)
-            OPTIONAL MATCH (e)-[:INVOLVES]->(m:Movement)
-            WITH e, collect(DISTINCT muscle2.name) as muscles, collect(DISTINCT m.name) as movements
-            WHERE ANY(pattern IN $base_patterns WHERE pattern IN movements)
-            RETURN
-                e.id as id,
-                e.name as name,
-                e.difficulty as level,
-                muscles,
-                e.category as equipment,
-                e.complexity_score as complexity,
-                movements as movement_patterns
-            ORDER BY e.complexity_score ASC
-            LIMIT $steps
-            """
-
-            next_exercises = self.graph.execute_query(find_next_complex, {
-                'min_complexity': base_complexity,
-                'target_muscles': base_ex['muscles'],
-                'base_id': base_ex['id'],
-                'base_patterns': base_ex['movement_patterns'],
-                'steps': steps - 1
-            })
-
-            progression_chain.extend(next_exercises)
-
-        elif progression_type == 'load':
-            # Progress by adding external load (use category field)
-            equipment_progression = ['bodyweight', 'dumbbell', 'kettlebell', 'barbell']
-
-            base_category = (base_ex.get('equipment', '') or 'bodyweight').lower()
-
-            current_eq_idx = 0
-            for idx, eq in enumerate(equipment_progression):
-                if eq in base_category:
-                    current_eq_idx = idx
-                    break
-
-            # Find same exercise with heavier equipment
-            for i in range(steps - 1):
-                target_eq_idx = min(current_eq_idx + i + 1, len(equipment_progression) - 1)
-                target_eq = equipment_progression[target_eq_idx]
-
-                find_next_load = """
-                MATCH (e:Exercise)-[:TARGETS]->(muscle:Muscle)
-                WHERE
-                    toLower(e.category) CONTAINS $target_equipment
-                    AND toLower(muscle.name) IN [m IN $target_muscles | toLower(m)]
-                    AND e.id <> $base_id
-                WITH DISTINCT e
-                OPTIONAL MATCH (e)-[:TARGETS]->(muscle2:Muscle)
-                OPTIONAL MATCH (e)-[:INVOLVES]->(m:Movement)
-                WITH e, collect(DISTINCT muscle2.name) as muscles, collect(DISTINCT m.name) as movements
-                WHERE ANY(pattern IN $base_patterns WHERE pattern IN movements)
-                RETURN
-                    e.id as id,
-                    e.name as name,
-                    e.difficulty as level,
-                    muscles,
-                    e.category as equipment,
-                    e.complexity_score as complexity,
-                    movements as movement_patterns
-                LIMIT 1
-                """
-
-                next_ex = self.graph.execute_query(find_next_load, {
-                    'target_equipment': target_eq,
-                    'target_muscles': base_ex['muscles'],
-                    'base_id': base_ex['id'],
-                    'base_patterns': base_ex['movement_patterns']
-                })
-
-                if next_ex:
-                    progression_chain.append(next_ex[0])
-                else:
-                    break
-
-        return progression_chain
+        return self.progressions.find_chain(base_exercise_name, progression_type, steps)
 
     def query_success_criteria_1(self) -> List[Dict]:
         """
@@ -0,0 +1,436 @@
+"""
+Progression Graph
+
+Internal Codename: JUDGMENT-DAY
+Precomputed, weighted PROGRESSES_TO edges for progression-chain search.
+
+For each progression type an edge (a)-[:PROGRESSES_TO {type, weight}]->(b)
+means b is a sensible next step after a:
+
+    intensity   b is one difficulty level up (or same level, more complex)
+    complexity  b has a higher complexity_score
+    load        b uses the next (or next-but-one) equipment tier:
+                bodyweight → dumbbell → kettlebell → barbell
+
+Both ends must share at least one Movement and one targeted Muscle. Edge
+weight is a cost (lower = closer step):
+
+    weight = 1 - (0.5 × movement Jaccard + 0.5 × muscle Jaccard) + step penalty
+
+Only the MAX_OUT_EDGES cheapest edges per exercise and type are kept. The
+edges are derived from the whole exercise kernel in one load (pairwise
+scores are dense matrix products over exercise × movement/muscle
+matrices), written with batched UNWINDs, and stamped with a kernel
+fingerprint on a (:ProgressionGraph) node. Chains are then a beam search
+over an in-memory adjacency list loaded with one query per type.
+
+Rebuilds are generational: new edges are written alongside the current
+ones with the next `generation`, the (:ProgressionGraph) node is switched
+to it, and only then are older generations deleted, so readers never see
+a partial or empty edge set. Readers never rebuild; run
+`arnold progressions --if-stale` after kernel imports (or without the flag
+to force a rebuild).
+"""
+
+import hashlib
+import heapq
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+GRAPH_VERSION = 2
+META_ID = 'PROGRESSION_GRAPH'
+
+PROGRESSION_TYPES = ('intensity', 'complexity', 'load')
+LEVEL_ORDER = ['Beginner', 'Intermediate', 'Expert']
+EQUIPMENT_PROGRESSION = ['bodyweight', 'dumbbell', 'kettlebell', 'barbell']
+
+MAX_OUT_EDGES = 8
+WRITE_BATCH_SIZE = 5000
+BLOCK_ROWS = 512
+
+# Step penalties (added to 1 - similarity)
+SAME_LEVEL_PENALTY = 0.5        # intensity: same level, higher complexity
+COMPLEXITY_JUMP_PENALTY = 0.1   # complexity: per point beyond +1
+EQUIPMENT_SKIP_PENALTY = 0.5    # load: skipping a tier
+
+EXERCISE_FEATURES_QUERY = """
+MATCH (e:Exercise)
+{where}
+OPTIONAL MATCH (e)-[:TARGETS]->(muscle:Muscle)
+WITH e, collect(DISTINCT muscle.name) as muscles
+OPTIONAL MATCH (e)-[:INVOLVES]->(m:Movement)
+WITH e, muscles, collect(DISTINCT m.name) as movements
+RETURN
+    e.id as id,
+    e.name as name,
+    e.difficulty as level,
+    muscles,
+    e.category as equipment,
+    e.complexity_score as complexity,
+    movements as movement_patterns
+ORDER BY e.id
+"""
+
+# Features that define the edges (everything in a features row except name)
+EDGE_FEATURES = ('id', 'level', 'equipment', 'complexity', 'movement_patterns', 'muscles')
+
+
+def equipment_rank(category: Optional[str]) -> int:
+    """Equipment tier for a category (-1 = not on the progression)."""
+    category = (category or '').lower()
+    if not category:
+        return 0
+    for idx, eq in enumerate(EQUIPMENT_PROGRESSION):
+        if eq in category:
+            return idx
+    return -1
+
+
+def level_rank(level: Optional[str]) -> int:
+    """Difficulty tier (unknown levels count as Beginner)."""
+    try:
+        return LEVEL_ORDER.index(level)
+    except ValueError:
+        return 0
+
+
+def _binary_matrix(rows: List[List[str]]) -> np.ndarray:
+    """Exercise × vocabulary 0/1 matrix."""
+    vocab = {v: j for j, v in enumerate(sorted({v for row in rows for v in row if v}))}
+    matrix = np.zeros((len(rows), len(vocab)), dtype=np.float32)
+    for i, row in enumerate(rows):
+        for v in row:
+            if v in vocab:
+                matrix[i, vocab[v]] = 1.0
+    return matrix
+
+
+def derive_edges(exercises: List[Dict], max_out: int = MAX_OUT_EDGES) -> Dict[str, List[Dict]]:
+    """
+    Score every exercise pair and keep the cheapest out-edges per type.
+
+    Args:
+        exercises: Rows from EXERCISE_FEATURES_QUERY
+        max_out: Edges kept per exercise and type
+
+    Returns:
+        {progression_type: [{'source', 'target', 'weight', 'shared_movements', 'muscle_overlap'}]}
+    """
+    n = len(exercises)
+    edges = {t: [] for t in PROGRESSION_TYPES}
+    if n < 2:
+        return edges
+
+    ids = [ex['id'] for ex in exercises]
+    movements = _binary_matrix([ex.get('movement_patterns') or [] for ex in exercises])
+    muscles = _binary_matrix([ex.get('muscles') or [] for ex in exercises])
+    n_movements = movements.sum(axis=1)
+    n_muscles = muscles.sum(axis=1)
+
+    levels = np.array([level_rank(ex.get('level')) for ex in exercises])
+    complexity = np.array(
+        [ex['complexity'] if ex.get('complexity') is not None else np.nan for ex in exercises],
+        dtype=np.float64
+    )
+    equipment = np.array([equipment_rank(ex.get('equipment')) for ex in exercises])
+
+    for start in range(0, n, BLOCK_ROWS):
+        rows = slice(start, min(start + BLOCK_ROWS, n))
+        shared_mov = movements[rows] @ movements.T
+        shared_mus = muscles[rows] @ muscles.T
+
+        union_mov = n_movements[rows, None] + n_movements[None, :] - shared_mov
+        union_mus = n_muscles[rows, None] + n_muscles[None, :] - shared_mus
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = 0.5 * np.where(union_mov > 0, shared_mov / union_mov, 0) \
+                + 0.5 * np.where(union_mus > 0, shared_mus / union_mus, 0)
+
+        related = (shared_mov > 0) & (shared_mus > 0)
+        related[np.arange(rows.stop - rows.start), np.arange(rows.start, rows.stop)] = False
+        base_cost = 1.0 - similarity
+
+        level_gap = levels[None, :] - levels[rows, None]
+        with np.errstate(invalid='ignore'):
+            complexity_gap = complexity[None, :] - complexity[rows, None]
+        complexity_up = np.nan_to_num(complexity_gap, nan=0.0) > 0
+        equipment_gap = equipment[None, :] - equipment[rows, None]
+        on_ladder = (equipment[rows, None] >= 0) & (equipment[None, :] >= 0)
+
+        costs = {
+            'intensity': np.where(
+                related & ((level_gap == 1) | ((level_gap == 0) & complexity_up)),
+                base_cost + np.where(level_gap == 0, SAME_LEVEL_PENALTY, 0.0),
+                np.inf
+            ),
+            'complexity': np.where(
+                related & complexity_up,
+                base_cost + COMPLEXITY_JUMP_PENALTY * np.maximum(np.nan_to_num(complexity_gap) - 1, 0),
+                np.inf
+            ),
+            'load': np.where(
+                related & on_ladder & ((equipment_gap == 1) | (equipment_gap == 2)),
+                base_cost + EQUIPMENT_SKIP_PENALTY * (equipment_gap - 1),
+                np.inf
+            ),
+        }
+
+        for progression_type, cost in costs.items():
+            k = min(max_out, n - 1)
+            cheapest = np.argpartition(cost, k - 1, axis=1)[:, :k]
+            for r, cols in enumerate(cheapest):
+                i = rows.start + r
+                for j in cols[np.isfinite(cost[r, cols])]:
+                    edges[progression_type].append({
+                        'source': ids[i],
+                        'target': ids[j],
+                        'weight': round(float(cost[r, j]), 4),
+                        'shared_movements': int(shared_mov[r, j]),
+                        'muscle_overlap': round(float(
+                            shared_mus[r, j] / union_mus[r, j]) if union_mus[r, j] else 0.0, 4),
+                    })
+
+    return edges
+
+
+def beam_search(
+    adjacency: Dict[str, List[Tuple[str, float]]],
+    start: str,
+    steps: int,
+    beam_width: int = 5
+) -> List[str]:
+    """
+    Cheapest simple path of up to `steps` nodes from `start`.
+
+    Keeps the `beam_width` cheapest partial paths per depth; the result is
+    the cheapest of the longest paths reached.
+    """
+    beams: List[Tuple[float, List[str]]] = [(0.0, [start])]
+
+    for _ in range(steps - 1):
+        expanded = [
+            (cost + weight, path + [target])
+            for cost, path in beams
+            for target, weight in adjacency.get(path[-1], [])
+            if target not in path
+        ]
+        if not expanded:
+            break
+        beams = heapq.nsmallest(beam_width, expanded, key=lambda b: b[0])
+
+    return min(beams, key=lambda b: b[0])[1]
+
+
+class ProgressionGraph:
+    """
+    Persisted PROGRESSES_TO edges plus memoized chain search.
+
+    Usage:
+        progressions = ProgressionGraph(graph)
+        chain = progressions.find_chain('Bodyweight Lunge', 'intensity', steps=5)
+    """
+
+    def __init__(self, graph, beam_width: int = 5):
+        """
+        Args:
+            graph: ArnoldGraph instance
+            beam_width: Partial paths kept per depth during search
+        """
+        self.graph = graph
+        self.beam_width = beam_width
+        self._adjacency: Dict[str, Dict[str, List[Tuple[str, float]]]] = {}
+        self._chains: Dict[Tuple[str, str, int], List[str]] = {}
+        self._names: Optional[List[Tuple[str, str, List[str]]]] = None
+
+    # --- Fingerprint ---
+
+    @staticmethod
+    def features_fingerprint(exercises: List[Dict]) -> str:
+        """Hash of the edge-defining features of every exercise (rows sorted by id)."""
+        digest = hashlib.sha1(json.dumps([GRAPH_VERSION, MAX_OUT_EDGES]).encode())
+        for ex in sorted(exercises, key=lambda ex: ex['id']):
+            row = [
+                sorted(ex.get(k) or []) if k in ('movement_patterns', 'muscles') else ex.get(k)
+                for k in EDGE_FEATURES
+            ]
+            digest.update(json.dumps(row, default=str).encode())
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def kernel_fingerprint(self) -> str:
+        """Fingerprint of the exercise features the edges derive from."""
+        return self.features_fingerprint(
+            self.graph.execute_query(EXERCISE_FEATURES_QUERY.format(where=''))
+        )
+
+    def stored_state(self) -> Dict:
+        """{'fingerprint', 'generation'} of the live edge set (empty if never built)."""
+        result = self.graph.execute_query(
+            "MATCH (m:ProgressionGraph {id: $id}) "
+            "RETURN m.fingerprint as fingerprint, m.generation as generation",
+            {'id': META_ID}
+        )
+        return result[0] if result else {}
+
+    def stored_fingerprint(self) -> Optional[str]:
+        return self.stored_state().get('fingerprint')
+
+    def ensure_built(self) -> Optional[Dict[str, int]]:
+        """
+        Maintenance entry point: rebuild the edges if missing or stale.
+
+        Returns the rebuild counts, or None if the stored edges are current.
+        """
+        exercises = self.graph.execute_query(EXERCISE_FEATURES_QUERY.format(where=''))
+        if self.stored_fingerprint() == self.features_fingerprint(exercises):
+            return None
+        return self.rebuild(exercises)
+
+    # --- Build ---
+
+    def rebuild(self, exercises: Optional[List[Dict]] = None) -> Dict[str, int]:
+        """
+        Recompute and persist PROGRESSES_TO edges for every type.
+
+        The new edges are written as the next generation next to the live
+        ones; the (:ProgressionGraph) node is switched to it once every
+        batch is in, and older generations are deleted last.
+
+        Args:
+            exercises: Feature rows (loaded from the graph if omitted)
+
+        Returns:
+            {progression_type: edge count}
+        """
+        if exercises is None:
+            exercises = self.graph.execute_query(EXERCISE_FEATURES_QUERY.format(where=''))
+        fingerprint = self.features_fingerprint(exercises)
+        generation = (self.stored_state().get('generation') or 0) + 1
+        edges = derive_edges(exercises)
+
+        # Leftovers of an interrupted rebuild that reused this generation number
+        self.graph.execute_write("""
+        MATCH ()-[r:PROGRESSES_TO {generation: $generation}]->()
+        CALL { WITH r DELETE r } IN TRANSACTIONS OF 10000 ROWS
+        """, {'generation': generation})
+
+        for progression_type, type_edges in edges.items():
+            for start in range(0, len(type_edges), WRITE_BATCH_SIZE):
+                self.graph.execute_write("""
+                UNWIND $edges as edge
+                MATCH (a:Exercise {id: edge.source})
+                MATCH (b:Exercise {id: edge.target})
+                CREATE (a)-[:PROGRESSES_TO {
+                    type: $type,
+                    generation: $generation,
+                    weight: edge.weight,
+                    shared_movements: edge.shared_movements,
+                    muscle_overlap: edge.muscle_overlap
+                }]->(b)
+                """, {
+                    'edges': type_edges[start:start + WRITE_BATCH_SIZE],
+                    'type': progression_type,
+                    'generation': generation,
+                })
+
+        # Switch readers to the new generation, then drop the old ones
+        counts = {t: len(e) for t, e in edges.items()}
+        self.graph.execute_write("""
+        MERGE (m:ProgressionGraph {id: $id})
+        SET m.fingerprint = $fingerprint,
+            m.generation = $generation,
+            m.built_at = datetime(),
+            m += $counts
+        """, {
+            'id': META_ID,
+            'fingerprint': fingerprint,
+            'generation': generation,
+            'counts': {f"{t}_edges": c for t, c in counts.items()}
+        })
+        self.graph.execute_write("""
+        MATCH ()-[r:PROGRESSES_TO]->()
+        WHERE coalesce(r.generation, 0) <> $generation
+        CALL { WITH r DELETE r } IN TRANSACTIONS OF 10000 ROWS
+        """, {'generation': generation})
+
+        self._adjacency.clear()
+        self._chains.clear()
+        self._names = None
+        return counts
+
+    # --- Lookup ---
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        Exercise ID for a name: exact name, then alias, then the shortest
+        name containing it (case-insensitive).
+        """
+        if self._names is None:
+            rows = self.graph.execute_query("""
+            MATCH (e:Exercise)
+            RETURN e.id as id, toLower(e.name) as name, [a IN coalesce(e.aliases, []) | toLower(a)] as aliases
+            """)
+            self._names = sorted(
+                ((r['id'], r['name'] or '', r['aliases']) for r in rows),
+                key=lambda r: (len(r[1]), r[0])
+            )
+
+        needle = (name or '').lower().strip()
+        if not needle:
+            return None
+        for matches in (
+            lambda r: r[1] == needle,
+            lambda r: needle in r[2],
+            lambda r: needle in r[1],
+        ):
+            for row in self._names:
+                if matches(row):
+                    return row[0]
+        return None
+
+    def adjacency(self, progression_type: str) -> Dict[str, List[Tuple[str, float]]]:
+        """Out-edges (target, weight) per exercise for one type, loaded once."""
+        if progression_type not in self._adjacency:
+            rows = self.graph.execute_query("""
+            OPTIONAL MATCH (m:ProgressionGraph {id: $id})
+            WITH coalesce(m.generation, 0) as generation
+            MATCH (a:Exercise)-[r:PROGRESSES_TO {type: $type}]->(b:Exercise)
+            WHERE coalesce(r.generation, 0) = generation
+            RETURN a.id as source, b.id as target, r.weight as weight
+            """, {'id': META_ID, 'type': progression_type})
+            adjacency: Dict[str, List[Tuple[str, float]]] = {}
+            for r in rows:
+                adjacency.setdefault(r['source'], []).append((r['target'], r['weight']))
+            self._adjacency[progression_type] = adjacency
+        return self._adjacency[progression_type]
+
+    def chain_ids(self, base_id: str, progression_type: str, steps: int) -> List[str]:
+        """Memoized beam-search chain of exercise IDs starting at base_id."""
+        key = (base_id, progression_type, steps)
+        if key not in self._chains:
+            if progression_type in PROGRESSION_TYPES:
+                self._chains[key] = beam_search(
+                    self.adjacency(progression_type), base_id, steps, self.beam_width
+                )
+            else:
+                self._chains[key] = [base_id]
+        return self._chains[key]
+
+    def exercise_details(self, exercise_ids: List[str]) -> List[Dict]:
+        """Feature rows for the given IDs, in the given order."""
+        if not exercise_ids:
+            return []
+        rows = self.graph.execute_query(
+            EXERCISE_FEATURES_QUERY.format(where='WHERE e.id IN $ids'),
+            {'ids': exercise_ids}
+        )
+        by_id = {r['id']: r for r in rows}
+        return [by_id[i] for i in exercise_ids if i in by_id]
+
+    def find_chain(self, base_exercise_name: str, progression_type: str, steps: int) -> List[Dict]:
+        """Resolve the base exercise and return its progression chain with details."""
+        base_id = self.resolve(base_exercise_name)
+        if base_id is None:
+            return []
+        return self.exercise_details(self.chain_ids(base_id, progression_type, steps))
@@ -9,16 +9,27 @@ Relationship types:
 - SIMILAR_TO: Similar movement pattern, different equipment/setup
 - SUBSTITUTES_FOR: Can replace in programming
 - TARGETS: Links to muscle groups
+
+Candidates from the graph are ranked locally first (name similarity, token
+overlap, equipment, muscle groups, optional embeddings). An exact name or
+alias match short-circuits the LLM; otherwise only the top few candidates
+go to the LLM in one comparative prompt, so each exercise costs at most one
+completion instead of one per candidate.
 """
 
 import os
+import re
 import json
-from typing import List, Dict, Optional
+import threading
+from typing import Callable, List, Dict, Optional
 from neo4j import GraphDatabase
-from openai import OpenAI
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
-import time
+import numpy as np
+
+from arnold.exercise_index import ExerciseIndex
+from arnold.llm_cache import llm_client
+from arnold.normalizer import normalize_exercise_name_for_matching
 
 # Configuration
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -28,15 +39,58 @@ NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "arnold")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 NUM_WORKERS = 1  # Parallel workers for LLM calls
 MODEL = "gpt-5-mini-2025-08-07"
+CANDIDATE_LIMIT = 50  # Graph candidates to rank locally (cheap)
+TOP_CANDIDATES = 3  # Ranked candidates sent to the LLM
+EXACT_MATCH_CONFIDENCE = 0.95  # Normalized name/alias hit, accepted without the LLM
+
+# Relationship definitions shared by the comparison and single-pair prompts
+RELATIONSHIP_GUIDE = """RELATIONSHIP TYPES:
+- EXACT_MATCH: Same exercise, just different name/alias (e.g., "Bench Press" = "Barbell Bench Press")
+- VARIATION_OF: Modified version (e.g., "Incline Bench Press" is variation of "Bench Press")
+- SIMILAR_TO: Similar movement, different equipment (e.g., "Dumbbell Press" similar to "Barbell Press")
+- SUBSTITUTES_FOR: Can replace in programming (e.g., "Push-up" substitutes "Bench Press")
+- UNRELATED: {unrelated}
+
+RULES:
+- inherit_muscles = true if relationship is EXACT_MATCH, VARIATION_OF, or high-confidence SIMILAR_TO
+- confidence > 0.9 for EXACT_MATCH
+- confidence > 0.7 for VARIATION_OF
+- confidence > 0.6 for SIMILAR_TO or SUBSTITUTES_FOR
+
+Respond with JSON only, no markdown."""
+
+# Local ranking weights (embedding weight applies only when an embedder is set)
+RANK_WEIGHTS = {'name': 0.5, 'tokens': 0.2, 'equipment': 0.15, 'muscles': 0.15, 'embedding': 0.4}
+
+# Equipment words in exercise names -> canonical equipment term
+EQUIPMENT_TERMS = {
+    'barbell': 'barbell', 'bb': 'barbell', 'dumbbell': 'dumbbell', 'db': 'dumbbell',
+    'kettlebell': 'kettlebell', 'kb': 'kettlebell', 'cable': 'cable', 'band': 'band',
+    'sandbag': 'sandbag', 'machine': 'machine', 'smith': 'machine', 'ez': 'e-z curl bar',
+    'trap': 'barbell', 'landmine': 'barbell', 'medicine': 'medicine ball', 'ball': 'exercise ball',
+    'bodyweight': 'body only', 'bw': 'body only',
+}
 
 class ExerciseMatcher:
     """Match user exercises to canonical exercises using LLM reasoning."""
     
-    def __init__(self):
+    def __init__(self, embedder: Optional[Callable[[List[str]], List[List[float]]]] = None):
+        """
+        Args:
+            embedder: Optional texts -> vectors function; adds embedding
+                      similarity to the local candidate ranking
+        """
         self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = llm_client(OPENAI_API_KEY)
+        self.embedder = embedder
+        self.stats = {'exercises': 0, 'llm_calls': 0, 'exact_matches': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
         
-    def find_canonical_candidates(self, exercise_name: str, limit: int = 20) -> List[Dict]:
+    def find_canonical_candidates(self, exercise_name: str, limit: int = CANDIDATE_LIMIT) -> List[Dict]:
         """Find potential canonical exercise matches using fuzzy search."""
         with self.driver.session(database=NEO4J_DATABASE) as session:
             # Search by name similarity using CONTAINS
@@ -54,6 +108,8 @@ class ExerciseMatcher:
                 RETURN ex.id as id,
                        ex.name as name,
                        ex.source as source,
+                       ex.equipment as equipment,
+                       coalesce(ex.aliases, []) as aliases,
                        muscle_groups
                 LIMIT $limit
             """, search_terms=search_terms, full_name=exercise_name.lower(), limit=limit)
@@ -64,44 +120,126 @@ class ExerciseMatcher:
                     'id': record['id'],
                     'name': record['name'],
                     'source': record['source'],
+                    'equipment': record['equipment'],
+                    'aliases': record['aliases'],
                     'muscle_groups': record['muscle_groups']
                 })
             
             return candidates
-    
-    def analyze_relationship(self, user_exercise: str, canonical_exercise: Dict) -> Dict:
-        """Use LLM to determine relationship type and confidence."""
-        
+
+    def rank_candidates(self, user_exercise: str, candidates: List[Dict]) -> List[Dict]:
+        """
+        Score candidates locally, best first (no LLM).
+
+        Each candidate gets 'score' (0-1) and 'exact' (normalized name or
+        alias equals the user exercise).
+        """
+        if not candidates:
+            return []
+
+        query = normalize_exercise_name_for_matching(user_exercise)
+        query_tokens = set(query.split())
+        query_equipment = {EQUIPMENT_TERMS[t] for t in query_tokens if t in EQUIPMENT_TERMS}
+        # Muscle words in the name ("quad", "chest") against candidate muscle groups
+        query_stems = {t[:4] for t in query_tokens if len(t) >= 3}
+
+        name_scores = {row['id']: score for row, score in ExerciseIndex(candidates).search(user_exercise, k=len(candidates))}
+
+        embedding_scores = {}
+        if self.embedder is not None:
+            vectors = np.asarray(self.embedder([user_exercise] + [c['name'] for c in candidates]), dtype=float)
+            norms = np.linalg.norm(vectors, axis=1)
+            norms[norms == 0] = 1.0
+            cosine = vectors[1:] @ vectors[0] / (norms[1:] * norms[0])
+            embedding_scores = {c['id']: float(max(0.0, sim)) for c, sim in zip(candidates, cosine)}
+
+        ranked = []
+        for candidate in candidates:
+            labels = [candidate['name'] or ''] + list(candidate.get('aliases') or [])
+            keys = {normalize_exercise_name_for_matching(label) for label in labels}
+            tokens = set(normalize_exercise_name_for_matching(candidate['name'] or '').split())
+
+            token_overlap = len(query_tokens & tokens) / len(query_tokens | tokens) if tokens else 0.0
+
+            candidate_equipment = (candidate.get('equipment') or '').lower()
+            candidate_equipment_terms = {EQUIPMENT_TERMS[t] for t in tokens if t in EQUIPMENT_TERMS}
+            if candidate_equipment:
+                candidate_equipment_terms.add(candidate_equipment)
+            if query_equipment:
+                equipment = 1.0 if query_equipment & candidate_equipment_terms else 0.0
+            else:
+                equipment = 0.5  # Unknown: neither helps nor hurts
+
+            muscle_stems = {
+                word[:4] for group in candidate.get('muscle_groups') or []
+                for word in re.findall(r'[a-z]+', group.lower()) if len(word) >= 3
+            }
+            muscles = 1.0 if query_stems & muscle_stems else 0.0
+
+            score = (
+                RANK_WEIGHTS['name'] * name_scores.get(candidate['id'], 0.0)
+                + RANK_WEIGHTS['tokens'] * token_overlap
+                + RANK_WEIGHTS['equipment'] * equipment
+                + RANK_WEIGHTS['muscles'] * muscles
+            )
+            total = RANK_WEIGHTS['name'] + RANK_WEIGHTS['tokens'] + RANK_WEIGHTS['equipment'] + RANK_WEIGHTS['muscles']
+            if embedding_scores:
+                score += RANK_WEIGHTS['embedding'] * embedding_scores.get(candidate['id'], 0.0)
+                total += RANK_WEIGHTS['embedding']
+
+            ranked.append(dict(candidate, score=round(score / total, 3), exact=query in keys))
+
+        ranked.sort(key=lambda c: (not c['exact'], -c['score'], c['name'] or ''))
+        return ranked
+
+    def compare_candidates(self, user_exercise: str, candidates: List[Dict]) -> Dict:
+        """
+        One LLM call choosing among the top-ranked candidates.
+
+        Returns:
+            Analysis dict (relationship_type, confidence, reasoning,
+            inherit_muscles) plus 'candidate' (the chosen one, or None)
+        """
+        listing = "\n".join(
+            f"{i}. {c['name']} | equipment: {c.get('equipment') or 'unknown'} | "
+            f"muscle groups: {', '.join(c['muscle_groups']) if c['muscle_groups'] else 'Unknown'}"
+            for i, c in enumerate(candidates)
+        )
+
         prompt = f"""You are an exercise science expert analyzing exercise relationships.
 
 USER EXERCISE: "{user_exercise}"
-CANONICAL EXERCISE: "{canonical_exercise['name']}"
-MUSCLE GROUPS: {', '.join(canonical_exercise['muscle_groups']) if canonical_exercise['muscle_groups'] else 'Unknown'}
 
-Determine the relationship between these exercises. Respond ONLY with valid JSON:
+CANONICAL CANDIDATES (pre-ranked by name similarity, best first):
+{listing}
+
+Pick the ONE candidate most closely related to the user exercise, and the relationship
+between them. Respond ONLY with valid JSON:
 
 {{
+  "candidate_index": 0,
   "relationship_type": "EXACT_MATCH" | "VARIATION_OF" | "SIMILAR_TO" | "SUBSTITUTES_FOR" | "UNRELATED",
   "confidence": 0.0-1.0,
   "reasoning": "brief explanation",
   "inherit_muscles": true|false
 }}
 
-RELATIONSHIP TYPES:
-- EXACT_MATCH: Same exercise, just different name/alias (e.g., "Bench Press" = "Barbell Bench Press")
-- VARIATION_OF: Modified version (e.g., "Incline Bench Press" is variation of "Bench Press")
-- SIMILAR_TO: Similar movement, different equipment (e.g., "Dumbbell Press" similar to "Barbell Press")
-- SUBSTITUTES_FOR: Can replace in programming (e.g., "Push-up" substitutes "Bench Press")
-- UNRELATED: Completely different exercises
+{RELATIONSHIP_GUIDE.format(unrelated='None of the candidates is related (candidate_index null)')}"""
 
-RULES:
-- inherit_muscles = true if relationship is EXACT_MATCH, VARIATION_OF, or high-confidence SIMILAR_TO
-- confidence > 0.9 for EXACT_MATCH
-- confidence > 0.7 for VARIATION_OF
-- confidence > 0.6 for SIMILAR_TO or SUBSTITUTES_FOR
+        self._count('llm_calls')
+        analysis = self._complete_json(prompt)
 
-Respond with JSON only, no markdown."""
+        index = analysis.get('candidate_index')
+        if isinstance(index, str) and index.strip().isdigit():
+            index = int(index)
+        chosen = candidates[index] if isinstance(index, int) and 0 <= index < len(candidates) else None
+        if chosen is None:
+            analysis['relationship_type'] = 'UNRELATED'
+        analysis['candidate'] = chosen
+        return analysis
 
+    def _complete_json(self, prompt: str) -> Dict:
+        """Single-message completion parsed as a relationship analysis."""
         try:
             response = self.client.chat.completions.create(
                 model=MODEL,
@@ -122,8 +260,11 @@ Respond with JSON only, no markdown."""
             
             # Validate
             valid_types = ["EXACT_MATCH", "VARIATION_OF", "SIMILAR_TO", "SUBSTITUTES_FOR", "UNRELATED"]
-            if analysis['relationship_type'] not in valid_types:
+            if analysis.get('relationship_type') not in valid_types:
                 analysis['relationship_type'] = "UNRELATED"
+            analysis.setdefault('confidence', 0.0)
+            analysis.setdefault('reasoning', '')
+            analysis.setdefault('inherit_muscles', False)
             
             return analysis
             
@@ -136,6 +277,29 @@ Respond with JSON only, no markdown."""
                 'inherit_muscles': False
             }
     
+    def analyze_relationship(self, user_exercise: str, canonical_exercise: Dict) -> Dict:
+        """Use LLM to determine relationship type and confidence."""
+        
+        prompt = f"""You are an exercise science expert analyzing exercise relationships.
+
+USER EXERCISE: "{user_exercise}"
+CANONICAL EXERCISE: "{canonical_exercise['name']}"
+MUSCLE GROUPS: {', '.join(canonical_exercise['muscle_groups']) if canonical_exercise['muscle_groups'] else 'Unknown'}
+
+Determine the relationship between these exercises. Respond ONLY with valid JSON:
+
+{{
+  "relationship_type": "EXACT_MATCH" | "VARIATION_OF" | "SIMILAR_TO" | "SUBSTITUTES_FOR" | "UNRELATED",
+  "confidence": 0.0-1.0,
+  "reasoning": "brief explanation",
+  "inherit_muscles": true|false
+}}
+
+{RELATIONSHIP_GUIDE.format(unrelated='Completely different exercises')}"""
+
+        self._count('llm_calls')
+        return self._complete_json(prompt)
+    
     def create_relationship(self, user_exercise_id: str, canonical_exercise_id: str, 
                           relationship_type: str, confidence: float, reasoning: str,
                           inherit_muscles: bool = False) -> bool:
@@ -196,28 +360,35 @@ Respond with JSON only, no markdown."""
                 'reason': 'No similar canonical exercises found'
             }
         
-        print(f"  Found {len(candidates)} candidates:")
-        for c in candidates[:3]:
-            print(f"    - {c['name']}")
+        self._count('exercises')
+        ranked = self.rank_candidates(user_exercise_name, candidates)
+        print(f"  Found {len(candidates)} candidates, top ranked:")
+        for c in ranked[:TOP_CANDIDATES]:
+            print(f"    - {c['name']} ({c['score']:.2f}{', exact' if c['exact'] else ''})")
         
-        # Analyze top candidates with LLM
-        best_match = None
-        best_confidence = 0.0
-        
-        for candidate in candidates[:5]:  # Check top 5
-            analysis = self.analyze_relationship(user_exercise_name, candidate)
-            
-            print(f"\n  Analyzing: {candidate['name']}")
-            print(f"    Type: {analysis['relationship_type']}")
-            print(f"    Confidence: {analysis['confidence']:.2f}")
-            print(f"    Reasoning: {analysis['reasoning']}")
-            
-            if analysis['confidence'] > best_confidence and analysis['relationship_type'] != 'UNRELATED':
-                best_match = {
-                    'candidate': candidate,
-                    'analysis': analysis
+        if ranked[0]['exact']:
+            # Same name or alias after normalization: no LLM needed
+            self._count('exact_matches')
+            best_match = {
+                'candidate': ranked[0],
+                'analysis': {
+                    'relationship_type': 'EXACT_MATCH',
+                    'confidence': EXACT_MATCH_CONFIDENCE,
+                    'reasoning': 'Normalized name/alias match',
+                    'inherit_muscles': True
                 }
-                best_confidence = analysis['confidence']
+            }
+        else:
+            # One comparative LLM call over the top-ranked candidates
+            analysis = self.compare_candidates(user_exercise_name, ranked[:TOP_CANDIDATES])
+            best_match = None
+            if analysis['candidate'] is not None:
+                print(f"\n  Best candidate: {analysis['candidate']['name']}")
+                print(f"    Type: {analysis['relationship_type']}")
+                print(f"    Confidence: {analysis['confidence']:.2f}")
+                print(f"    Reasoning: {analysis['reasoning']}")
+                if analysis['relationship_type'] != 'UNRELATED':
+                    best_match = {'candidate': analysis.pop('candidate'), 'analysis': analysis}
         
         # Create relationship for best match
         if best_match:
@@ -269,7 +440,6 @@ Respond with JSON only, no markdown."""
             for future in tqdm(as_completed(futures), total=len(exercise_list), desc="Matching exercises"):
                 idx, result = future.result()
                 results[idx] = result
-                time.sleep(0.1)  # Rate limiting
         
         return results
     
@@ -320,6 +490,11 @@ def main():
             else:
                 print(f"\n❌ {result['user_exercise']}")
                 print(f"   → {result['reason']}")
+
+        stats = matcher.stats
+        print(f"\nLLM calls: {stats['llm_calls']} for {stats['exercises']} exercises "
+              f"({stats['exact_matches']} exact matches, no LLM)")
+        print(f"{matcher.client.cache.summary()}")
     
     finally:
         matcher.close()
@@ -2,11 +2,21 @@
 """
 Import Brock's Obsidian workout logs into Neo4j.
 Handles his narrative workout card format with circuits, complexes, and varied notation.
+
+Two phases: files are parsed in a process pool, then exercise names are
+resolved in one batched query and workouts are written in UNWIND batches.
+
+Usage:
+    python import_obsidian_workouts.py --dir /path/to/workouts --dry-run
+    python import_obsidian_workouts.py --dir /path/to/workouts --workers 8 --batch-size 100
 """
 
 import os
 import re
+import json
+import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -23,34 +33,13 @@ NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "arnold")
 
+WRITE_BATCH_SIZE = 100  # Workouts per UNWIND transaction
+SET_PROPERTIES = ('reps', 'load_lbs', 'duration_seconds', 'distance_miles', 'notes')
+
+
+class ObsidianWorkoutParser:
+    """Parse Brock's workout logs (no database access, safe to run in worker processes)."""
 
-class ObsidianWorkoutImporter:
-    """Import Brock's workout logs to Neo4j."""
-    
-    def __init__(self, workout_dir: Path):
-        self.workout_dir = Path(workout_dir)
-        self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-        self.stats = {
-            'files_found': 0,
-            'files_parsed': 0,
-            'files_skipped': 0,
-            'workouts_created': 0,
-            'exercises_matched': 0,
-            'exercises_unmatched': 0
-        }
-        
-    def find_workout_files(self) -> List[Path]:
-        """Find all workout markdown files."""
-        if not self.workout_dir.exists():
-            print(f"❌ Workout directory not found: {self.workout_dir}")
-            return []
-        
-        # Look for .md files with dates in the filename
-        files = [f for f in self.workout_dir.glob("*.md") 
-                if re.match(r'\d{4}-\d{2}-\d{2}', f.name)]
-        self.stats['files_found'] = len(files)
-        return sorted(files)
-    
     def parse_obsidian_workout(self, filepath: Path) -> Optional[Dict]:
         """
         Parse Brock's workout formats (both YAML and Markdown).
@@ -472,149 +461,199 @@ class ObsidianWorkoutImporter:
             return set_data
         
         return None
+
+
+def _parse_file(filepath: Path) -> Optional[Dict]:
+    """Process-pool entry point."""
+    return ObsidianWorkoutParser().parse_obsidian_workout(filepath)
+
+
+class ObsidianWorkoutImporter(ObsidianWorkoutParser):
+    """Import Brock's workout logs to Neo4j."""
     
-    def match_exercise_to_variant(self, exercise_name: str) -> Optional[str]:
-        """Match exercise to ExerciseVariant or Activity."""
+    def __init__(self, workout_dir: Path):
+        self.workout_dir = Path(workout_dir)
+        self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        self.stats = {
+            'files_found': 0,
+            'files_parsed': 0,
+            'files_skipped': 0,
+            'workouts_created': 0,
+            'distinct_exercises': 0,
+            'exercises_matched': 0,
+            'exercises_unmatched': 0
+        }
+        
+    def find_workout_files(self) -> List[Path]:
+        """Find all workout markdown files."""
+        if not self.workout_dir.exists():
+            print(f"❌ Workout directory not found: {self.workout_dir}")
+            return []
+        
+        # Look for .md files with dates in the filename
+        files = [f for f in self.workout_dir.glob("*.md") 
+                if re.match(r'\d{4}-\d{2}-\d{2}', f.name)]
+        self.stats['files_found'] = len(files)
+        return sorted(files)
+    
+    # --- Phase 2: batched graph access ---
+
+    def existing_workout_dates(self, dates: List[str]) -> set:
+        """Dates (YYYY-MM-DD) that already have a Workout, in one query."""
         with self.driver.session(database=NEO4J_DATABASE) as session:
-            # Clean exercise name (remove parenthetical notes)
-            clean_name = re.sub(r'\([^)]+\)', '', exercise_name).strip()
-            
-            # Try exact match
-            result = session.run("""
-                MATCH (v:ExerciseVariant)
-                WHERE toLower(v.name) = toLower($name)
-                RETURN v.id as id
-                LIMIT 1
-            """, name=clean_name)
-            
-            record = result.single()
-            if record:
-                return record['id']
-            
-            # Try fuzzy match
             result = session.run("""
-                MATCH (v:ExerciseVariant)
-                WHERE toLower(v.name) CONTAINS toLower($name)
-                   OR toLower($name) CONTAINS toLower(v.name)
-                RETURN v.id as id, v.name as name
-                LIMIT 1
-            """, name=clean_name)
-            
-            record = result.single()
-            if record:
-                return record['id']
-            
-            # Try Activity
+                UNWIND $dates AS d
+                MATCH (w:Workout {date: date(d)})
+                RETURN DISTINCT toString(w.date) as date
+            """, dates=dates)
+            return {record['date'] for record in result}
+
+    def resolve_exercise_names(self, names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Match every distinct exercise name to an ExerciseVariant or Activity in one query.
+
+        Same precedence as the per-name lookup it replaces: exact variant
+        name, then variant name containment either way, then Activity.
+
+        Returns:
+            {name: variant/activity id or None}
+        """
+        # Clean exercise names (remove parenthetical notes)
+        cleaned = {name: re.sub(r'\([^)]+\)', '', name).strip() for name in names}
+        with self.driver.session(database=NEO4J_DATABASE) as session:
             result = session.run("""
-                MATCH (a:Activity)
-                WHERE toLower(a.name) = toLower($name)
-                   OR toLower($name) CONTAINS toLower(a.name)
-                RETURN a.id as id
-                LIMIT 1
-            """, name=clean_name)
-            
-            record = result.single()
-            if record:
-                return record['id']
-            
-            return None
-    
-    def create_or_get_exercise(self, exercise_name: str) -> str:
-        """Create user exercise or get existing one."""
+                UNWIND $names AS name
+                WITH name, toLower(name) AS needle
+                OPTIONAL MATCH (exact:ExerciseVariant)
+                WHERE toLower(exact.name) = needle
+                WITH name, needle, collect(exact.id)[0] AS exact_id
+                OPTIONAL MATCH (fuzzy:ExerciseVariant)
+                WHERE exact_id IS NULL
+                  AND (toLower(fuzzy.name) CONTAINS needle OR needle CONTAINS toLower(fuzzy.name))
+                WITH name, needle, exact_id, collect(fuzzy.id)[0] AS fuzzy_id
+                OPTIONAL MATCH (a:Activity)
+                WHERE exact_id IS NULL AND fuzzy_id IS NULL
+                  AND (toLower(a.name) = needle OR needle CONTAINS toLower(a.name))
+                WITH name, exact_id, fuzzy_id, collect(a.id)[0] AS activity_id
+                RETURN name, coalesce(exact_id, fuzzy_id, activity_id) AS id
+            """, names=sorted(set(cleaned.values())))
+            by_clean = {record['name']: record['id'] for record in result}
+        return {name: by_clean.get(clean) for name, clean in cleaned.items()}
+
+    def get_or_create_exercises(self, variants: Dict[str, Optional[str]]) -> Dict[str, str]:
+        """
+        MERGE one user Exercise per name (plus MAPS_TO for matched names) in one write.
+
+        Args:
+            variants: {exercise name: variant/activity id or None}
+
+        Returns:
+            {exercise name: Exercise id}
+        """
         with self.driver.session(database=NEO4J_DATABASE) as session:
             result = session.run("""
-                MERGE (ex:Exercise {name: $name, source: 'user'})
+                UNWIND $exercises AS e
+                MERGE (ex:Exercise {name: e.name, source: 'user'})
                 ON CREATE SET ex.id = randomUUID(), ex.created_at = datetime()
-                RETURN ex.id as id
-            """, name=exercise_name)
-            
-            return result.single()['id']
-    
-    def import_workout(self, workout_data: Dict) -> bool:
-        """Import workout to Neo4j."""
-        try:
-            with self.driver.session(database=NEO4J_DATABASE) as session:
-                # Check if exists
-                exists = session.run("""
-                    MATCH (w:Workout {date: date($date)})
-                    RETURN count(w) > 0 as exists
-                """, date=workout_data['date']).single()['exists']
-                
-                if exists:
-                    self.stats['files_skipped'] += 1
-                    return False
-                
-                # Create workout
-                workout_id = session.run("""
-                    CREATE (w:Workout {
-                        id: randomUUID(),
-                        date: date($date),
-                        type: $type,
-                        duration_minutes: $duration,
-                        notes: $notes,
-                        source: 'obsidian_import',
-                        imported_at: datetime()
-                    })
-                    RETURN w.id as id
-                """, 
-                    date=workout_data['date'],
-                    type=workout_data['type'],
-                    duration=workout_data['duration_minutes'],
-                    notes=str(workout_data['notes'])
-                ).single()['id']
-                
-                # Process exercises
-                for ex_data in workout_data['exercises']:
-                    exercise_name = ex_data['exercise_name']
-                    variant_id = self.match_exercise_to_variant(exercise_name)
-                    
-                    if variant_id:
-                        self.stats['exercises_matched'] += 1
-                        exercise_id = self.create_or_get_exercise(exercise_name)
-                        
-                        # Create MAPS_TO
-                        session.run("""
-                            MATCH (ex:Exercise {id: $ex_id})
-                            MATCH (v {id: $variant_id})
-                            MERGE (ex)-[r:MAPS_TO]->(v)
-                            ON CREATE SET r.confidence = 0.8, r.match_type = 'AUTO'
-                        """, ex_id=exercise_id, variant_id=variant_id)
-                    else:
-                        self.stats['exercises_unmatched'] += 1
-                        exercise_id = self.create_or_get_exercise(exercise_name)
-                    
-                    # Create sets
-                    for idx, set_data in enumerate(ex_data['sets'], 1):
-                        session.run("""
-                            MATCH (w:Workout {id: $workout_id})
-                            MATCH (ex:Exercise {id: $exercise_id})
-                            CREATE (s:Set {
-                                id: randomUUID(),
-                                set_number: $set_number,
-                                reps: $reps,
-                                load_lbs: $load_lbs,
-                                duration_seconds: $duration_seconds,
-                                distance_miles: $distance_miles,
-                                notes: $notes
-                            })
-                            CREATE (w)-[:CONTAINS]->(s)
-                            CREATE (s)-[:OF_EXERCISE]->(ex)
-                        """,
-                            workout_id=workout_id,
-                            exercise_id=exercise_id,
-                            set_number=idx,
-                            **set_data
-                        )
-                
-                self.stats['workouts_created'] += 1
-                return True
-                
-        except Exception as e:
-            print(f"  ❌ Error importing: {e}")
-            return False
-    
-    def run_import(self, limit: Optional[int] = None, dry_run: bool = False):
-        """Run import process."""
+                WITH ex, e
+                CALL {
+                    WITH ex, e
+                    MATCH (v {id: e.variant_id})
+                    MERGE (ex)-[r:MAPS_TO]->(v)
+                    ON CREATE SET r.confidence = 0.8, r.match_type = 'AUTO'
+                }
+                RETURN e.name as name, ex.id as id
+            """, exercises=[{'name': name, 'variant_id': vid} for name, vid in variants.items()])
+            return {record['name']: record['id'] for record in result}
+
+    def write_workouts(self, batch: List[Dict]) -> int:
+        """
+        Create a batch of workouts with their sets in one transaction.
+
+        Args:
+            batch: Output of _workout_params
+
+        Returns:
+            Number of workouts created
+        """
+        with self.driver.session(database=NEO4J_DATABASE) as session:
+            return session.execute_write(lambda tx: tx.run("""
+                UNWIND $workouts AS wk
+                CREATE (w:Workout {
+                    id: randomUUID(),
+                    date: date(wk.date),
+                    type: wk.type,
+                    duration_minutes: wk.duration,
+                    notes: wk.notes,
+                    source: 'obsidian_import',
+                    imported_at: datetime()
+                })
+                WITH w, wk
+                CALL {
+                    WITH w, wk
+                    UNWIND wk.sets AS s
+                    MATCH (ex:Exercise {id: s.exercise_id})
+                    CREATE (st:Set)
+                    SET st = s.props, st.id = randomUUID()
+                    CREATE (w)-[:CONTAINS]->(st)
+                    CREATE (st)-[:OF_EXERCISE]->(ex)
+                }
+                RETURN count(w) as created
+            """, workouts=batch).single()['created'])
+
+    @staticmethod
+    def _workout_params(workout_data: Dict, exercise_ids: Dict[str, str]) -> Dict:
+        """Flatten a parsed workout into UNWIND parameters."""
+        sets = []
+        for ex_data in workout_data['exercises']:
+            for idx, set_data in enumerate(ex_data['sets'], 1):
+                props = {key: set_data.get(key) for key in SET_PROPERTIES}
+                props['set_number'] = idx
+                sets.append({'exercise_id': exercise_ids[ex_data['exercise_name']], 'props': props})
+        return {
+            'date': workout_data['date'],
+            'type': workout_data['type'],
+            'duration': workout_data['duration_minutes'],
+            'notes': str(workout_data['notes']),
+            'sets': sets
+        }
+
+    # --- Import ---
+
+    def parse_all(self, files: List[Path], workers: Optional[int] = None) -> List[Dict]:
+        """
+        Phase 1: parse every file in a process pool.
+
+        Returns:
+            Parsed workouts in file order (unparseable files counted as skipped)
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(files) > 1:
+            chunksize = max(1, len(files) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(tqdm(
+                    executor.map(_parse_file, files, chunksize=chunksize),
+                    total=len(files), desc="Parsing"
+                ))
+        else:
+            parsed = [self.parse_obsidian_workout(f) for f in tqdm(files, desc="Parsing")]
+
+        workouts = [w for w in parsed if w]
+        self.stats['files_parsed'] = len(workouts)
+        self.stats['files_skipped'] += len(files) - len(workouts)
+        return workouts
+
+    def run_import(self, limit: Optional[int] = None, dry_run: bool = False,
+                   workers: Optional[int] = None, batch_size: int = WRITE_BATCH_SIZE):
+        """
+        Run import process.
+
+        Phase 1 parses all files in parallel and collects the distinct
+        exercise names. Phase 2 resolves those names in one query, MERGEs
+        the user exercises in one write, and creates workouts in UNWIND
+        batches of batch_size. A dry run stops after phase 1 and reports
+        throughput.
+        """
         print("=" * 80)
         print("OBSIDIAN WORKOUT IMPORT")
         print("=" * 80)
@@ -628,33 +667,70 @@ class ObsidianWorkoutImporter:
         
         print(f"Found {len(files)} workout files")
         
-        if dry_run:
-            print("\n🔍 DRY RUN - Parsing first file as example:\n")
-            if files:
-                workout = self.parse_obsidian_workout(files[0])
-                if workout:
-                    import json
-                    print(json.dumps(workout, indent=2, default=str))
-                else:
-                    print("❌ Failed to parse")
-            return
-        
         if limit:
             files = files[:limit]
             print(f"Limiting to first {limit} files")
         
-        print("\nImporting...\n")
+        timings = {}
+        start = time.perf_counter()
+        workouts = self.parse_all(files, workers)
+        timings['parse'] = time.perf_counter() - start
+
+        names = sorted({ex['exercise_name'] for w in workouts for ex in w['exercises']})
+        total_sets = sum(len(ex['sets']) for w in workouts for ex in w['exercises'])
+        self.stats['distinct_exercises'] = len(names)
+
+        if dry_run:
+            print("\n🔍 DRY RUN - nothing written\n")
+            if workouts:
+                print("First parsed workout:")
+                print(json.dumps(workouts[0], indent=2, default=str))
+            rate = len(files) / timings['parse'] if timings['parse'] else 0.0
+            print(f"\nParsed {len(workouts)}/{len(files)} files in {timings['parse']:.2f}s "
+                  f"({rate:.0f} files/s, {workers or os.cpu_count()} workers)")
+            print(f"  {sum(len(w['exercises']) for w in workouts)} exercise entries, "
+                  f"{len(names)} distinct names, {total_sets} sets")
+            print(f"  Would write {(len(workouts) + batch_size - 1) // batch_size} workout batches "
+                  f"of up to {batch_size} (1 name-resolution query, 1 exercise MERGE)")
+            return
         
-        for filepath in tqdm(files, desc="Processing"):
-            workout_data = self.parse_obsidian_workout(filepath)
-            
-            if workout_data:
-                self.stats['files_parsed'] += 1
-                self.import_workout(workout_data)
-            else:
+        print("\nImporting...\n")
+
+        # Skip dates already in the graph (and repeats within this import)
+        start = time.perf_counter()
+        existing = self.existing_workout_dates(sorted({w['date'] for w in workouts}))
+        new_workouts = []
+        for workout in workouts:
+            if workout['date'] in existing:
                 self.stats['files_skipped'] += 1
+                continue
+            existing.add(workout['date'])
+            new_workouts.append(workout)
+
+        names = sorted({ex['exercise_name'] for w in new_workouts for ex in w['exercises']})
+        variants = self.resolve_exercise_names(names) if names else {}
+        exercise_ids = self.get_or_create_exercises(variants) if variants else {}
+        timings['resolve'] = time.perf_counter() - start
+
+        for workout in new_workouts:
+            for ex_data in workout['exercises']:
+                if variants.get(ex_data['exercise_name']):
+                    self.stats['exercises_matched'] += 1
+                else:
+                    self.stats['exercises_unmatched'] += 1
+
+        start = time.perf_counter()
+        for i in tqdm(range(0, len(new_workouts), batch_size), desc="Writing"):
+            batch = [self._workout_params(w, exercise_ids) for w in new_workouts[i:i + batch_size]]
+            try:
+                self.stats['workouts_created'] += self.write_workouts(batch)
+            except Exception as e:
+                print(f"  ❌ Error importing batch {i // batch_size + 1}: {e}")
+        timings['write'] = time.perf_counter() - start
         
         self.print_summary()
+        print(f"\nTiming: parse {timings['parse']:.2f}s, resolve {timings['resolve']:.2f}s, "
+              f"write {timings['write']:.2f}s")
     
     def print_summary(self):
         """Print summary."""
@@ -665,7 +741,8 @@ class ObsidianWorkoutImporter:
         print(f"Files parsed:      {self.stats['files_parsed']}")
         print(f"Files skipped:     {self.stats['files_skipped']}")
         print(f"Workouts created:  {self.stats['workouts_created']}")
-        print(f"\nExercises matched:   {self.stats['exercises_matched']}")
+        print(f"\nDistinct exercises:  {self.stats['distinct_exercises']}")
+        print(f"Exercises matched:   {self.stats['exercises_matched']}")
         print(f"Exercises unmatched: {self.stats['exercises_unmatched']}")
         
         if self.stats['exercises_unmatched'] > 0:
@@ -683,14 +760,17 @@ def main():
     parser = argparse.ArgumentParser(description='Import Obsidian workouts')
     parser.add_argument('--dir', required=True, help='Workout directory')
     parser.add_argument('--limit', type=int, help='Limit number of files')
-    parser.add_argument('--dry-run', action='store_true', help='Parse without importing')
+    parser.add_argument('--dry-run', action='store_true', help='Parse all files and report throughput, no writes')
+    parser.add_argument('--workers', type=int, help='Parser processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=WRITE_BATCH_SIZE, help='Workouts per write transaction')
     
     args = parser.parse_args()
     
     importer = ObsidianWorkoutImporter(workout_dir=args.dir)
     
     try:
-        importer.run_import(limit=args.limit, dry_run=args.dry_run)
+        importer.run_import(limit=args.limit, dry_run=args.dry_run,
+                            workers=args.workers, batch_size=args.batch_size)
     finally:
         importer.close()
 
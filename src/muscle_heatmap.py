@@ -16,7 +16,7 @@ import pandas as pd
 import numpy as np
 import json
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 # =============================================================================
 # Configuration
@@ -26,8 +26,9 @@ DATA_DIR = Path(__file__).parent.parent / "data"
 STAGING_DIR = DATA_DIR / "staging"
 STATIC_DIR = DATA_DIR / "static"
 
-SETS_PARQUET = STAGING_DIR / "sets.parquet"
-MUSCLE_TARGETING_CSV = STAGING_DIR / "muscle_targeting.csv"
+# Set × muscle facts (scripts/export_set_muscle_facts.py), partitioned by month
+FACTS_DIR = STAGING_DIR / "set_muscle_facts"
+FACTS_GLOB = FACTS_DIR / "month=*" / "*.parquet"
 MUSCLE_MAPPING_JSON = STATIC_DIR / "muscle_svg_mapping.json"
 
 
@@ -43,10 +44,9 @@ def load_muscle_mapping():
     return pd.DataFrame(data["muscles"])
 
 
-@st.cache_data
-def load_muscle_targeting():
-    """Load exercise -> muscle targeting relationships."""
-    return pd.read_csv(MUSCLE_TARGETING_CSV)
+def read_facts() -> str:
+    """DuckDB table expression over the fact partitions."""
+    return f"read_parquet('{FACTS_GLOB}', hive_partitioning = true)"
 
 
 @st.cache_data
@@ -54,61 +54,46 @@ def get_date_range():
     """Get min/max dates from workout data."""
     conn = duckdb.connect()
     result = conn.execute(f"""
-        SELECT MIN(date) as min_date, MAX(date) as max_date
-        FROM '{SETS_PARQUET}'
-        WHERE date IS NOT NULL
+        SELECT MIN(session_date) as min_date, MAX(session_date) as max_date
+        FROM {read_facts()}
     """).fetchone()
     conn.close()
-    return (
-        datetime.strptime(result[0], "%Y-%m-%d").date(),
-        datetime.strptime(result[1], "%Y-%m-%d").date()
-    )
+    return result[0], result[1]
 
 
 def query_muscle_volume(start_date: str, end_date: str, role_weight: dict) -> pd.DataFrame:
     """
     Query volume per muscle with role weighting.
+    
+    Single group-by over the pre-exploded fact table; the month predicate
+    prunes partitions outside the range. Sets with no logged reps count as
+    one rep (the fact table's volume_lbs counts them as zero).
     """
     conn = duckdb.connect()
     
-    conn.execute(f"""
-        CREATE OR REPLACE TABLE muscle_targeting AS 
-        SELECT * FROM '{MUSCLE_TARGETING_CSV}'
-    """)
-    
     query = f"""
-        WITH set_volume AS (
-            SELECT 
-                exercise_id,
-                COALESCE(reps, 1) * COALESCE(load_lbs, 0) as volume
-            FROM '{SETS_PARQUET}'
-            WHERE date >= '{start_date}' 
-              AND date <= '{end_date}'
-              AND load_lbs > 0
-        ),
-        muscle_volume AS (
-            SELECT 
-                mt.muscle_name,
-                mt.target_role,
-                SUM(sv.volume) as raw_volume
-            FROM set_volume sv
-            JOIN muscle_targeting mt ON sv.exercise_id = mt.exercise_id
-            GROUP BY mt.muscle_name, mt.target_role
-        )
         SELECT 
             muscle_name,
             SUM(
-                CASE 
-                    WHEN target_role = 'primary' THEN raw_volume * {role_weight['primary']}
-                    WHEN target_role = 'secondary' THEN raw_volume * {role_weight['secondary']}
-                    ELSE raw_volume * 0.25
+                COALESCE(reps, 1) * COALESCE(load_lbs, 0) * CASE 
+                    WHEN role = 'primary' THEN ?
+                    WHEN role = 'secondary' THEN ?
+                    ELSE 0.25
                 END
             ) as weighted_volume
-        FROM muscle_volume
+        FROM {read_facts()}
+        WHERE CAST(month AS VARCHAR) BETWEEN ? AND ?
+          AND session_date >= CAST(? AS DATE)
+          AND session_date <= CAST(? AS DATE)
+          AND load_lbs > 0
         GROUP BY muscle_name
     """
     
-    df = conn.execute(query).df()
+    df = conn.execute(query, [
+        role_weight['primary'], role_weight['secondary'],
+        start_date[:7], end_date[:7],
+        start_date, end_date
+    ]).df()
     conn.close()
     return df
 
@@ -174,10 +159,8 @@ def main():
     
     # Check for required files
     missing = []
-    if not SETS_PARQUET.exists():
-        missing.append(str(SETS_PARQUET))
-    if not MUSCLE_TARGETING_CSV.exists():
-        missing.append(str(MUSCLE_TARGETING_CSV))
+    if not any(FACTS_DIR.glob("month=*/*.parquet")):
+        missing.append(f"{FACTS_DIR} (run scripts/export_set_muscle_facts.py)")
     if not MUSCLE_MAPPING_JSON.exists():
         missing.append(str(MUSCLE_MAPPING_JSON))
     
@@ -0,0 +1,9 @@
+"""Shared pytest setup: make src/, scripts/, scripts/sync/ and scripts/benchmarks/ importable."""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+for path in ("src", "scripts", "scripts/sync", "scripts/benchmarks"):
+    sys.path.insert(0, str(PROJECT_ROOT / path))
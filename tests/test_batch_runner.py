@@ -0,0 +1,191 @@
+"""BatchRunner checkpoint / resume and rate-limit handling against the fake LLM endpoint."""
+
+import contextlib
+import importlib.util
+import itertools
+import json
+import sys
+import types
+import urllib.error
+import urllib.request
+
+import pytest
+from fake_llm_server import start_server
+
+from arnold.batch_runner import BatchRunner, Checkpoint, RateLimited, run_packed
+
+ITEMS = [f"EXERCISE:{i:03d}" for i in range(40)]
+
+
+class SinkCrash(RuntimeError):
+    pass
+
+
+@pytest.fixture
+def fake_llm():
+    server = start_server(latency=0.01, capacity=3, retry_after=0.05)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_caller(server):
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+    def call(item):
+        body = json.dumps({"model": "fake", "messages": [{"role": "user", "content": item}]}).encode()
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                payload = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise RateLimited(retry_after=float(e.headers.get("Retry-After", 0.05))) from e
+            raise
+        return json.loads(payload["choices"][0]["message"]["content"])
+    return call
+
+
+def test_crash_and_resume_sinks_each_item_once(fake_llm, tmp_path):
+    checkpoint = tmp_path / "run.jsonl"
+    call = make_caller(fake_llm)
+    sunk = []
+
+    def crashing_sink(item, result):
+        if len(sunk) >= 15:
+            raise SinkCrash("simulated crash")
+        sunk.append(item)
+
+    with pytest.raises(SinkCrash):
+        BatchRunner(call, checkpoint, sink=crashing_sink, max_workers=8).run(ITEMS)
+    assert len(Checkpoint(checkpoint).load()) == 15
+
+    resumed = BatchRunner(call, checkpoint, sink=lambda item, result: sunk.append(item), max_workers=8)
+    stats = resumed.run(ITEMS)
+
+    assert sorted(sunk) == ITEMS
+    assert stats["skipped"] == 15
+    assert stats["succeeded"] == len(ITEMS) - 15
+    assert set(resumed.results()) == set(ITEMS)
+
+
+def test_torn_checkpoint_line_is_redone(tmp_path):
+    checkpoint = tmp_path / "run.jsonl"
+    BatchRunner(str.upper, checkpoint).run(ITEMS[:3])
+    with open(checkpoint, "a") as f:
+        f.write('{"key": "EXERCISE:003", "ok": tr')  # crash mid-write
+
+    sunk = []
+    stats = BatchRunner(str.upper, checkpoint, sink=lambda item, result: sunk.append(item)).run(ITEMS[:4])
+
+    assert stats["skipped"] == 3
+    assert sunk == ["EXERCISE:003"]
+
+
+def test_failed_items_are_retried_on_resume(tmp_path):
+    checkpoint = tmp_path / "run.jsonl"
+    flaky = {"EXERCISE:002"}
+
+    def fn(item):
+        if item in flaky:
+            raise ValueError("bad response")
+        return item.lower()
+
+    first = BatchRunner(fn, checkpoint).run(ITEMS[:5])
+    assert (first["succeeded"], first["failed"]) == (4, 1)
+
+    flaky.clear()
+    second = BatchRunner(fn, checkpoint).run(ITEMS[:5])
+    assert (second["skipped"], second["succeeded"], second["failed"]) == (4, 1, 0)
+
+    kept = BatchRunner(fn, tmp_path / "other.jsonl", retry_failed=False)
+    flaky.add("EXERCISE:002")
+    kept.run(ITEMS[:5])
+    assert kept.run(ITEMS[:5])["skipped"] == 5
+
+
+def test_rate_limits_back_off_and_requeue():
+    calls = itertools.count(1)
+
+    def fn(item):
+        if next(calls) <= 2:
+            raise RateLimited(retry_after=0.01)
+        return item
+
+    runner = BatchRunner(fn, initial_workers=4, max_workers=4)
+    stats = runner.run(ITEMS[:6])
+
+    assert stats["succeeded"] == 6
+    assert stats["rate_limited"] == 2
+    assert min(stats["concurrency"]) < 4
+
+
+def test_run_packed_requeues_unanswered_items(tmp_path):
+    checkpoint = tmp_path / "packed.jsonl"
+    singles = []
+
+    def fn_many(pack):
+        # Answers every item but EXERCISE:001
+        return [None if item == "EXERCISE:001" else item.lower() for item in pack]
+
+    def fn_one(item):
+        singles.append(item)
+        return item.lower()
+
+    sunk = {}
+    stats = run_packed(fn_many, fn_one, ITEMS[:6], pack_size=4, checkpoint=checkpoint,
+                       sink=lambda item, result: sunk.setdefault(item, result))
+
+    assert singles == ["EXERCISE:001"]
+    assert stats["requeued"] == 1
+    assert stats["succeeded"] == 6
+    assert sunk == {item: item.lower() for item in ITEMS[:6]}
+
+    again = run_packed(fn_many, fn_one, ITEMS[:6], pack_size=4, checkpoint=checkpoint)
+    assert again["skipped"] == 6
+
+
+class FlakyClassifier:
+    """Packs answer nothing; singles fail with an error result until `healthy`."""
+
+    healthy = False
+
+    def __init__(self, api_key=None):
+        pass
+
+    def classify_exercises(self, pack, taxonomy):
+        return [None] * len(pack)
+
+    def classify_exercise(self, name, category, equipment, taxonomy):
+        if FlakyClassifier.healthy:
+            return {"exercise": name, "movements": ["HINGE"], "confidence": 0.9}
+        return {"exercise": name, "movements": [], "confidence": 0.0, "error": "invalid JSON"}
+
+
+@pytest.fixture
+def classify_movements(monkeypatch):
+    import arnold.classify_movements as module
+
+    if importlib.util.find_spec("tqdm") is None:
+        progress = types.SimpleNamespace(n=0, update=lambda n: None)
+        tqdm = types.ModuleType("tqdm")
+        tqdm.tqdm = lambda **kwargs: contextlib.nullcontext(progress)
+        monkeypatch.setitem(sys.modules, "tqdm", tqdm)
+    monkeypatch.setattr(module, "MovementClassifier", FlakyClassifier)
+    monkeypatch.setattr(FlakyClassifier, "healthy", False)
+    return module
+
+
+def test_classify_batch_retries_error_results(classify_movements, tmp_path):
+    checkpoint = tmp_path / "classify.jsonl"
+    exercises = [{"name": "Tire Flip"}, {"name": "Sled Drag"}]
+
+    results = classify_movements.classify_batch(exercises, [], checkpoint=checkpoint, pack_size=2)
+
+    assert [r["error"] for r in results] == ["RuntimeError: invalid JSON"] * 2
+    assert results[0]["reasoning"] == "Classification failed: RuntimeError: invalid JSON"
+    assert not any(record["ok"] for record in Checkpoint(checkpoint).load().values())
+
+    FlakyClassifier.healthy = True
+    results = classify_movements.classify_batch(exercises, [], checkpoint=checkpoint, pack_size=2)
+    assert [r["movements"] for r in results] == [["HINGE"], ["HINGE"]]
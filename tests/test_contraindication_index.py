@@ -0,0 +1,81 @@
+"""ContraindicationIndex staleness: one aggregate query per load, full hash only on change."""
+
+from arnold.judgment_day.contraindications import ContraindicationIndex
+
+
+class FakeGraph:
+    """Answers the index queries from an in-memory kernel and records each query kind."""
+
+    def __init__(self):
+        self.exercises = [
+            {'id': 'EX:1', 'name': 'Back Squat', 'category': 'deep_flexion', 'primary_muscles': ['quads']},
+            {'id': 'EX:2', 'name': 'Overhead Press', 'category': 'overhead_pressing', 'primary_muscles': []},
+        ]
+        self.last_changed = '2026-01-01'
+        self.queries = []
+
+    def execute_query(self, query, params=None):
+        query = ' '.join(query.split())
+        if 'count(e) as exercises' in query:
+            self.queries.append('watermark')
+            return [{'exercises': len(self.exercises), 'last_changed': self.last_changed,
+                     'involves': 0, 'requires': 0}]
+        if 'primary_muscles' in query and 'ORDER BY id' in query:
+            self.queries.append('fingerprint')
+            return self.exercises
+        if 'ORDER BY source, target' in query:
+            return []
+        if 'toLower' in query and 'ORDER BY e.id' in query:
+            self.queries.append('build')
+            return [{'id': ex['id'], 'name': ex['name'].lower(), 'category': ex['category']}
+                    for ex in self.exercises]
+        return []
+
+
+def test_unchanged_kernel_loads_with_one_query(tmp_path):
+    graph = FakeGraph()
+    path = tmp_path / 'index.json'
+    ContraindicationIndex(graph, path).load()
+
+    graph.queries.clear()
+    index = ContraindicationIndex(graph, path).load()
+
+    assert graph.queries == ['watermark']
+    assert index.exercise_ids == ['EX:1', 'EX:2']
+    assert index.forbidden(['pattern:deep_flexion']) == {'EX:1'}
+
+
+def test_moved_watermark_checks_full_hash_before_rebuilding(tmp_path):
+    graph = FakeGraph()
+    path = tmp_path / 'index.json'
+    ContraindicationIndex(graph, path).load()
+
+    # Timestamp moved, content did not: keep the index, record the watermark
+    graph.last_changed = '2026-02-01'
+    graph.queries.clear()
+    ContraindicationIndex(graph, path).load()
+    assert graph.queries == ['watermark', 'fingerprint']
+
+    graph.queries.clear()
+    ContraindicationIndex(graph, path).load()
+    assert graph.queries == ['watermark']
+
+    # Content changed: rebuild
+    graph.exercises[1]['category'] = 'deep_flexion'
+    graph.last_changed = '2026-03-01'
+    graph.queries.clear()
+    index = ContraindicationIndex(graph, path).load()
+    assert graph.queries == ['watermark', 'fingerprint', 'build']
+    assert index.forbidden(['pattern:deep_flexion']) == {'EX:1', 'EX:2'}
+
+
+def test_reindex_rebuilds_with_full_hash(tmp_path):
+    graph = FakeGraph()
+    path = tmp_path / 'index.json'
+    first = ContraindicationIndex(graph, path).load()
+
+    graph.queries.clear()
+    index = ContraindicationIndex(graph, path).load(rebuild=True)
+
+    assert graph.queries == ['watermark', 'fingerprint', 'build']
+    assert index.fingerprint == first.fingerprint
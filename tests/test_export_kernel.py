@@ -0,0 +1,83 @@
+"""Kernel export streams every query through ArnoldGraph.iter_query into the .cypher files."""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "export" / "export_kernel.py"
+
+
+class Node(dict):
+    """Stand-in for a neo4j Node: property access plus labels."""
+
+    def __init__(self, labels, **props):
+        super().__init__(props)
+        self.labels = frozenset(labels)
+
+
+class StreamingGraph:
+    """Serves iter_query from canned rows; execute_query must not be used."""
+
+    def __init__(self):
+        self.streamed = []
+
+    def iter_query(self, query, parameters=None, fetch_size=1000):
+        query = ' '.join(query.split())
+        self.streamed.append(query)
+        if query.startswith("MATCH (m:Muscle) RETURN m"):
+            yield {"m": Node(["Muscle"], fma_id="FMA:1", name='Biceps "long"')}
+        elif "RETURN ex.id as id, ex.name as name" in query:
+            yield {"id": "EX:1", "name": "Curl", "source": "free-exercise-db", "category": "strength"}
+            yield {"id": "EX:2", "name": "Row", "source": "free-exercise-db", "category": None}
+        elif "[r:IS_A]" in query:
+            yield {"parent": Node(["Muscle"], fma_id="FMA:1"), "rel_type": "IS_A",
+                   "child": Node(["Muscle"], fma_id="FMA:2")}
+
+    def execute_query(self, *args, **kwargs):
+        raise AssertionError("export should stream, not materialize")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def exporter(monkeypatch, tmp_path):
+    # The exporter only talks to the graph passed in; skip the neo4j driver import
+    monkeypatch.setitem(sys.modules, "arnold.graph", types.SimpleNamespace(ArnoldGraph=None))
+    spec = importlib.util.spec_from_file_location("export_kernel", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.KernelExporter(StreamingGraph(), output_dir=str(tmp_path))
+
+
+def test_export_all_streams_every_query(exporter, tmp_path):
+    exporter.export_all()
+
+    assert len(exporter.graph.streamed) == 15
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "01_constraints.cypher", "02_reference_nodes.cypher", "03_anatomy.cypher",
+        "04_exercise_sources.cypher", "05_canonical_exercises.cypher",
+        "06_exercise_relationships.cypher",
+    ]
+
+
+def test_exercises_written_as_they_stream(exporter, tmp_path):
+    exporter.export_canonical_exercises()
+
+    assert (tmp_path / "05_canonical_exercises.cypher").read_text().splitlines()[3:] == [
+        'MERGE (ex:Exercise {id: "EX:1"})',
+        'SET ex.name = "Curl", ex.source = "free-exercise-db", ex.is_canonical = true, ex.category = "strength";',
+        'MERGE (ex:Exercise {id: "EX:2"})',
+        'SET ex.name = "Row", ex.source = "free-exercise-db", ex.is_canonical = true;',
+    ]
+
+
+def test_anatomy_escapes_names_and_keeps_hierarchy(exporter, tmp_path):
+    exporter.export_anatomy()
+
+    cypher = (tmp_path / "03_anatomy.cypher").read_text()
+    assert 'SET m.name = "Biceps \\"long\\"";' in cypher
+    assert 'MATCH (p:Muscle {fma_id: "FMA:1"}), (c:Muscle {fma_id: "FMA:2"}) MERGE (p)-[:IS_A]->(c);' in cypher
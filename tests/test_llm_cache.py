@@ -0,0 +1,114 @@
+"""LLM response cache: request keys, read-through modes and replay stubs."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from arnold.llm_cache import CachedLLMClient, LLMCache, LLMCacheMiss, request_key
+
+REQUEST = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": "Classify: Goblet Squat"}],
+    "temperature": 0,
+}
+
+
+class FakeOpenAI:
+    """Stands in for openai.OpenAI; counts API calls."""
+
+    def __init__(self, content='{"category": "strength"}', finish_reason="stop"):
+        self.calls = 0
+        self.content = content
+        self.finish_reason = finish_reason
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **params):
+        self.calls += 1
+        message = SimpleNamespace(role="assistant", content=self.content)
+        return SimpleNamespace(
+            model=params["model"],
+            choices=[SimpleNamespace(index=0, message=message, finish_reason=self.finish_reason)],
+        )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(tmp_path / "llm.sqlite")
+
+
+def client_for(cache, mode, api=None, stub=None):
+    client = CachedLLMClient(api_key="test", cache=cache, mode=mode, stub=stub)
+    client._client = api or FakeOpenAI()
+    return client
+
+
+def test_request_key_ignores_transport_params():
+    assert request_key(REQUEST) == request_key({**REQUEST, "timeout": 30, "user": "x"})
+    assert request_key(REQUEST) == request_key(dict(reversed(list(REQUEST.items()))))
+    assert request_key(REQUEST) != request_key({**REQUEST, "temperature": 0.7})
+
+
+def test_readwrite_serves_repeat_requests_from_cache(cache):
+    api = FakeOpenAI()
+    client = client_for(cache, "readwrite", api)
+
+    first = client.chat.completions.create(**REQUEST)
+    second = client.chat.completions.create(**REQUEST)
+
+    assert api.calls == 1
+    assert second.choices[0].message.content == first.choices[0].message.content
+    assert second.cached
+    assert cache.stats == {"hits": 1, "misses": 1, "stored": 1, "stubbed": 0}
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "llm.sqlite"
+    client_for(LLMCache(path), "readwrite").create(**REQUEST)
+
+    reopened = LLMCache(path)
+    response = client_for(reopened, "replay").create(**REQUEST)
+
+    assert response.choices[0].message.content == '{"category": "strength"}'
+    assert reopened.count() == 1
+
+
+def test_truncated_responses_are_not_stored(cache):
+    client_for(cache, "readwrite", FakeOpenAI(finish_reason="length")).create(**REQUEST)
+    assert cache.count() == 0
+
+
+def test_refresh_overwrites(cache):
+    client_for(cache, "readwrite", FakeOpenAI(content="old")).create(**REQUEST)
+    api = FakeOpenAI(content="new")
+    client_for(cache, "refresh", api).create(**REQUEST)
+
+    assert api.calls == 1
+    assert cache.get(request_key(REQUEST))["content"] == "new"
+
+
+def test_replay_never_calls_the_api(cache):
+    api = FakeOpenAI()
+    with pytest.raises(LLMCacheMiss):
+        client_for(cache, "replay", api).create(**REQUEST)
+
+    stubbed = client_for(cache, "replay", api, stub=lambda **params: "stub answer")
+    assert stubbed.create(**REQUEST).choices[0].message.content == "stub answer"
+    assert api.calls == 0
+    assert cache.count() == 0
+
+
+def test_counters_are_exact_under_threads(cache):
+    client = client_for(cache, "replay", stub=lambda **params: "{}")
+    requests = [{**REQUEST, "messages": [{"role": "user", "content": str(i)}]} for i in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda params: client.create(**params), requests))
+
+    assert cache.stats["misses"] == 200
+    assert cache.stats["stubbed"] == 200
+
+
+def test_unknown_mode_is_rejected(cache):
+    with pytest.raises(ValueError):
+        CachedLLMClient(cache=cache, mode="sometimes")
@@ -0,0 +1,172 @@
+"""Neo4j → Postgres workout sync: staged upsert against an in-memory Postgres fake."""
+
+import importlib.util
+import sys
+import types
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "sync_neo4j_to_postgres.py"
+
+
+@pytest.fixture
+def sync(monkeypatch):
+    # The upsert never talks to Neo4j; a bare module satisfies the import
+    monkeypatch.setitem(sys.modules, "neo4j", types.SimpleNamespace(GraphDatabase=None))
+    spec = importlib.util.spec_from_file_location("sync_neo4j_to_postgres", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakePostgres:
+    """workout_summaries keyed by neo4j_id, with a per-connection staging table."""
+
+    def __init__(self):
+        self.rows = {}
+        self.commits = 0
+
+    def connect(self, uri):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.stage = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.db.commits += 1
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = conn.db.rows
+        self.rowcount = -1
+        self._result = []
+
+    def copy_expert(self, sql, buf):
+        assert sql.startswith("COPY workout_summaries_stage")
+        for line in buf.getvalue().splitlines():
+            values = [None if v == "\\N" else v for v in line.split("\t")]
+            values[1] = date.fromisoformat(values[1])
+            self.conn.stage.append(tuple(values))
+
+    def execute(self, sql):
+        sql = " ".join(sql.split())
+        if sql.startswith("CREATE TEMP TABLE workout_summaries_stage"):
+            self.conn.stage = []
+        elif sql.startswith("SELECT DISTINCT ws.workout_date"):
+            self._result = {(self.rows[r[0]][1],) for r in self.conn.stage
+                            if r[0] in self.rows and self.rows[r[0]][1] != r[1]}
+        elif sql.startswith("INSERT INTO workout_summaries"):
+            assert "IS DISTINCT FROM" in sql
+            changed = [r for r in self.conn.stage if self.rows.get(r[0]) != r]
+            for r in changed:
+                self.rows[r[0]] = r
+            self._result = [(r[1],) for r in changed]
+            self.rowcount = len(changed)
+        else:
+            raise AssertionError(f"unexpected SQL: {sql[:60]}")
+
+    def fetchall(self):
+        return list(self._result)
+
+    def close(self):
+        pass
+
+
+def workout(neo4j_id, day, volume=1000, name="Lower"):
+    return {
+        "neo4j_id": neo4j_id, "workout_date": day, "workout_name": name, "workout_type": "strength",
+        "duration_minutes": 60, "set_count": 12, "total_volume_lbs": volume, "patterns": ["Squat"],
+        "exercises": [{"name": "Goblet Squat", "sets": 3, "max_load": 50, "total_reps": 30,
+                       "set_details": [{"set_num": 1, "reps": 10, "load_lbs": 50}]}],
+        "source": "logged",
+    }
+
+
+@pytest.fixture
+def postgres(sync, monkeypatch):
+    db = FakePostgres()
+    monkeypatch.setattr(sync.psycopg2, "connect", db.connect)
+    return db
+
+
+def test_upsert_inserts_then_skips_unchanged_rows(sync, postgres):
+    workouts = [workout("w1", "2025-03-03"), workout("w2", "2025-03-05")]
+
+    first = sync.load_to_postgres(workouts)
+    again = sync.load_to_postgres(workouts)
+
+    assert first == {"staged": 2, "changed": 2, "dates": {date(2025, 3, 3), date(2025, 3, 5)}}
+    assert again == {"staged": 2, "changed": 0, "dates": set()}
+    assert len(postgres.rows) == 2
+
+
+def test_moved_workout_reports_old_and_new_dates(sync, postgres):
+    sync.load_to_postgres([workout("w1", "2025-03-03"), workout("w2", "2025-03-05")])
+
+    result = sync.load_to_postgres([workout("w1", "2025-03-10", volume=1200), workout("w2", "2025-03-05")])
+
+    assert result["changed"] == 1
+    assert result["dates"] == {date(2025, 3, 3), date(2025, 3, 10)}
+    assert postgres.rows["w1"][6] == "1200.0"
+
+
+def test_rows_without_a_date_are_not_staged(sync, postgres):
+    assert sync.load_to_postgres([workout("w1", None)]) == {"staged": 0, "changed": 0, "dates": set()}
+    assert postgres.commits == 0
+
+
+def test_copy_buffer_escapes_text(sync):
+    buf = sync._copy_buffer([("a\tb", None, "line\nbreak", "back\\slash")])
+    assert buf.getvalue() == "a\\tb\t\\N\tline\\nbreak\tback\\\\slash\n"
+
+
+def test_affected_weeks_cover_trend_lookahead(sync):
+    weeks = sync.affected_weeks({date(2025, 3, 5)})
+    assert weeks == [date(2025, 3, 3), date(2025, 3, 10), date(2025, 3, 17), date(2025, 3, 24)]
+
+
+class RecordingConnection:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.statements.append(sql)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("changed, views", [
+    (True, ["biometric_trends", "training_trends"]),
+    (False, ["biometric_trends"]),
+])
+def test_main_refreshes_trends(sync, monkeypatch, tmp_path, changed, views):
+    statements = []
+    monkeypatch.setattr(sync, "STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(sync, "load_to_postgres",
+                        lambda workouts: {"staged": 1, "changed": int(changed), "dates": {date(2025, 3, 3)}})
+    monkeypatch.setattr(sync.psycopg2, "connect", lambda uri: RecordingConnection(statements))
+    unstamped = {**workout("w1", "2025-03-03"), "version": None}
+    monkeypatch.setattr(sync, "get_neo4j_workouts", lambda since: ([unstamped], 1))
+
+    assert sync.main([]) == 0
+    assert statements == [f"REFRESH MATERIALIZED VIEW {view};" for view in views]
@@ -0,0 +1,102 @@
+"""ObsidianWorkoutImporter.resolve_exercise_names against a fake Neo4j session."""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent.parent / "src" / "import_obsidian_workouts.py"
+
+VARIANTS = [
+    {"id": "VAR:bench", "name": "Bench Press"},
+    {"id": "VAR:incline", "name": "Incline Bench Press"},
+    {"id": "VAR:row", "name": "Dumbbell Row"},
+]
+ACTIVITIES = [{"id": "ACT:run", "name": "Run"}]
+
+
+class FakeSession:
+    """
+    Answers the resolver query by applying its precedence in Python
+    (exact variant name, containment either way, then Activity).
+    """
+
+    def __init__(self, queries):
+        self.queries = queries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, names):
+        self.queries.append(query)
+        records = []
+        for name in names:
+            needle = name.lower()
+            exact = [v["id"] for v in VARIANTS if v["name"].lower() == needle]
+            fuzzy = [v["id"] for v in VARIANTS
+                     if needle in v["name"].lower() or v["name"].lower() in needle]
+            activity = [a["id"] for a in ACTIVITIES
+                        if a["name"].lower() == needle or a["name"].lower() in needle]
+            records.append({"name": name, "id": (exact or fuzzy or activity or [None])[0]})
+        return records
+
+
+class FakeDriver:
+    def __init__(self):
+        self.queries = []
+
+    def session(self, database=None):
+        return FakeSession(self.queries)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def importer(monkeypatch, tmp_path):
+    # Neo4j (and the progress bar) are only imported, never used, by the resolver
+    driver = FakeDriver()
+    neo4j = types.ModuleType("neo4j")
+    neo4j.GraphDatabase = types.SimpleNamespace(driver=lambda uri, auth: driver)
+    monkeypatch.setitem(sys.modules, "neo4j", neo4j)
+    if importlib.util.find_spec("tqdm") is None:
+        tqdm = types.ModuleType("tqdm")
+        tqdm.tqdm = lambda iterable=None, **kwargs: iterable
+        monkeypatch.setitem(sys.modules, "tqdm", tqdm)
+
+    spec = importlib.util.spec_from_file_location("import_obsidian_workouts", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ObsidianWorkoutImporter(tmp_path), driver
+
+
+def test_resolves_in_one_query_with_precedence(importer):
+    importer, driver = importer
+
+    resolved = importer.resolve_exercise_names([
+        "Bench Press", "bench press (paused)", "Incline Bench Press", "Row", "Easy Run", "Burpee",
+    ])
+
+    assert resolved == {
+        "Bench Press": "VAR:bench",
+        "bench press (paused)": "VAR:bench",     # parenthetical dropped, exact beats containment
+        "Incline Bench Press": "VAR:incline",
+        "Row": "VAR:row",                        # variant name contains the needle
+        "Easy Run": "ACT:run",                   # needle contains the activity name
+        "Burpee": None,
+    }
+    assert len(driver.queries) == 1
+
+
+def test_activity_fallback_is_aggregated_before_return(importer):
+    importer, driver = importer
+    importer.resolve_exercise_names(["Run"])
+
+    query = " ".join(driver.queries[0].split())
+    assert "WITH name, exact_id, fuzzy_id, collect(a.id)[0] AS activity_id" in query
+    assert query.endswith("RETURN name, coalesce(exact_id, fuzzy_id, activity_id) AS id")
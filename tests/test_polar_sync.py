@@ -0,0 +1,202 @@
+"""Polar AccessLink sync against a local API stub and an in-memory Postgres fake."""
+
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import polar_api
+import polar_loader
+import psycopg2
+import pytest
+
+START = "2024-03-0{}T07:00:00"
+
+# 1 = new, 2 = already imported, 3 = new but one HR sample is out of the
+# hr_samples.hr_value SMALLINT range, so only that session is left out.
+EXERCISES = {
+    "1": {"id": "1", "start_time": START.format(1), "duration": "PT3S", "sport": "RUNNING",
+          "samples": [{"sample_type": 0, "recording_rate": 1, "data": "120,0,122"}]},
+    "2": {"id": "2", "start_time": START.format(2), "duration": "PT2S", "sport": "CYCLING",
+          "samples": [{"sample_type": 0, "recording_rate": 1, "data": "101,102"}]},
+    "3": {"id": "3", "start_time": START.format(3), "duration": "PT2S", "sport": "ROWING",
+          "samples": [{"sample_type": 0, "recording_rate": 1, "data": "130,40000"}]},
+}
+
+
+class PolarStub(BaseHTTPRequestHandler):
+    """GET /v3/exercises (summaries) and /v3/exercises/<id> (with samples)."""
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.server.paths.append(path)
+        if path.rsplit("/", 1)[1] in self.server.broken:
+            self.send_response(500)
+            self.end_headers()
+            return
+        if path == "/v3/exercises":
+            body = [{k: v for k, v in ex.items() if k != "samples"} for ex in EXERCISES.values()]
+        elif path.startswith("/v3/exercises/") and path.rsplit("/", 1)[1] in EXERCISES:
+            body = EXERCISES[path.rsplit("/", 1)[1]]
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeDB:
+    """polar_sessions / hr_samples in memory, with commit/rollback and statement counts."""
+
+    encoding = "UTF8"
+
+    def __init__(self, existing=()):
+        self.sessions = {sid: i for i, sid in enumerate(existing, start=100)}
+        self.samples = []
+        self.committed = None
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def snapshot(self):
+        return dict(self.sessions), list(self.samples)
+
+    def commit(self):
+        self.committed = self.snapshot()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.connection = db
+        self.rowcount = -1
+        self._rows = []
+        self._values = []
+
+    def mogrify(self, template, args):
+        # Called by execute_values; keep the row, emit a placeholder
+        self._values.append(args)
+        return b"(?)"
+
+    def execute(self, sql, params=None):
+        sql = sql.decode() if isinstance(sql, bytes) else sql
+        self.db.statements.append(sql.split()[0])
+        if sql.startswith("SELECT polar_session_id"):
+            self._rows = [(sid,) for sid in params[0] if sid in self.db.sessions]
+        elif sql.startswith("INSERT INTO polar_sessions"):
+            self._rows = []
+            for row in self._values:
+                self.db.sessions[row[0]] = len(self.db.sessions) + 1
+                self._rows.append((row[0], self.db.sessions[row[0]]))
+            self._values = []
+        else:
+            raise AssertionError(f"unexpected SQL: {sql}")
+
+    def copy_expert(self, sql, buf):
+        self.db.statements.append("COPY")
+        rows = [line.split("\t") for line in buf.getvalue().splitlines()]
+        for row in rows:
+            if not -32768 <= int(row[2]) <= 32767:
+                raise psycopg2.errors.lookup("22003")("smallint out of range")
+            self.db.samples.append(tuple(row))
+        self.rowcount = len(rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def polar_stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PolarStub)
+    server.paths = []
+    server.broken = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(polar_api, "API_BASE", f"http://127.0.0.1:{server.server_port}/v3")
+    monkeypatch.setattr(polar_api, "get_valid_access_token", lambda: "token")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_fetches_samples_for_new_sessions_only(polar_stub, monkeypatch):
+    db = FakeDB(existing=["2"])
+    monkeypatch.setattr(polar_api, "connect", lambda uri: db)
+
+    result = polar_api.sync_sessions(date(2024, 3, 1), date(2024, 3, 31), concurrency=2)
+
+    assert sorted(polar_stub.paths) == ["/v3/exercises", "/v3/exercises/1", "/v3/exercises/3"]
+    assert result["sessions_imported"] == 1
+    assert result["samples_imported"] == 2  # the 0 reading is a dropout
+    assert result["skipped"] == 1
+    assert [sid for sid, _ in result["failed"]] == ["3"]
+
+
+def test_invalid_session_is_left_out_alone(polar_stub, monkeypatch):
+    db = FakeDB(existing=["2"])
+    monkeypatch.setattr(polar_api, "connect", lambda uri: db)
+
+    result = polar_api.sync_sessions(date(2024, 3, 1), date(2024, 3, 31))
+
+    sessions, samples = db.committed
+    assert set(sessions) == {"1", "2"}
+    assert {row[0] for row in samples} == {str(sessions["1"])}
+    assert all(row[3] == "polar_api" for row in samples)
+    assert result["failed"] == [("3", "HR sample out of range: 40000")]
+
+
+def test_failed_detail_fetch_is_retried_next_sync(polar_stub, monkeypatch):
+    db = FakeDB(existing=["2", "3"])
+    monkeypatch.setattr(polar_api, "connect", lambda uri: db)
+    polar_stub.broken.add("1")
+
+    result = polar_api.sync_sessions(date(2024, 3, 1), date(2024, 3, 31))
+
+    assert result["sessions_imported"] == 0
+    assert result["failed"] == [("1", "detail fetch failed")]
+    assert "1" not in db.sessions
+
+    polar_stub.broken.clear()
+    result = polar_api.sync_sessions(date(2024, 3, 1), date(2024, 3, 31))
+
+    assert result["sessions_imported"] == 1
+    assert result["samples_imported"] == 2
+    assert result["failed"] == []
+
+
+def test_batch_loads_in_three_round_trips():
+    db = FakeDB()
+    parsed = [polar_api.parse_session(EXERCISES[sid]) for sid in ("1", "2", "3")]
+
+    result = polar_loader.load_sessions(db, parsed, source="polar_file", verbose=False)
+
+    assert result["sessions_imported"] == 2
+    assert result["samples_imported"] == 4
+    assert [sid for sid, _ in result["failed"]] == ["3"]
+    assert db.statements == ["SELECT", "INSERT", "COPY"]
+
+
+def test_load_sessions_dedupes_within_batch():
+    db = FakeDB()
+    parsed = [polar_api.parse_session(EXERCISES["1"]), polar_api.parse_session(EXERCISES["1"])]
+
+    result = polar_loader.load_sessions(db, parsed, source="polar_file", verbose=False)
+
+    assert result == {"sessions_imported": 1, "samples_imported": 2, "skipped": 1, "failed": []}
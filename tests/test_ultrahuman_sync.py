@@ -0,0 +1,134 @@
+"""Ultrahuman fetch/sync against a local stub of the /metrics endpoint."""
+
+import importlib.util
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from ultrahuman_fetcher import UltrahumanAuthError, UltrahumanFetcher
+
+VALID_TOKEN = "good-token"
+SAMPLES_SCRIPT = Path(__file__).parent.parent / "scripts" / "sync_ultrahuman.py"
+
+
+def metrics_payload(day: str) -> dict:
+    return {"data": {"metric_data": [
+        {"type": "night_rhr", "object": {"avg": 52}},
+        {"type": "avg_sleep_hrv", "object": {"value": 61.5}},
+        {"type": "steps", "object": {"value": "n/a"}},
+    ]}, "date": day}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers GET /api/v1/metrics; 2024-01-03 has no data, bad tokens get 401."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        day = parse_qs(url.query).get("date", [""])[0]
+        self.server.requests.append(day)
+        if url.path != "/api/v1/metrics":
+            status, body = 404, {}
+        elif self.headers.get("Authorization") != VALID_TOKEN:
+            status, body = 401, {"error": "unauthorized"}
+        elif day == "2024-01-03":
+            status, body = 404, {}
+        else:
+            status, body = 200, metrics_payload(day)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/api/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_range_covers_every_day(stub_url):
+    with UltrahumanFetcher(VALID_TOKEN, "me@example.com", concurrency=3, rate=100,
+                           base_url=stub_url) as fetcher:
+        results = dict(fetcher.fetch_range(date(2024, 1, 1), date(2024, 1, 5)))
+
+    assert sorted(results) == [date(2024, 1, d) for d in range(1, 6)]
+    assert results[date(2024, 1, 3)] is None
+    assert results[date(2024, 1, 2)]["date"] == "2024-01-02"
+    assert fetcher.stats["requests"] == 5
+    assert fetcher.stats["not_found"] == 1
+
+
+def test_fetch_range_raises_on_bad_token(stub_url):
+    fetcher = UltrahumanFetcher("expired", "me@example.com", rate=100, base_url=stub_url)
+    with fetcher, pytest.raises(UltrahumanAuthError):
+        list(fetcher.fetch_range(date(2024, 1, 1), date(2024, 1, 5)))
+
+
+@pytest.fixture
+def sync_module(monkeypatch):
+    pytest.importorskip("psycopg2")
+    import ultrahuman_to_postgres
+
+    monkeypatch.setenv("ULTRAHUMAN_USER_EMAIL", "me@example.com")
+    return ultrahuman_to_postgres
+
+
+def test_extract_metrics_skips_non_numeric(sync_module):
+    rows = sync_module.extract_metrics(metrics_payload("2024-01-01"), date(2024, 1, 1))
+    assert rows == [
+        (date(2024, 1, 1), "resting_hr", 52.0, "ultrahuman"),
+        (date(2024, 1, 1), "hrv_morning", 61.5, "ultrahuman"),
+    ]
+
+
+def test_main_dry_run_against_stub(sync_module, stub_url, monkeypatch):
+    monkeypatch.setenv("ULTRAHUMAN_AUTH_TOKEN", VALID_TOKEN)
+    code = sync_module.main(["--start", "2024-01-01", "--end", "2024-01-05",
+                             "--dry-run", "--quiet", "--base-url", stub_url, "--rate", "100"])
+    assert code == 0
+
+
+def test_main_exits_nonzero_on_auth_error(sync_module, stub_url, monkeypatch, capsys):
+    monkeypatch.setenv("ULTRAHUMAN_AUTH_TOKEN", "expired")
+    code = sync_module.main(["--date", "2024-01-01", "--dry-run", "--base-url", stub_url])
+    assert code == 1
+    assert "auth token" in capsys.readouterr().out
+
+
+@pytest.fixture
+def samples_sync(monkeypatch):
+    # scripts/sync_ultrahuman.py, not its namesake in scripts/sync/
+    pytest.importorskip("numpy")
+    spec = importlib.util.spec_from_file_location("sync_ultrahuman", SAMPLES_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    monkeypatch.setenv("ULTRAHUMAN_USER_EMAIL", "me@example.com")
+    return module
+
+
+def test_connection_test_uses_fetcher(samples_sync, stub_url, monkeypatch, capsys):
+    monkeypatch.setenv("ULTRAHUMAN_AUTH_TOKEN", VALID_TOKEN)
+    samples_sync.main(["--test", "--base-url", stub_url])
+    assert "SUCCESS" in capsys.readouterr().out
+
+
+def test_connection_test_exits_on_bad_token(samples_sync, stub_url, monkeypatch):
+    monkeypatch.setenv("ULTRAHUMAN_AUTH_TOKEN", "expired")
+    with pytest.raises(SystemExit) as exc:
+        samples_sync.main(["--test", "--base-url", stub_url])
+    assert exc.value.code == 1
@@ -0,0 +1,169 @@
+"""Grammar-first workout parsing and exercise name normalization."""
+
+import pytest
+
+from arnold.exercise_index import ExerciseIndex, extract_exercise_names
+from arnold.hybrid_ingest import HybridWorkoutParser
+from arnold.normalizer import (
+    AliasIndex,
+    find_canonical_exercise_id,
+    is_non_exercise,
+    normalize_exercise_name_for_matching,
+)
+
+EXERCISE_DB = [
+    {"id": "EXERCISE:Deadlift", "name": "Deadlift", "category": "strength"},
+    {"id": "EXERCISE:Goblet_Squat", "name": "Goblet Squat", "category": "strength"},
+    {"id": "EXERCISE:Push_Up", "name": "Push-Up", "category": "strength"},
+    {"id": "EXERCISE:Farmer_Carry", "name": "Farmer Carry", "category": "conditioning"},
+]
+
+WORKOUT = """---
+date: 2025-01-02
+perceived_intensity: 7
+tags: strength
+---
+## Main
+- Deadlift: 3x5 @ 225 lb
+- Goblet Squat 3x10 @ 50 lb
+- Push-ups 3x15
+- Farmer carry 2 min
+- Kettlebell swing + burpees 3 rounds
+
+## Notes
+- Felt strong
+"""
+
+
+class FakeLLM:
+    """Records the blocks it is sent; answers each with one custom exercise."""
+
+    def __init__(self):
+        self.calls = []
+
+    def parse_exercise_blocks(self, blocks, exercise_database, workout_filename):
+        self.calls.append(blocks)
+        return {
+            block_id: [{"name": "Swing/Burpee Complex", "canonical_id": None, "is_custom": True,
+                        "category": "conditioning", "sets": [], "notes": ""}]
+            for block_id in blocks
+        }
+
+
+def sets_of(exercise):
+    return [(s.get("weight"), s.get("reps"), s.get("duration_seconds")) for s in exercise["sets"]]
+
+
+def test_grammar_only_parse():
+    parsed = HybridWorkoutParser(None).parse_workout(WORKOUT, EXERCISE_DB, "2025-01-02.md")
+    by_id = {e["canonical_id"]: e for e in parsed["exercises"]}
+
+    assert parsed["date"] == "2025-01-02"
+    assert parsed["metadata"]["tags"] == ["strength"]
+    assert sets_of(by_id["EXERCISE:Deadlift"]) == [(225.0, 5, None)] * 3
+    assert sets_of(by_id["EXERCISE:Goblet_Squat"]) == [(50.0, 10, None)] * 3
+    assert sets_of(by_id["EXERCISE:Push_Up"]) == [(None, 15, None)] * 3
+    assert sets_of(by_id["EXERCISE:Farmer_Carry"]) == [(None, None, 120)]
+    assert by_id["EXERCISE:Deadlift"]["provenance"] == {"source": "grammar", "lines": [7]}
+    assert parsed["notes"] == "Felt strong"
+
+    meta = parsed["parsing_metadata"]
+    assert (meta["blocks_total"], meta["blocks_grammar"], meta["llm_calls"]) == (5, 4, 0)
+    assert meta["parsing_warnings"] == ["line 11 skipped (no LLM): compound line: 'Kettlebell swing + burpees'"]
+
+
+def test_only_ambiguous_blocks_go_to_the_llm():
+    llm = FakeLLM()
+    parsed = HybridWorkoutParser(llm).parse_workout(WORKOUT, EXERCISE_DB, "2025-01-02.md")
+
+    assert len(llm.calls) == 1
+    assert [lines for lines in llm.calls[0].values()] == [["Kettlebell swing + burpees 3 rounds"]]
+    custom = parsed["exercises"][-1]
+    assert custom["provenance"]["source"] == "llm"
+    assert custom["order_in_workout"] == 5
+    assert parsed["parsing_metadata"]["llm_calls"] == 1
+
+
+@pytest.mark.parametrize("line, reason", [
+    ("- Mystery Move 3x10", "no catalog match"),
+    ("- Deadlift 15x5", "sets or load?"),
+])
+def test_ambiguous_lines_are_not_guessed(line, reason):
+    markdown = f"---\ndate: 2025-01-03\n---\n{line}\n"
+    parsed = HybridWorkoutParser(None).parse_workout(markdown, EXERCISE_DB)
+
+    assert parsed["exercises"] == []
+    assert reason in parsed["parsing_metadata"]["parsing_warnings"][0]
+
+
+@pytest.mark.parametrize("name", ["Sets: 3", "Notes: easy day", "---", "3:00", "12", "ok", "50 per side"])
+def test_non_exercise_lines(name):
+    assert is_non_exercise(name)
+
+
+@pytest.mark.parametrize("raw, normalized", [
+    ("Push-Ups (5/side)", "push up"),
+    ("Weighted Pull-ups 25 lb", "pull up"),
+    ("Bench Press", "bench press"),
+    ("Plank Static", "plank"),
+    ("Dumbbell Rows with pause", "dumbbell row"),
+])
+def test_normalize_for_matching(raw, normalized):
+    assert normalize_exercise_name_for_matching(raw) == normalized
+
+
+def test_alias_index_prefers_longest_match():
+    index = AliasIndex({
+        "row": "EXERCISE:Row",
+        "dumbbell row": "EXERCISE:Dumbbell_Row",
+        "single arm dumbbell row": "EXERCISE:Single_Arm_Dumbbell_Row",
+    })
+
+    assert index.lookup("dumbbell row") == "EXERCISE:Dumbbell_Row"
+    assert index.lookup("kneeling single arm dumbbell row") == "EXERCISE:Single_Arm_Dumbbell_Row"
+    assert index.lookup("cable rows") == "EXERCISE:Row"
+    assert index.lookup("single arm") == "EXERCISE:Single_Arm_Dumbbell_Row"  # alias containing the name
+    assert index.lookup("squat") is None
+
+
+def test_alias_index_first_registration_wins():
+    index = AliasIndex({"deadlift": "EXERCISE:Deadlift"})
+
+    assert not index.add("Deadlifts", "EXERCISE:Other")
+    assert index.add("trap bar deadlift", "EXERCISE:Trap_Bar_Deadlift")
+    assert index.lookup("trap bar deadlift") == "EXERCISE:Trap_Bar_Deadlift"
+    assert len(index) == 2
+
+
+def test_default_index_uses_static_mappings():
+    assert find_canonical_exercise_id(normalize_exercise_name_for_matching("Sandbag Clean")) == "EXERCISE:SANDBAG_CARRY"
+
+
+def test_trailing_count_is_not_part_of_the_name():
+    markdown = "---\ndate: 2025-01-03\n---\n- Push-ups 10\n- Goblet squat 3x10\n"
+
+    assert extract_exercise_names(markdown) == ["Push-ups", "Goblet squat"]
+    assert ExerciseIndex(EXERCISE_DB).best_match("push-ups 10")[0]["id"] == "EXERCISE:Push_Up"
+
+    parsed = HybridWorkoutParser(None).parse_workout(markdown, EXERCISE_DB)
+    assert "unparsed notation: '10'" in parsed["parsing_metadata"]["parsing_warnings"][0]
+
+
+def test_shared_index_is_keyed_by_catalog_contents():
+    index = ExerciseIndex.for_database(EXERCISE_DB)
+
+    assert ExerciseIndex.for_database([dict(row) for row in EXERCISE_DB]) is index
+    renamed = [{**EXERCISE_DB[0], "name": "Romanian Deadlift"}] + EXERCISE_DB[1:]
+    assert ExerciseIndex.for_database(renamed) is not index
+
+
+@pytest.mark.parametrize("line, seconds", [("- Plank 1:30", 90), ("- Plank: 1:00", 60)])
+def test_clock_time_after_name_takes_the_grammar_path(line, seconds):
+    markdown = f"---\ndate: 2025-01-03\n---\n{line}\n"
+    db = EXERCISE_DB + [{"id": "EXERCISE:Plank", "name": "Plank", "category": "core"}]
+    parsed = HybridWorkoutParser(None).parse_workout(markdown, db)
+
+    assert [(e["canonical_id"], sets_of(e)) for e in parsed["exercises"]] == [
+        ("EXERCISE:Plank", [(None, None, seconds)])
+    ]
+    assert extract_exercise_names(markdown) == ["Plank"]